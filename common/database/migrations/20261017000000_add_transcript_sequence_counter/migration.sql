@@ -0,0 +1,15 @@
+-- Per-session transcript sequence counter: writers reserve a block of
+-- sequence numbers with one UPDATE ... increment instead of reading
+-- MAX(sequence_num) before every append.
+
+ALTER TABLE "conversation_sessions"
+    ADD COLUMN "next_sequence_num" INTEGER NOT NULL DEFAULT 1;
+
+UPDATE "conversation_sessions" AS s
+SET "next_sequence_num" = e.max_seq + 1
+FROM (
+    SELECT "session_id", MAX("sequence_num") AS max_seq
+    FROM "session_transcript_entries"
+    GROUP BY "session_id"
+) AS e
+WHERE e."session_id" = s."id";
@@ -0,0 +1,33 @@
+-- Per-session hash chains for the audit ledger. Existing rows keep their
+-- single global chain (chain_id '') and are numbered in their original
+-- append order so they still verify.
+
+ALTER TABLE "audit_ledger"
+    ADD COLUMN "chain_id" TEXT NOT NULL DEFAULT '',
+    ADD COLUMN "chain_seq" INTEGER NOT NULL DEFAULT 0;
+
+UPDATE "audit_ledger" AS a
+SET "chain_seq" = o.seq
+FROM (
+    SELECT "id", ROW_NUMBER() OVER (ORDER BY "created_at", "id") AS seq
+    FROM "audit_ledger"
+) AS o
+WHERE o."id" = a."id";
+
+CREATE UNIQUE INDEX "audit_ledger_chain_id_chain_seq_key" ON "audit_ledger"("chain_id", "chain_seq");
+CREATE INDEX "audit_ledger_created_at_idx" ON "audit_ledger"("created_at");
+
+CREATE TABLE "audit_ledger_checkpoints" (
+    "id" TEXT NOT NULL,
+    "merkle_root" TEXT NOT NULL,
+    "prev_root" TEXT NOT NULL DEFAULT '',
+    "tips" JSONB NOT NULL,
+    "chain_count" INTEGER NOT NULL,
+    "window_start" TIMESTAMP(3) NOT NULL,
+    "window_end" TIMESTAMP(3) NOT NULL,
+    "created_at" TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+    CONSTRAINT "audit_ledger_checkpoints_pkey" PRIMARY KEY ("id")
+);
+
+CREATE INDEX "audit_ledger_checkpoints_window_end_idx" ON "audit_ledger_checkpoints"("window_end");
@@ -0,0 +1,37 @@
+-- Hourly per-agent invocation rollup with a fixed latency histogram.
+-- SuperAgent accumulates outcomes in memory and flushes them here with
+-- additive upserts; success_rate / p95_latency_ms are derived from these
+-- rows instead of a read-modify-write of the agents row per invocation.
+
+CREATE TABLE "agent_metrics_hourly" (
+    "agent_id"      TEXT         NOT NULL,
+    "bucket_start"  TIMESTAMP(3) NOT NULL,
+    "latency_le_ms" INTEGER      NOT NULL,
+    "invocations"   INTEGER      NOT NULL DEFAULT 0,
+    "successes"     INTEGER      NOT NULL DEFAULT 0,
+
+    CONSTRAINT "agent_metrics_hourly_pkey"
+        PRIMARY KEY ("agent_id", "bucket_start", "latency_le_ms")
+);
+
+CREATE INDEX "agent_metrics_hourly_bucket_start_idx"
+    ON "agent_metrics_hourly"("bucket_start");
+
+-- Backfill from existing invocations. Bounds must match
+-- superagent.pricing.agent_metrics.LATENCY_BOUNDS_MS.
+INSERT INTO "agent_metrics_hourly"
+    ("agent_id", "bucket_start", "latency_le_ms", "invocations", "successes")
+SELECT
+    i."agent_id",
+    date_trunc('hour', i."created_at"),
+    COALESCE(
+        (SELECT MIN(b)
+         FROM unnest(ARRAY[50, 100, 250, 500, 1000, 2500, 5000, 10000,
+                           30000, 60000, 120000, 600000]) AS b
+         WHERE b >= COALESCE(i."latency_ms", 0)),
+        600000
+    ) AS le,
+    COUNT(*),
+    COUNT(*) FILTER (WHERE i."status" = 'SUCCESS')
+FROM "agent_invocations" AS i
+GROUP BY 1, 2, 3;
@@ -0,0 +1,32 @@
+-- Semantic plan cache for the Planning & Discovery service. Goals are
+-- embedded and matched by cosine similarity, so paraphrases of a recently
+-- planned goal reuse its validated manifest. Entries referencing an agent
+-- are deleted when that agent re-registers.
+
+CREATE EXTENSION IF NOT EXISTS vector;
+
+CREATE TABLE "plan_cache_entries" (
+    "id"           TEXT         NOT NULL,
+    "goal"         TEXT         NOT NULL,
+    "context_hash" TEXT         NOT NULL,
+    "embedding"    vector(768)  NOT NULL,
+    "manifest"     JSONB        NOT NULL,
+    "agent_ids"    TEXT[]       NOT NULL DEFAULT ARRAY[]::TEXT[],
+    "created_at"   TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    "expires_at"   TIMESTAMP(3) NOT NULL,
+
+    CONSTRAINT "plan_cache_entries_pkey" PRIMARY KEY ("id")
+);
+
+CREATE INDEX "plan_cache_entries_context_hash_idx"
+    ON "plan_cache_entries"("context_hash");
+
+CREATE INDEX "plan_cache_entries_expires_at_idx"
+    ON "plan_cache_entries"("expires_at");
+
+CREATE INDEX "plan_cache_entries_agent_ids_idx"
+    ON "plan_cache_entries" USING GIN ("agent_ids");
+
+CREATE INDEX "plan_cache_entries_embedding_hnsw_idx"
+    ON "plan_cache_entries" USING hnsw ("embedding" vector_cosine_ops)
+    WITH (m = 16, ef_construction = 64);
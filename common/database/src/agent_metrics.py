@@ -0,0 +1,53 @@
+"""Rolling agent metrics computed from ``agent_metrics_hourly``.
+
+SuperAgent refreshes the agents it has just flushed buckets for; the
+gateway's nightly metrics_refresh refreshes every agent with traffic. Both
+run the statement built here, so the two writers can never disagree on how
+``success_rate`` and ``p95_latency_ms`` are derived.
+"""
+
+from __future__ import annotations
+
+# success_rate + p95_latency_ms from the last seven days of buckets. p95 is the
+# upper bound of the first latency bucket whose cumulative count reaches 95%
+# of the agent's invocations. uptime_score: placeholder — a real value needs a
+# health_check_log table; 1.0 until health ping logging is implemented.
+_AGENT_ROLLUP_SQL = """
+WITH recent AS (
+    SELECT agent_id, latency_le_ms,
+           SUM(invocations) AS n, SUM(successes) AS ok
+    FROM agent_metrics_hourly
+    WHERE bucket_start >= timezone('utc', now()) - interval '7 days'{scope}
+    GROUP BY agent_id, latency_le_ms
+), cumulative AS (
+    SELECT agent_id, latency_le_ms,
+           SUM(n) OVER (PARTITION BY agent_id ORDER BY latency_le_ms) AS cum,
+           SUM(n) OVER (PARTITION BY agent_id) AS total,
+           SUM(ok) OVER (PARTITION BY agent_id) AS ok
+    FROM recent
+), rollup AS (
+    SELECT DISTINCT ON (agent_id) agent_id, latency_le_ms, total, ok
+    FROM cumulative
+    WHERE cum >= 0.95 * total
+    ORDER BY agent_id, latency_le_ms
+)
+UPDATE agents AS a
+SET success_rate = r.ok::float / r.total,
+    p95_latency_ms = r.latency_le_ms,
+    uptime_score = 1.0
+FROM rollup AS r
+WHERE a.id = r.agent_id AND r.total > 0
+"""
+
+
+def agent_rollup_sql(agent_count: int = 0) -> str:
+    """``UPDATE agents`` statement refreshing rolled-up metrics.
+
+    With *agent_count* > 0 only the agents bound to ``$1 .. $agent_count`` are
+    refreshed; otherwise every agent with traffic in the window.
+    """
+    scope = ""
+    if agent_count > 0:
+        ids = ", ".join(f"${i + 1}" for i in range(agent_count))
+        scope = f"\n      AND agent_id IN ({ids})"
+    return _AGENT_ROLLUP_SQL.format(scope=scope)
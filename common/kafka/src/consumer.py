@@ -6,10 +6,12 @@ import asyncio
 import contextlib
 import json
 import logging
+import time
 from abc import ABC, abstractmethod
+from collections.abc import Awaitable, Callable, Sequence
 from typing import Any
 
-from aiokafka import AIOKafkaConsumer
+from aiokafka import AIOKafkaConsumer, AIOKafkaProducer, ConsumerRecord, TopicPartition
 from pydantic import BaseModel
 
 logger = logging.getLogger(__name__)
@@ -26,6 +28,22 @@ class KafkaConsumerConfig(BaseModel):
     max_poll_records: int = 50
     session_timeout_ms: int = 30000
     heartbeat_interval_ms: int = 10000
+    # Batched mode — fetch up to batch_max_records per getmany(), process each
+    # partition's records with at most max_concurrency keys in flight (order
+    # is kept per message key) and commit only after the whole batch is done.
+    # Auto-commit is disabled in this mode.
+    batch_mode: bool = False
+    batch_max_records: int = 100
+    batch_timeout_ms: int = 1000
+    max_concurrency: int = 1
+    # Poison messages: retried max_retries times, then published to
+    # dead_letter_topic (if set) and skipped. Retries back off exponentially
+    # from retry_backoff_ms up to retry_backoff_max_ms, so a short outage of
+    # a downstream dependency does not exhaust them within milliseconds.
+    max_retries: int = 0
+    retry_backoff_ms: int = 500
+    retry_backoff_max_ms: int = 10000
+    dead_letter_topic: str | None = None
 
 
 class BaseKafkaConsumer(ABC):
@@ -34,7 +52,14 @@ class BaseKafkaConsumer(ABC):
 
     Subclasses implement ``handle_message`` to process individual messages.
     The consumer loop is resilient: per-message errors are logged and skipped
-    so that a single bad message never crashes the consumer.
+    (or dead-lettered) so that a single bad message never crashes the consumer.
+
+    With ``batch_mode`` enabled, subclasses may also define
+    ``handle_batch`` to process a partition's records in one call (e.g. one
+    embedding request for many manifests). If it raises, the batch is
+    re-processed message by message so only the poison message is
+    dead-lettered — including the messages ``handle_batch`` had already
+    applied before it failed, so handlers must be idempotent.
 
     Lifecycle::
 
@@ -44,11 +69,27 @@ class BaseKafkaConsumer(ABC):
         await consumer.stop()
     """
 
+    # Optional ``async def handle_batch(self, messages) -> None`` hook, used
+    # only in ``batch_mode``. Messages arrive in offset order. If it raises
+    # part-way, every message of the batch is replayed through
+    # ``handle_message`` — both must be idempotent (e.g. upserts keyed by the
+    # message key). ``None`` processes each message through ``handle_message``.
+    handle_batch: Callable[[list[dict[str, Any]]], Awaitable[None]] | None = None
+
     def __init__(self, config: KafkaConsumerConfig) -> None:
         self._config = config
         self._consumer: AIOKafkaConsumer | None = None
+        self._dlq_producer: AIOKafkaProducer | None = None
         self._running = False
         self._task: asyncio.Task[None] | None = None
+        self.processed = 0
+        self.failed = 0
+        self.dead_lettered = 0
+        self.batches = 0
+        self.last_batch_size = 0
+        self.processing_seconds_total = 0.0
+        self.processing_seconds_max = 0.0
+        self._lag: dict[str, int] = {}
 
     @abstractmethod
     async def handle_message(self, message: dict[str, Any]) -> None:
@@ -66,22 +107,31 @@ class BaseKafkaConsumer(ABC):
             logger.warning("Consumer already running, ignoring start()")
             return
 
+        # Values are decoded per message so a malformed payload is handled
+        # like any other poison message instead of breaking the fetch.
         self._consumer = AIOKafkaConsumer(
             *self._config.topics,
             bootstrap_servers=self._config.bootstrap_servers,
             group_id=self._config.group_id,
-            value_deserializer=lambda m: json.loads(m.decode("utf-8")),
             auto_offset_reset=self._config.auto_offset_reset,
-            enable_auto_commit=self._config.enable_auto_commit,
+            enable_auto_commit=(
+                self._config.enable_auto_commit and not self._config.batch_mode
+            ),
             max_poll_records=self._config.max_poll_records,
             session_timeout_ms=self._config.session_timeout_ms,
             heartbeat_interval_ms=self._config.heartbeat_interval_ms,
         )
 
         await self._consumer.start()
+        if self._config.dead_letter_topic:
+            self._dlq_producer = AIOKafkaProducer(
+                bootstrap_servers=self._config.bootstrap_servers
+            )
+            await self._dlq_producer.start()
         self._running = True
+        loop = self._batch_loop if self._config.batch_mode else self._consume_loop
         self._task = asyncio.create_task(
-            self._consume_loop(), name=f"kafka-consumer-{self._config.group_id}"
+            loop(), name=f"kafka-consumer-{self._config.group_id}"
         )
         logger.info(
             "Kafka consumer started",
@@ -105,29 +155,207 @@ class BaseKafkaConsumer(ABC):
             await self._consumer.stop()
             self._consumer = None
 
+        if self._dlq_producer:
+            await self._dlq_producer.stop()
+            self._dlq_producer = None
+
         logger.info("Kafka consumer stopped", extra={"group_id": self._config.group_id})
 
     async def _consume_loop(self) -> None:
-        """Internal message consumption loop."""
+        """Internal message consumption loop (one message at a time)."""
         assert self._consumer is not None  # noqa: S101 — guaranteed by start()
 
         try:
             async for message in self._consumer:
                 if not self._running:
                     break
-                try:
-                    await self.handle_message(message.value)
-                except Exception:
-                    logger.exception(
-                        "Failed to process Kafka message — skipping",
-                        extra={
-                            "topic": message.topic,
-                            "partition": message.partition,
-                            "offset": message.offset,
-                        },
-                    )
+                await self._process_record(message)
+        except asyncio.CancelledError:
+            pass
+        except Exception:
+            logger.exception("Kafka consumer loop encountered a fatal error")
+            raise
+
+    async def _batch_loop(self) -> None:
+        """Batched consumption: getmany → process partitions → commit."""
+        assert self._consumer is not None  # noqa: S101 — guaranteed by start()
+
+        try:
+            while self._running:
+                batch = await self._consumer.getmany(
+                    timeout_ms=self._config.batch_timeout_ms,
+                    max_records=self._config.batch_max_records,
+                )
+                if not batch:
+                    continue
+                await self.process_batch(batch)
+                await self._commit(batch)
         except asyncio.CancelledError:
             pass
         except Exception:
             logger.exception("Kafka consumer loop encountered a fatal error")
             raise
+
+    async def process_batch(
+        self, batch: dict[TopicPartition, list[ConsumerRecord]]
+    ) -> None:
+        """Process every partition of one ``getmany()`` result concurrently."""
+        started = time.monotonic()
+        await asyncio.gather(
+            *(self._process_partition(records) for records in batch.values())
+        )
+        elapsed = time.monotonic() - started
+        self.batches += 1
+        self.last_batch_size = sum(len(records) for records in batch.values())
+        self.processing_seconds_total += elapsed
+        self.processing_seconds_max = max(self.processing_seconds_max, elapsed)
+        self._record_lag(batch)
+
+    async def _process_partition(self, records: Sequence[ConsumerRecord]) -> None:
+        if self.handle_batch is not None:
+            try:
+                values = [self._decode(record) for record in records]
+                await self.handle_batch(values)
+            except Exception:
+                logger.warning(
+                    "handle_batch failed — retrying %d message(s) individually",
+                    len(records),
+                    exc_info=True,
+                )
+            else:
+                self.processed += len(records)
+                return
+
+        # Same key → same lane, handled in offset order; lanes run concurrently.
+        lanes: dict[Any, list[ConsumerRecord]] = {}
+        for record in records:
+            lane = record.key if record.key is not None else ("offset", record.offset)
+            lanes.setdefault(lane, []).append(record)
+        slots = asyncio.Semaphore(max(1, self._config.max_concurrency))
+
+        async def run_lane(lane_records: list[ConsumerRecord]) -> None:
+            async with slots:
+                for record in lane_records:
+                    await self._process_record(record)
+
+        await asyncio.gather(*(run_lane(lane) for lane in lanes.values()))
+
+    @staticmethod
+    def _decode(record: ConsumerRecord) -> dict[str, Any]:
+        value = record.value
+        if isinstance(value, bytes | bytearray):
+            return json.loads(value.decode("utf-8"))
+        return value
+
+    async def _process_record(self, record: ConsumerRecord) -> None:
+        """handle_message with backed-off retries; poison messages go to the DLQ.
+
+        An undecodable payload can never succeed, so it is dead-lettered
+        without retrying.
+        """
+        try:
+            message = self._decode(record)
+        except ValueError as exc:
+            self.failed += 1
+            logger.warning(
+                "Undecodable Kafka message — skipping",
+                extra={
+                    "topic": record.topic,
+                    "partition": record.partition,
+                    "offset": record.offset,
+                },
+            )
+            await self._dead_letter(record, exc)
+            return
+
+        attempts = 1 + max(0, self._config.max_retries)
+        for attempt in range(1, attempts + 1):
+            try:
+                await self.handle_message(message)
+            except Exception as exc:
+                if attempt < attempts:
+                    await asyncio.sleep(self._retry_delay(attempt))
+                    continue
+                self.failed += 1
+                logger.exception(
+                    "Failed to process Kafka message — skipping",
+                    extra={
+                        "topic": record.topic,
+                        "partition": record.partition,
+                        "offset": record.offset,
+                    },
+                )
+                await self._dead_letter(record, exc)
+            else:
+                self.processed += 1
+            return
+
+    def _retry_delay(self, attempt: int) -> float:
+        """Seconds to wait before retry number *attempt* (1-based)."""
+        delay_ms = self._config.retry_backoff_ms * 2 ** (attempt - 1)
+        return min(delay_ms, self._config.retry_backoff_max_ms) / 1000
+
+    async def _dead_letter(self, record: ConsumerRecord, exc: Exception) -> None:
+        if self._dlq_producer is None or not self._config.dead_letter_topic:
+            return
+        raw = record.value
+        if isinstance(raw, bytes | bytearray):
+            raw = raw.decode("utf-8", errors="replace")
+        envelope = {
+            "topic": record.topic,
+            "partition": record.partition,
+            "offset": record.offset,
+            "key": record.key.decode("utf-8", errors="replace")
+            if isinstance(record.key, bytes)
+            else record.key,
+            "error": f"{type(exc).__name__}: {exc}",
+            "value": raw,
+            "group_id": self._config.group_id,
+        }
+        try:
+            await self._dlq_producer.send_and_wait(
+                self._config.dead_letter_topic,
+                value=json.dumps(envelope, default=str).encode("utf-8"),
+                key=record.key if isinstance(record.key, bytes) else None,
+            )
+            self.dead_lettered += 1
+        except Exception:
+            logger.exception(
+                "Dead-letter publish failed",
+                extra={"topic": record.topic, "offset": record.offset},
+            )
+
+    async def _commit(self, batch: dict[TopicPartition, list[ConsumerRecord]]) -> None:
+        assert self._consumer is not None  # noqa: S101
+        offsets = {tp: records[-1].offset + 1 for tp, records in batch.items()}
+        try:
+            await self._consumer.commit(offsets)
+        except Exception:
+            # Typically a rebalance; the batch will be redelivered.
+            logger.warning("Kafka offset commit failed", exc_info=True)
+
+    def _record_lag(self, batch: dict[TopicPartition, list[ConsumerRecord]]) -> None:
+        assert self._consumer is not None  # noqa: S101
+        for tp, records in batch.items():
+            highwater = self._consumer.highwater(tp)
+            if highwater is not None:
+                lag = max(0, highwater - (records[-1].offset + 1))
+                self._lag[f"{tp.topic}:{tp.partition}"] = lag
+
+    def stats(self) -> dict[str, Any]:
+        """Throughput, failure, processing-time and consumer-lag metrics."""
+        return {
+            "group_id": self._config.group_id,
+            "running": self._running,
+            "processed": self.processed,
+            "failed": self.failed,
+            "dead_lettered": self.dead_lettered,
+            "batches": self.batches,
+            "last_batch_size": self.last_batch_size,
+            "batch_seconds_avg": round(
+                self.processing_seconds_total / (self.batches or 1), 4
+            ),
+            "batch_seconds_max": round(self.processing_seconds_max, 4),
+            "lag": dict(self._lag),
+            "lag_total": sum(self._lag.values()),
+        }
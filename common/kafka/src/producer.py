@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+import asyncio
+import contextlib
 import json
 import logging
 from typing import Any
@@ -19,6 +21,14 @@ class KafkaProducerConfig(BaseModel):
     max_request_size: int = 1048576  # 1 MB
     request_timeout_ms: int = 30000
     retry_backoff_ms: int = 1000
+    # Batching — wait up to linger_ms to fill batches of max_batch_size bytes.
+    linger_ms: int = 0
+    max_batch_size: int = 16384
+    compression_type: str | None = None  # "gzip", "lz4", "snappy", "zstd"
+    enable_idempotence: bool = False
+    # Bound on messages queued by publish_nowait() but not yet handed to the
+    # client; further messages are dropped (and counted) while it is full.
+    outbox_size: int = 10000
 
 
 class KafkaProducer:
@@ -31,11 +41,23 @@ class KafkaProducer:
         await producer.start()
         await producer.publish("my.topic", payload={"key": "value"})
         await producer.stop()
+
+    Hot paths that must not wait on the broker use ``publish_nowait``, which
+    queues into a bounded outbox drained by a background task; ``flush()``
+    waits until everything queued so far has been acknowledged.
     """
 
     def __init__(self, config: KafkaProducerConfig) -> None:
         self._config = config
         self._producer: AIOKafkaProducer | None = None
+        self._outbox: asyncio.Queue[tuple[str, dict[str, Any], bytes | None]] = (
+            asyncio.Queue(maxsize=config.outbox_size)
+        )
+        self._drain_task: asyncio.Task[None] | None = None
+        self._pending: set[asyncio.Future[Any]] = set()
+        self.sent = 0
+        self.failed = 0
+        self.dropped = 0
 
     async def start(self) -> None:
         """Start the underlying AIOKafkaProducer."""
@@ -45,8 +67,15 @@ class KafkaProducer:
             max_request_size=self._config.max_request_size,
             request_timeout_ms=self._config.request_timeout_ms,
             retry_backoff_ms=self._config.retry_backoff_ms,
+            linger_ms=self._config.linger_ms,
+            max_batch_size=self._config.max_batch_size,
+            compression_type=self._config.compression_type,
+            enable_idempotence=self._config.enable_idempotence,
         )
         await self._producer.start()
+        self._drain_task = asyncio.create_task(
+            self._drain(), name="kafka-producer-outbox"
+        )
         logger.info(
             "Kafka producer started",
             extra={"bootstrap_servers": self._config.bootstrap_servers},
@@ -55,9 +84,89 @@ class KafkaProducer:
     async def stop(self) -> None:
         """Flush pending messages and stop the producer."""
         if self._producer:
+            with contextlib.suppress(Exception):
+                await self.flush()
+            if self._drain_task is not None:
+                self._drain_task.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await self._drain_task
+                self._drain_task = None
             await self._producer.stop()
             self._producer = None
-            logger.info("Kafka producer stopped")
+            logger.info("Kafka producer stopped", extra=self.stats())
+
+    def publish_nowait(
+        self,
+        topic: str,
+        payload: dict[str, Any],
+        key: str | None = None,
+    ) -> bool:
+        """
+        Queue a message for background delivery without waiting on the broker.
+
+        Returns False (and counts a drop) if the producer is not started or
+        the outbox is full — callers on a hot path should treat delivery as
+        best-effort.
+        """
+        if self._producer is None:
+            self.dropped += 1
+            return False
+        encoded_key = key.encode("utf-8") if key else None
+        try:
+            self._outbox.put_nowait((topic, payload, encoded_key))
+        except asyncio.QueueFull:
+            self.dropped += 1
+            if self.dropped == 1 or self.dropped % 1000 == 0:
+                logger.warning(
+                    "Kafka outbox full — dropping messages",
+                    extra={"topic": topic, "dropped": self.dropped},
+                )
+            return False
+        return True
+
+    async def _drain(self) -> None:
+        assert self._producer is not None
+        while True:
+            topic, payload, key = await self._outbox.get()
+            try:
+                # send() only enqueues into the client's batch accumulator;
+                # it blocks when that is full, which backs the outbox up.
+                future = await self._producer.send(topic, value=payload, key=key)
+            except Exception:
+                self.failed += 1
+                logger.exception("Kafka send failed", extra={"topic": topic})
+            else:
+                self._pending.add(future)
+                future.add_done_callback(self._delivered)
+            finally:
+                self._outbox.task_done()
+
+    def _delivered(self, future: asyncio.Future[Any]) -> None:
+        self._pending.discard(future)
+        if future.cancelled() or future.exception() is not None:
+            self.failed += 1
+        else:
+            self.sent += 1
+
+    async def flush(self) -> None:
+        """Wait until every queued message has been acknowledged (or failed)."""
+        if self._producer is None:
+            return
+        if self._drain_task is not None and not self._drain_task.done():
+            await self._outbox.join()
+        await self._producer.flush()
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+
+    def stats(self) -> dict[str, int]:
+        """Outbox depth and delivery counters."""
+        return {
+            "queued": self._outbox.qsize(),
+            "in_flight": len(self._pending),
+            "sent": self.sent,
+            "failed": self.failed,
+            "dropped": self.dropped,
+        }
 
     async def publish(
         self,
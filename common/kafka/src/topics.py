@@ -4,6 +4,7 @@
 class KafkaTopics:
     # Registry Service → Planning & Discovery Service
     REGISTRY_AGENT_REGISTERED = "registry.agent.registered"
+    REGISTRY_AGENT_REGISTERED_DLQ = "registry.agent.registered.dlq"
 
     # Gateway Service → Planning & Discovery Service
     GATEWAY_USER_QUERY = "gateway.user.query"
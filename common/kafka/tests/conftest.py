@@ -0,0 +1,12 @@
+"""Make ``common.kafka.src`` importable regardless of pytest rootdir.
+
+Mirrors the pattern in ``common/llm/tests/conftest.py``.
+"""
+
+import sys
+from pathlib import Path
+
+_REPO_ROOT = Path(__file__).resolve().parents[3]
+
+if str(_REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(_REPO_ROOT))
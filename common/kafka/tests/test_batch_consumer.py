@@ -0,0 +1,181 @@
+"""Batched mode of BaseKafkaConsumer: per-key ordering, DLQ, commit, metrics."""
+
+import asyncio
+import itertools
+import json
+import time
+from typing import Any
+
+import pytest
+from aiokafka import ConsumerRecord, TopicPartition
+
+from common.kafka.src import BaseKafkaConsumer, KafkaConsumerConfig
+
+TP = TopicPartition("registry.agent.registered", 0)
+
+
+def _record(offset: int, key: str | None, value: Any) -> ConsumerRecord:
+    raw = value if isinstance(value, bytes) else json.dumps(value).encode()
+    return ConsumerRecord(
+        topic=TP.topic,
+        partition=TP.partition,
+        offset=offset,
+        timestamp=0,
+        timestamp_type=0,
+        key=key.encode() if key else None,
+        value=raw,
+        checksum=None,
+        serialized_key_size=0,
+        serialized_value_size=len(raw),
+        headers=(),
+    )
+
+
+class _FakeConsumer:
+    def __init__(self, highwater: int) -> None:
+        self._highwater = highwater
+        self.commits: list[dict[TopicPartition, int]] = []
+
+    def highwater(self, tp: TopicPartition) -> int:
+        return self._highwater
+
+    async def commit(self, offsets: dict[TopicPartition, int]) -> None:
+        self.commits.append(offsets)
+
+
+class _FakeProducer:
+    def __init__(self) -> None:
+        self.sent: list[tuple[str, dict[str, Any]]] = []
+
+    async def send_and_wait(self, topic: str, value: bytes, key: Any = None) -> None:
+        self.sent.append((topic, json.loads(value)))
+
+
+class _Recorder(BaseKafkaConsumer):
+    def __init__(self, **overrides: Any) -> None:
+        super().__init__(
+            KafkaConsumerConfig(
+                bootstrap_servers="kafka:9092",
+                group_id="test",
+                topics=[TP.topic],
+                batch_mode=True,
+                dead_letter_topic="registry.agent.registered.dlq",
+                **overrides,
+            )
+        )
+        self.seen: list[tuple[str, int]] = []
+        self.in_flight = 0
+        self.peak = 0
+        self._consumer = _FakeConsumer(highwater=10)
+        self._dlq_producer = _FakeProducer()
+
+    async def handle_message(self, message: dict[str, Any]) -> None:
+        if message.get("poison"):
+            raise ValueError("bad manifest")
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(0.01 * (3 - message["n"] % 3))
+        self.in_flight -= 1
+        self.seen.append((message["agent_id"], message["n"]))
+
+
+@pytest.mark.asyncio
+async def test_keys_run_concurrently_but_stay_ordered():
+    consumer = _Recorder(max_concurrency=3)
+    records = [
+        _record(i, agent, {"agent_id": agent, "n": i})
+        for i, agent in enumerate(["a", "b", "a", "c", "b", "a"])
+    ]
+    await consumer.process_batch({TP: records})
+
+    assert consumer.peak > 1
+    for agent in "abc":
+        ns = [n for a, n in consumer.seen if a == agent]
+        assert ns == sorted(ns)
+    assert consumer.processed == 6
+
+
+@pytest.mark.asyncio
+async def test_concurrency_is_bounded():
+    consumer = _Recorder(max_concurrency=2)
+    records = [_record(i, f"k{i}", {"agent_id": f"k{i}", "n": i}) for i in range(6)]
+    await consumer.process_batch({TP: records})
+    assert consumer.peak == 2
+
+
+@pytest.mark.asyncio
+async def test_poison_messages_are_retried_then_dead_lettered():
+    consumer = _Recorder(max_retries=1, retry_backoff_ms=0)
+    records = [
+        _record(0, "a", {"agent_id": "a", "n": 0}),
+        _record(1, "b", {"poison": True}),
+        _record(2, "c", b"{not json"),
+    ]
+    await consumer.process_batch({TP: records})
+    await consumer._commit({TP: records})
+
+    dlq = consumer._dlq_producer.sent
+    assert [envelope["offset"] for _, envelope in dlq] == [1, 2]
+    assert dlq[0][1]["error"].startswith("ValueError")
+    assert consumer.stats()["dead_lettered"] == 2
+    # The batch is still committed past the poison messages.
+    assert consumer._consumer.commits == [{TP: 3}]
+
+
+@pytest.mark.asyncio
+async def test_retries_back_off_exponentially():
+    class _Flaky(_Recorder):
+        def __init__(self) -> None:
+            super().__init__(
+                max_retries=3, retry_backoff_ms=20, retry_backoff_max_ms=50
+            )
+            self.attempts: list[float] = []
+
+        async def handle_message(self, message: dict[str, Any]) -> None:
+            self.attempts.append(time.monotonic())
+            if len(self.attempts) < 4:
+                raise ConnectionError("db restarting")
+
+    consumer = _Flaky()
+    await consumer.process_batch({TP: [_record(0, "a", {"agent_id": "a"})]})
+
+    delays = [0.02, 0.04, 0.05]
+    gaps = [b - a for a, b in itertools.pairwise(consumer.attempts)]
+    assert [consumer._retry_delay(n) for n in (1, 2, 3)] == delays
+    assert all(gap >= d * 0.9 for gap, d in zip(gaps, delays, strict=True))
+    assert consumer.stats()["processed"] == 1
+    assert consumer._dlq_producer.sent == []
+
+
+@pytest.mark.asyncio
+async def test_handle_batch_override_falls_back_per_message():
+    class _Bulk(_Recorder):
+        bulk_sizes: list[int] = []
+
+        async def handle_batch(self, messages: list[dict[str, Any]]) -> None:
+            if any(m.get("poison") for m in messages):
+                raise ValueError("one bad apple")
+            self.bulk_sizes.append(len(messages))
+
+    consumer = _Bulk()
+    good = [_record(i, "a", {"agent_id": "a", "n": i}) for i in range(3)]
+    await consumer.process_batch({TP: good})
+    assert consumer.bulk_sizes == [3]
+    assert consumer.seen == []
+
+    mixed = [_record(3, "a", {"agent_id": "a", "n": 3}), _record(4, "b", {"poison": 1})]
+    await consumer.process_batch({TP: mixed})
+    assert consumer.seen == [("a", 3)]
+    assert consumer.dead_lettered == 1
+
+
+@pytest.mark.asyncio
+async def test_stats_report_lag_and_batch_timing():
+    consumer = _Recorder()
+    records = [_record(i, "a", {"agent_id": "a", "n": i}) for i in range(4)]
+    await consumer.process_batch({TP: records})
+    stats = consumer.stats()
+    assert stats["lag"] == {f"{TP.topic}:0": 6}
+    assert stats["batches"] == 1
+    assert stats["last_batch_size"] == 4
+    assert stats["batch_seconds_max"] > 0
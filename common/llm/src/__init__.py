@@ -1,12 +1,14 @@
 """Shared LLM provider abstraction for Orcha services."""
 
 from .config import LLMConfig, LLMProviderType
+from .embedding_cache import EmbeddingCache
 from .ollama import OllamaProvider
 from .openrouter import OpenRouterProvider
 from .provider import LLMProvider, create_llm_provider
 from .split import SplitLLMProvider
 
 __all__ = [
+    "EmbeddingCache",
     "LLMConfig",
     "LLMProvider",
     "LLMProviderType",
@@ -38,6 +38,15 @@ class LLMConfig(BaseModel):
     # Optional embedding size override for providers that support it
     # (e.g. OpenRouter/OpenAI-compatible embeddings APIs).
     embedding_dimension: int | None = None
+    # Maximum texts per embed_many() request; None uses the provider's limit.
+    embedding_batch_size: int | None = None
+
+    @property
+    def embedding_namespace(self) -> str:
+        """Provider and endpoint, naming this backend in embedding cache keys."""
+        if self.provider == LLMProviderType.OLLAMA:
+            return f"ollama@{self.ollama_base_url.rstrip('/')}"
+        return f"{self.provider.value}@{self.base_url.rstrip('/')}"
 
     @model_validator(mode="after")
     def _validate_api_key(self) -> LLMConfig:
@@ -47,4 +56,6 @@ class LLMConfig(BaseModel):
             )
         if self.embedding_dimension is not None and self.embedding_dimension <= 0:
             raise ValueError("embedding_dimension must be a positive integer")
+        if self.embedding_batch_size is not None and self.embedding_batch_size <= 0:
+            raise ValueError("embedding_batch_size must be a positive integer")
         return self
@@ -0,0 +1,216 @@
+"""Two-level embedding cache shared by every service that embeds text.
+
+L1 is a per-process LRU; L2 is Redis, so a vector computed by any replica
+(or any service pointing at the same Redis) is reused by all of them and
+survives restarts. Keys are
+``{prefix}:v{version}:{namespace}:{model}:{dimensions}:{sha256(normalised text)}``:
+the namespace names the embedding backend (provider and endpoint) and the
+dimension the requested output size, so two deployments sharing a Redis but
+embedding differently never read each other's vectors. ``KEY_VERSION`` is
+bumped whenever the vectors a backend returns change meaning.
+
+Vectors are stored as packed little-endian float32 bytes — 3 KiB for a
+768-dim vector instead of ~15 KiB of JSON floats — and every vector handed
+out, hit or freshly computed, carries float32 precision.
+
+Redis is optional (``redis`` must be installed when a URL is given).
+Redis failures degrade to L1-only and are counted, never raised.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import struct
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Sequence
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+EmbedMany = Callable[[list[str]], Awaitable[list[list[float]]]]
+
+# 2: Ollama embeddings come from /api/embed, which L2-normalises; version-1
+# entries hold the unnormalised vectors of the legacy /api/embeddings.
+KEY_VERSION = 2
+
+
+def normalise_text(text: str) -> str:
+    """Collapse whitespace so trivially different inputs share one entry."""
+    return " ".join(text.split())
+
+
+def pack_vector(vector: Sequence[float]) -> bytes:
+    """Serialise *vector* as little-endian float32."""
+    return struct.pack(f"<{len(vector)}f", *vector)
+
+
+def unpack_vector(data: bytes) -> list[float]:
+    """Inverse of ``pack_vector``."""
+    return list(struct.unpack(f"<{len(data) // 4}f", data))
+
+
+class EmbeddingCache:
+    """In-process LRU in front of an optional shared Redis tier."""
+
+    def __init__(
+        self,
+        *,
+        redis_url: str | None = None,
+        redis: Any = None,
+        max_entries: int = 4096,
+        ttl_seconds: int = 7 * 86400,
+        key_prefix: str = "emb",
+        namespace: str = "default",
+        dimensions: int | None = None,
+    ) -> None:
+        self._redis_url = redis_url
+        self._redis = redis
+        self._owns_redis = redis is None
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._prefix = key_prefix
+        self._namespace = namespace
+        self._dimensions = dimensions or "native"
+        self._l1: OrderedDict[str, bytes] = OrderedDict()
+        self.lookups = 0
+        self.l1_hits = 0
+        self.l2_hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def key(self, text: str, model: str) -> str:
+        digest = hashlib.sha256(normalise_text(text).encode()).hexdigest()
+        return (
+            f"{self._prefix}:v{KEY_VERSION}:{self._namespace}:{model}:"
+            f"{self._dimensions}:{digest}"
+        )
+
+    async def get_many(
+        self, texts: Sequence[str], model: str
+    ) -> list[list[float] | None]:
+        """Cached vectors for *texts* (``None`` where absent), L1 then L2."""
+        keys = [self.key(t, model) for t in texts]
+        found: list[bytes | None] = [self._l1_get(k) for k in keys]
+        self.lookups += len(keys)
+        self.l1_hits += sum(v is not None for v in found)
+
+        remote = [i for i, v in enumerate(found) if v is None]
+        client = self._client()
+        if remote and client is not None:
+            try:
+                values = await client.mget([keys[i] for i in remote])
+            except Exception as exc:
+                self._redis_failed("read", exc)
+            else:
+                for i, value in zip(remote, values, strict=True):
+                    if value is not None:
+                        found[i] = value
+                        self._l1_put(keys[i], value)
+                        self.l2_hits += 1
+
+        self.misses += sum(v is None for v in found)
+        return [unpack_vector(v) if v is not None else None for v in found]
+
+    async def put_many(
+        self, texts: Sequence[str], model: str, vectors: Sequence[Sequence[float]]
+    ) -> None:
+        """Store *vectors* for *texts* in both tiers."""
+        entries = {
+            self.key(t, model): pack_vector(v)
+            for t, v in zip(texts, vectors, strict=True)
+        }
+        await self._put_packed(entries)
+
+    async def get_or_embed_many(
+        self, texts: Sequence[str], model: str, embed_many: EmbedMany
+    ) -> list[list[float]]:
+        """Vectors for *texts*, computing only the misses (deduplicated)."""
+        cached = await self.get_many(texts, model)
+        # One text per distinct key: "a b" and "a  b" are embedded once.
+        missing: dict[str, str] = {}
+        for text, vector in zip(texts, cached, strict=True):
+            if vector is None:
+                missing.setdefault(self.key(text, model), text)
+        if missing:
+            computed = await embed_many(list(missing.values()))
+            packed = {
+                key: pack_vector(v) for key, v in zip(missing, computed, strict=True)
+            }
+            await self._put_packed(packed)
+            # Hand out what a later hit would return, not the raw float64s.
+            by_key = {key: unpack_vector(v) for key, v in packed.items()}
+            cached = [
+                v if v is not None else list(by_key[self.key(t, model)])
+                for t, v in zip(texts, cached, strict=True)
+            ]
+        return cached  # type: ignore[return-value]
+
+    async def get_or_embed(
+        self,
+        text: str,
+        model: str,
+        embed: Callable[[str], Awaitable[list[float]]],
+    ) -> list[float]:
+        """Vector for *text*, computing it with *embed* on a miss."""
+
+        async def _one(batch: list[str]) -> list[list[float]]:
+            return [await embed(batch[0])]
+
+        return (await self.get_or_embed_many([text], model, _one))[0]
+
+    def stats(self) -> dict[str, Any]:
+        hits = self.l1_hits + self.l2_hits
+        return {
+            "backend": "redis" if self._redis or self._redis_url else "memory",
+            "l1_entries": len(self._l1),
+            "lookups": self.lookups,
+            "l1_hits": self.l1_hits,
+            "l2_hits": self.l2_hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "hit_rate": round(hits / self.lookups, 3) if self.lookups else 0.0,
+        }
+
+    async def aclose(self) -> None:
+        """Close the Redis connection pool if this cache created it."""
+        if self._redis is not None and self._owns_redis:
+            await self._redis.aclose()
+            self._redis = None
+
+    async def _put_packed(self, entries: dict[str, bytes]) -> None:
+        for key, value in entries.items():
+            self._l1_put(key, value)
+        client = self._client()
+        if not entries or client is None:
+            return
+        try:
+            async with client.pipeline(transaction=False) as pipe:
+                for key, value in entries.items():
+                    pipe.set(key, value, ex=self.ttl_seconds)
+                await pipe.execute()
+        except Exception as exc:
+            self._redis_failed("write", exc)
+
+    def _client(self) -> Any:
+        if self._redis is None and self._redis_url:
+            import redis.asyncio as aioredis
+
+            self._redis = aioredis.from_url(self._redis_url)
+        return self._redis
+
+    def _l1_get(self, key: str) -> bytes | None:
+        value = self._l1.get(key)
+        if value is not None:
+            self._l1.move_to_end(key)
+        return value
+
+    def _l1_put(self, key: str, value: bytes) -> None:
+        self._l1[key] = value
+        self._l1.move_to_end(key)
+        while len(self._l1) > self.max_entries:
+            self._l1.popitem(last=False)
+
+    def _redis_failed(self, op: str, exc: Exception) -> None:
+        self.errors += 1
+        logger.warning("Embedding cache Redis %s failed: %s", op, exc)
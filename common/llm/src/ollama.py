@@ -5,11 +5,12 @@ from __future__ import annotations
 import json
 import logging
 import re
+from collections.abc import Sequence
 from typing import TYPE_CHECKING, Any
 
 import httpx
 
-from .provider import LLMProvider
+from .provider import LLMProvider, chunk_texts
 
 if TYPE_CHECKING:
     from .config import LLMConfig
@@ -17,6 +18,9 @@ if TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 
 _JSON_FENCE_RE = re.compile(r"```(?:json)?\s*([\s\S]*?)```", re.IGNORECASE)
+# /api/embed runs a whole batch through the model at once; larger batches
+# mostly add latency on CPU-only hosts.
+_OLLAMA_EMBED_BATCH = 64
 
 
 def _extract_json(text: str) -> str:
@@ -37,7 +41,12 @@ class OllamaProvider(LLMProvider):
     Useful for local development and offline environments.
 
     Note: Ollama's embedding endpoint requires models that support embeddings
-    (e.g. ``nomic-embed-text``, ``mxbai-embed-large``).
+    (e.g. ``nomic-embed-text``, ``mxbai-embed-large``). Embeddings use the
+    batched ``/api/embed`` endpoint, which needs Ollama ≥ 0.2 and returns
+    L2-normalised vectors; single and batched calls produce identical output.
+    Vectors stored from the legacy ``/api/embeddings`` endpoint were not
+    normalised, so agent embeddings must be fully recomputed after upgrading
+    (``make pnd-reembed``).
     """
 
     def __init__(self, config: LLMConfig) -> None:
@@ -83,10 +92,31 @@ class OllamaProvider(LLMProvider):
         return content
 
     async def embed(self, text: str, model: str) -> list[float]:
-        body = {"model": model, "prompt": text}
-        response = await self._request_with_retry("POST", "/api/embeddings", json=body)
-        data = response.json()
-        return data["embedding"]
+        return (await self.embed_many([text], model))[0]
+
+    async def embed_many(self, texts: Sequence[str], model: str) -> list[list[float]]:
+        batch_size = self._config.embedding_batch_size or _OLLAMA_EMBED_BATCH
+        vectors: list[list[float]] = []
+        for batch in chunk_texts(texts, batch_size):
+            body = {"model": model, "input": batch}
+            try:
+                response = await self._request_with_retry(
+                    "POST", "/api/embed", json=body
+                )
+            except httpx.HTTPStatusError as exc:
+                if exc.response.status_code == 404:
+                    raise RuntimeError(
+                        f"Ollama at {self._config.ollama_base_url} has no /api/embed "
+                        "endpoint; embeddings require Ollama >= 0.2"
+                    ) from exc
+                raise
+            embeddings = response.json()["embeddings"]
+            if len(embeddings) != len(batch):
+                raise ValueError(
+                    f"Ollama returned {len(embeddings)} embeddings for {len(batch)} inputs"
+                )
+            vectors.extend(embeddings)
+        return vectors
 
     async def _request_with_retry(
         self, method: str, path: str, **kwargs: Any
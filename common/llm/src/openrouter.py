@@ -3,11 +3,12 @@
 from __future__ import annotations
 
 import logging
+from collections.abc import Sequence
 from typing import TYPE_CHECKING, Any
 
 import httpx
 
-from .provider import LLMProvider
+from .provider import LLMProvider, chunk_texts
 
 if TYPE_CHECKING:
     from .config import LLMConfig
@@ -16,6 +17,10 @@ logger = logging.getLogger(__name__)
 
 _OPENROUTER_CHAT_PATH = "/chat/completions"
 _OPENROUTER_EMBED_PATH = "/embeddings"
+# OpenAI-compatible embeddings endpoints cap a request at 2048 inputs and
+# ~300k tokens; stay well inside both.
+_OPENROUTER_EMBED_BATCH = 256
+_OPENROUTER_EMBED_MAX_CHARS = 400_000
 
 
 class OpenRouterProvider(LLMProvider):
@@ -89,16 +94,34 @@ class OpenRouterProvider(LLMProvider):
         return data["choices"][0]["message"]["content"]
 
     async def embed(self, text: str, model: str) -> list[float]:
+        response = await self._request_with_retry(
+            "POST", _OPENROUTER_EMBED_PATH, json=self._embed_body(text, model)
+        )
+        data = response.json()
+        return data["data"][0]["embedding"]
+
+    async def embed_many(self, texts: Sequence[str], model: str) -> list[list[float]]:
+        batch_size = self._config.embedding_batch_size or _OPENROUTER_EMBED_BATCH
+        vectors: list[list[float]] = []
+        for batch in chunk_texts(texts, batch_size, _OPENROUTER_EMBED_MAX_CHARS):
+            response = await self._request_with_retry(
+                "POST", _OPENROUTER_EMBED_PATH, json=self._embed_body(batch, model)
+            )
+            rows = sorted(response.json()["data"], key=lambda r: r.get("index", 0))
+            if len(rows) != len(batch):
+                raise ValueError(
+                    f"OpenRouter returned {len(rows)} embeddings for {len(batch)} inputs"
+                )
+            vectors.extend(row["embedding"] for row in rows)
+        return vectors
+
+    def _embed_body(self, text: str | list[str], model: str) -> dict[str, Any]:
         body: dict[str, Any] = {"model": model, "input": text}
         # OpenRouter's OpenAI-compatible embeddings endpoint accepts "dimensions"
         # for models that support configurable output vector size.
         if self._config.embedding_dimension is not None:
             body["dimensions"] = self._config.embedding_dimension
-        response = await self._request_with_retry(
-            "POST", _OPENROUTER_EMBED_PATH, json=body
-        )
-        data = response.json()
-        return data["data"][0]["embedding"]
+        return body
 
     async def _request_with_retry(
         self, method: str, path: str, **kwargs: Any
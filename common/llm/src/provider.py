@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
+from collections.abc import Iterator, Sequence
 from typing import TYPE_CHECKING, Any
 
 if TYPE_CHECKING:
@@ -52,6 +53,44 @@ class LLMProvider(ABC):
             Embedding as a list of floats.
         """
 
+    @abstractmethod
+    async def embed_many(self, texts: Sequence[str], model: str) -> list[list[float]]:
+        """
+        Generate embedding vectors for several texts in as few requests as
+        the provider allows.
+
+        Args:
+            texts: The input texts to embed.
+            model: Provider-specific embedding model identifier.
+
+        Returns:
+            One embedding per input text, in input order.
+        """
+
+
+def chunk_texts(
+    texts: Sequence[str], max_items: int, max_chars: int | None = None
+) -> Iterator[list[str]]:
+    """
+    Split *texts* into request-sized batches, preserving order.
+
+    Each batch holds at most *max_items* texts and, when *max_chars* is set,
+    at most *max_chars* characters (a single longer text gets its own batch).
+    """
+    batch: list[str] = []
+    chars = 0
+    for text in texts:
+        if batch and (
+            len(batch) >= max_items
+            or (max_chars is not None and chars + len(text) > max_chars)
+        ):
+            yield batch
+            batch, chars = [], 0
+        batch.append(text)
+        chars += len(text)
+    if batch:
+        yield batch
+
 
 def create_llm_provider(config: LLMConfig) -> LLMProvider:
     """
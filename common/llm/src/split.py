@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+from collections.abc import Sequence
 from typing import Any
 
 from .provider import LLMProvider
@@ -33,3 +34,6 @@ class SplitLLMProvider(LLMProvider):
 
     async def embed(self, text: str, model: str) -> list[float]:
         return await self._embedding.embed(text, model)
+
+    async def embed_many(self, texts: Sequence[str], model: str) -> list[list[float]]:
+        return await self._embedding.embed_many(texts, model)
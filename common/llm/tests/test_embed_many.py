@@ -0,0 +1,104 @@
+"""Batched embeddings: request chunking and response ordering per provider."""
+
+from __future__ import annotations
+
+import json
+from collections.abc import Callable
+from typing import Any
+
+import httpx
+import pytest
+
+from common.llm.src import (
+    LLMConfig,
+    LLMProviderType,
+    OllamaProvider,
+    OpenRouterProvider,
+)
+from common.llm.src.provider import chunk_texts
+
+
+def _transport(
+    requests: list[dict], respond: Callable[[dict], Any]
+) -> httpx.MockTransport:
+    def handler(request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        requests.append({"path": request.url.path, **body})
+        return httpx.Response(200, json=respond(body))
+
+    return httpx.MockTransport(handler)
+
+
+def test_chunk_texts_respects_item_and_char_limits():
+    texts = ["aa", "bb", "cc", "dddddddd", "e"]
+    assert list(chunk_texts(texts, 2)) == [["aa", "bb"], ["cc", "dddddddd"], ["e"]]
+    assert list(chunk_texts(texts, 10, max_chars=6)) == [
+        ["aa", "bb", "cc"],
+        ["dddddddd"],
+        ["e"],
+    ]
+    assert list(chunk_texts([], 4)) == []
+
+
+@pytest.mark.asyncio
+async def test_openrouter_embed_many_chunks_and_restores_order():
+    requests: list[dict] = []
+
+    def respond(body: dict) -> dict:
+        rows = [
+            {"index": i, "embedding": [float(len(t))]}
+            for i, t in enumerate(body["input"])
+        ]
+        return {"data": list(reversed(rows))}
+
+    provider = OpenRouterProvider(
+        LLMConfig(api_key="k", embedding_batch_size=2, embedding_dimension=8)
+    )
+    provider._client = httpx.AsyncClient(
+        base_url="https://or.test/api/v1", transport=_transport(requests, respond)
+    )
+
+    vectors = await provider.embed_many(["a", "bb", "ccc"], "emb")
+
+    assert vectors == [[1.0], [2.0], [3.0]]
+    assert [r["input"] for r in requests] == [["a", "bb"], ["ccc"]]
+    assert all(r["dimensions"] == 8 and r["model"] == "emb" for r in requests)
+    await provider.aclose()
+
+
+@pytest.mark.asyncio
+async def test_ollama_single_and_batched_embeds_share_endpoint():
+    requests: list[dict] = []
+
+    def respond(body: dict) -> dict:
+        return {"embeddings": [[float(len(t))] for t in body["input"]]}
+
+    provider = OllamaProvider(
+        LLMConfig(provider=LLMProviderType.OLLAMA, embedding_batch_size=2)
+    )
+    provider._client = httpx.AsyncClient(
+        base_url="http://ollama.test", transport=_transport(requests, respond)
+    )
+
+    assert await provider.embed_many(["a", "bb", "ccc"], "nomic") == [
+        [1.0],
+        [2.0],
+        [3.0],
+    ]
+    assert await provider.embed("dddd", "nomic") == [4.0]
+    assert {r["path"] for r in requests} == {"/api/embed"}
+    assert [r["input"] for r in requests] == [["a", "bb"], ["ccc"], ["dddd"]]
+    await provider.aclose()
+
+
+@pytest.mark.asyncio
+async def test_ollama_without_batched_embed_reports_the_version_floor():
+    provider = OllamaProvider(LLMConfig(provider=LLMProviderType.OLLAMA))
+    provider._client = httpx.AsyncClient(
+        base_url="http://ollama.test",
+        transport=httpx.MockTransport(lambda request: httpx.Response(404)),
+    )
+
+    with pytest.raises(RuntimeError, match=r"Ollama >= 0\.2"):
+        await provider.embed("a", "nomic")
+    await provider.aclose()
@@ -0,0 +1,143 @@
+"""EmbeddingCache: L1/L2 tiers, miss de-duplication and Redis outages."""
+
+from __future__ import annotations
+
+from collections.abc import Awaitable, Callable
+
+import pytest
+
+from common.llm.src.embedding_cache import EmbeddingCache, pack_vector, unpack_vector
+
+
+class _FakePipeline:
+    def __init__(self, redis: _FakeRedis) -> None:
+        self._redis = redis
+        self._ops: list[tuple[str, bytes]] = []
+
+    async def __aenter__(self) -> _FakePipeline:
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        return None
+
+    def set(self, key: str, value: bytes, ex: int | None = None) -> None:
+        self._ops.append((key, value))
+
+    async def execute(self) -> None:
+        self._redis.check()
+        self._redis.data.update(self._ops)
+
+
+class _FakeRedis:
+    """Binary redis.asyncio stand-in (no decode_responses)."""
+
+    def __init__(self) -> None:
+        self.data: dict[str, bytes] = {}
+        self.down = False
+
+    def check(self) -> None:
+        if self.down:
+            raise ConnectionError("redis down")
+
+    async def mget(self, keys: list[str]) -> list[bytes | None]:
+        self.check()
+        return [self.data.get(k) for k in keys]
+
+    def pipeline(self, transaction: bool = True) -> _FakePipeline:
+        return _FakePipeline(self)
+
+
+class _Embedder:
+    def __init__(self) -> None:
+        self.calls: list[list[str]] = []
+
+    async def __call__(self, texts: list[str]) -> list[list[float]]:
+        self.calls.append(texts)
+        return [[float(len(t)), 0.5] for t in texts]
+
+
+def test_vectors_round_trip_as_float32():
+    vector = [0.25, -1.5, 3.0]
+    assert len(pack_vector(vector)) == 12
+    assert unpack_vector(pack_vector(vector)) == vector
+
+
+@pytest.mark.asyncio
+async def test_misses_are_deduplicated_and_computed_once():
+    cache = EmbeddingCache()
+    embed = _Embedder()
+
+    first = await cache.get_or_embed_many(["a b", "a  b", "ccc"], "m", embed)
+    again = await cache.get_or_embed_many(["ccc", "a b"], "m", embed)
+
+    assert first == [[3.0, 0.5], [3.0, 0.5], [3.0, 0.5]]
+    assert again == [[3.0, 0.5], [3.0, 0.5]]
+    assert embed.calls == [["a b", "ccc"]]
+    assert cache.stats()["l1_hits"] == 2
+
+
+@pytest.mark.asyncio
+async def test_replicas_share_vectors_through_redis():
+    redis = _FakeRedis()
+    embed = _Embedder()
+    await EmbeddingCache(redis=redis).get_or_embed("forecast", "m", _single(embed))
+
+    other = EmbeddingCache(redis=redis)
+    assert await other.get_or_embed("forecast", "m", _single(embed)) == [8.0, 0.5]
+    assert await other.get_or_embed("forecast", "other-model", _single(embed))
+    assert len(embed.calls) == 2
+    assert other.stats()["l2_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_backends_and_dimensions_do_not_share_vectors():
+    redis = _FakeRedis()
+    embed = _Embedder()
+    await EmbeddingCache(redis=redis, namespace="ollama@a").get_or_embed(
+        "forecast", "m", _single(embed)
+    )
+
+    for other in (
+        EmbeddingCache(redis=redis, namespace="openrouter@b"),
+        EmbeddingCache(redis=redis, namespace="ollama@a", dimensions=256),
+    ):
+        await other.get_or_embed("forecast", "m", _single(embed))
+    assert len(embed.calls) == 3
+    assert len(redis.data) == 3
+
+
+@pytest.mark.asyncio
+async def test_miss_and_hit_return_the_same_float32_values():
+    redis = _FakeRedis()
+
+    async def embed(texts: list[str]) -> list[list[float]]:
+        return [[0.1, 1 / 3] for _ in texts]
+
+    computed = await EmbeddingCache(redis=redis).get_or_embed_many(["q"], "m", embed)
+    served = await EmbeddingCache(redis=redis).get_or_embed_many(["q"], "m", embed)
+
+    assert computed == served == [unpack_vector(pack_vector([0.1, 1 / 3]))]
+
+
+@pytest.mark.asyncio
+async def test_redis_outage_degrades_to_process_cache():
+    redis = _FakeRedis()
+    redis.down = True
+    cache = EmbeddingCache(redis=redis, max_entries=1)
+    embed = _Embedder()
+
+    await cache.get_or_embed("one", "m", _single(embed))
+    await cache.get_or_embed("one", "m", _single(embed))
+    await cache.get_or_embed("two", "m", _single(embed))
+    await cache.get_or_embed("one", "m", _single(embed))
+
+    assert len(embed.calls) == 3
+    assert cache.stats()["errors"] == 6
+    assert cache.stats()["l1_entries"] == 1
+
+
+def _single(embed: _Embedder) -> Callable[[str], Awaitable[list[float]]]:
+    async def _one(text: str) -> list[float]:
+        return (await embed([text]))[0]
+
+    return _one
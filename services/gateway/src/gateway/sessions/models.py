@@ -77,6 +77,7 @@ class TranscriptEntryDTO(BaseModel):
 
 class TranscriptListResponse(BaseModel):
     entries: list[TranscriptEntryDTO]
+    next_after: int | None = None
 
 
 class ConversationSessionSummaryDTO(BaseModel):
@@ -8,6 +8,7 @@ from typing import Annotated, Any
 
 from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, status
 from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 
 from ..auth.models import TokenPayload
 from ..dependencies import require_auth
@@ -28,6 +29,7 @@ router = APIRouter(prefix="/api/v1/sessions", tags=["sessions"])
 
 _SESSION_TTL = 86400 * 30  # 30 days
 _MAX_PAGE_SIZE = 50
+_MAX_TRANSCRIPT_PAGE = 500
 
 
 async def _assert_session_owner(
@@ -129,21 +131,42 @@ async def get_session_transcript(
     session_id: str,
     request: Request,
     payload: Annotated[TokenPayload, Depends(require_auth)],
-) -> TranscriptListResponse:
+    after: int = Query(0, ge=0),
+    limit: int | None = Query(None, ge=1, le=_MAX_TRANSCRIPT_PAGE),
+) -> TranscriptListResponse | StreamingResponse:
+    """One keyset page when ``limit`` is given; otherwise the full transcript,
+    streamed through from SuperAgent without buffering it here."""
     sa = request.app.state.superagent
     await _assert_session_owner(
         session_id, payload.user_id, request.app.state.redis, sa
     )
-    resp = await sa.get(
-        f"/sessions/{session_id}/transcript",
-        params={"user_id": payload.user_id},
+    params: dict[str, Any] = {"user_id": payload.user_id, "after": after}
+    if limit is not None:
+        params["limit"] = limit
+        resp = await sa.get(f"/sessions/{session_id}/transcript", params=params)
+        if resp.status_code == 404:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Session not found"
+            )
+        resp.raise_for_status()
+        return TranscriptListResponse.model_validate(resp.json())
+
+    upstream = await sa.send(
+        sa.build_request("GET", f"/sessions/{session_id}/transcript", params=params),
+        stream=True,
+    )
+    if upstream.status_code != 200:
+        await upstream.aclose()
+        if upstream.status_code == 404:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Session not found"
+            )
+        upstream.raise_for_status()
+    return StreamingResponse(
+        upstream.aiter_raw(),
+        media_type="application/json",
+        background=BackgroundTask(upstream.aclose),
     )
-    if resp.status_code == 404:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Session not found"
-        )
-    resp.raise_for_status()
-    return TranscriptListResponse.model_validate(resp.json())
 
 
 @router.get("/{session_id}/audit")
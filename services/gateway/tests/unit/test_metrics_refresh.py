@@ -0,0 +1,178 @@
+"""Unit tests for the metrics_refresh job (set-based SQL rollups).
+
+The rollup values are checked against a real Postgres when
+``TEST_DATABASE_URL`` is set; each test works on session-local temp tables
+that shadow the real ones, so nothing persistent is touched.
+"""
+
+from __future__ import annotations
+
+import os
+from decimal import Decimal
+from unittest.mock import AsyncMock
+
+import pytest
+import pytest_asyncio
+
+from common.database.src.agent_metrics import agent_rollup_sql
+from gateway.jobs.metrics_refresh import run_metrics_refresh
+
+_SCHEMA = (
+    """
+    CREATE TEMP TABLE agents (
+        id text PRIMARY KEY,
+        task_category text,
+        success_rate double precision NOT NULL DEFAULT 0.70,
+        uptime_score double precision NOT NULL DEFAULT 1.0,
+        p95_latency_ms integer NOT NULL DEFAULT 5000,
+        execution_count integer NOT NULL DEFAULT 0
+    )
+    """,
+    """
+    CREATE TEMP TABLE agent_metrics_hourly (
+        agent_id text NOT NULL,
+        bucket_start timestamp(3) NOT NULL,
+        latency_le_ms integer NOT NULL,
+        invocations integer NOT NULL DEFAULT 0,
+        successes integer NOT NULL DEFAULT 0,
+        PRIMARY KEY (agent_id, bucket_start, latency_le_ms)
+    )
+    """,
+    """
+    CREATE TEMP TABLE payment_configs (
+        agent_id text PRIMARY KEY,
+        enabled boolean NOT NULL DEFAULT false,
+        base_fee text
+    )
+    """,
+    """
+    CREATE TEMP TABLE registry_stats (
+        id text PRIMARY KEY,
+        task_category text UNIQUE NOT NULL,
+        median_base_fee_usd numeric(18, 8),
+        median_latency_ms double precision,
+        agent_count integer NOT NULL DEFAULT 0,
+        computed_at timestamp(3) NOT NULL
+    )
+    """,
+)
+
+
+class _PostgresDB:
+    """``execute_raw`` over one asyncpg connection, returning the row count."""
+
+    def __init__(self, conn) -> None:
+        self.conn = conn
+
+    async def execute_raw(self, sql: str, *args) -> int:
+        status = await self.conn.execute(sql, *args)
+        return int(status.rsplit(" ", 1)[-1])
+
+
+@pytest_asyncio.fixture
+async def pg():
+    url = os.getenv("TEST_DATABASE_URL")
+    if not url:
+        pytest.skip("TEST_DATABASE_URL not set")
+    asyncpg = pytest.importorskip("asyncpg")
+    conn = await asyncpg.connect(url)
+    try:
+        for ddl in _SCHEMA:
+            await conn.execute(ddl)
+        yield _PostgresDB(conn)
+    finally:
+        await conn.close()
+
+
+async def _buckets(db: _PostgresDB, agent_id: str, rows: list[tuple]) -> None:
+    """Insert (hours_ago, latency_le_ms, invocations, successes) buckets."""
+    await db.conn.executemany(
+        """
+        INSERT INTO agent_metrics_hourly
+            (agent_id, bucket_start, latency_le_ms, invocations, successes)
+        VALUES ($1, date_trunc('hour', timezone('utc', now()))
+                    - make_interval(hours => $2), $3, $4, $5)
+        """,
+        [(agent_id, *row) for row in rows],
+    )
+
+
+async def _agent(db: _PostgresDB, agent_id: str) -> tuple:
+    row = await db.conn.fetchrow(
+        "SELECT success_rate, p95_latency_ms FROM agents WHERE id = $1", agent_id
+    )
+    return tuple(row)
+
+
+async def test_rollup_takes_p95_bucket_and_success_rate_from_last_week(pg):
+    await pg.conn.execute("INSERT INTO agents (id) VALUES ('a1'), ('idle')")
+    await _buckets(
+        pg,
+        "a1",
+        [
+            (1, 50, 60, 58),
+            (30, 50, 30, 27),
+            (2, 1000, 5, 5),
+            (3, 5000, 5, 0),
+            # Older than seven days: ignored.
+            (24 * 8, 600000, 1000, 0),
+        ],
+    )
+
+    await run_metrics_refresh(pg)
+
+    # 90 of 100 calls ≤ 50 ms, 95 ≤ 1000 ms → p95 is the 1000 ms bucket.
+    assert await _agent(pg, "a1") == (0.9, 1000)
+    assert await _agent(pg, "idle") == (0.70, 5000)
+
+
+async def test_scoped_rollup_only_touches_the_given_agents(pg):
+    await pg.conn.execute("INSERT INTO agents (id) VALUES ('a1'), ('a2')")
+    await _buckets(pg, "a1", [(1, 100, 4, 4)])
+    await _buckets(pg, "a2", [(1, 250, 4, 0)])
+
+    assert await pg.execute_raw(agent_rollup_sql(1), "a2") == 1
+
+    assert await _agent(pg, "a1") == (0.70, 5000)
+    assert await _agent(pg, "a2") == (0.0, 250)
+
+
+async def test_registry_stats_are_medians_over_paid_agents(pg):
+    await pg.conn.execute(
+        """
+        INSERT INTO agents (id, task_category, p95_latency_ms) VALUES
+            ('a1', 'search', 100), ('a2', 'search', 300),
+            ('a3', 'search', 0), ('a4', '', 700), ('free', 'search', 9000)
+        """
+    )
+    await pg.conn.execute(
+        """
+        INSERT INTO payment_configs (agent_id, enabled, base_fee) VALUES
+            ('a1', true, '0.10'), ('a2', true, ' 0.30 '), ('a3', true, 'n/a'),
+            ('a4', true, '1'), ('free', false, '5')
+        """
+    )
+
+    await run_metrics_refresh(pg)
+
+    rows = {
+        r["task_category"]: (
+            r["median_base_fee_usd"],
+            r["median_latency_ms"],
+            r["agent_count"],
+        )
+        for r in await pg.conn.fetch("SELECT * FROM registry_stats")
+    }
+    # a3's fee is not numeric and its latency is unset; 'free' is unpaid.
+    assert rows == {
+        "search": (Decimal("0.20000000"), 200.0, 3),
+        "general": (Decimal("1.00000000"), 700.0, 1),
+    }
+
+
+async def test_registry_stats_skipped_when_agent_rollup_fails(mock_db):
+    mock_db.execute_raw = AsyncMock(side_effect=RuntimeError("relation missing"))
+
+    await run_metrics_refresh(mock_db)
+
+    assert mock_db.execute_raw.await_count == 1
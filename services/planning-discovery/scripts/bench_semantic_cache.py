@@ -0,0 +1,66 @@
+"""Microbenchmark for the in-process SemanticCache.
+
+Measures the mean cost of ``get`` (hit), ``set`` of a new key at capacity
+(forcing an LRU eviction) and ``invalidate_by_type`` of a small type, at
+increasing cache sizes. Per-operation time should stay flat as the entry
+count grows.
+
+Usage::
+
+    cd services/planning-discovery
+    PYTHONPATH=src python scripts/bench_semantic_cache.py [--sizes 10000 100000 1000000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from planning_discovery.cache.semantic_cache import SemanticCache
+
+_OPS = 100_000
+
+
+def _fill(size: int) -> SemanticCache:
+    cache = SemanticCache(max_entries=size)
+    for i in range(size):
+        cache.set(f"key-{i}", "v", cache_type="search" if i % 1000 else "plan")
+    return cache
+
+
+def _per_op_us(fn, ops: int) -> float:  # noqa: ANN001
+    started = time.perf_counter()
+    for i in range(ops):
+        fn(i)
+    return (time.perf_counter() - started) / ops * 1e6
+
+
+def bench(size: int) -> dict[str, float]:
+    cache = _fill(size)
+    get_us = _per_op_us(lambda i: cache.get(f"key-{i % size}"), _OPS)
+    set_us = _per_op_us(lambda i: cache.set(f"new-{i}", "v"), _OPS)
+    for i in range(100):
+        cache.set(f"small-{i}", "v", cache_type="small")
+    started = time.perf_counter()
+    cache.invalidate_by_type("small")
+    invalidate_us = (time.perf_counter() - started) * 1e6
+    return {"get": get_us, "set": set_us, "invalidate_100": invalidate_us}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000]
+    )
+    args = parser.parse_args()
+
+    print(f"{'entries':>10} {'get µs':>8} {'set µs':>8} {'invalidate(100) µs':>20}")
+    for size in args.sizes:
+        r = bench(size)
+        print(
+            f"{size:>10} {r['get']:>8.2f} {r['set']:>8.2f} {r['invalidate_100']:>20.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
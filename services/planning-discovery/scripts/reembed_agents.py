@@ -0,0 +1,99 @@
+"""Re-embed agents in bulk (e.g. after changing LLM_EMBEDDING_MODEL).
+
+Also run it once, without ``--missing-only``, when upgrading a deployment
+that embedded through Ollama's legacy ``/api/embeddings`` endpoint: the
+batched ``/api/embed`` (Ollama >= 0.2) returns L2-normalised vectors, and
+stored agent embeddings must match the query vectors they are compared with.
+
+Streams active agents from Postgres page by page and embeds each page's
+TDWA components with one batched ``embed_many`` call, upserting the results
+into ``agent_embeddings``. Uses the service settings (.env) for the database
+and embedding provider. Vectors are always recomputed — the shared embedding
+cache is bypassed so no vector from a previous model or dimension is reused.
+
+Usage::
+
+    # from the repo root
+    export PYTHONPATH=.:services/planning-discovery/src
+    python services/planning-discovery/scripts/reembed_agents.py [--page-size 100] [--missing-only]
+
+Or via Make::
+
+    make pnd-reembed
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import time
+
+from planning_discovery.config import settings
+from planning_discovery.db.pool import AsyncpgPool
+from planning_discovery.manifest_processing.embedding_generator import (
+    TDWAEmbeddingGenerator,
+)
+from planning_discovery.manifest_processing.reindexer import reindex_agents
+from planning_discovery.manifest_processing.storage import EmbeddingStorage
+
+from common.llm.src import (
+    EmbeddingCache,
+    LLMConfig,
+    LLMProviderType,
+    create_llm_provider,
+)
+
+logger = logging.getLogger(__name__)
+
+
+async def main(page_size: int, missing_only: bool) -> None:
+    provider = create_llm_provider(
+        LLMConfig(
+            provider=LLMProviderType(settings.llm_embedding_provider),
+            api_key=settings.openrouter_api_key,
+            base_url=settings.openrouter_base_url,
+            ollama_base_url=settings.ollama_base_url,
+            embedding_dimension=settings.llm_embedding_dimension,
+            embedding_batch_size=settings.llm_embedding_batch_size,
+        )
+    )
+    pool = AsyncpgPool(dsn=settings.database_url, min_size=1, max_size=2)
+    await pool.connect()
+    try:
+        embedding_gen = TDWAEmbeddingGenerator(
+            llm_provider=provider,
+            embedding_model=settings.llm_embedding_model,
+            # Process-local only: de-duplicates shared component texts in a run
+            embedding_cache=EmbeddingCache(),
+        )
+        started = time.monotonic()
+        indexed = await reindex_agents(
+            pool,
+            embedding_gen,
+            EmbeddingStorage(pool),
+            page_size=page_size,
+            missing_only=missing_only,
+        )
+        logger.info(
+            "Re-embedded %d agent(s) with %s in %.1fs",
+            indexed,
+            settings.llm_embedding_model,
+            time.monotonic() - started,
+        )
+    finally:
+        await pool.disconnect()
+        await provider.aclose()  # type: ignore[attr-defined]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument(
+        "--missing-only",
+        action="store_true",
+        help="only HEALTHY agents without an embedding row (startup catch-up)",
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+    asyncio.run(main(args.page_size, args.missing_only))
@@ -5,7 +5,7 @@ from __future__ import annotations
 from datetime import UTC, datetime
 from typing import Any
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
 
 from ...config import settings
 
@@ -27,3 +27,21 @@ async def health_check() -> dict[str, Any]:
         "environment": settings.environment,
         "timestamp": datetime.now(UTC).isoformat(),
     }
+
+
+@router.get("/kafka", response_model=dict[str, Any])
+async def kafka_health(request: Request) -> dict[str, Any]:
+    """Manifest consumer throughput, dead-letter count and per-partition lag."""
+    consumer = getattr(request.app.state, "manifest_consumer", None)
+    return {"manifest_consumer": consumer.stats() if consumer else None}
+
+
+@router.get("/cache", response_model=dict[str, Any])
+async def cache_health(request: Request) -> dict[str, Any]:
+    """Pipeline and embedding cache backends, hit/miss counters and invalidations."""
+    cache = getattr(request.app.state, "pipeline_cache", None)
+    embeddings = getattr(request.app.state, "embedding_cache", None)
+    return {
+        "pipeline_cache": cache.stats() if cache else None,
+        "embedding_cache": embeddings.stats() if embeddings else None,
+    }
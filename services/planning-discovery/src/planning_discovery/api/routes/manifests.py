@@ -149,6 +149,7 @@ async def process_manifest(
     embedding_gen: Annotated[TDWAEmbeddingGenerator, Depends(get_embedding_gen)],
     storage: Annotated[EmbeddingStorage, Depends(get_embedding_storage)],
     pool: Annotated[object, Depends(get_pool)],
+    request: Request,
 ) -> ProcessManifestResponse:
     """
     Run the manifest processing pipeline directly over HTTP.
@@ -160,6 +161,7 @@ async def process_manifest(
     2. Generate a TDWA semantic template string
     3. Compute TDWA embeddings (combined + per-field) via the configured LLM
     4. Upsert the embeddings into ``agent_embeddings``
+    5. Retire cached search results and plans
 
     The ``agent_id`` must already exist in the ``agents`` table.
     Register the agent via the Registry service first.
@@ -179,6 +181,11 @@ async def process_manifest(
         # Step 4 — persist
         await storage.upsert(body.agent_id, templated_string, embeddings)
 
+        # Step 5 — invalidate the pipeline cache
+        cache = getattr(request.app.state, "pipeline_cache", None)
+        if cache is not None:
+            await cache.on_agent_registered(body.agent_id)
+
     except HTTPException:
         raise
     except Exception as exc:
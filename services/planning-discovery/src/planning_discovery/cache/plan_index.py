@@ -0,0 +1,217 @@
+"""Semantic (embedding-similarity) tier of the plan cache.
+
+The exact plan cache only matches the normalised goal text, so paraphrases
+("show my portfolio performance" / "show me my portfolio's performance")
+miss each other. ``SemanticPlanIndex`` embeds the goal and asks the HNSW
+index on ``plan_cache_entries`` for the nearest cached plan with the same
+context. A match at or above ``similarity_threshold`` is returned only after
+one query confirms every agent it references is still active and HEALTHY.
+
+A match was planned for another goal, so it is returned as a template: the
+agents, capabilities and edges are kept, but task inputs taken from the
+original query are dropped (``$tasks`` references between nodes stay). The
+caller re-resolves them for the new goal before executing the plan.
+
+The table lives in Postgres, so every replica shares the index. Any failure
+degrades to a miss and the pipeline plans from scratch.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import time
+from typing import TYPE_CHECKING, Any
+
+from common.llm.src.embedding_cache import EmbeddingCache
+
+if TYPE_CHECKING:
+    from common.llm.src import LLMProvider
+
+    from ..db.pool import AsyncpgPool
+
+logger = logging.getLogger(__name__)
+
+_NEAREST_SQL = """
+SELECT id, goal, manifest, agent_ids,
+       1 - (embedding <=> $1::vector) AS similarity
+FROM plan_cache_entries
+WHERE context_hash = $2
+  AND expires_at > timezone('utc', now())
+ORDER BY embedding <=> $1::vector
+LIMIT 1
+"""
+
+_HEALTHY_COUNT_SQL = """
+SELECT count(*) AS healthy
+FROM agents
+WHERE id = ANY($1::text[])
+  AND is_active = true
+  AND health_status::text = 'HEALTHY'
+"""
+
+_INSERT_SQL = """
+INSERT INTO plan_cache_entries
+    (id, goal, context_hash, embedding, manifest, agent_ids, created_at, expires_at)
+VALUES (
+    gen_random_uuid()::text, $1, $2, $3::vector, $4::jsonb, $5::text[],
+    timezone('utc', now()),
+    timezone('utc', now()) + make_interval(secs => $6)
+)
+"""
+
+_DELETE_SQL = "DELETE FROM plan_cache_entries WHERE id = $1"
+_FORGET_AGENT_SQL = (
+    "DELETE FROM plan_cache_entries WHERE agent_ids @> ARRAY[$1]::text[]"
+)
+_PURGE_EXPIRED_SQL = (
+    "DELETE FROM plan_cache_entries WHERE expires_at <= timezone('utc', now())"
+)
+
+_PURGE_INTERVAL_SECONDS = 300
+
+
+def plan_agent_ids(manifest: dict[str, Any]) -> list[str]:
+    """Distinct agent ids referenced by the nodes of a manifest dict."""
+    ids = {n.get("agent_id") for n in manifest.get("nodes", [])}
+    return sorted(i for i in ids if i)
+
+
+class SemanticPlanIndex:
+    """Nearest-neighbour lookup of cached plans by goal embedding."""
+
+    def __init__(
+        self,
+        pool: AsyncpgPool,
+        llm_provider: LLMProvider,
+        embedding_model: str,
+        *,
+        similarity_threshold: float = 0.92,
+        ttl_seconds: int = 86400,
+        embedding_cache: EmbeddingCache | None = None,
+    ) -> None:
+        self._pool = pool
+        self._llm = llm_provider
+        self._embedding_model = embedding_model
+        self.similarity_threshold = similarity_threshold
+        self.ttl_seconds = ttl_seconds
+        # Also reuses the goal vector between lookup() and add() of one request.
+        self._embedding_cache = embedding_cache or EmbeddingCache()
+        self._last_purge = time.monotonic()
+        self.lookups = 0
+        self.hits = 0
+        self.below_threshold = 0
+        self.unhealthy = 0
+        self.errors = 0
+
+    async def lookup(self, goal: str, context_hash: str) -> dict[str, Any] | None:
+        """Return the closest cached plan template for *goal*, or ``None``."""
+        self.lookups += 1
+        try:
+            vector = await self._embed(goal)
+            row = await self._pool.fetchrow(_NEAREST_SQL, _vec(vector), context_hash)
+            if row is None:
+                return None
+            similarity = float(row["similarity"])
+            if similarity < self.similarity_threshold:
+                self.below_threshold += 1
+                return None
+            if not await self.agents_healthy(list(row["agent_ids"])):
+                self.unhealthy += 1
+                await self._pool.execute(_DELETE_SQL, row["id"])
+                return None
+        except Exception:
+            self.errors += 1
+            logger.warning(
+                "Semantic plan lookup failed — treating as miss", exc_info=True
+            )
+            return None
+
+        self.hits += 1
+        manifest = _template(_json(row["manifest"]))
+        metadata = manifest.setdefault("metadata", {})
+        metadata["plan_cache_similarity"] = round(similarity, 4)
+        metadata["plan_cache_source_query"] = row["goal"]
+        logger.info(
+            "Semantic plan cache hit (similarity=%.3f) for query=%.60r",
+            similarity,
+            goal,
+        )
+        return manifest
+
+    async def add(self, goal: str, context_hash: str, manifest: dict[str, Any]) -> None:
+        """Index a freshly validated manifest under *goal*."""
+        try:
+            vector = await self._embed(goal)
+            await self._pool.execute(
+                _INSERT_SQL,
+                goal,
+                context_hash,
+                _vec(vector),
+                json.dumps(manifest, default=str),
+                plan_agent_ids(manifest),
+                float(self.ttl_seconds),
+            )
+            if time.monotonic() - self._last_purge >= _PURGE_INTERVAL_SECONDS:
+                self._last_purge = time.monotonic()
+                await self._pool.execute(_PURGE_EXPIRED_SQL)
+        except Exception:
+            self.errors += 1
+            logger.warning("Semantic plan cache insert failed", exc_info=True)
+
+    async def agents_healthy(self, agent_ids: list[str]) -> bool:
+        """True when every agent in *agent_ids* is active and HEALTHY."""
+        if not agent_ids:
+            return True
+        row = await self._pool.fetchrow(_HEALTHY_COUNT_SQL, agent_ids)
+        return row is not None and int(row["healthy"]) == len(set(agent_ids))
+
+    async def forget_agent(self, agent_id: str) -> None:
+        """Drop cached plans that reference *agent_id* (it re-registered)."""
+        try:
+            await self._pool.execute(_FORGET_AGENT_SQL, agent_id)
+        except Exception:
+            self.errors += 1
+            logger.warning(
+                "Semantic plan cache invalidation failed for agent %s",
+                agent_id,
+                exc_info=True,
+            )
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "similarity_threshold": self.similarity_threshold,
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "below_threshold": self.below_threshold,
+            "unhealthy": self.unhealthy,
+            "errors": self.errors,
+        }
+
+    async def _embed(self, goal: str) -> list[float]:
+        return await self._embedding_cache.get_or_embed(
+            goal.strip().lower(),
+            self._embedding_model,
+            lambda text: self._llm.embed(text, self._embedding_model),
+        )
+
+
+def _vec(vector: list[float]) -> str:
+    return "[" + ",".join(str(v) for v in vector) + "]"
+
+
+def _template(manifest: dict[str, Any]) -> dict[str, Any]:
+    """Strip query-derived task inputs, keeping ``$tasks`` references."""
+    for node in manifest.get("nodes", []):
+        task = node.get("task")
+        if isinstance(task, dict) and task.get("inputs"):
+            task["inputs"] = {
+                field: value
+                for field, value in task["inputs"].items()
+                if isinstance(value, str) and value.startswith("$tasks.")
+            }
+    return manifest
+
+
+def _json(value: Any) -> dict[str, Any]:
+    return json.loads(value) if isinstance(value, str) else dict(value)
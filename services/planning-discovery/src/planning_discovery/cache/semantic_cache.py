@@ -3,19 +3,29 @@
 Implements multi-tier caching:
   1. Query cache — hash(task_description) → decomposition/resolution result
   2. Embedding cache — hash(query + filters) → search results
-  3. Plan cache (APC) — intent-based matching for plan template reuse
+  3. Plan cache (APC) — intent-based matching for plan template reuse,
+     with an optional embedding-similarity tier (``SemanticPlanIndex``)
+
+``PipelineCache`` is shared across replicas through Redis when configured.
 """
 
 from __future__ import annotations
 
 import hashlib
+import heapq
 import json
 import time
+from collections import OrderedDict, defaultdict
 from dataclasses import dataclass, field
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 import structlog
 
+from .plan_index import plan_agent_ids
+
+if TYPE_CHECKING:
+    from .plan_index import SemanticPlanIndex
+
 logger = structlog.get_logger()
 
 
@@ -29,10 +39,15 @@ class CacheEntry:
     ttl_seconds: int = 3600
     hit_count: int = 0
     cache_type: str = "generic"
+    size_bytes: int = 0
+
+    @property
+    def expires_at(self) -> float:
+        return self.created_at + self.ttl_seconds
 
     @property
     def is_expired(self) -> bool:
-        return (time.time() - self.created_at) > self.ttl_seconds
+        return time.time() > self.expires_at
 
 
 @dataclass
@@ -44,6 +59,8 @@ class CacheStats:
     misses: int = 0
     evictions: int = 0
     entries: int = 0
+    bytes: int = 0
+    stale: int = 0
 
     @property
     def hit_rate(self) -> float:
@@ -52,18 +69,42 @@ class CacheStats:
         return self.hits / self.total_gets
 
 
+def _sizeof(key: str, value: Any) -> int:
+    """Approximate footprint of an entry: key plus serialized value."""
+    if isinstance(value, str | bytes):
+        size = len(value)
+    else:
+        size = len(json.dumps(value, default=str))
+    return len(key) + size
+
+
 class SemanticCache:
     """In-memory semantic cache with TTL-based eviction.
 
-    For production, this would be backed by Redis. The in-memory
-    implementation provides the same interface for testing and
-    single-process deployments.
+    Every operation is O(1) amortised, independent of the entry count:
+
+    - an ``OrderedDict`` in recency order gives LRU lookup and eviction,
+    - a min-heap of ``(expires_at, key)`` yields expired entries first
+      (records of replaced or deleted entries are skipped lazily and the
+      heap is rebuilt once they outnumber live entries),
+    - a per-type key index lets ``invalidate_by_type`` touch only that type.
+
+    Capacity is bounded by both ``max_entries`` and ``max_bytes``, where an
+    entry's size is its key plus its serialized value.
     """
 
-    def __init__(self, default_ttl: int = 3600, max_entries: int = 10000):
+    def __init__(
+        self,
+        default_ttl: int = 3600,
+        max_entries: int = 10000,
+        max_bytes: int | None = None,
+    ):
         self.default_ttl = default_ttl
         self.max_entries = max_entries
-        self._store: dict[str, CacheEntry] = {}
+        self.max_bytes = max_bytes
+        self._store: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._expiry: list[tuple[float, str]] = []
+        self._by_type: dict[str, set[str]] = defaultdict(set)
         self.stats = CacheStats()
 
     @staticmethod
@@ -80,11 +121,11 @@ class SemanticCache:
             self.stats.misses += 1
             return None
         if entry.is_expired:
-            del self._store[key]
+            self._remove(key)
             self.stats.misses += 1
             self.stats.evictions += 1
-            self.stats.entries -= 1
             return None
+        self._store.move_to_end(key)
         entry.hit_count += 1
         self.stats.hits += 1
         return entry.value
@@ -97,68 +138,132 @@ class SemanticCache:
         cache_type: str = "generic",
     ) -> None:
         """Store a value in cache."""
-        if len(self._store) >= self.max_entries:
-            self._evict_expired()
-            if len(self._store) >= self.max_entries:
-                self._evict_lru()
-
-        self._store[key] = CacheEntry(
+        entry = CacheEntry(
             key=key,
             value=value,
+            created_at=time.time(),
             ttl_seconds=ttl or self.default_ttl,
             cache_type=cache_type,
+            size_bytes=_sizeof(key, value),
         )
+        if self.max_bytes is not None and entry.size_bytes > self.max_bytes:
+            self.delete(key)
+            return
+
+        self._remove(key)
+        self._store[key] = entry
+        self._by_type[cache_type].add(key)
+        heapq.heappush(self._expiry, (entry.expires_at, key))
+        self.stats.bytes += entry.size_bytes
         self.stats.entries = len(self._store)
 
+        self._evict_expired()
+        while self._over_capacity():
+            self._evict_lru()
+        self._compact_expiry()
+
     def delete(self, key: str) -> bool:
         """Remove an entry from cache."""
-        if key in self._store:
-            del self._store[key]
-            self.stats.entries = len(self._store)
-            return True
-        return False
+        return self._remove(key) is not None
 
     def clear(self) -> None:
         """Clear all cache entries."""
         self._store.clear()
+        self._expiry.clear()
+        self._by_type.clear()
         self.stats.entries = 0
+        self.stats.bytes = 0
 
     def invalidate_by_type(self, cache_type: str) -> int:
         """Invalidate all entries of a given type (e.g., on registry event)."""
-        keys_to_remove = [
-            k for k, v in self._store.items() if v.cache_type == cache_type
-        ]
+        keys_to_remove = self._by_type.pop(cache_type, set())
         for k in keys_to_remove:
-            del self._store[k]
-        self.stats.entries = len(self._store)
+            self._remove(k)
         self.stats.evictions += len(keys_to_remove)
         return len(keys_to_remove)
 
+    def _over_capacity(self) -> bool:
+        return len(self._store) > self.max_entries or (
+            self.max_bytes is not None and self.stats.bytes > self.max_bytes
+        )
+
+    def _remove(self, key: str) -> CacheEntry | None:
+        entry = self._store.pop(key, None)
+        if entry is None:
+            return None
+        keys = self._by_type.get(entry.cache_type)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_type[entry.cache_type]
+        self.stats.bytes -= entry.size_bytes
+        self.stats.entries = len(self._store)
+        return entry
+
     def _evict_expired(self) -> None:
-        """Remove all expired entries."""
-        expired = [k for k, v in self._store.items() if v.is_expired]
-        for k in expired:
-            del self._store[k]
-        self.stats.evictions += len(expired)
+        """Remove all expired entries, soonest-expiring first."""
+        now = time.time()
+        while self._expiry and self._expiry[0][0] <= now:
+            expires_at, key = heapq.heappop(self._expiry)
+            entry = self._store.get(key)
+            if entry is not None and entry.expires_at == expires_at:
+                self._remove(key)
+                self.stats.evictions += 1
 
     def _evict_lru(self) -> None:
-        """Evict least-recently-used entry (lowest hit count, oldest)."""
+        """Evict the least-recently-used entry."""
         if not self._store:
             return
-        # Evict the entry with lowest hit_count, breaking ties by oldest
-        lru_key = min(
-            self._store.keys(),
-            key=lambda k: (self._store[k].hit_count, -self._store[k].created_at),
-        )
-        del self._store[lru_key]
+        lru_key = next(iter(self._store))
+        self._remove(lru_key)
         self.stats.evictions += 1
 
+    def _compact_expiry(self) -> None:
+        """Drop heap records of replaced/removed entries once they dominate."""
+        if len(self._expiry) > 2 * len(self._store) + 64:
+            self._expiry = [(e.expires_at, k) for k, e in self._store.items()]
+            heapq.heapify(self._expiry)
+
+
+# Sub-caches whose values depend on the agent roster; a registration event
+# makes them stale. Decompositions only depend on the query.
+_AGENT_DEPENDENT_TYPES = ("search", "plan_template")
+
+# Misses whose generation is remembered until the matching set (LRU bound).
+_MAX_PENDING_MISSES = 4096
+
+
+def _normalise(text: str) -> str:
+    return text.strip().lower()
+
+
+def _canonical(value: dict[str, Any] | None) -> str:
+    return json.dumps(value or {}, sort_keys=True, default=str)
+
+
+def _context_hash(context: dict[str, Any] | None) -> str:
+    return hashlib.sha256(_canonical(context).encode()).hexdigest()[:32]
+
 
 class PipelineCache:
     """Specialized cache for the P&D pipeline with typed sub-caches.
 
     Provides convenience methods for caching decomposition results,
     search results, and plan templates.
+
+    With a ``redis_url`` every replica shares one cache; without one, or
+    while Redis is unreachable, entries live in a process-local
+    ``SemanticCache``. Both tiers hold JSON, so every hit is a fresh copy
+    the caller may mutate.
+
+    Invalidation is generation based: each sub-cache has a counter at
+    ``{key_prefix}:gen:{type}`` and every entry records the generation it
+    was written under. ``on_agent_registered`` bumps the counters of the
+    agent-dependent sub-caches, retiring their entries on all replicas at
+    once; retired entries then age out by TTL. A miss remembers the
+    generation it saw and the following set writes under that one, so a
+    result computed while an invalidation lands is stale on arrival instead
+    of being served for its whole TTL.
     """
 
     def __init__(
@@ -166,65 +271,275 @@ class PipelineCache:
         query_ttl: int = 3600,  # 1 hour
         embedding_ttl: int = 300,  # 5 minutes
         plan_ttl: int = 86400,  # 24 hours
+        *,
+        redis_url: str | None = None,
+        redis: Any = None,
+        key_prefix: str = "pnd:cache",
+        plan_index: SemanticPlanIndex | None = None,
+        local_max_bytes: int | None = None,
     ):
-        self.cache = SemanticCache(default_ttl=query_ttl)
+        self.cache = SemanticCache(default_ttl=query_ttl, max_bytes=local_max_bytes)
         self.query_ttl = query_ttl
         self.embedding_ttl = embedding_ttl
         self.plan_ttl = plan_ttl
+        self._redis_url = redis_url
+        self._redis = redis
+        self._owns_redis = redis is None
+        self._prefix = key_prefix
+        self._plan_index = plan_index
+        self._stats: dict[str, CacheStats] = defaultdict(CacheStats)
+        # Process-local twin of the Redis generation counters.
+        self._local_generations: dict[str, int] = defaultdict(int)
+        # (cache_type, key) → (Redis generation or None, local generation)
+        # observed by the miss that a later set fills.
+        self._miss_generations: OrderedDict[tuple[str, str], tuple[str | None, int]] = (
+            OrderedDict()
+        )
+        self.invalidations = 0
+        self.redis_errors = 0
 
     # ── Query Cache ───────────────────────────────────────────────────
 
-    def get_decomposition(self, query: str) -> dict[str, Any] | None:
+    async def get_decomposition(
+        self, query: str, context: dict[str, Any] | None = None
+    ) -> dict[str, Any] | None:
         """Look up cached decomposition for a query."""
-        key = self.cache._hash_key(["decomp", query.strip().lower()])
-        return self.cache.get(key)
+        return await self._get("decomposition", _normalise(query), _canonical(context))
 
-    def set_decomposition(self, query: str, result: dict[str, Any]) -> None:
+    async def set_decomposition(
+        self,
+        query: str,
+        result: dict[str, Any],
+        context: dict[str, Any] | None = None,
+    ) -> None:
         """Cache a decomposition result."""
-        key = self.cache._hash_key(["decomp", query.strip().lower()])
-        self.cache.set(key, result, ttl=self.query_ttl, cache_type="decomposition")
+        await self._set(
+            "decomposition",
+            (_normalise(query), _canonical(context)),
+            result,
+            self.query_ttl,
+        )
 
     # ── Embedding/Search Cache ────────────────────────────────────────
 
-    def get_search_results(
+    async def get_search_results(
         self,
         query: str,
         filters: dict[str, Any] | None = None,
     ) -> list[dict[str, Any]] | None:
         """Look up cached search results."""
-        filter_str = json.dumps(filters or {}, sort_keys=True)
-        key = self.cache._hash_key(["search", query, filter_str])
-        return self.cache.get(key)
+        return await self._get("search", query, _canonical(filters))
 
-    def set_search_results(
+    async def set_search_results(
         self,
         query: str,
         filters: dict[str, Any] | None,
         results: list[dict[str, Any]],
     ) -> None:
         """Cache search results."""
-        filter_str = json.dumps(filters or {}, sort_keys=True)
-        key = self.cache._hash_key(["search", query, filter_str])
-        self.cache.set(key, results, ttl=self.embedding_ttl, cache_type="search")
+        await self._set(
+            "search", (query, _canonical(filters)), results, self.embedding_ttl
+        )
 
     # ── Plan Template Cache (APC) ─────────────────────────────────────
 
-    def get_plan_template(self, intent: str) -> dict[str, Any] | None:
-        """Look up cached plan template by intent."""
-        key = self.cache._hash_key(["plan", intent.strip().lower()])
-        return self.cache.get(key)
+    async def get_plan_template(
+        self, intent: str, context: dict[str, Any] | None = None
+    ) -> dict[str, Any] | None:
+        """Look up cached plan template by intent, then by similarity.
+
+        An exact hit counts as one only once its agents revalidate; a
+        semantic hit is a template whose task inputs the caller re-resolves.
+        """
+        exact = self._stats["plan_template"]
+        exact.total_gets += 1
+        plan = await self._lookup(
+            "plan_template", _normalise(intent), _canonical(context)
+        )
+        if plan is not None and await self._plan_healthy(plan):
+            exact.hits += 1
+            return plan
+        exact.misses += 1
+        if plan is not None:
+            exact.stale += 1
+        if self._plan_index is None:
+            return None
+
+        stats = self._stats["plan_semantic"]
+        stats.total_gets += 1
+        plan = await self._plan_index.lookup(intent, _context_hash(context))
+        if plan is None:
+            stats.misses += 1
+        else:
+            stats.hits += 1
+        return plan
 
-    def set_plan_template(self, intent: str, plan: dict[str, Any]) -> None:
+    async def set_plan_template(
+        self,
+        intent: str,
+        plan: dict[str, Any],
+        context: dict[str, Any] | None = None,
+    ) -> None:
         """Cache a plan template for reuse."""
-        key = self.cache._hash_key(["plan", intent.strip().lower()])
-        self.cache.set(key, plan, ttl=self.plan_ttl, cache_type="plan_template")
+        await self._set(
+            "plan_template",
+            (_normalise(intent), _canonical(context)),
+            plan,
+            self.plan_ttl,
+        )
+        if self._plan_index is not None:
+            await self._plan_index.add(intent, _context_hash(context), plan)
 
     # ── Registry Event Handling ───────────────────────────────────────
 
-    def on_agent_registered(self) -> int:
-        """Invalidate search caches when a new agent registers."""
-        return self.cache.invalidate_by_type("search")
+    async def on_agent_registered(self, agent_id: str | None = None) -> int:
+        """Retire search results and plan templates after a registry change.
+
+        Semantic plan entries are dropped only when they reference
+        *agent_id*; the health revalidation covers the rest.
+        Returns the number of process-local entries dropped.
+        """
+        dropped = sum(self.cache.invalidate_by_type(t) for t in _AGENT_DEPENDENT_TYPES)
+        for cache_type in _AGENT_DEPENDENT_TYPES:
+            self._local_generations[cache_type] += 1
+        client = self._client()
+        if client is not None:
+            try:
+                async with client.pipeline(transaction=False) as pipe:
+                    for cache_type in _AGENT_DEPENDENT_TYPES:
+                        pipe.incr(self._generation_key(cache_type))
+                    await pipe.execute()
+            except Exception as exc:
+                self._redis_failed("invalidate", exc)
+        if self._plan_index is not None and agent_id:
+            await self._plan_index.forget_agent(agent_id)
+        self.invalidations += 1
+        return dropped
+
+    def stats(self) -> dict[str, Any]:
+        """Per-sub-cache hit/miss counters for the health route."""
+        return {
+            "backend": "redis" if self._redis or self._redis_url else "memory",
+            "local_entries": self.cache.stats.entries,
+            "local_bytes": self.cache.stats.bytes,
+            "invalidations": self.invalidations,
+            "redis_errors": self.redis_errors,
+            "types": {
+                cache_type: {
+                    "hits": s.hits,
+                    "misses": s.misses,
+                    "stale": s.stale,
+                    "hit_rate": round(s.hit_rate, 3),
+                }
+                for cache_type, s in sorted(self._stats.items())
+            },
+            "semantic_plans": self._plan_index.stats() if self._plan_index else None,
+        }
+
+    async def aclose(self) -> None:
+        """Close the Redis connection pool if this cache created it."""
+        if self._redis is not None and self._owns_redis:
+            await self._redis.aclose()
+            self._redis = None
+
+    # ── Internals ─────────────────────────────────────────────────────
+
+    def _client(self) -> Any:
+        if self._redis is None and self._redis_url:
+            import redis.asyncio as aioredis
+
+            self._redis = aioredis.from_url(self._redis_url, decode_responses=True)
+        return self._redis
+
+    def _generation_key(self, cache_type: str) -> str:
+        return f"{self._prefix}:gen:{cache_type}"
+
+    def _entry_key(self, cache_type: str, key: str) -> str:
+        return f"{self._prefix}:{cache_type}:{key}"
+
+    def _redis_failed(self, op: str, exc: Exception) -> None:
+        self.redis_errors += 1
+        logger.warning("pipeline_cache_redis_error", op=op, error=str(exc))
+
+    async def _get(self, cache_type: str, *parts: str) -> Any | None:
+        stats = self._stats[cache_type]
+        stats.total_gets += 1
+        value = await self._lookup(cache_type, *parts)
+        if value is None:
+            stats.misses += 1
+        else:
+            stats.hits += 1
+        return value
+
+    async def _lookup(self, cache_type: str, *parts: str) -> Any | None:
+        key = self.cache._hash_key([cache_type, *parts])
+        payload = await self._read(cache_type, key)
+        return None if payload is None else json.loads(payload)
+
+    async def _plan_healthy(self, plan: dict[str, Any]) -> bool:
+        if self._plan_index is None:
+            return True
+        try:
+            return await self._plan_index.agents_healthy(plan_agent_ids(plan))
+        except Exception as exc:
+            logger.warning("plan_cache_revalidation_failed", error=str(exc))
+            return True
 
-    @property
-    def stats(self) -> CacheStats:
-        return self.cache.stats
+    async def _read(self, cache_type: str, key: str) -> str | None:
+        local_generation = self._local_generations[cache_type]
+        client = self._client()
+        if client is not None:
+            try:
+                generation, raw = await client.mget(
+                    self._generation_key(cache_type), self._entry_key(cache_type, key)
+                )
+            except Exception as exc:
+                self._redis_failed("read", exc)
+            else:
+                generation = generation or "0"
+                if raw is not None:
+                    written_under, _, payload = raw.partition(":")
+                    if written_under == generation:
+                        return payload
+                self._remember_miss(cache_type, key, (generation, local_generation))
+                return None
+        payload = self.cache.get(key)
+        if payload is None:
+            self._remember_miss(cache_type, key, (None, local_generation))
+        return payload
+
+    def _remember_miss(
+        self, cache_type: str, key: str, generations: tuple[str | None, int]
+    ) -> None:
+        # Concurrent misses keep the oldest generation: a fill that may
+        # predate an invalidation is written stale rather than served.
+        pending = self._miss_generations
+        pending.setdefault((cache_type, key), generations)
+        pending.move_to_end((cache_type, key))
+        while len(pending) > _MAX_PENDING_MISSES:
+            pending.popitem(last=False)
+
+    async def _set(
+        self, cache_type: str, parts: tuple[str, ...], value: Any, ttl: int
+    ) -> None:
+        key = self.cache._hash_key([cache_type, *parts])
+        payload = json.dumps(value, default=str)
+        generation, local_generation = self._miss_generations.pop(
+            (cache_type, key), (None, self._local_generations[cache_type])
+        )
+        client = self._client()
+        if client is not None:
+            try:
+                if generation is None:
+                    generation = await client.get(self._generation_key(cache_type))
+                await client.set(
+                    self._entry_key(cache_type, key),
+                    f"{generation or '0'}:{payload}",
+                    ex=ttl,
+                )
+                return
+            except Exception as exc:
+                self._redis_failed("write", exc)
+        if local_generation != self._local_generations[cache_type]:
+            return  # computed before the last invalidation
+        self.cache.set(key, payload, ttl=ttl, cache_type=cache_type)
@@ -74,6 +74,8 @@ class Settings(BaseSettings):
     # Optional embedding vector size override (e.g. 768 for gemini/openai models
     # that support configurable output dimensions through OpenRouter).
     llm_embedding_dimension: int | None = None
+    # Max texts per batched embedding request (None → provider limit).
+    llm_embedding_batch_size: int | None = None
     llm_validation_model: str = "openai/gpt-4o-mini"
     llm_confidence_threshold: float = 0.75
     llm_timeout: int = 60
@@ -87,10 +89,46 @@ class Settings(BaseSettings):
     kafka_manifest_group_id: str = "planning-manifest-processors"
     kafka_query_group_id: str = "planning-query-handlers"
 
+    # ── Manifest consumer (batched mode) ──────────────────────────────────────
+    # Manifests are fetched in batches and up to kafka_manifest_concurrency
+    # agents are embedded in parallel per partition (events for the same agent
+    # stay ordered). Offsets are committed once a batch is fully processed;
+    # messages that still fail after retries go to the dead-letter topic.
+    # Retries back off exponentially from kafka_manifest_retry_backoff_ms so
+    # a brief DB / embedding outage does not dead-letter healthy manifests.
+    kafka_manifest_batch_size: int = 50
+    kafka_manifest_batch_timeout_ms: int = 1000
+    kafka_manifest_concurrency: int = 4
+    kafka_manifest_max_retries: int = 2
+    kafka_manifest_retry_backoff_ms: int = 500
+    kafka_manifest_dead_letter_topic: str = "registry.agent.registered.dlq"
+
     # ── Hybrid search ─────────────────────────────────────────────────────────
     similarity_threshold: float = 0.75
     top_k_candidates: int = 5
 
+    # ── Pipeline cache ────────────────────────────────────────────────────────
+    # Decompositions, hybrid-search results and whole plans are cached in Redis
+    # so every replica shares them; without redis_url the cache is per-process.
+    # New agent registrations retire cached search results and plans.
+    redis_url: str | None = None
+    pipeline_cache_enabled: bool = True
+    cache_decomposition_ttl_seconds: int = 3600
+    cache_search_ttl_seconds: int = 300
+    cache_plan_ttl_seconds: int = 86400
+    # Memory bound of the process-local tier (used without / during a Redis outage)
+    cache_local_max_bytes: int = 64 * 1024 * 1024
+    # Semantic plan tier: paraphrased goals reuse a cached plan when their
+    # embeddings are at least this cosine-similar (pgvector, shared by all
+    # replicas) and every agent in the plan is still HEALTHY.
+    plan_cache_semantic_enabled: bool = True
+    plan_cache_similarity_threshold: float = 0.92
+    # Embedding vectors (queries, capabilities, TDWA components, plan goals)
+    # keyed by model + text hash; Redis-backed via redis_url and shared with
+    # the superagent PnD gate. max_entries bounds the in-process L1.
+    embedding_cache_max_entries: int = 4096
+    embedding_cache_ttl_seconds: int = 7 * 86400
+
     # ── Logging ───────────────────────────────────────────────────────────────
     log_level: str = "INFO"
 
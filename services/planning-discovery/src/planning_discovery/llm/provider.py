@@ -11,6 +11,7 @@ from __future__ import annotations
 
 import hashlib
 import json
+from collections.abc import Sequence
 from typing import Any
 
 import structlog
@@ -100,6 +101,11 @@ class MockLLMProvider(LLMProvider):
         h = hashlib.sha256(text.encode()).digest()
         return [b / 255.0 for b in h] * 48  # 1536 dims
 
+    async def embed_many(
+        self, texts: Sequence[str], model: str = "text-embedding-3-small"
+    ) -> list[list[float]]:
+        return [await self.embed(text, model) for text in texts]
+
 
 # ── Factory ──────────────────────────────────────────────────────────────────
 
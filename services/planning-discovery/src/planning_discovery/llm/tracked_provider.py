@@ -8,6 +8,7 @@ which are used by the P&D pipeline for telemetry and cost budgeting.
 from __future__ import annotations
 
 import time
+from collections.abc import Sequence
 from dataclasses import dataclass, field
 from typing import Any
 
@@ -62,10 +63,10 @@ class CumulativeStats:
 class TrackedLLMProvider(BaseLLMProvider):
     """Decorator around a ``common.llm.LLMProvider`` that records usage stats.
 
-    Implements the same ``complete()`` / ``embed()`` interface so it can be
-    used anywhere a ``BaseLLMProvider`` is expected.  Additionally exposes
-    ``tracked_complete()`` which returns the raw content *plus* an ``LLMUsage``
-    record.
+    Implements the same ``complete()`` / ``embed()`` / ``embed_many()``
+    interface so it can be used anywhere a ``BaseLLMProvider`` is expected.
+    Additionally exposes ``tracked_complete()`` which returns the raw content
+    *plus* an ``LLMUsage`` record.
 
     Usage::
 
@@ -149,3 +150,15 @@ class TrackedLLMProvider(BaseLLMProvider):
             latency_ms=round(latency_ms, 1),
         )
         return result
+
+    async def embed_many(self, texts: Sequence[str], model: str) -> list[list[float]]:
+        t0 = time.monotonic()
+        result = await self._inner.embed_many(texts, model)
+        latency_ms = (time.monotonic() - t0) * 1000
+        logger.debug(
+            "llm_tracked_embed_many",
+            model=model,
+            count=len(result),
+            latency_ms=round(latency_ms, 1),
+        )
+        return result
@@ -9,6 +9,7 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from common.llm.src import (
+    EmbeddingCache,
     LLMConfig,
     LLMProviderType,
     SplitLLMProvider,
@@ -18,11 +19,14 @@ from common.utils.src.logging_config import setup_logging
 
 from .api import v1_router
 from .api.middleware.error_handler import ErrorHandlerMiddleware
+from .cache.plan_index import SemanticPlanIndex
+from .cache.semantic_cache import PipelineCache
 from .config import settings
 from .db.pool import AsyncpgPool
 from .db.prisma import prisma
 from .manifest_processing.consumer import ManifestConsumer
 from .manifest_processing.embedding_generator import TDWAEmbeddingGenerator
+from .manifest_processing.reindexer import reindex_agents
 from .manifest_processing.storage import EmbeddingStorage
 from .planning.pipeline import OptimizedPlanningPipeline
 
@@ -35,12 +39,14 @@ logger = setup_logging(
 # Module-level singletons (populated during lifespan startup)
 _pool: AsyncpgPool | None = None
 _consumer: ManifestConsumer | None = None
+_cache: PipelineCache | None = None
+_embedding_cache: EmbeddingCache | None = None
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan — startup and graceful shutdown."""
-    global _pool, _consumer
+    global _pool, _consumer, _cache, _embedding_cache
 
     logger.info("Starting %s v%s", settings.service_name, settings.service_version)
 
@@ -75,21 +81,54 @@ async def lifespan(app: FastAPI):
             embedding_dimension=settings.llm_embedding_dimension,
         )
     )
-    embedding_provider = create_llm_provider(
-        LLMConfig(
-            provider=LLMProviderType(settings.llm_embedding_provider),
-            api_key=settings.openrouter_api_key,
-            base_url=settings.openrouter_base_url,
-            ollama_base_url=settings.ollama_base_url,
-            embedding_dimension=settings.llm_embedding_dimension,
-        )
+    embedding_config = LLMConfig(
+        provider=LLMProviderType(settings.llm_embedding_provider),
+        api_key=settings.openrouter_api_key,
+        base_url=settings.openrouter_base_url,
+        ollama_base_url=settings.ollama_base_url,
+        embedding_dimension=settings.llm_embedding_dimension,
+        embedding_batch_size=settings.llm_embedding_batch_size,
     )
+    embedding_provider = create_llm_provider(embedding_config)
     llm_provider = SplitLLMProvider(
         completion=completion_provider,
         embedding=embedding_provider,
     )
 
-    # 4. Planning pipeline (stateless — reused per-request)
+    # 4. Caches — Redis-backed when REDIS_URL is set
+    _embedding_cache = EmbeddingCache(
+        redis_url=settings.redis_url,
+        max_entries=settings.embedding_cache_max_entries,
+        ttl_seconds=settings.embedding_cache_ttl_seconds,
+        namespace=embedding_config.embedding_namespace,
+        dimensions=settings.llm_embedding_dimension,
+    )
+    app.state.embedding_cache = _embedding_cache
+    if settings.pipeline_cache_enabled:
+        _cache = PipelineCache(
+            query_ttl=settings.cache_decomposition_ttl_seconds,
+            embedding_ttl=settings.cache_search_ttl_seconds,
+            plan_ttl=settings.cache_plan_ttl_seconds,
+            redis_url=settings.redis_url,
+            local_max_bytes=settings.cache_local_max_bytes,
+            plan_index=SemanticPlanIndex(
+                pool=_pool,
+                llm_provider=llm_provider,
+                embedding_model=settings.llm_embedding_model,
+                similarity_threshold=settings.plan_cache_similarity_threshold,
+                ttl_seconds=settings.cache_plan_ttl_seconds,
+                embedding_cache=_embedding_cache,
+            )
+            if settings.plan_cache_semantic_enabled
+            else None,
+        )
+        logger.info(
+            "Pipeline cache enabled (%s)",
+            "redis" if settings.redis_url else "in-process",
+        )
+    app.state.pipeline_cache = _cache
+
+    # 5. Planning pipeline (stateless — reused per-request)
     pipeline = OptimizedPlanningPipeline(
         llm_provider=llm_provider,
         pool=_pool,
@@ -100,6 +139,8 @@ async def lifespan(app: FastAPI):
         top_k_candidates=settings.top_k_candidates,
         similarity_threshold=settings.similarity_threshold,
         confidence_threshold=settings.llm_confidence_threshold,
+        cache=_cache,
+        embedding_cache=_embedding_cache,
     )
     app.state.pipeline = pipeline
     logger.info("Planning pipeline initialised")
@@ -111,16 +152,17 @@ async def lifespan(app: FastAPI):
     await loop.run_in_executor(None, pipeline._search.warm_up)
     logger.info("Cross-encoder warm-up complete")
 
-    # 5. Manifest processing components — shared with HTTP test endpoint
+    # 6. Manifest processing components — shared with HTTP test endpoint
     embedding_gen = TDWAEmbeddingGenerator(
         llm_provider=llm_provider,
         embedding_model=settings.llm_embedding_model,
+        embedding_cache=_embedding_cache,
     )
     embedding_storage = EmbeddingStorage(_pool)
     app.state.embedding_gen = embedding_gen
     app.state.embedding_storage = embedding_storage
 
-    # 6. Manifest consumer — BaseKafkaConsumer.start() already spawns the
+    # 7. Manifest consumer — BaseKafkaConsumer.start() already spawns the
     #    internal consume-loop task; we just need to keep a reference so the
     #    lifespan can cancel it on shutdown.
     logger.info("Starting manifest Kafka consumer…")
@@ -129,13 +171,26 @@ async def lifespan(app: FastAPI):
         group_id=settings.kafka_manifest_group_id,
         pool=_pool,
         embedding_generator=embedding_gen,
+        batch_size=settings.kafka_manifest_batch_size,
+        batch_timeout_ms=settings.kafka_manifest_batch_timeout_ms,
+        concurrency=settings.kafka_manifest_concurrency,
+        max_retries=settings.kafka_manifest_max_retries,
+        retry_backoff_ms=settings.kafka_manifest_retry_backoff_ms,
+        dead_letter_topic=settings.kafka_manifest_dead_letter_topic,
+        cache=_cache,
     )
     await _consumer.start()
+    app.state.manifest_consumer = _consumer
     logger.info("Manifest consumer started")
 
-    # 7. Catch-up indexing — index any active HEALTHY agents that have no
+    # 8. Catch-up indexing — index any active HEALTHY agents that have no
     #    embedding row yet (covers Kafka gaps from restarts or missed events).
-    await _catchup_index_missing_embeddings(_pool, embedding_gen, embedding_storage)
+    indexed = await reindex_agents(
+        _pool, embedding_gen, embedding_storage, missing_only=True
+    )
+    logger.info("Catch-up indexing: %d agent(s) missing embeddings indexed", indexed)
+    if indexed and _cache:
+        await _cache.on_agent_registered()
 
     logger.info("%s is ready", settings.service_name)
 
@@ -151,6 +206,12 @@ async def lifespan(app: FastAPI):
         )  # cancels the internal task and closes the aiokafka consumer
         logger.info("Manifest consumer stopped")
 
+    if _cache:
+        await _cache.aclose()
+
+    if _embedding_cache:
+        await _embedding_cache.aclose()
+
     if _pool:
         await _pool.disconnect()
         logger.info("asyncpg pool closed")
@@ -161,68 +222,6 @@ async def lifespan(app: FastAPI):
     logger.info("%s shutdown complete", settings.service_name)
 
 
-async def _catchup_index_missing_embeddings(
-    pool: AsyncpgPool,
-    embedding_gen: TDWAEmbeddingGenerator,
-    storage: EmbeddingStorage,
-) -> None:
-    """Index any active HEALTHY agents that have no embedding row.
-
-    Runs once at startup to recover from Kafka gaps — e.g. PnD was down when
-    an agent was registered, or the consumer loop crashed before committing.
-    """
-    from .manifest_processing.template_generator import SemanticTemplateGenerator
-
-    template_gen = SemanticTemplateGenerator()
-
-    sql = """
-        SELECT a.id, a.name, a.description, a.tags,
-               a.protocol_type::text AS protocol_type,
-               a.health_status::text AS health_status,
-               a.version, a.provider,
-               json_agg(json_build_object(
-                   'name', c.name, 'type', c.type::text, 'description', c.description
-               )) FILTER (WHERE c.name IS NOT NULL) AS capabilities
-        FROM agents a
-        LEFT JOIN capabilities c ON c.agent_id = a.id
-        WHERE a.is_active = true
-          AND a.health_status::text = 'HEALTHY'
-          AND a.id NOT IN (SELECT agent_id FROM agent_embeddings)
-        GROUP BY a.id
-    """
-    import json as _json
-
-    rows = await pool.fetch(sql)
-    if not rows:
-        logger.info("Catch-up indexing: all active agents already have embeddings")
-        return
-
-    logger.info(
-        "Catch-up indexing: %d agent(s) missing embeddings — indexing now", len(rows)
-    )
-    for row in rows:
-        agent_id = row["id"]
-        try:
-            caps = row["capabilities"]
-            if isinstance(caps, str):
-                caps = _json.loads(caps)
-            manifest = {
-                "name": row["name"],
-                "description": row["description"],
-                "tags": list(row["tags"] or []),
-                "protocol_type": row["protocol_type"],
-                "capabilities": caps or [],
-            }
-            templated = template_gen.generate(manifest)
-            embeddings = await embedding_gen.generate(manifest)
-            await storage.upsert(agent_id, templated, embeddings)
-            logger.info("Catch-up indexed agent %s", agent_id)
-        except Exception:
-            logger.exception(
-                "Catch-up indexing failed for agent %s — skipping", agent_id
-            )
-
-
 # ── FastAPI app ────────────────────────────────────────────────────────────────
 
 app = FastAPI(
@@ -15,6 +15,7 @@ from .storage import EmbeddingStorage
 from .template_generator import SemanticTemplateGenerator
 
 if TYPE_CHECKING:
+    from ..cache.semantic_cache import PipelineCache
     from ..db.pool import AsyncpgPool
     from .embedding_generator import TDWAEmbeddingGenerator
 
@@ -28,6 +29,14 @@ class ManifestConsumer(BaseKafkaConsumer):
     Pipeline per message::
 
         Kafka event → SemanticTemplateGenerator → TDWAEmbeddingGenerator → EmbeddingStorage
+
+    Runs in batched mode: events are keyed by agent_id, so different agents
+    are embedded concurrently while re-registrations of one agent apply in
+    order. Offsets are committed after each batch; poison events are
+    dead-lettered (``kafka_manifest_dead_letter_topic``).
+
+    Each stored manifest invalidates the search and plan caches of every
+    replica through the optional ``PipelineCache``.
     """
 
     def __init__(
@@ -36,19 +45,35 @@ class ManifestConsumer(BaseKafkaConsumer):
         group_id: str,
         pool: AsyncpgPool,
         embedding_generator: TDWAEmbeddingGenerator,
+        *,
+        batch_size: int = 50,
+        batch_timeout_ms: int = 1000,
+        concurrency: int = 4,
+        max_retries: int = 2,
+        retry_backoff_ms: int = 500,
+        dead_letter_topic: str | None = KafkaTopics.REGISTRY_AGENT_REGISTERED_DLQ,
+        cache: PipelineCache | None = None,
     ) -> None:
         config = KafkaConsumerConfig(
             bootstrap_servers=bootstrap_servers,
             group_id=group_id,
             topics=[KafkaTopics.REGISTRY_AGENT_REGISTERED],
             auto_offset_reset="earliest",
-            enable_auto_commit=True,
+            enable_auto_commit=False,
+            batch_mode=True,
+            batch_max_records=batch_size,
+            batch_timeout_ms=batch_timeout_ms,
+            max_concurrency=concurrency,
+            max_retries=max_retries,
+            retry_backoff_ms=retry_backoff_ms,
+            dead_letter_topic=dead_letter_topic or None,
         )
         super().__init__(config)
 
         self._template_gen = SemanticTemplateGenerator()
         self._embedding_gen = embedding_generator
         self._storage = EmbeddingStorage(pool)
+        self._cache = cache
 
     async def handle_message(self, message: dict[str, Any]) -> None:
         """Process a single manifest registration event."""
@@ -67,5 +92,7 @@ class ManifestConsumer(BaseKafkaConsumer):
         semantic_string = self._template_gen.generate(manifest)
         embeddings = await self._embedding_gen.generate(manifest)
         await self._storage.upsert(agent_id, semantic_string, embeddings)
+        if self._cache is not None:
+            await self._cache.on_agent_registered(agent_id)
 
         logger.info("Stored embedding for agent %s", agent_id)
@@ -18,6 +18,8 @@ from typing import TYPE_CHECKING, Any
 
 import numpy as np
 
+from common.llm.src.embedding_cache import EmbeddingCache
+
 from .normalizer import NormalizedManifest, normalize_manifest
 
 if TYPE_CHECKING:
@@ -42,64 +44,81 @@ class TDWAEmbeddingGenerator:
 
     Each component (name, description, capability_names, tags,
     capability_descriptions) is embedded separately, then combined
-    into a weighted-average ``combined`` vector.
+    into a weighted-average ``combined`` vector. Component vectors go through
+    the shared ``EmbeddingCache``, so re-indexing an unchanged manifest (or
+    one sharing tags/capability names with another agent) skips the LLM.
     """
 
-    def __init__(self, llm_provider: LLMProvider, embedding_model: str) -> None:
+    def __init__(
+        self,
+        llm_provider: LLMProvider,
+        embedding_model: str,
+        embedding_cache: EmbeddingCache | None = None,
+    ) -> None:
         self._llm = llm_provider
         self._embedding_model = embedding_model
+        self._embedding_cache = embedding_cache or EmbeddingCache()
 
     async def generate(self, raw: dict[str, Any]) -> dict[str, list[float]]:
         """
         Generate all TDWA component embeddings plus the combined vector.
 
         Accepts both the nested emerge.yaml format and the flat Kafka payload
-        format — ``normalize_manifest`` handles the conversion.
+        format — ``normalize_manifest`` handles the conversion. All components
+        are embedded in a single ``embed_many`` call.
 
         Returns:
             Dict with keys: ``combined``, ``name``, ``description``,
             ``capability_names``, ``tags``, ``capability_descriptions``.
             Each value is a list of floats of length ``EMBEDDING_DIM``.
         """
-        manifest: NormalizedManifest = normalize_manifest(raw)
-
-        components = {
-            "name": manifest.name,
-            "description": manifest.description,
-            "capability_names": " ".join(c.name for c in manifest.capabilities),
-            "tags": " ".join(manifest.tags),
-            "capability_descriptions": " ".join(
-                c.description for c in manifest.capabilities
-            ),
-        }
-
-        # First pass: embed non-empty components so we know the actual dimension
-        embeddings: dict[str, list[float]] = {}
-        empty_keys: list[str] = []
-
-        for component_name, text in components.items():
-            if not text.strip():
-                empty_keys.append(component_name)
-            else:
-                embeddings[component_name] = await self._llm.embed(
-                    text, self._embedding_model
-                )
-
-        # Infer dimension from the first real embedding; fall back if all empty
-        dim = (
-            len(next(iter(embeddings.values())))
-            if embeddings
-            else _EMBEDDING_DIM_FALLBACK
-        )
+        return (await self.generate_many([raw]))[0]
 
-        # Zero-pad components that had no text, using the actual model dimension
-        for key in empty_keys:
-            embeddings[key] = [0.0] * dim
+    async def generate_many(
+        self, raws: list[dict[str, Any]]
+    ) -> list[dict[str, list[float]]]:
+        """
+        ``generate()`` for several manifests, embedding every component of
+        every manifest in one batched (provider-chunked) request.
+        """
+        components = [_components(normalize_manifest(raw)) for raw in raws]
 
-        # Weighted average (TDWA)
-        combined = np.zeros(dim, dtype=np.float64)
-        for component, weight in TDWA_WEIGHTS.items():
-            combined += weight * np.array(embeddings[component], dtype=np.float64)
+        # Embed non-empty components only; empty ones are zero-padded below
+        texts = [t for comps in components for t in comps.values() if t.strip()]
+        vectors = await self._embedding_cache.get_or_embed_many(
+            texts, self._embedding_model, self._embed_missing
+        )
 
-        embeddings["combined"] = combined.tolist()
-        return embeddings
+        # Infer dimension from the first real embedding; fall back if all empty
+        dim = len(vectors[0]) if vectors else _EMBEDDING_DIM_FALLBACK
+        remaining = iter(vectors)
+        results: list[dict[str, list[float]]] = []
+        for comps in components:
+            embeddings = {
+                key: next(remaining) if text.strip() else [0.0] * dim
+                for key, text in comps.items()
+            }
+
+            # Weighted average (TDWA)
+            combined = np.zeros(dim, dtype=np.float64)
+            for component, weight in TDWA_WEIGHTS.items():
+                combined += weight * np.array(embeddings[component], dtype=np.float64)
+
+            embeddings["combined"] = combined.tolist()
+            results.append(embeddings)
+        return results
+
+    async def _embed_missing(self, texts: list[str]) -> list[list[float]]:
+        return await self._llm.embed_many(texts, self._embedding_model)
+
+
+def _components(manifest: NormalizedManifest) -> dict[str, str]:
+    return {
+        "name": manifest.name,
+        "description": manifest.description,
+        "capability_names": " ".join(c.name for c in manifest.capabilities),
+        "tags": " ".join(manifest.tags),
+        "capability_descriptions": " ".join(
+            c.description for c in manifest.capabilities
+        ),
+    }
@@ -0,0 +1,114 @@
+"""Bulk (re-)indexing of agent embeddings.
+
+Streams agents from Postgres in keyset-paginated pages (``ORDER BY id``,
+``id > last_id``) so memory stays flat however large the catalogue is, and
+embeds each page with one batched ``TDWAEmbeddingGenerator.generate_many``
+call instead of five serial requests per agent.
+
+Used at startup to catch up on agents that have no embedding row
+(``missing_only=True``) and by ``scripts/reembed_agents.py`` to rebuild every
+active agent's vectors after an embedding model change.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from typing import TYPE_CHECKING, Any
+
+from .template_generator import SemanticTemplateGenerator
+
+if TYPE_CHECKING:
+    from ..db.pool import AsyncpgPool
+    from .embedding_generator import TDWAEmbeddingGenerator
+    from .storage import EmbeddingStorage
+
+logger = logging.getLogger(__name__)
+
+_PAGE_SQL = """
+SELECT a.id, a.name, a.description, a.tags,
+       a.protocol_type::text AS protocol_type,
+       json_agg(json_build_object(
+           'name', c.name, 'type', c.type::text, 'description', c.description
+       )) FILTER (WHERE c.name IS NOT NULL) AS capabilities
+FROM agents a
+LEFT JOIN capabilities c ON c.agent_id = a.id
+WHERE a.is_active = true
+  AND a.id > $1
+  {filter}
+GROUP BY a.id
+ORDER BY a.id
+LIMIT $2
+"""
+
+_MISSING_FILTER = """AND a.health_status::text = 'HEALTHY'
+  AND NOT EXISTS (SELECT 1 FROM agent_embeddings e WHERE e.agent_id = a.id)"""
+
+
+async def reindex_agents(
+    pool: AsyncpgPool,
+    embedding_gen: TDWAEmbeddingGenerator,
+    storage: EmbeddingStorage,
+    *,
+    page_size: int = 100,
+    missing_only: bool = False,
+) -> int:
+    """(Re-)embed active agents page by page; return the number indexed.
+
+    With ``missing_only`` only HEALTHY agents without an embedding row are
+    indexed. A page whose batched embedding fails is retried agent by agent,
+    so one bad manifest never costs the rest of its page.
+    """
+    sql = _PAGE_SQL.format(filter=_MISSING_FILTER if missing_only else "")
+    template_gen = SemanticTemplateGenerator()
+    last_id = ""
+    indexed = 0
+
+    while True:
+        rows = await pool.fetch(sql, last_id, page_size)
+        if not rows:
+            break
+        last_id = rows[-1]["id"]
+        manifests = [_manifest(row) for row in rows]
+
+        try:
+            page_embeddings: list[Any] = await embedding_gen.generate_many(manifests)
+        except Exception:
+            logger.warning(
+                "Batched embedding failed for %d agent(s) — retrying one by one",
+                len(rows),
+                exc_info=True,
+            )
+            page_embeddings = [None] * len(rows)
+
+        for row, manifest, embeddings in zip(
+            rows, manifests, page_embeddings, strict=True
+        ):
+            agent_id = row["id"]
+            try:
+                if embeddings is None:
+                    embeddings = await embedding_gen.generate(manifest)
+                templated = template_gen.generate(manifest)
+                await storage.upsert(agent_id, templated, embeddings)
+                indexed += 1
+            except Exception:
+                logger.exception("Indexing failed for agent %s — skipping", agent_id)
+
+        logger.info("Indexed %d agent(s) so far (last id %s)", indexed, last_id)
+        if len(rows) < page_size:
+            break
+
+    return indexed
+
+
+def _manifest(row: Any) -> dict[str, Any]:
+    caps = row["capabilities"]
+    if isinstance(caps, str):
+        caps = json.loads(caps)
+    return {
+        "name": row["name"],
+        "description": row["description"],
+        "tags": list(row["tags"] or []),
+        "protocol_type": row["protocol_type"],
+        "capabilities": caps or [],
+    }
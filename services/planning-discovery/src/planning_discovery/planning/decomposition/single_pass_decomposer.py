@@ -17,6 +17,8 @@ from .schemas import DecompositionResult
 if TYPE_CHECKING:
     from common.llm.src import LLMProvider
 
+    from ...cache.semantic_cache import PipelineCache
+
 logger = logging.getLogger(__name__)
 
 # _SIMPLE_PATTERNS = [
@@ -48,12 +50,14 @@ class SinglePassDecomposer:
         primary_model: str,
         fallback_model: str,
         confidence_threshold: float = 0.75,
+        cache: PipelineCache | None = None,
     ) -> None:
         self._llm = llm_provider
         self._primary_model = primary_model
         self._fallback_model = fallback_model
         self._confidence_threshold = confidence_threshold
         self._validator = DAGValidator()
+        self._cache = cache
 
     async def decompose(
         self,
@@ -63,6 +67,12 @@ class SinglePassDecomposer:
         """Decompose *user_query* into a task DAG."""
         context = context or {}
 
+        if self._cache is not None:
+            cached = await self._cache.get_decomposition(user_query, context)
+            if cached is not None:
+                logger.debug("Decomposition cache hit for query=%.60r", user_query)
+                return DecompositionResult.model_validate(cached)
+
         # # Pre-flight: skip decomposition for simple single-action queries
         # if self._is_simple_query(user_query):
         #     return self._skip_decomposition(user_query)
@@ -87,6 +97,10 @@ class SinglePassDecomposer:
             decomposition = await self._fallback_decompose(user_query, context)
             decomposition.method = "fallback_gpt4"
 
+        if self._cache is not None and decomposition.success and decomposition.tasks:
+            await self._cache.set_decomposition(
+                user_query, decomposition.model_dump(mode="json"), context
+            )
         return decomposition
 
     # def _is_simple_query(self, query: str) -> bool:
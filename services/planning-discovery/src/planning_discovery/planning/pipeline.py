@@ -21,8 +21,9 @@ from typing import TYPE_CHECKING, Any
 from ..schemas.workflow_manifest import NodeType, WorkflowManifest
 
 if TYPE_CHECKING:
-    from common.llm.src import LLMProvider
+    from common.llm.src import EmbeddingCache, LLMProvider
 
+    from ..cache.semantic_cache import PipelineCache
     from ..db.pool import AsyncpgPool
     from ..schemas.internal import CoverageResult, ValidationResult
 from ..ranking import score_candidates
@@ -48,6 +49,9 @@ class OptimizedPlanningPipeline:
     ``WorkflowManifest``.
 
     Instantiate once at application startup and reuse across requests.
+    An optional ``PipelineCache`` short-circuits whole plans and is shared
+    with the decomposer and the hybrid search; an optional ``EmbeddingCache``
+    is shared by the hybrid search and the coverage analyser.
     """
 
     def __init__(
@@ -62,23 +66,30 @@ class OptimizedPlanningPipeline:
         top_k_candidates: int = 5,
         similarity_threshold: float = 0.75,
         confidence_threshold: float = 0.75,
+        cache: PipelineCache | None = None,
+        embedding_cache: EmbeddingCache | None = None,
     ) -> None:
+        self._cache = cache
         self._decomposer = SinglePassDecomposer(
             llm_provider=llm_provider,
             primary_model=decomposition_model,
             fallback_model=fallback_model,
             confidence_threshold=confidence_threshold,
+            cache=cache,
         )
         self._search = HybridSearchPipeline(
             pool=pool,
             llm_provider=llm_provider,
             embedding_model=embedding_model,
             top_k=top_k_candidates,
+            cache=cache,
+            embedding_cache=embedding_cache,
         )
         self._coverage = SemanticCoverageAnalyzer(
             llm_provider=llm_provider,
             embedding_model=embedding_model,
             similarity_threshold=similarity_threshold,
+            embedding_cache=embedding_cache,
         )
         # Stage 2b: IO resolution uses the lighter decomposition model for
         # extraction/matching — fast enough and cost-effective per task.
@@ -114,6 +125,21 @@ class OptimizedPlanningPipeline:
         started_at = time.monotonic()
         logger.info("Planning started — plan_id=%s query='%.80s'", plan_id, user_query)
 
+        if self._cache is not None:
+            cached = await self._cache.get_plan_template(user_query, context)
+            if cached is not None and "plan_cache_source_query" in cached.get(
+                "metadata", {}
+            ):
+                cached = await self._rebind_template(cached, user_query)
+            if cached is not None:
+                logger.info("Planning served from plan cache — plan_id=%s", plan_id)
+                cached.pop("created_at", None)
+                cached["metadata"] = {
+                    **cached.get("metadata", {}),
+                    "original_query": user_query,
+                }
+                return WorkflowManifest(**{**cached, "id": plan_id})
+
         # ── Stage 1: Decompose ────────────────────────────────────────────────
         decomp = await self._decomposer.decompose(user_query, context or {})
         if not decomp.tasks:
@@ -258,7 +284,39 @@ class OptimizedPlanningPipeline:
             len(workflow_dict.get("nodes", [])),
         )
 
-        return WorkflowManifest(**workflow_dict)
+        manifest = WorkflowManifest(**workflow_dict)
+        if self._cache is not None:
+            await self._cache.set_plan_template(
+                user_query, manifest.model_dump(mode="json"), context
+            )
+        return manifest
+
+    async def _rebind_template(
+        self, template: dict[str, Any], user_query: str
+    ) -> dict[str, Any] | None:
+        """
+        Fill a semantically matched plan template with inputs for *user_query*.
+
+        The template was planned for a paraphrase of *user_query*; each agent
+        node re-extracts its inputs from this query.  Returns None when a node
+        cannot be rebound, in which case the query is planned from scratch.
+        """
+        nodes = [
+            n
+            for n in template.get("nodes", [])
+            if n.get("capability") and n.get("task")
+        ]
+        rebound = await asyncio.gather(
+            *[self._io_resolver.rebind_inputs(n, user_query) for n in nodes]
+        )
+        if any(inputs is None for inputs in rebound):
+            logger.info(
+                "Semantic plan template not reusable for query='%.80s'", user_query
+            )
+            return None
+        for node, inputs in zip(nodes, rebound, strict=True):
+            node["task"]["inputs"] = inputs
+        return template
 
     # ------------------------------------------------------------------
     # Stage 2a helpers
@@ -14,6 +14,8 @@ from typing import TYPE_CHECKING, Any
 
 import numpy as np
 
+from common.llm.src.embedding_cache import EmbeddingCache
+
 from ...schemas.internal import AgentSearchResult, CoverageResult
 
 if TYPE_CHECKING:
@@ -33,10 +35,12 @@ class SemanticCoverageAnalyzer:
         llm_provider: LLMProvider,
         embedding_model: str,
         similarity_threshold: float = 0.75,
+        embedding_cache: EmbeddingCache | None = None,
     ) -> None:
         self._llm = llm_provider
         self._embedding_model = embedding_model
         self._threshold = similarity_threshold
+        self._embedding_cache = embedding_cache or EmbeddingCache()
 
     async def analyze_coverage(
         self,
@@ -69,9 +73,13 @@ class SemanticCoverageAnalyzer:
             )
 
         # Embed required functions
-        req_embeddings: dict[str, list[float]] = {}
-        for func in required_functions:
-            req_embeddings[func] = await self._llm.embed(func, self._embedding_model)
+        req_embeddings = dict(
+            zip(
+                required_functions,
+                await self._embed_many(required_functions),
+                strict=True,
+            )
+        )
 
         # Check each candidate
         for candidate in top_candidates:
@@ -113,13 +121,16 @@ class SemanticCoverageAnalyzer:
         agent: dict[str, Any],
     ) -> dict[str, Any]:
         capabilities: list[dict[str, Any]] = agent.get("capabilities") or []
-        agent_cap_embeddings: dict[str, list[float]] = {}
-
-        for cap in capabilities:
-            text = f"{cap.get('name', '')}: {cap.get('description', '')}"
-            agent_cap_embeddings[cap.get("name", "")] = await self._llm.embed(
-                text, self._embedding_model
+        texts = [
+            f"{c.get('name', '')}: {c.get('description', '')}" for c in capabilities
+        ]
+        agent_cap_embeddings: dict[str, list[float]] = dict(
+            zip(
+                (c.get("name", "") for c in capabilities),
+                await self._embed_many(texts),
+                strict=True,
             )
+        )
 
         matches: dict[str, Any] = {}
         covered = 0
@@ -186,6 +197,15 @@ class SemanticCoverageAnalyzer:
             manifest=agent,
         )
 
+    async def _embed_many(self, texts: list[str]) -> list[list[float]]:
+        """Embed *texts* through the shared cache; only misses reach the LLM."""
+
+        return await self._embedding_cache.get_or_embed_many(
+            texts,
+            self._embedding_model,
+            lambda missing: self._llm.embed_many(missing, self._embedding_model),
+        )
+
     @staticmethod
     def _cosine_similarity(vec1: list[float], vec2: list[float]) -> float:
         a = np.array(vec1)
@@ -15,34 +15,20 @@ from typing import TYPE_CHECKING, Any
 
 import numpy as np
 
+from common.llm.src.embedding_cache import EmbeddingCache
+
 from .keyword_extractor import extract_keywords
 
 if TYPE_CHECKING:
     from common.llm.src import LLMProvider
 
+    from ...cache.semantic_cache import PipelineCache
     from ...db.pool import AsyncpgPool
 
 logger = logging.getLogger(__name__)
 
 _CROSS_ENCODER_MODEL = "cross-encoder/ms-marco-MiniLM-L-6-v2"
 
-# Process-level embedding cache: (query, model) → vector.
-# Avoids repeat remote API calls when the same query arrives on consecutive
-# orchestrator turns (which is the common case during multi-step agent runs).
-_EMBED_CACHE_MAX = 128
-_embed_cache: dict[tuple[str, str], list[float]] = {}
-
-
-def _embed_cache_get(query: str, model: str) -> list[float] | None:
-    return _embed_cache.get((query, model))
-
-
-def _embed_cache_set(query: str, model: str, vec: list[float]) -> None:
-    if len(_embed_cache) >= _EMBED_CACHE_MAX:
-        _embed_cache.pop(next(iter(_embed_cache)))
-    _embed_cache[(query, model)] = vec
-
-
 # ms-marco-MiniLM-L-6-v2 outputs raw logits (not probabilities).
 # Empirical ranges: highly relevant ~5–12, relevant ~0–5, irrelevant < 0.
 _CE_HIGH_THRESHOLD = 5.0
@@ -66,11 +52,17 @@ class HybridSearchPipeline:
         llm_provider: LLMProvider,
         embedding_model: str,
         top_k: int = 5,
+        cache: PipelineCache | None = None,
+        embedding_cache: EmbeddingCache | None = None,
     ) -> None:
         self._pool = pool
         self._llm = llm_provider
         self._embedding_model = embedding_model
         self._top_k = top_k
+        self._cache = cache
+        # Query vectors are shared across replicas (and with the PnD gate) via
+        # Redis; repeat queries on consecutive orchestrator turns skip the API.
+        self._embedding_cache = embedding_cache or EmbeddingCache()
         self._cross_encoder: Any = (
             None  # loaded on first search; call warm_up() at startup
         )
@@ -93,6 +85,14 @@ class HybridSearchPipeline:
         filters = filters or {}
         logger.debug("[search] query=%r filters=%s", query, filters)
 
+        # top_k is part of the key: /candidates overrides it per request.
+        cache_filters = {**filters, "top_k": self._top_k}
+        if self._cache is not None:
+            cached = await self._cache.get_search_results(query, cache_filters)
+            if cached is not None:
+                logger.debug("[search] cache hit (%d agents)", len(cached))
+                return cached
+
         keywords = extract_keywords(query)
         logger.debug("[Step 1] extracted keywords: %s", keywords)
 
@@ -155,6 +155,8 @@ class HybridSearchPipeline:
             len(result),
             [(a.get("name"), a.get("cross_encoder_score")) for a in result],
         )
+        if self._cache is not None and result:
+            await self._cache.set_search_results(query, cache_filters, result)
         return result
 
     # ── Step 1: GIN inverted index filter ─────────────────────────────────────
@@ -341,14 +343,12 @@ class HybridSearchPipeline:
         return result
 
     async def _embed_cached(self, query: str) -> list[float]:
-        """Embed *query*, returning a cached vector if the same query was seen recently."""
-        cached = _embed_cache_get(query, self._embedding_model)
-        if cached is not None:
-            logger.debug("[embed_cached] cache hit for query=%.60r", query)
-            return cached
-        result = await self._llm.embed(query, self._embedding_model)
-        _embed_cache_set(query, self._embedding_model, result)
-        return result
+        """Embed *query* through the shared embedding cache."""
+        return await self._embedding_cache.get_or_embed(
+            query,
+            self._embedding_model,
+            lambda text: self._llm.embed(text, self._embedding_model),
+        )
 
     def warm_up(self) -> None:
         """Pre-load the cross-encoder at startup so the first request isn't slow."""
@@ -302,6 +302,61 @@ class IOResolver:
 
         return resolved_tasks, hitl_node
 
+    async def rebind_inputs(
+        self,
+        node: dict[str, Any],
+        user_query: str,
+        model: str | None = None,
+    ) -> dict[str, Any] | None:
+        """
+        Re-resolve the inputs of a cached plan node for a new *user_query*.
+
+        Used when a plan template planned for another goal is reused: the
+        node keeps its agent, capability and ``$tasks`` references, and every
+        other field is extracted from *user_query* or filled from its schema
+        default.
+
+        Returns:
+            The node's new ``inputs``, or None when the set of required
+            fields left unresolved differs from the template's — its HITL
+            node would then ask for the wrong fields.
+        """
+        capability = node.get("capability") or {}
+        task = node.get("task") or {}
+        input_schema = capability.get("input_schema") or {}
+        properties: dict[str, Any] = input_schema.get("properties", {})
+        required_fields: list[str] = input_schema.get("required", [])
+        template_inputs: dict[str, Any] = task.get("inputs") or {}
+
+        extracted_from_query = await self._extract_from_query(
+            user_query=user_query,
+            input_schema=input_schema,
+            task_description=task.get("description", ""),
+            model=model or self._model,
+        )
+
+        filled_inputs: dict[str, Any] = {}
+        missing_required: list[str] = []
+        for field_name, field_schema in properties.items():
+            reference = template_inputs.get(field_name)
+            if isinstance(reference, str) and reference.startswith("$tasks."):
+                filled_inputs[field_name] = reference
+            elif extracted_from_query.get(field_name) is not None:
+                filled_inputs[field_name] = extracted_from_query[field_name]
+            elif "default" in field_schema:
+                filled_inputs[field_name] = field_schema["default"]
+            elif field_name in required_fields:
+                missing_required.append(field_name)
+
+        if set(missing_required) != set(task.get("unresolved_inputs") or []):
+            logger.info(
+                "Cached node %s cannot be rebound: unresolved inputs %s",
+                node.get("id"),
+                missing_required,
+            )
+            return None
+        return filled_inputs
+
     # ------------------------------------------------------------------
     # Capability selection
     # ------------------------------------------------------------------
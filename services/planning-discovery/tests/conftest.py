@@ -114,6 +114,9 @@ def mock_llm_provider() -> MagicMock:
     """Mock LLM provider with deterministic responses."""
     mock = MagicMock()
     mock.embed = AsyncMock(return_value=[0.1] * 1536)
+    mock.embed_many = AsyncMock(
+        side_effect=lambda texts, model: [[0.1] * 1536 for _ in texts]
+    )
     mock.complete = AsyncMock(
         return_value='{"tasks": [], "edges": [], "metadata": {"confidence": 0.85}}'
     )
@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from unittest.mock import AsyncMock, MagicMock
+from unittest.mock import MagicMock
 
 import pytest
 from planning_discovery.manifest_processing.embedding_generator import (
@@ -36,7 +36,6 @@ class TestManifestProcessingIntegration:
         self, mock_llm_provider: MagicMock, crypto_oracle_manifest: dict
     ) -> None:
         """Test embedding generation with mocked LLM."""
-        mock_llm_provider.embed = AsyncMock(return_value=[0.1] * 1536)
         embedding_gen = TDWAEmbeddingGenerator(mock_llm_provider, "test-model")
 
         result = await embedding_gen.generate(crypto_oracle_manifest)
@@ -44,7 +43,9 @@ class TestManifestProcessingIntegration:
         assert isinstance(result, dict)
         assert "combined" in result
         assert len(result["combined"]) == 1536
-        assert mock_llm_provider.embed.called
+        # All five components in a single batched call
+        mock_llm_provider.embed_many.assert_awaited_once()
+        assert len(mock_llm_provider.embed_many.await_args.args[0]) == 5
 
     def test_multiple_manifests_processing(
         self,
@@ -18,6 +18,13 @@ def _install_common_llm_mock() -> None:
     if "common" in sys.modules and not isinstance(sys.modules["common"], MagicMock):
         # Real package present — nothing to do
         return
+    try:
+        # Importable workspace package (e.g. EmbeddingCache is needed at runtime)
+        import common.llm.src  # noqa: F401
+
+        return
+    except ImportError:
+        pass
 
     class _LLMProvider(ABC):
         @abstractmethod
@@ -925,3 +925,76 @@ class TestResolveIO:
         missing_fields = {r["field_name"] for r in hitl["inputs"]["requests"]}
         assert "origin" in missing_fields
         assert "departure_date" in missing_fields
+
+
+# ---------------------------------------------------------------------------
+# Rebinding cached plan templates
+# ---------------------------------------------------------------------------
+
+
+def _cached_flight_node(unresolved: list[str]) -> dict[str, Any]:
+    capability = _flight_manifest()["capabilities"][0]
+    return {
+        "id": "task_2",
+        "agent_id": "did:orcha:agent:skylink",
+        "capability": {
+            "capability_id": capability["capability_id"],
+            "type": capability["type"],
+            "name": capability["name"],
+            "input_schema": capability["input_schema"],
+            "output_schema": capability["output_schema"],
+        },
+        "task": {
+            "description": "Search flights",
+            "inputs": {"origin": "$tasks.task_1.output.airport"},
+            "unresolved_inputs": unresolved,
+        },
+    }
+
+
+class TestRebindInputs:
+    """Tests for rebind_inputs() on semantically matched plan templates."""
+
+    @pytest.mark.asyncio
+    async def test_inputs_come_from_the_new_query(self) -> None:
+        llm = _make_llm(
+            complete_returns=json.dumps(
+                {
+                    "extracted_inputs": {
+                        "origin": "CDG",
+                        "destination": "JFK",
+                        "departure_date": "2026-05-01",
+                    }
+                }
+            )
+        )
+        resolver = IOResolver(llm)
+
+        inputs = await resolver.rebind_inputs(
+            _cached_flight_node([]), "Flights to JFK on 2026-05-01"
+        )
+
+        assert inputs == {
+            "origin": "$tasks.task_1.output.airport",
+            "destination": "JFK",
+            "departure_date": "2026-05-01",
+            "passengers": 1,
+        }
+
+    @pytest.mark.asyncio
+    async def test_new_missing_field_rejects_the_template(self) -> None:
+        llm = _make_llm(
+            complete_returns=json.dumps(
+                {"extracted_inputs": {"destination": "JFK", "departure_date": None}}
+            )
+        )
+        resolver = IOResolver(llm)
+
+        assert await resolver.rebind_inputs(_cached_flight_node([]), "to JFK") is None
+        assert await resolver.rebind_inputs(
+            _cached_flight_node(["departure_date"]), "to JFK"
+        ) == {
+            "origin": "$tasks.task_1.output.airport",
+            "destination": "JFK",
+            "passengers": 1,
+        }
@@ -0,0 +1,294 @@
+"""Unit tests for the Redis-backed PipelineCache and its pipeline wiring."""
+
+from __future__ import annotations
+
+import json
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from planning_discovery.cache.plan_index import SemanticPlanIndex
+from planning_discovery.cache.semantic_cache import PipelineCache
+from planning_discovery.planning.decomposition.schemas import DecompositionResult
+from planning_discovery.planning.decomposition.single_pass_decomposer import (
+    SinglePassDecomposer,
+)
+from planning_discovery.planning.resolution.hybrid_search import HybridSearchPipeline
+
+pytestmark = pytest.mark.unit
+
+
+class _FakePipeline:
+    def __init__(self, redis: _FakeRedis) -> None:
+        self._redis = redis
+        self._ops: list[str] = []
+
+    async def __aenter__(self) -> _FakePipeline:
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        return None
+
+    def incr(self, key: str) -> None:
+        self._ops.append(key)
+
+    async def execute(self) -> list[int]:
+        return [await self._redis.incr(key) for key in self._ops]
+
+
+class _FakeRedis:
+    """Just enough of redis.asyncio for PipelineCache (decode_responses=True)."""
+
+    def __init__(self) -> None:
+        self.data: dict[str, str] = {}
+        self.down = False
+
+    def _check(self) -> None:
+        if self.down:
+            raise ConnectionError("redis down")
+
+    async def get(self, key: str) -> str | None:
+        self._check()
+        return self.data.get(key)
+
+    async def mget(self, *keys: str) -> list[str | None]:
+        self._check()
+        return [self.data.get(k) for k in keys]
+
+    async def set(self, key: str, value: str, ex: int | None = None) -> None:
+        self._check()
+        self.data[key] = value
+
+    async def incr(self, key: str) -> int:
+        self._check()
+        self.data[key] = str(int(self.data.get(key, "0")) + 1)
+        return int(self.data[key])
+
+    def pipeline(self, transaction: bool = True) -> _FakePipeline:
+        self._check()
+        return _FakePipeline(self)
+
+
+_AGENTS: list[dict[str, Any]] = [{"id": "a1", "name": "weather", "base_fee": "0.01"}]
+
+
+async def test_replicas_share_entries_and_get_fresh_copies():
+    redis = _FakeRedis()
+    replica_a = PipelineCache(redis=redis)
+    replica_b = PipelineCache(redis=redis)
+
+    await replica_a.set_search_results("forecast", {"top_k": 5}, _AGENTS)
+    hit = await replica_b.get_search_results("forecast", {"top_k": 5})
+    assert hit == _AGENTS
+    hit[0]["routing_score"] = 0.9
+    assert await replica_b.get_search_results("forecast", {"top_k": 5}) == _AGENTS
+
+    assert await replica_b.get_search_results("forecast", {"top_k": 8}) is None
+    assert replica_b.stats()["types"]["search"] == {
+        "hits": 2,
+        "misses": 1,
+        "stale": 0,
+        "hit_rate": 0.667,
+    }
+    assert replica_a.cache.stats.entries == 0
+
+
+async def test_registration_retires_search_and_plans_on_every_replica():
+    redis = _FakeRedis()
+    replica_a = PipelineCache(redis=redis)
+    replica_b = PipelineCache(redis=redis)
+    await replica_a.set_search_results("forecast", None, _AGENTS)
+    await replica_a.set_plan_template("Get the forecast", {"id": "p1"})
+    await replica_a.set_decomposition("Get the forecast", {"tasks": []})
+
+    await replica_b.on_agent_registered()
+
+    assert await replica_a.get_search_results("forecast") is None
+    assert await replica_a.get_plan_template("get the forecast ") is None
+    assert await replica_a.get_decomposition("Get the forecast") == {"tasks": []}
+
+    await replica_a.set_search_results("forecast", None, _AGENTS)
+    assert await replica_b.get_search_results("forecast") == _AGENTS
+
+
+@pytest.mark.parametrize("shared", [True, False])
+async def test_fill_computed_across_an_invalidation_is_not_served(shared):
+    redis = _FakeRedis() if shared else None
+    replica_a = PipelineCache(redis=redis)
+    replica_b = PipelineCache(redis=redis) if shared else replica_a
+
+    assert await replica_a.get_search_results("forecast") is None
+    # The registry changes while replica A is still searching.
+    await replica_b.on_agent_registered("a2")
+    await replica_a.set_search_results("forecast", None, _AGENTS)
+
+    assert await replica_a.get_search_results("forecast") is None
+    await replica_a.set_search_results("forecast", None, _AGENTS)
+    assert await replica_a.get_search_results("forecast") == _AGENTS
+
+
+async def test_redis_outage_falls_back_to_process_cache():
+    redis = _FakeRedis()
+    cache = PipelineCache(redis=redis)
+    redis.down = True
+
+    await cache.set_plan_template("q", {"id": "p1"})
+    assert await cache.get_plan_template("q") == {"id": "p1"}
+    assert await cache.on_agent_registered() == 1
+    assert await cache.get_plan_template("q") is None
+    assert cache.stats()["redis_errors"] == 4
+
+
+async def test_decomposer_serves_repeat_queries_from_cache():
+    cache = PipelineCache(redis=_FakeRedis())
+    decomposer = SinglePassDecomposer(
+        llm_provider=MagicMock(),
+        primary_model="small",
+        fallback_model="large",
+        cache=cache,
+    )
+    result = DecompositionResult(
+        success=True,
+        tasks=[{"id": "task_1", "description": "Get the forecast"}],
+        edges=[],
+        confidence=0.9,
+        method="single_pass_7b",
+        llm_calls=1,
+    )
+    decomposer._single_pass_decompose = AsyncMock(return_value=result)
+    decomposer._validator.validate = MagicMock(
+        return_value=MagicMock(is_valid=True, confidence=0.9)
+    )
+
+    first = await decomposer.decompose("Get the forecast", {"units": "metric"})
+    second = await decomposer.decompose("get the forecast", {"units": "metric"})
+    await decomposer.decompose("Get the forecast", {"units": "imperial"})
+
+    assert second == first
+    assert decomposer._single_pass_decompose.await_count == 2
+
+
+async def test_search_hit_skips_retrieval():
+    cache = PipelineCache(redis=_FakeRedis())
+    pool = MagicMock()
+    pool.fetch = AsyncMock(side_effect=AssertionError("search should be cached"))
+    search = HybridSearchPipeline(
+        pool=pool, llm_provider=MagicMock(), embedding_model="e", top_k=5, cache=cache
+    )
+    await cache.set_search_results("forecast", {"top_k": 5}, _AGENTS)
+
+    assert await search.search("forecast") == _AGENTS
+    pool.fetch.assert_not_called()
+
+
+# ── Semantic plan tier ────────────────────────────────────────────────────────
+
+_MANIFEST: dict[str, Any] = {
+    "id": "p1",
+    "nodes": [
+        {
+            "id": "n1",
+            "agent_id": "a1",
+            "task": {"inputs": {"account": "ACC-1", "period": "ytd"}},
+        },
+        {
+            "id": "n2",
+            "agent_id": "a2",
+            "task": {"inputs": {"holdings": "$tasks.n1.output.holdings"}},
+        },
+    ],
+    "edges": [],
+    "entry_node_id": "n1",
+    "metadata": {"original_query": "show my portfolio performance"},
+}
+
+
+class _FakePool:
+    """Answers the plan_cache_entries / agents queries of SemanticPlanIndex."""
+
+    def __init__(self, similarity: float = 0.97, healthy: int = 2) -> None:
+        self.similarity = similarity
+        self.healthy = healthy
+        self.executed: list[tuple[str, tuple[Any, ...]]] = []
+
+    async def fetchrow(self, sql: str, *args: Any) -> dict[str, Any] | None:
+        if "FROM plan_cache_entries" in sql:
+            return {
+                "id": "e1",
+                "goal": "show my portfolio performance",
+                "manifest": json.dumps(_MANIFEST),
+                "agent_ids": ["a1", "a2"],
+                "similarity": self.similarity,
+            }
+        return {"healthy": self.healthy}
+
+    async def execute(self, sql: str, *args: Any) -> str:
+        self.executed.append((" ".join(sql.split()), args))
+        return "OK"
+
+
+def _semantic_cache(pool: _FakePool) -> tuple[PipelineCache, MagicMock]:
+    llm = MagicMock()
+    llm.embed = AsyncMock(return_value=[0.1, 0.2])
+    index = SemanticPlanIndex(pool, llm, "e", similarity_threshold=0.9)
+    return PipelineCache(redis=_FakeRedis(), plan_index=index), llm
+
+
+async def test_paraphrase_is_served_by_semantic_tier():
+    cache, _ = _semantic_cache(_FakePool(similarity=0.95))
+
+    plan = await cache.get_plan_template("show me my portfolio's performance")
+
+    # Another goal's literal inputs are dropped; node wiring is kept.
+    assert [n["task"]["inputs"] for n in plan["nodes"]] == [
+        {},
+        {"holdings": "$tasks.n1.output.holdings"},
+    ]
+    assert plan["metadata"]["plan_cache_similarity"] == 0.95
+    assert plan["metadata"]["plan_cache_source_query"] == (
+        "show my portfolio performance"
+    )
+    stats = cache.stats()
+    assert stats["types"]["plan_semantic"]["hits"] == 1
+    assert stats["types"]["plan_template"]["misses"] == 1
+
+
+async def test_semantic_match_below_threshold_or_unhealthy_misses():
+    pool = _FakePool(similarity=0.8)
+    cache, _ = _semantic_cache(pool)
+    assert await cache.get_plan_template("rebalance my portfolio") is None
+
+    pool.similarity, pool.healthy = 0.99, 1
+    assert await cache.get_plan_template("rebalance my portfolio") is None
+    assert pool.executed == [("DELETE FROM plan_cache_entries WHERE id = $1", ("e1",))]
+    assert cache.stats()["semantic_plans"]["unhealthy"] == 1
+
+
+async def test_exact_hit_with_unhealthy_agent_is_stale():
+    pool = _FakePool(similarity=0.5, healthy=1)
+    cache, llm = _semantic_cache(pool)
+    await cache.set_plan_template("show my portfolio performance", _MANIFEST)
+
+    assert await cache.get_plan_template("show my portfolio performance") is None
+    assert cache.stats()["types"]["plan_template"] == {
+        "hits": 0,
+        "misses": 1,
+        "stale": 1,
+        "hit_rate": 0.0,
+    }
+    # lookup() reuses the embedding computed when the plan was stored
+    llm.embed.assert_awaited_once()
+
+
+async def test_new_plans_are_indexed_and_forgotten_on_reregistration():
+    pool = _FakePool()
+    cache, _ = _semantic_cache(pool)
+
+    await cache.set_plan_template("show my portfolio performance", _MANIFEST)
+    await cache.on_agent_registered("a2")
+
+    (insert_sql, insert_args), (forget_sql, forget_args) = pool.executed
+    assert insert_sql.startswith("INSERT INTO plan_cache_entries")
+    assert insert_args[4] == ["a1", "a2"]
+    assert "agent_ids @> ARRAY[$1]" in forget_sql
+    assert forget_args == ("a2",)
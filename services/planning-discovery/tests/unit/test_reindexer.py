@@ -0,0 +1,88 @@
+"""Unit tests for paged, batched agent (re-)indexing."""
+
+from __future__ import annotations
+
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from planning_discovery.manifest_processing.embedding_generator import (
+    TDWAEmbeddingGenerator,
+)
+from planning_discovery.manifest_processing.reindexer import reindex_agents
+
+pytestmark = pytest.mark.unit
+
+
+def _agent(agent_id: str, name: str) -> dict[str, Any]:
+    return {
+        "id": agent_id,
+        "name": name,
+        "description": f"{name} agent",
+        "tags": ["demo"],
+        "protocol_type": "MCP",
+        "capabilities": '[{"name": "run", "type": "TOOL", "description": "Run"}]',
+    }
+
+
+class _PagedPool:
+    """Serves *agents* with keyset pagination (``id > $1 LIMIT $2``)."""
+
+    def __init__(self, agents: list[dict[str, Any]]) -> None:
+        self.agents = sorted(agents, key=lambda a: a["id"])
+        self.pages: list[tuple[str, int]] = []
+        self.sql: list[str] = []
+
+    async def fetch(self, sql: str, last_id: str, limit: int) -> list[dict[str, Any]]:
+        self.sql.append(sql)
+        self.pages.append((last_id, limit))
+        return [a for a in self.agents if a["id"] > last_id][:limit]
+
+
+def _llm() -> MagicMock:
+    llm = MagicMock()
+    llm.embed = AsyncMock(return_value=[1.0, 0.0])
+    llm.embed_many = AsyncMock(
+        side_effect=lambda texts, model: [[1.0, 0.0] for _ in texts]
+    )
+    return llm
+
+
+async def test_streams_pages_and_embeds_each_page_in_one_call():
+    pool = _PagedPool([_agent(f"a{i}", f"Agent {i}") for i in range(5)])
+    llm = _llm()
+    storage = MagicMock(upsert=AsyncMock())
+
+    indexed = await reindex_agents(
+        pool, TDWAEmbeddingGenerator(llm, "emb"), storage, page_size=2
+    )
+
+    assert indexed == 5
+    assert pool.pages == [("", 2), ("a1", 2), ("a3", 2)]
+    assert llm.embed_many.await_count == 3
+    llm.embed.assert_not_called()
+    agent_id, templated, embeddings = storage.upsert.await_args_list[0].args
+    assert agent_id == "a0" and "Agent 0" in templated
+    assert set(embeddings) >= {"combined", "name", "tags"}
+    assert "agent_embeddings" not in pool.sql[0]
+
+
+async def test_failed_batch_falls_back_to_agent_by_agent():
+    pool = _PagedPool([_agent("a0", "Good"), _agent("a1", "Bad")])
+    llm = _llm()
+
+    async def embed_many(texts: list[str], model: str) -> list[list[float]]:
+        if any("Bad" in t for t in texts):
+            raise RuntimeError("provider rejected input")
+        return [[1.0, 0.0] for _ in texts]
+
+    llm.embed_many = AsyncMock(side_effect=embed_many)
+    storage = MagicMock(upsert=AsyncMock())
+
+    indexed = await reindex_agents(
+        pool, TDWAEmbeddingGenerator(llm, "emb"), storage, missing_only=True
+    )
+
+    assert indexed == 1
+    assert [c.args[0] for c in storage.upsert.await_args_list] == ["a0"]
+    assert "NOT EXISTS" in pool.sql[0]
@@ -0,0 +1,86 @@
+"""Unit tests for the in-process SemanticCache (LRU, TTL heap, type index)."""
+
+from __future__ import annotations
+
+import pytest
+from planning_discovery.cache import semantic_cache
+from planning_discovery.cache.semantic_cache import SemanticCache
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> list[float]:
+    now = [1_000.0]
+    monkeypatch.setattr(semantic_cache.time, "time", lambda: now[0])
+    return now
+
+
+class TestSemanticCache:
+    """Eviction order, expiry and bounds of SemanticCache."""
+
+    def test_evicts_least_recently_used(self, clock: list[float]) -> None:
+        cache = SemanticCache(max_entries=3)
+        for key in ("a", "b", "c"):
+            cache.set(key, key)
+        cache.get("a")
+
+        cache.set("d", "d")
+
+        assert cache.get("b") is None
+        assert [cache.get(k) for k in ("a", "c", "d")] == ["a", "c", "d"]
+        assert cache.stats.evictions == 1
+
+    def test_expired_entries_are_evicted_before_live_ones(
+        self, clock: list[float]
+    ) -> None:
+        cache = SemanticCache(max_entries=3)
+        cache.set("long", 1, ttl=100)
+        cache.set("short", 2, ttl=10)
+        cache.set("mid", 3, ttl=50)
+        clock[0] += 20
+
+        cache.set("new", 4)
+
+        assert cache.stats.entries == 3
+        assert "short" not in cache._store
+        assert cache.get("long") == 1
+
+    def test_overwriting_a_key_leaves_no_stale_expiry(self, clock: list[float]) -> None:
+        cache = SemanticCache(max_entries=10)
+        cache.set("k", "old", ttl=5)
+        cache.set("k", "new", ttl=500)
+        clock[0] += 10
+
+        cache.set("other", "x")
+
+        assert cache.get("k") == "new"
+        for i in range(200):
+            cache.set("k", str(i))
+        assert len(cache._expiry) <= 2 * len(cache._store) + 64
+
+    def test_invalidate_by_type_only_touches_that_type(
+        self, clock: list[float]
+    ) -> None:
+        cache = SemanticCache()
+        cache.set("s1", 1, cache_type="search")
+        cache.set("s2", 2, cache_type="search")
+        cache.set("d1", 3, cache_type="decomposition")
+        cache.delete("s2")
+
+        assert cache.invalidate_by_type("search") == 1
+        assert cache.get("d1") == 3
+        assert cache.invalidate_by_type("search") == 0
+        assert cache.stats.entries == 1
+
+    def test_memory_is_bounded_by_bytes(self, clock: list[float]) -> None:
+        cache = SemanticCache(max_entries=1000, max_bytes=100)
+        for i in range(5):
+            cache.set(f"k{i}", "x" * 30)
+
+        assert cache.stats.bytes <= 100
+        assert list(cache._store) == ["k2", "k3", "k4"]
+
+        cache.set("huge", "x" * 500)
+        assert cache.get("huge") is None
+        assert cache.stats.bytes == 3 * (2 + 30)
@@ -6,6 +6,7 @@ from typing import Annotated, Any
 
 from fastapi import (
     APIRouter,
+    Body,
     Depends,
     File,
     HTTPException,
@@ -81,6 +82,84 @@ async def _build_manifest_payload(db: Prisma, agent_id: str) -> dict[str, Any]:
     }
 
 
+_MANIFEST_INCLUDE: dict[str, Any] = {
+    "transport": True,
+    "security": {"include": {"auth_strategies": True}},
+    "payment": True,
+    "capabilities": True,
+}
+
+# Upper bound on ids per bulk manifest request.
+MAX_BULK_MANIFESTS = 100
+
+
+def _manifest_data(agent: Any) -> dict[str, Any]:
+    """Universal Agent Manifest body for an agent loaded with ``_MANIFEST_INCLUDE``."""
+    return {
+        "identity": {
+            "id": agent.id,
+            "name": agent.name,
+            "version": agent.version,
+            "provider": agent.provider,
+            "owner_contact": agent.owner_contact,
+            "description": agent.description,
+            "tags": agent.tags,
+        },
+        "metadata": {
+            "indexed_at": agent.indexed_at.isoformat(),
+            "health_status": agent.health_status.lower(),
+            "health_endpoint": agent.health_endpoint,
+        },
+        "protocol": {
+            "type": agent.protocol_type.lower(),
+            "version": agent.protocol_version,
+            "transport": {
+                "type": agent.transport.type.lower() if agent.transport else None,
+                "endpoint": agent.transport.endpoint if agent.transport else None,
+                "command": agent.transport.command if agent.transport else None,
+                "args": agent.transport.args if agent.transport else None,
+                "env": agent.transport.env if agent.transport else None,
+            },
+        },
+        "security": {
+            "transport_layer": {
+                "type": (
+                    agent.security.transport_layer_type.lower()
+                    if agent.security
+                    else None
+                ),
+            },
+            "auth_strategies": [
+                {
+                    "id": auth.strategy_id,
+                    "type": auth.type.lower(),
+                    "config": auth.config,
+                }
+                for auth in (agent.security.auth_strategies if agent.security else [])
+            ],
+        },
+        "payment": {
+            "enabled": agent.payment.enabled if agent.payment else False,
+            "base_fee": agent.payment.base_fee if agent.payment else None,
+        },
+        "authorized_scope": agent.authorized_scope,
+        "capabilities": [
+            {
+                "type": cap.type.lower(),
+                "id": cap.capability_id,
+                "name": cap.name,
+                "description": cap.description,
+                "input_schema": cap.input_schema,
+                "output_schema": cap.output_schema,
+                "uri_template": cap.uri_template,
+                "mime_type": cap.mime_type,
+                "arguments": cap.arguments,
+            }
+            for cap in agent.capabilities
+        ],
+    }
+
+
 @router.post(
     "/register",
     response_model=RegisterAgentResponse,
@@ -212,13 +291,7 @@ async def get_agent_manifest(
         404 Not Found: Agent doesn't exist
     """
     agent = await db.agent.find_unique(
-        where={"id": agent_id},
-        include={
-            "transport": True,
-            "security": {"include": {"auth_strategies": True}},
-            "payment": True,
-            "capabilities": True,
-        },
+        where={"id": agent_id}, include=_MANIFEST_INCLUDE
     )
 
     if not agent:
@@ -231,73 +304,41 @@ async def get_agent_manifest(
             },
         )
 
-    # Build manifest response
+    return {"status": "success", "data": _manifest_data(agent)}
+
+
+@router.post("/manifests", response_model=dict)
+async def get_agent_manifests(
+    user_id: Annotated[str, Depends(verify_token)],
+    db: Annotated[Prisma, Depends(get_db)],
+    agent_ids: Annotated[list[str], Body(embed=True, max_length=MAX_BULK_MANIFESTS)],
+):
+    """
+    Get the Universal Agent Manifests for several agents in one query.
+
+    Used by SuperAgent to warm its manifest cache for a whole candidate set.
+    Unknown ids are listed under ``missing`` rather than failing the call.
+
+    Returns:
+        200 OK: {"manifests": [...], "missing": [agent_id, ...]}
+        401 Unauthorized: Invalid PAT token
+        422 Unprocessable Entity: More than MAX_BULK_MANIFESTS ids
+    """
+    wanted = list(dict.fromkeys(agent_ids))
+    agents = (
+        await db.agent.find_many(
+            where={"id": {"in": wanted}}, include=_MANIFEST_INCLUDE
+        )
+        if wanted
+        else []
+    )
+    found = {agent.id for agent in agents}
+
     return {
         "status": "success",
         "data": {
-            "identity": {
-                "id": agent.id,
-                "name": agent.name,
-                "version": agent.version,
-                "provider": agent.provider,
-                "owner_contact": agent.owner_contact,
-                "description": agent.description,
-                "tags": agent.tags,
-            },
-            "metadata": {
-                "indexed_at": agent.indexed_at.isoformat(),
-                "health_status": agent.health_status.lower(),
-                "health_endpoint": agent.health_endpoint,
-            },
-            "protocol": {
-                "type": agent.protocol_type.lower(),
-                "version": agent.protocol_version,
-                "transport": {
-                    "type": agent.transport.type.lower() if agent.transport else None,
-                    "endpoint": agent.transport.endpoint if agent.transport else None,
-                    "command": agent.transport.command if agent.transport else None,
-                    "args": agent.transport.args if agent.transport else None,
-                    "env": agent.transport.env if agent.transport else None,
-                },
-            },
-            "security": {
-                "transport_layer": {
-                    "type": (
-                        agent.security.transport_layer_type.lower()
-                        if agent.security
-                        else None
-                    ),
-                },
-                "auth_strategies": [
-                    {
-                        "id": auth.strategy_id,
-                        "type": auth.type.lower(),
-                        "config": auth.config,
-                    }
-                    for auth in (
-                        agent.security.auth_strategies if agent.security else []
-                    )
-                ],
-            },
-            "payment": {
-                "enabled": agent.payment.enabled if agent.payment else False,
-                "base_fee": agent.payment.base_fee if agent.payment else None,
-            },
-            "authorized_scope": agent.authorized_scope,
-            "capabilities": [
-                {
-                    "type": cap.type.lower(),
-                    "id": cap.capability_id,
-                    "name": cap.name,
-                    "description": cap.description,
-                    "input_schema": cap.input_schema,
-                    "output_schema": cap.output_schema,
-                    "uri_template": cap.uri_template,
-                    "mime_type": cap.mime_type,
-                    "arguments": cap.arguments,
-                }
-                for cap in agent.capabilities
-            ],
+            "manifests": [_manifest_data(agent) for agent in agents],
+            "missing": [agent_id for agent_id in wanted if agent_id not in found],
         },
     }
 
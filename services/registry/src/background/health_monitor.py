@@ -1,6 +1,16 @@
-"""Background health monitoring service using APScheduler."""
+"""Background health monitoring service using APScheduler.
+
+Every agent carries its own probe schedule: probes are spread across the
+check interval with jitter, run at most ``health_check_concurrency`` at a
+time over one pooled HTTP client, and persistently UNHEALTHY agents back
+off exponentially. Only state transitions are written — batched at the end
+of each tick — so a steady fleet costs no registry writes at all.
+"""
 
 import asyncio
+import random
+import time
+from dataclasses import dataclass
 from datetime import UTC, datetime
 
 import grpc
@@ -15,6 +25,28 @@ from ..config import settings
 from ..services.health_check import HealthCheckService
 
 
+@dataclass
+class AgentHealthState:
+    """In-memory probe schedule and last persisted health of one agent."""
+
+    agent_id: str
+    health_endpoint: str
+    status: str
+    failures: int
+    interval: float
+    next_due: float
+
+
+@dataclass
+class HealthTransition:
+    """A status change that must be persisted."""
+
+    agent_id: str
+    status: str
+    failures: int
+    error_message: str
+
+
 class HealthMonitor:
     """Background service for monitoring agent health using APScheduler."""
 
@@ -30,155 +62,251 @@ class HealthMonitor:
         self.grpc_channel = grpc_channel
         self.health_service = HealthCheckService(timeout=5)
         self.scheduler = AsyncIOScheduler()
+        self.states: dict[str, AgentHealthState] = {}
+        self._semaphore = asyncio.Semaphore(settings.health_check_concurrency)
+        self._roster_refreshed_at: float | None = None
+        self.probes = 0
+        self.writes = 0
 
     async def start(self):
         """Start the health monitoring scheduler."""
         # Add job to scheduler
         self.scheduler.add_job(
-            self._check_all_agents,
-            trigger=IntervalTrigger(seconds=settings.health_check_interval),
+            self._tick,
+            trigger=IntervalTrigger(seconds=settings.health_check_tick_seconds),
             id="health_check_job",
             name="Agent Health Check",
             replace_existing=True,
+            max_instances=1,
+            coalesce=True,
         )
 
         # Start scheduler
         self.scheduler.start()
-        print(f"✓ Health monitor started (interval: {settings.health_check_interval}s)")
+        print(
+            f"✓ Health monitor started (interval: {settings.health_check_interval}s, "
+            f"concurrency: {settings.health_check_concurrency})"
+        )
 
     async def stop(self):
         """Stop the health monitoring scheduler."""
         self.scheduler.shutdown(wait=True)
         print("✓ Health monitor stopped")
 
-    async def _check_all_agents(self):
-        """Check health of all active agents."""
+    async def _tick(self):
+        """Probe every agent whose next check is due, then persist transitions."""
         try:
-            # Get all active agents with their transport type.
-            # STDIO agents are spawned on demand — no HTTP service to probe.
-            agents_raw = await self.db.agent.find_many(
-                where={"is_active": True},
-                include={"transport": True},
-            )
-            # Skip STDIO agents — they have no HTTP health endpoint.
-            agents = [
-                a
-                for a in agents_raw
-                if not (a.transport and a.transport.type.upper() == "STDIO")
-            ]
-
-            print(
-                f"[{datetime.now(UTC).isoformat()}] Checking health of {len(agents)} agents..."
+            now = time.monotonic()
+            if (
+                self._roster_refreshed_at is None
+                or now - self._roster_refreshed_at >= settings.health_check_interval
+            ):
+                await self._refresh_roster(now)
+
+            due = [s for s in self.states.values() if s.next_due <= now]
+            if not due:
+                return
+
+            results = await asyncio.gather(
+                *(self._probe(state) for state in due), return_exceptions=True
             )
-
-            # Check each agent in parallel
-            tasks = [self._check_agent_health(agent) for agent in agents]
-
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-
-            # Count results
-            healthy = sum(1 for r in results if r is True)
-            unhealthy = sum(1 for r in results if r is False)
+            transitions = [r for r in results if isinstance(r, HealthTransition)]
             errors = sum(1 for r in results if isinstance(r, Exception))
+            if transitions:
+                await self._write_transitions(transitions)
 
             print(
-                f"[{datetime.now(UTC).isoformat()}] Health check complete: {healthy} healthy, {unhealthy} unhealthy, {errors} errors"
+                f"[{datetime.now(UTC).isoformat()}] Health check: {len(due)} probed, "
+                f"{len(transitions)} changed, {errors} errors"
             )
 
         except Exception as e:
             print(f"✗ Health monitor error: {e}")
 
-    async def _check_agent_health(self, agent) -> bool:
+    async def _refresh_roster(self, now: float):
+        """
+        Reload the set of active agents and seed schedules for new ones.
+
+        New agents get a random first probe within one interval so a large
+        fleet is spread evenly instead of being probed in one burst. A known
+        agent whose stored status differs from the cached one (written at
+        registration, by another replica or by an operator) is re-seeded
+        from the row, so the next probe writes its result if it disagrees.
+
+        Args:
+            now: Current monotonic time
+        """
+        agents_raw = await self.db.agent.find_many(
+            where={"is_active": True},
+            include={"transport": True},
+        )
+        # Skip STDIO agents — spawned on demand, no HTTP health endpoint.
+        agents = [
+            a
+            for a in agents_raw
+            if not (a.transport and a.transport.type.upper() == "STDIO")
+        ]
+
+        interval = settings.health_check_interval
+        states: dict[str, AgentHealthState] = {}
+        for agent in agents:
+            status = getattr(agent.health_status, "value", agent.health_status)
+            state = self.states.get(agent.id)
+            if state is None:
+                state = AgentHealthState(
+                    agent_id=agent.id,
+                    health_endpoint=agent.health_endpoint,
+                    status=status,
+                    failures=agent.health_failures,
+                    interval=interval,
+                    next_due=now + random.uniform(0, interval),  # noqa: S311
+                )
+            else:
+                state.health_endpoint = agent.health_endpoint
+                if state.status != status:
+                    state.status = status
+                    state.failures = agent.health_failures
+            states[agent.id] = state
+        self.states = states
+        self._roster_refreshed_at = now
+
+    async def _probe(self, state: AgentHealthState) -> HealthTransition | bool:
         """
-        Check health of a single agent.
+        Probe one agent and reschedule it.
 
         Args:
-            agent: Agent record from database
+            state: The agent's schedule and last persisted health
 
         Returns:
-            True if healthy, False otherwise
+            A HealthTransition if the status changed, otherwise whether the
+            agent is healthy
         """
-        try:
-            # Perform health check
+        async with self._semaphore:
             is_healthy, error_message = await self.health_service.check_agent_health(
-                agent.health_endpoint
+                state.health_endpoint
             )
+        self.probes += 1
 
-            # Determine status
-            new_failures = 0 if is_healthy else agent.health_failures + 1
-            status = self.health_service.get_health_status(
-                is_healthy, new_failures, settings.max_health_failures
-            )
+        failures = 0 if is_healthy else state.failures + 1
+        status = self.health_service.get_health_status(
+            is_healthy, failures, settings.max_health_failures
+        )
+        state.failures = failures
 
-            # Update via gRPC if channel available, otherwise update directly
-            if self.grpc_channel:
-                await self._update_health_via_grpc(agent.id, status, error_message)
-            else:
-                await self._update_health_directly(
-                    agent.id, status, new_failures, error_message
-                )
+        # Adaptive backoff: persistently failing agents are probed less often;
+        # any other state returns to the base interval.
+        if status == "UNHEALTHY":
+            state.interval = min(state.interval * 2, settings.health_check_max_interval)
+        else:
+            state.interval = settings.health_check_interval
+        state.next_due = time.monotonic() + _jittered(state.interval)
 
+        if status == state.status:
             return is_healthy
+        state.status = status
+        return HealthTransition(state.agent_id, status, failures, error_message)
 
-        except Exception as e:
-            print(f"Error checking health for agent {agent.name}: {e}")
-            return False
-
-    async def _update_health_via_grpc(
-        self, agent_id: str, status: str, error_message: str
-    ):
+    async def _write_transitions(self, transitions: list[HealthTransition]):
         """
-        Update agent health via gRPC call.
+        Persist status transitions from one tick.
+
+        With a gRPC channel the whole tick is one UpdateAgentHealthBatch call;
+        otherwise (or if that call fails) direct writes are grouped into one
+        update_many per (status, failures) pair. A transition that is not
+        written clears the cached status so the next probe of that agent
+        writes again.
 
         Args:
-            agent_id: Agent ID
-            status: Health status
-            error_message: Error message if unhealthy
+            transitions: Status changes detected in this tick
         """
-        try:
-            stub = registry_pb2_grpc.RegistryServiceStub(self.grpc_channel)
-
-            # Map status to proto enum
-            status_map = {
-                "HEALTHY": registry_pb2.HEALTH_STATUS_HEALTHY,
-                "UNHEALTHY": registry_pb2.HEALTH_STATUS_UNHEALTHY,
-                "UNKNOWN": registry_pb2.HEALTH_STATUS_UNKNOWN,
-            }
-
-            timestamp = Timestamp()
-            timestamp.FromDatetime(datetime.now(UTC))
-
-            request = registry_pb2.UpdateHealthRequest(
-                agent_id=agent_id,
-                status=status_map[status],
-                last_error=error_message,
-                checked_at=timestamp,
-            )
-
-            await stub.UpdateAgentHealth(request)
+        if self.grpc_channel:
+            try:
+                failed = await self._update_health_via_grpc(transitions)
+            except Exception as e:
+                print(f"Failed to update health via gRPC: {e}")
+            else:
+                self.writes += 1
+                self._forget_status(failed)
+                return
 
-        except Exception as e:
-            print(f"Failed to update health via gRPC: {e}")
-            # Fall back to direct update
-            await self._update_health_directly(agent_id, status, 0, error_message)
+        await self._update_health_directly(transitions)
 
-    async def _update_health_directly(
-        self, agent_id: str, status: str, failures: int, error_message: str
-    ):
+    async def _update_health_via_grpc(
+        self, transitions: list[HealthTransition]
+    ) -> list[str]:
         """
-        Update agent health directly in database.
+        Send one tick's transitions in a single UpdateAgentHealthBatch call.
 
         Args:
-            agent_id: Agent ID
-            status: Health status
-            failures: Failure count
-            error_message: Error message if unhealthy
+            transitions: Status changes detected in this tick
+
+        Returns:
+            IDs of agents whose update the registry did not apply
         """
-        await self.db.agent.update(
-            where={"id": agent_id},
-            data={
-                "health_status": status,
-                "health_failures": failures,
-                "last_health_check": datetime.now(UTC),
-            },
+        stub = registry_pb2_grpc.RegistryServiceStub(self.grpc_channel)
+
+        # Map status to proto enum
+        status_map = {
+            "HEALTHY": registry_pb2.HEALTH_STATUS_HEALTHY,
+            "UNHEALTHY": registry_pb2.HEALTH_STATUS_UNHEALTHY,
+            "UNKNOWN": registry_pb2.HEALTH_STATUS_UNKNOWN,
+        }
+
+        timestamp = Timestamp()
+        timestamp.FromDatetime(datetime.now(UTC))
+
+        request = registry_pb2.UpdateHealthBatchRequest(
+            updates=[
+                registry_pb2.UpdateHealthRequest(
+                    agent_id=t.agent_id,
+                    status=status_map.get(t.status, registry_pb2.HEALTH_STATUS_UNKNOWN),
+                    last_error=t.error_message,
+                    checked_at=timestamp,
+                    failures=t.failures,
+                )
+                for t in transitions
+            ]
         )
+        response = await stub.UpdateAgentHealthBatch(request)
+        if not response.success:
+            print(f"Failed to persist health for some agents: {response.message}")
+        return list(response.failed_agent_ids)
+
+    async def _update_health_directly(self, transitions: list[HealthTransition]):
+        """
+        Write transitions directly, one update_many per (status, failures).
+
+        Args:
+            transitions: Status changes detected in this tick
+        """
+        groups: dict[tuple[str, int], list[str]] = {}
+        for t in transitions:
+            groups.setdefault((t.status, t.failures), []).append(t.agent_id)
+
+        checked_at = datetime.now(UTC)
+        for (status, failures), agent_ids in groups.items():
+            try:
+                await self.db.agent.update_many(
+                    where={"id": {"in": agent_ids}},
+                    data={
+                        "health_status": status,
+                        "health_failures": failures,
+                        "last_health_check": checked_at,
+                    },
+                )
+                self.writes += 1
+            except Exception as e:
+                print(f"Failed to persist health for {len(agent_ids)} agents: {e}")
+                self._forget_status(agent_ids)
+
+    def _forget_status(self, agent_ids: list[str]):
+        """Clear the cached status of agents whose transition was not written."""
+        for agent_id in agent_ids:
+            if agent_id in self.states:
+                self.states[agent_id].status = ""
+
+
+def _jittered(interval: float) -> float:
+    """Spread probes by ± health_check_jitter of the interval."""
+    jitter = settings.health_check_jitter
+    return interval * random.uniform(1 - jitter, 1 + jitter)  # noqa: S311
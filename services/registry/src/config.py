@@ -56,6 +56,15 @@ class Settings(BaseSettings):
     # Health Check
     health_check_interval: int = 300  # 5 minutes in seconds
     max_health_failures: int = 3
+    # Each agent is probed every health_check_interval seconds (± jitter
+    # fraction); UNHEALTHY agents back off exponentially up to
+    # health_check_max_interval. The scheduler wakes every
+    # health_check_tick_seconds and runs at most health_check_concurrency
+    # probes at once.
+    health_check_jitter: float = 0.1
+    health_check_max_interval: int = 3600
+    health_check_tick_seconds: int = 5
+    health_check_concurrency: int = 50
 
     # Payment
     payment_facilitator_url: str = "https://api.orcha.bot/verify"
@@ -38,29 +38,12 @@ class RegistryServicer(registry_pb2_grpc.RegistryServiceServicer):
             UpdateHealthResponse
         """
         try:
-            # Map proto enum to Prisma enum
-            status_map = {
-                registry_pb2.HEALTH_STATUS_HEALTHY: "HEALTHY",
-                registry_pb2.HEALTH_STATUS_UNHEALTHY: "UNHEALTHY",
-                registry_pb2.HEALTH_STATUS_UNKNOWN: "UNKNOWN",
-            }
-
-            db_status = status_map.get(request.status, "UNKNOWN")
-
             # Update agent
             await self.db.agent.update(
                 where={"id": request.agent_id},
-                data={
-                    "health_status": db_status,
-                    "last_health_check": request.checked_at.ToDatetime(),
-                    "health_failures": {
-                        "increment": (
-                            1
-                            if request.status == registry_pb2.HEALTH_STATUS_UNHEALTHY
-                            else 0
-                        )
-                    },
-                },
+                data=_health_data(
+                    request.status, request.checked_at.ToDatetime(), request.failures
+                ),
             )
 
             return registry_pb2.UpdateHealthResponse(
@@ -72,6 +55,52 @@ class RegistryServicer(registry_pb2_grpc.RegistryServiceServicer):
                 success=False, message=f"Error: {str(e)}"
             )
 
+    async def UpdateAgentHealthBatch(
+        self,
+        request: registry_pb2.UpdateHealthBatchRequest,
+        context: grpc.aio.ServicerContext,
+    ) -> registry_pb2.UpdateHealthBatchResponse:
+        """
+        Update the health of several agents (batch endpoint).
+
+        Updates sharing a status, failure count and check time are applied
+        with one update_many; a group that fails is reported in failed_agent_ids
+        without affecting the others.
+
+        Args:
+            request: UpdateHealthBatchRequest with one update per agent
+            context: gRPC context
+
+        Returns:
+            UpdateHealthBatchResponse
+        """
+        groups: dict[tuple[int, Any, int], list[str]] = {}
+        for update in request.updates:
+            key = (update.status, update.checked_at.ToDatetime(), update.failures)
+            groups.setdefault(key, []).append(update.agent_id)
+
+        failed: list[str] = []
+        errors: list[str] = []
+        for (status, checked_at, failures), agent_ids in groups.items():
+            try:
+                await self.db.agent.update_many(
+                    where={"id": {"in": agent_ids}},
+                    data=_health_data(status, checked_at, failures),
+                )
+            except Exception as e:
+                failed.extend(agent_ids)
+                errors.append(str(e))
+
+        return registry_pb2.UpdateHealthBatchResponse(
+            success=not failed,
+            message=(
+                f"Error: {'; '.join(errors)}"
+                if failed
+                else f"Health updated for {len(request.updates)} agents"
+            ),
+            failed_agent_ids=failed,
+        )
+
     async def GetAgentManifest(
         self,
         request: registry_pb2.GetManifestRequest,
@@ -122,21 +151,23 @@ class RegistryServicer(registry_pb2_grpc.RegistryServiceServicer):
             GetMultipleManifestsResponse
         """
         try:
-            manifests = []
-
-            for agent_id in request.agent_ids:
-                agent = await self.db.agent.find_unique(
-                    where={"id": agent_id},
-                    include={
-                        "transport": True,
-                        "security": {"include": {"auth_strategies": True}},
-                        "payment": True,
-                        "capabilities": {"include": {"auth_strategies": True}},
-                    },
-                )
-
-                if agent:
-                    manifests.append(self._agent_to_proto(agent))
+            # One query for the whole batch, returned in request order.
+            agent_ids = list(dict.fromkeys(request.agent_ids))
+            agents = await self.db.agent.find_many(
+                where={"id": {"in": agent_ids}},
+                include={
+                    "transport": True,
+                    "security": {"include": {"auth_strategies": True}},
+                    "payment": True,
+                    "capabilities": {"include": {"auth_strategies": True}},
+                },
+            )
+            by_id = {agent.id: agent for agent in agents}
+            manifests = [
+                self._agent_to_proto(by_id[agent_id])
+                for agent_id in agent_ids
+                if agent_id in by_id
+            ]
 
             return registry_pb2.GetMultipleManifestsResponse(manifests=manifests)
 
@@ -305,3 +336,22 @@ class RegistryServicer(registry_pb2_grpc.RegistryServiceServicer):
             payment=payment,
             capabilities=capabilities,
         )
+
+
+def _health_data(status: int, checked_at: Any, failures: int) -> dict[str, Any]:
+    """Prisma update data for one health report (proto status enum).
+
+    *failures* is the reporter's consecutive-failure count and is stored
+    as-is, so gRPC and direct writes agree and a restarted monitor seeds
+    from the same value.
+    """
+    status_map = {
+        registry_pb2.HEALTH_STATUS_HEALTHY: "HEALTHY",
+        registry_pb2.HEALTH_STATUS_UNHEALTHY: "UNHEALTHY",
+        registry_pb2.HEALTH_STATUS_UNKNOWN: "UNKNOWN",
+    }
+    return {
+        "health_status": status_map.get(status, "UNKNOWN"),
+        "last_health_check": checked_at,
+        "health_failures": failures,
+    }
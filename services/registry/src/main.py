@@ -15,6 +15,7 @@ from .api.dependencies import db
 from .background import HealthMonitor
 from .config import settings
 from .grpc_server import RegistryServicer
+from .services.health_check import close_http_client
 
 # Setup logging
 logger = setup_logging(settings.service_name, settings.log_level)
@@ -92,6 +93,7 @@ async def lifespan(app: FastAPI):
     # Stop health monitor
     if health_monitor:
         await health_monitor.stop()
+    await close_http_client()
 
     # Stop gRPC server
     if grpc_server:
@@ -2,6 +2,30 @@
 
 import httpx
 
+# One pooled client shared by every HealthCheckService (the health monitor
+# and per-request registration probes) so probes reuse keep-alive
+# connections instead of opening a new client per check.
+_client: httpx.AsyncClient | None = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the shared probe client, creating it on first use."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+        )
+    return _client
+
+
+async def close_http_client() -> None:
+    """Close the shared probe client (application shutdown)."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+    _client = None
+
 
 class HealthCheckService:
     """Service for checking agent health status."""
@@ -26,15 +50,14 @@ class HealthCheckService:
             Tuple of (is_healthy, error_message)
         """
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    health_endpoint, timeout=self.timeout, follow_redirects=True
-                )
-
-                # Consider 2xx status codes as healthy
-                if 200 <= response.status_code < 300:
-                    return True, ""
-                return False, f"HTTP {response.status_code}"
+            response = await get_http_client().get(
+                health_endpoint, timeout=self.timeout
+            )
+
+            # Consider 2xx status codes as healthy
+            if 200 <= response.status_code < 300:
+                return True, ""
+            return False, f"HTTP {response.status_code}"
 
         except httpx.TimeoutException:
             return False, "Connection timeout"
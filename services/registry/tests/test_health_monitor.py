@@ -0,0 +1,293 @@
+"""Tests for the bounded, change-only health monitor."""
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+
+from services.registry.src.background import health_monitor as hm
+from services.registry.src.background.health_monitor import HealthMonitor
+
+
+def _agent(agent_id: str, status: str = "HEALTHY", failures: int = 0, transport="HTTP"):
+    return SimpleNamespace(
+        id=agent_id,
+        name=agent_id,
+        health_endpoint=f"https://{agent_id}.example.com/health",
+        health_status=status,
+        health_failures=failures,
+        transport=SimpleNamespace(type=transport),
+    )
+
+
+@pytest.fixture
+def monitor(db) -> HealthMonitor:
+    db.agent.find_many = AsyncMock(return_value=[])
+    db.agent.update_many = AsyncMock()
+    monitor = HealthMonitor(db)
+    monitor.health_service.check_agent_health = AsyncMock(return_value=(True, ""))
+    return monitor
+
+
+def _make_due(monitor: HealthMonitor) -> None:
+    for state in monitor.states.values():
+        state.next_due = 0
+
+
+@pytest.fixture
+def registry_stub(monkeypatch) -> SimpleNamespace:
+    """Fake registry gRPC stub; set ``stub.UpdateAgentHealthBatch`` per test."""
+    stub = SimpleNamespace(UpdateAgentHealthBatch=AsyncMock())
+    pb2 = SimpleNamespace(
+        HEALTH_STATUS_HEALTHY=1,
+        HEALTH_STATUS_UNHEALTHY=2,
+        HEALTH_STATUS_UNKNOWN=3,
+        UpdateHealthRequest=SimpleNamespace,
+        UpdateHealthBatchRequest=SimpleNamespace,
+    )
+    monkeypatch.setattr(hm, "registry_pb2", pb2)
+    monkeypatch.setattr(
+        hm, "registry_pb2_grpc", SimpleNamespace(RegistryServiceStub=lambda ch: stub)
+    )
+    return stub
+
+
+async def _flip(monitor: HealthMonitor, db, agents: dict[str, bool]) -> None:
+    """Run one tick in which every agent in *agents* changes status."""
+    db.agent.find_many.return_value = [_agent(a, "UNKNOWN") for a in agents]
+    monitor.health_service.check_agent_health = AsyncMock(
+        side_effect=lambda url: (agents[url.split("//")[1].split(".")[0]], "")
+    )
+    await monitor._refresh_roster(0)
+    _make_due(monitor)
+    await monitor._tick()
+
+
+class TestHealthMonitor:
+    """Scheduling, concurrency and write behaviour of HealthMonitor."""
+
+    async def test_steady_state_writes_nothing(self, monitor, db):
+        db.agent.find_many.return_value = [_agent(f"a{i}") for i in range(20)]
+        await monitor._tick()
+        for _ in range(3):
+            _make_due(monitor)
+            await monitor._tick()
+
+        assert monitor.probes >= 60
+        db.agent.update_many.assert_not_called()
+        db.agent.update.assert_not_called()
+
+    async def test_transitions_are_batched_per_status(self, monitor, db):
+        db.agent.find_many.return_value = [
+            _agent("up1", "UNKNOWN"),
+            _agent("up2", "UNKNOWN"),
+            _agent("down", "UNKNOWN", failures=2),
+            _agent("steady", "HEALTHY"),
+            _agent("stdio", "UNKNOWN", transport="STDIO"),
+        ]
+        healthy = {"up1", "up2", "steady"}
+        monitor.health_service.check_agent_health = AsyncMock(
+            side_effect=lambda url: (url.split("//")[1].split(".")[0] in healthy, "")
+        )
+        await monitor._refresh_roster(0)
+        _make_due(monitor)
+
+        await monitor._tick()
+
+        assert "stdio" not in monitor.states
+        calls = {
+            (
+                c.kwargs["data"]["health_status"],
+                c.kwargs["data"]["health_failures"],
+            ): set(c.kwargs["where"]["id"]["in"])
+            for c in db.agent.update_many.await_args_list
+        }
+        assert calls == {("HEALTHY", 0): {"up1", "up2"}, ("UNHEALTHY", 3): {"down"}}
+
+    async def test_probes_are_bounded_by_semaphore(self, monitor, db, monkeypatch):
+        monkeypatch.setattr(monitor, "_semaphore", asyncio.Semaphore(3))
+        db.agent.find_many.return_value = [_agent(f"a{i}") for i in range(12)]
+        active = peak = 0
+
+        async def probe(url):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            return True, ""
+
+        monitor.health_service.check_agent_health = probe
+        await monitor._refresh_roster(0)
+        _make_due(monitor)
+        await monitor._tick()
+
+        assert peak == 3
+
+    async def test_failing_agent_backs_off_and_recovers(self, monitor, db, monkeypatch):
+        monkeypatch.setattr(hm.settings, "health_check_interval", 100)
+        monkeypatch.setattr(hm.settings, "health_check_max_interval", 350)
+        monkeypatch.setattr(hm.settings, "health_check_jitter", 0.0)
+        db.agent.find_many.return_value = [_agent("a", "UNHEALTHY", failures=3)]
+        monitor.health_service.check_agent_health = AsyncMock(
+            return_value=(False, "Connection failed")
+        )
+        await monitor._refresh_roster(0)
+
+        intervals = []
+        for _ in range(3):
+            _make_due(monitor)
+            await monitor._tick()
+            intervals.append(monitor.states["a"].interval)
+        assert intervals == [200, 350, 350]
+        db.agent.update_many.assert_not_called()
+
+        monitor.health_service.check_agent_health = AsyncMock(return_value=(True, ""))
+        _make_due(monitor)
+        await monitor._tick()
+        assert monitor.states["a"].interval == 100
+        db.agent.update_many.assert_awaited_once()
+
+    async def test_failed_write_is_retried_on_next_probe(self, monitor, db):
+        db.agent.find_many.return_value = [_agent("a", "UNKNOWN")]
+        db.agent.update_many = AsyncMock(side_effect=[RuntimeError("db down"), None])
+        await monitor._refresh_roster(0)
+
+        for _ in range(2):
+            _make_due(monitor)
+            await monitor._tick()
+
+        assert db.agent.update_many.await_count == 2
+        assert monitor.states["a"].status == "HEALTHY"
+
+    async def test_status_written_elsewhere_is_reseeded_and_corrected(
+        self, monitor, db
+    ):
+        row = _agent("a", "UNKNOWN")
+
+        async def update_many(where, data):
+            row.health_status = data["health_status"]
+            row.health_failures = data["health_failures"]
+
+        db.agent.find_many.return_value = [row]
+        db.agent.update_many = AsyncMock(side_effect=update_many)
+        monitor.health_service.check_agent_health = AsyncMock(
+            return_value=(False, "Connection failed")
+        )
+        await monitor._refresh_roster(0)
+        for _ in range(3):
+            _make_due(monitor)
+            await monitor._tick()
+        assert (row.health_status, row.health_failures) == ("UNHEALTHY", 3)
+
+        # Re-registration stores the agent as HEALTHY behind the monitor's back.
+        row.health_status, row.health_failures = "HEALTHY", 0
+        await monitor._refresh_roster(0)
+        assert (monitor.states["a"].status, monitor.states["a"].failures) == (
+            "HEALTHY",
+            0,
+        )
+        for _ in range(3):
+            _make_due(monitor)
+            await monitor._tick()
+
+        # HEALTHY → UNKNOWN on the first failure, UNHEALTHY again at the third.
+        assert db.agent.update_many.await_count == 3
+        assert (row.health_status, row.health_failures) == ("UNHEALTHY", 3)
+
+    async def test_grpc_writes_one_batch_per_tick(self, monitor, db, registry_stub):
+        monitor.grpc_channel = object()
+        registry_stub.UpdateAgentHealthBatch.return_value = SimpleNamespace(
+            success=False, message="Error: deadlock", failed_agent_ids=["b"]
+        )
+
+        await _flip(monitor, db, {"a": True, "b": True, "c": False})
+
+        registry_stub.UpdateAgentHealthBatch.assert_awaited_once()
+        (request,) = registry_stub.UpdateAgentHealthBatch.await_args.args
+        # "c" failed once, still UNKNOWN: not a transition, not sent.
+        assert {(u.agent_id, u.status, u.failures) for u in request.updates} == {
+            ("a", 1, 0),
+            ("b", 1, 0),
+        }
+        db.agent.update_many.assert_not_called()
+        assert {a: s.status for a, s in monitor.states.items()} == {
+            "a": "HEALTHY",
+            "b": "",
+            "c": "UNKNOWN",
+        }
+
+    async def test_grpc_failure_falls_back_per_group(self, monitor, db, registry_stub):
+        monitor.grpc_channel = object()
+        registry_stub.UpdateAgentHealthBatch.side_effect = ConnectionError("down")
+
+        async def update_many(where, data):
+            if data["health_status"] == "HEALTHY":
+                raise RuntimeError("db down")
+
+        db.agent.update_many = AsyncMock(side_effect=update_many)
+        db.agent.find_many.return_value = [
+            _agent("up", "UNKNOWN"),
+            _agent("down", "UNKNOWN", failures=2),
+        ]
+        monitor.health_service.check_agent_health = AsyncMock(
+            side_effect=lambda url: ("up" in url, "")
+        )
+        await monitor._refresh_roster(0)
+        _make_due(monitor)
+
+        await monitor._tick()
+
+        # Both groups were attempted; only the failed one is retried later.
+        assert db.agent.update_many.await_count == 2
+        assert monitor.states["up"].status == ""
+        assert monitor.states["down"].status == "UNHEALTHY"
+
+
+async def test_probe_client_is_shared():
+    from services.registry.src.services import health_check
+
+    client = health_check.get_http_client()
+    assert health_check.get_http_client() is client
+    await health_check.close_http_client()
+    assert client.is_closed
+
+
+async def test_batch_rpc_stores_failure_counts_as_sent(db, monkeypatch):
+    from datetime import UTC, datetime
+
+    from common.proto.src import registry_pb2_grpc
+
+    if not hasattr(registry_pb2_grpc, "RegistryServiceServicer"):
+        pytest.skip("generated gRPC stubs missing (make grpc-generate)")
+    from services.registry.src.grpc_server import registry_servicer as rs
+
+    monkeypatch.setattr(
+        rs,
+        "registry_pb2",
+        SimpleNamespace(
+            HEALTH_STATUS_HEALTHY=1,
+            HEALTH_STATUS_UNHEALTHY=2,
+            HEALTH_STATUS_UNKNOWN=3,
+            UpdateHealthBatchResponse=SimpleNamespace,
+        ),
+    )
+    db.agent.update_many = AsyncMock()
+    checked_at = SimpleNamespace(ToDatetime=lambda: datetime(2026, 1, 1, tzinfo=UTC))
+    request = SimpleNamespace(
+        updates=[
+            SimpleNamespace(
+                agent_id="down", status=2, failures=3, checked_at=checked_at
+            ),
+            SimpleNamespace(agent_id="up", status=1, failures=0, checked_at=checked_at),
+        ]
+    )
+
+    response = await rs.RegistryServicer(db).UpdateAgentHealthBatch(request, None)
+
+    assert response.success
+    assert {
+        (c.kwargs["data"]["health_status"], c.kwargs["data"]["health_failures"])
+        for c in db.agent.update_many.await_args_list
+    } == {("UNHEALTHY", 3), ("HEALTHY", 0)}
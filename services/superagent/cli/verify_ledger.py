@@ -0,0 +1,152 @@
+"""Offline audit-ledger verifier.
+
+Usage:
+    # Verify straight from Postgres (DATABASE_URL), resuming if interrupted
+    uv run python cli/verify_ledger.py verify --db --state ledger-verify.json
+
+    # Export the ledger (and ledger.checkpoints.jsonl) for an auditor, then
+    # verify the files on 8 processes
+    uv run python cli/verify_ledger.py export --out ledger.jsonl
+    uv run python cli/verify_ledger.py verify --file ledger.jsonl --workers 8
+
+Prints a JSON summary (rows, chains, first broken link per chain, checkpoint
+linkage and tips the ledger no longer matches) and exits 1 when any of those
+fail, so it can gate a nightly job.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+from pathlib import Path
+
+from superagent.middleware.ledger_verify import (
+    DEFAULT_PAGE_SIZE,
+    VerifyState,
+    export_checkpoints,
+    export_ledger,
+    iter_db_checkpoints,
+    iter_db_pages,
+    iter_export_pages,
+    load_checkpoints,
+    make_executor,
+    verify_pages,
+)
+
+
+def _parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Audit ledger verifier")
+    sub = p.add_subparsers(dest="command", required=True)
+
+    verify = sub.add_parser("verify", help="Verify every hash chain")
+    source = verify.add_mutually_exclusive_group(required=True)
+    source.add_argument("--db", action="store_true", help="Read from Postgres")
+    source.add_argument("--file", type=Path, help="JSON Lines export to verify")
+    verify.add_argument(
+        "--checkpoints",
+        type=Path,
+        default=None,
+        help="Checkpoint export for --file (default: <file>.checkpoints.jsonl)",
+    )
+    verify.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    verify.add_argument(
+        "--state",
+        type=Path,
+        default=None,
+        help="Progress file; an unfinished run recorded here is resumed",
+    )
+
+    export = sub.add_parser("export", help="Export the ledger as JSON Lines")
+    export.add_argument("--out", type=Path, required=True)
+
+    for sp in (verify, export):
+        sp.add_argument("--page-size", type=int, default=DEFAULT_PAGE_SIZE)
+        sp.add_argument("--database-url", default=os.environ.get("DATABASE_URL", ""))
+    return p.parse_args()
+
+
+def _checkpoints_path(ledger: Path) -> Path:
+    return ledger.with_suffix(".checkpoints.jsonl")
+
+
+async def _connect(url: str):
+    from src.generated_client import Prisma
+
+    if not url:
+        sys.exit("DATABASE_URL (or --database-url) is required")
+    db = Prisma(datasource={"url": url})
+    await db.connect()
+    return db
+
+
+async def _verify(args: argparse.Namespace) -> int:
+    state = VerifyState()
+    if args.state is not None and args.state.exists():
+        state = VerifyState.load(args.state)
+        if state.complete:
+            state = VerifyState()
+        elif state.cursor is not None:
+            print(f"Resuming after {state.cursor}", file=sys.stderr)
+
+    db = await _connect(args.database_url) if args.db else None
+    executor = make_executor(args.workers)
+    try:
+        if db is not None:
+            checkpoints = iter_db_checkpoints(db, page_size=args.page_size)
+            pages = iter_db_pages(db, after=state.cursor, page_size=args.page_size)
+        else:
+            path = args.checkpoints or _checkpoints_path(args.file)
+            if not path.exists():
+                sys.exit(f"Checkpoint export {path} not found (see --checkpoints)")
+            checkpoints = iter_export_pages(path, page_size=args.page_size)
+            pages = iter_export_pages(
+                args.file, after=state.cursor, page_size=args.page_size
+            )
+        tips = await load_checkpoints(checkpoints, state)
+        state = await verify_pages(
+            pages,
+            state=state,
+            state_path=args.state,
+            executor=executor,
+            max_in_flight=max(2, args.workers * 2),
+            tips=tips,
+        )
+    finally:
+        if executor is not None:
+            executor.shutdown()
+        if db is not None:
+            await db.disconnect()
+
+    summary = state.summary()
+    print(json.dumps(summary, indent=2, sort_keys=True))
+    return 0 if summary["ok"] else 1
+
+
+async def _export(args: argparse.Namespace) -> int:
+    db = await _connect(args.database_url)
+    try:
+        written = await export_ledger(db, args.out, page_size=args.page_size)
+        checkpoints = await export_checkpoints(
+            db, _checkpoints_path(args.out), page_size=args.page_size
+        )
+    finally:
+        await db.disconnect()
+    print(f"Exported {written} row(s) to {args.out}", file=sys.stderr)
+    print(
+        f"Exported {checkpoints} checkpoint(s) to {_checkpoints_path(args.out)}",
+        file=sys.stderr,
+    )
+    return 0
+
+
+def main() -> None:
+    args = _parse_args()
+    handler = _verify if args.command == "verify" else _export
+    sys.exit(asyncio.run(handler(args)))
+
+
+if __name__ == "__main__":
+    main()
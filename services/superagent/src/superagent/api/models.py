@@ -39,6 +39,8 @@ class TranscriptEntryDTO(BaseModel):
 
 class TranscriptListResponse(BaseModel):
     entries: list[TranscriptEntryDTO]
+    # Keyset cursor: pass as ?after= for the next page; null when exhausted.
+    next_after: int | None = None
 
 
 class RunAuditStep(BaseModel):
@@ -187,6 +189,13 @@ class HealthResponse(BaseModel):
     service: str = "superagent"
 
 
+class MCPHealthResponse(BaseModel):
+    """MCP session pool counters plus RSS/CPU of each warm STDIO server."""
+
+    sessions: dict[str, Any]
+    stdio_processes: list[dict[str, Any]]
+
+
 # ── Agent credential management ───────────────────────────────────────────────
 
 
@@ -5,8 +5,15 @@ POST /sessions/{id}/message     → SSE stream
 POST /sessions/{id}/resume      → SSE stream
 PATCH /sessions/{id}/context      → merge lead_gen_options / email_campaign_context
 GET  /sessions/{id}/status      → { status, pending_interrupt }
+GET  /sessions/{id}/transcript  → keyset-paged rows (?after=&limit=) or streamed JSON
 GET  /sessions/{id}/audit       → Verified Runs evidence package
 GET  /health                    → { status: "ok" }
+GET  /health/mcp                → MCP session pool + STDIO server RSS/CPU
+GET  /health/http               → shared HTTP client pool utilisation
+GET  /health/db                 → database pool utilisation + transcript write-behind
+                                   + credit reservation / agent metrics counters
+GET  /health/kafka              → step_complete producer outbox + delivery counters
+POST /a2a/push/{id}             → A2A push-notification receiver (task updates)
 """
 
 from __future__ import annotations
@@ -22,12 +29,14 @@ if TYPE_CHECKING:
 from fastapi import APIRouter, HTTPException, Query, Request
 from fastapi.responses import StreamingResponse
 
+from ..persistence.db import DB
 from .models import (
     AgentEnvStatusResponse,
     ConversationSessionSummaryDTO,
     CreateSessionRequest,
     CreateSessionResponse,
     HealthResponse,
+    MCPHealthResponse,
     MessageRequest,
     PaginatedSessionsResponse,
     ResumeRequest,
@@ -46,6 +55,8 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+_MAX_TRANSCRIPT_PAGE = 500
+
 
 def _get_runner(request: Request) -> Any:
     runner = getattr(request.app.state, "runner", None)
@@ -131,18 +142,45 @@ async def get_session(session_id: str) -> SessionDetailResponse:
 async def get_transcript(
     session_id: str,
     user_id: str = Query(..., description="Caller user id for ownership check"),
-) -> TranscriptListResponse:
+    after: int = Query(0, ge=0, description="Return rows after this sequence_num"),
+    limit: int | None = Query(
+        None,
+        ge=1,
+        le=_MAX_TRANSCRIPT_PAGE,
+        description="Page size; omit to stream every row after `after`",
+    ),
+) -> TranscriptListResponse | StreamingResponse:
+    """
+    With ``limit`` returns one keyset page plus ``next_after`` (null on the
+    last page). Without it, streams the whole transcript in the same JSON
+    shape, reading one bounded page at a time.
+    """
     from ..persistence.transcript_store import (
         entry_to_dto,
-        load_transcript_rows,
+        iter_transcript_rows,
+        load_transcript_page,
         verify_session_owner,
     )
 
     if not await verify_session_owner(session_id, user_id):
         raise HTTPException(status_code=404, detail="Session not found")
-    rows = await load_transcript_rows(session_id)
-    entries = [TranscriptEntryDTO(**entry_to_dto(r)) for r in rows]
-    return TranscriptListResponse(entries=entries)
+
+    if limit is not None:
+        rows = await load_transcript_page(session_id, after=after, limit=limit)
+        return TranscriptListResponse(
+            entries=[TranscriptEntryDTO(**entry_to_dto(r)) for r in rows],
+            next_after=rows[-1].sequence_num if len(rows) == limit else None,
+        )
+
+    async def body() -> AsyncIterator[str]:
+        yield '{"entries":['
+        sep = ""
+        async for row in iter_transcript_rows(session_id, after=after):
+            yield sep + TranscriptEntryDTO(**entry_to_dto(row)).model_dump_json()
+            sep = ","
+        yield '],"next_after":null}'
+
+    return StreamingResponse(body(), media_type="application/json")
 
 
 @router.get(
@@ -173,26 +211,22 @@ async def _load_artifact_refs(artifact_ids: list[str]) -> dict[str, Any]:
     from ..graph.state import ArtifactRef
 
     try:
-        from src.generated_client import Prisma
-
-        db = Prisma()
-        await db.connect()
-        refs: dict[str, Any] = {}
-        for artifact_id in artifact_ids:
-            try:
-                row = await db.artifact.find_unique(where={"id": artifact_id})
-                if row and row.status == "READY":
-                    refs[artifact_id] = ArtifactRef(
-                        artifact_id=row.id,
-                        filename=row.filename,
-                        mime_type=row.mime_type,
-                        size_bytes=row.size_bytes,
-                        s3_bucket=row.s3_bucket,
-                        s3_key=row.s3_key,
-                    )
-            except Exception:
-                logger.warning("Could not load artifact %s — skipping", artifact_id)
-        await db.disconnect()
+        async with DB.session() as db:
+            refs: dict[str, Any] = {}
+            for artifact_id in artifact_ids:
+                try:
+                    row = await db.artifact.find_unique(where={"id": artifact_id})
+                    if row and row.status == "READY":
+                        refs[artifact_id] = ArtifactRef(
+                            artifact_id=row.id,
+                            filename=row.filename,
+                            mime_type=row.mime_type,
+                            size_bytes=row.size_bytes,
+                            s3_bucket=row.s3_bucket,
+                            s3_key=row.s3_key,
+                        )
+                except Exception:
+                    logger.warning("Could not load artifact %s — skipping", artifact_id)
         return refs
     except Exception:
         logger.exception("_load_artifact_refs failed")
@@ -311,6 +345,75 @@ async def health() -> HealthResponse:
     return HealthResponse()
 
 
+@router.get("/health/mcp", response_model=MCPHealthResponse)
+async def health_mcp() -> MCPHealthResponse:
+    from ..handlers.mcp_session_pool import MCP_SESSION_POOL
+    from ..handlers.stdio_process_manager import STDIO_PROCESS_MANAGER
+
+    return MCPHealthResponse(
+        sessions=MCP_SESSION_POOL.stats(),
+        stdio_processes=STDIO_PROCESS_MANAGER.stats(),
+    )
+
+
+@router.get("/health/http")
+async def health_http() -> dict[str, Any]:
+    from ..clients.http_pool import HTTP_CLIENTS
+
+    return HTTP_CLIENTS.stats()
+
+
+@router.get("/health/db")
+async def health_db() -> dict[str, Any]:
+    from ..persistence.transcript_store import TRANSCRIPT_WRITES
+    from ..pricing.agent_metrics import AGENT_METRICS
+    from ..pricing.credit_ledger import CREDITS
+
+    return {
+        **DB.stats(),
+        "transcript_writes": TRANSCRIPT_WRITES.stats(),
+        "credit_ledger": CREDITS.stats(),
+        "agent_metrics": AGENT_METRICS.stats(),
+    }
+
+
+@router.get("/health/kafka")
+async def health_kafka() -> dict[str, Any]:
+    from ..middleware.step_events import STEP_EVENTS
+
+    return {"step_events": STEP_EVENTS.stats()}
+
+
+@router.get("/health/cache")
+async def health_cache() -> dict[str, Any]:
+    from ..middleware.manifest_cache import MANIFEST_CACHE
+    from ..pnd.gate import gate_embedding_cache_stats
+
+    return {
+        "manifests": MANIFEST_CACHE.stats(),
+        "gate_embeddings": gate_embedding_cache_stats(),
+    }
+
+
+@router.post("/a2a/push/{subscription_id}", status_code=204)
+async def a2a_push_notification(subscription_id: str, request: Request) -> None:
+    """Receive an A2A push notification for an in-flight task.
+
+    The token in ``X-A2A-Notification-Token`` must match the one issued in
+    the task's ``pushNotificationConfig``; unknown subscriptions get 404 so
+    agents stop retrying once the task has been handled.
+    """
+    from ..handlers.a2a_delivery import A2A_PUSH_RECEIVER, PUSH_TOKEN_HEADER
+
+    try:
+        payload = await request.json()
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail="Invalid JSON body") from exc
+    token = request.headers.get(PUSH_TOKEN_HEADER, "")
+    if not A2A_PUSH_RECEIVER.deliver(subscription_id, token, payload):
+        raise HTTPException(status_code=404, detail="Unknown push subscription")
+
+
 # ── Agent credential management ───────────────────────────────────────────────
 # These endpoints let the frontend store and check env-var credentials for
 # STDIO MCP agents (e.g. NOTION_API_KEY for notion-mcp).
@@ -12,6 +12,7 @@ from pathlib import Path
 from typing import Any
 
 from .graph.state import ArtifactRef
+from .persistence.db import DB
 
 logger = logging.getLogger(__name__)
 
@@ -43,25 +44,21 @@ async def create_artifact_row(
 ) -> None:
     """Persist an Artifact row to the database."""
     try:
-        from src.generated_client import Prisma
-
-        db = Prisma()
-        await db.connect()
-        await db.artifact.create(
-            data={
-                "id": artifact_id,
-                "user_id": user_id,
-                "session_id": session_id,
-                "filename": filename,
-                "mime_type": mime_type,
-                "size_bytes": size_bytes,
-                "source": source,
-                "status": "READY",
-                "s3_bucket": s3_bucket,
-                "s3_key": s3_key,
-            }
-        )
-        await db.disconnect()
+        async with DB.session() as db:
+            await db.artifact.create(
+                data={
+                    "id": artifact_id,
+                    "user_id": user_id,
+                    "session_id": session_id,
+                    "filename": filename,
+                    "mime_type": mime_type,
+                    "size_bytes": size_bytes,
+                    "source": source,
+                    "status": "READY",
+                    "s3_bucket": s3_bucket,
+                    "s3_key": s3_key,
+                }
+            )
     except Exception:
         logger.exception("Failed to create Artifact DB row for %s", artifact_id)
 
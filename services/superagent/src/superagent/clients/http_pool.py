@@ -0,0 +1,242 @@
+"""Shared, connection-pooled HTTP clients for agent calls.
+
+Handlers used to build a fresh ``httpx.AsyncClient`` per call, paying TCP +
+TLS setup on every A2A message, auth-URL lookup and raw MCP call.
+``HTTP_CLIENTS`` keeps one keep-alive connection pool per agent origin
+(``scheme://host:port``) — HTTP/2 where the server negotiates it — so
+per-host connection limits hold no matter how many calls fan out.
+
+``HTTP_CLIENTS.session(url, headers=..., timeout=...)`` yields a lightweight
+``httpx.AsyncClient`` bound to that origin's shared transport. The client
+carries the caller's headers/timeout; leaving the block never closes the
+shared pool (``main.py`` lifespan calls ``aclose()`` at shutdown).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Any
+from urllib.parse import urlsplit
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+try:
+    import h2  # noqa: F401
+
+    _HTTP2_AVAILABLE = True
+except ImportError:  # pragma: no cover — httpx[http2] is a declared dependency
+    _HTTP2_AVAILABLE = False
+
+
+def origin_of(url: str) -> str:
+    """``scheme://host:port`` — the unit connection limits apply to."""
+    parts = urlsplit(url)
+    scheme = parts.scheme or "http"
+    port = parts.port or (443 if scheme == "https" else 80)
+    return f"{scheme}://{(parts.hostname or '').lower()}:{port}"
+
+
+def timeout_profile(
+    transport: dict[str, Any] | None,
+    *,
+    default_read: float | None = None,
+) -> httpx.Timeout:
+    """Per-agent timeouts from the manifest transport block.
+
+    Recognised keys (all seconds, all optional)::
+
+        transport:
+          timeout_seconds: 120          # read timeout shorthand
+          timeouts: {connect: 3, read: 120, write: 30, pool: 5}
+
+    Anything unset falls back to the service-wide ``http_*_timeout_seconds``.
+    """
+    from ..config import settings
+
+    connect = float(getattr(settings, "http_connect_timeout_seconds", 5.0))
+    read = float(
+        default_read
+        if default_read is not None
+        else getattr(settings, "http_read_timeout_seconds", 30.0)
+    )
+    profile: dict[str, Any] = {}
+    if transport:
+        if transport.get("timeout_seconds") is not None:
+            profile["read"] = transport["timeout_seconds"]
+        if isinstance(transport.get("timeouts"), dict):
+            profile.update(transport["timeouts"])
+
+    def _seconds(key: str, fallback: float) -> float:
+        try:
+            value = float(profile.get(key, fallback))
+        except (TypeError, ValueError):
+            return fallback
+        return value if value > 0 else fallback
+
+    read_s = _seconds("read", read)
+    return httpx.Timeout(
+        connect=_seconds("connect", connect),
+        read=read_s,
+        write=_seconds("write", read_s),
+        pool=_seconds("pool", connect),
+    )
+
+
+class _CountedStream(httpx.AsyncByteStream):
+    """Response body wrapper that reports when the request really finished."""
+
+    def __init__(self, inner: httpx.AsyncByteStream, done: Any) -> None:
+        self._inner = inner
+        self._done = done
+        self._closed = False
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._inner:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._inner.aclose()
+        finally:
+            if not self._closed:
+                self._closed = True
+                self._done()
+
+
+class _MeteredTransport(httpx.AsyncBaseTransport):
+    """Shared per-origin transport with in-flight / total / error counters."""
+
+    def __init__(self, inner: httpx.AsyncHTTPTransport) -> None:
+        self._inner = inner
+        self.in_flight = 0
+        self.requests_total = 0
+        self.errors_total = 0
+
+    def _done(self) -> None:
+        self.in_flight -= 1
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.in_flight += 1
+        self.requests_total += 1
+        try:
+            response = await self._inner.handle_async_request(request)
+        except Exception:
+            self.in_flight -= 1
+            self.errors_total += 1
+            raise
+        response.stream = _CountedStream(response.stream, self._done)  # type: ignore[arg-type]
+        return response
+
+    def connection_counts(self) -> tuple[int, int]:
+        """(open, idle) connections — read from the httpcore pool if exposed."""
+        pool = getattr(self._inner, "_pool", None)
+        connections = list(getattr(pool, "connections", []) or [])
+        open_ = [c for c in connections if not c.is_closed()]
+        return len(open_), sum(1 for c in open_ if c.is_idle())
+
+    async def aclose(self) -> None:
+        await self._inner.aclose()
+
+
+class HTTPClientRegistry:
+    """Process-wide registry of pooled transports, one per agent origin."""
+
+    def __init__(
+        self,
+        *,
+        http2: bool = True,
+        max_connections_per_host: int = 20,
+        max_keepalive_per_host: int = 10,
+        keepalive_expiry_seconds: float = 30.0,
+    ) -> None:
+        self.http2 = http2 and _HTTP2_AVAILABLE
+        self.limits = httpx.Limits(
+            max_connections=max_connections_per_host,
+            max_keepalive_connections=max_keepalive_per_host,
+            keepalive_expiry=keepalive_expiry_seconds,
+        )
+        self._transports: dict[str, _MeteredTransport] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def transport_for(self, url: str) -> _MeteredTransport:
+        # Pooled connections belong to the loop that opened them.
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._transports.clear()
+        origin = origin_of(url)
+        transport = self._transports.get(origin)
+        if transport is None:
+            transport = _MeteredTransport(
+                httpx.AsyncHTTPTransport(http2=self.http2, limits=self.limits)
+            )
+            self._transports[origin] = transport
+            logger.debug("HTTP pool: new connection pool for %s", origin)
+        return transport
+
+    @asynccontextmanager
+    async def session(
+        self,
+        url: str,
+        *,
+        headers: dict[str, str] | None = None,
+        timeout: httpx.Timeout | float | None = None,
+    ) -> AsyncIterator[httpx.AsyncClient]:
+        """Yield a client for *url*'s origin that shares its pooled transport."""
+        client = httpx.AsyncClient(
+            transport=self.transport_for(url),
+            headers=headers,
+            timeout=timeout if timeout is not None else timeout_profile(None),
+            trust_env=False,
+        )
+        # Deliberately not ``async with client`` — that would close the
+        # shared transport. The client itself holds no other resources.
+        yield client
+
+    def stats(self) -> dict[str, Any]:
+        """Pool utilisation per origin, for the health/metrics endpoints."""
+        hosts: dict[str, Any] = {}
+        for origin, transport in self._transports.items():
+            open_, idle = transport.connection_counts()
+            hosts[origin] = {
+                "in_flight": transport.in_flight,
+                "requests_total": transport.requests_total,
+                "errors_total": transport.errors_total,
+                "connections_open": open_,
+                "connections_idle": idle,
+                "max_connections": self.limits.max_connections,
+                "utilisation": round(
+                    transport.in_flight / (self.limits.max_connections or 1), 3
+                ),
+            }
+        return {"http2": self.http2, "hosts": hosts}
+
+    async def aclose(self) -> None:
+        """Close every pooled connection (lifespan shutdown)."""
+        transports = list(self._transports.values())
+        self._transports.clear()
+        for transport in transports:
+            try:
+                await transport.aclose()
+            except Exception:
+                logger.debug("HTTP pool: transport close failed", exc_info=True)
+
+
+def _build_registry() -> HTTPClientRegistry:
+    from ..config import settings
+
+    return HTTPClientRegistry(
+        http2=settings.http_pool_http2,
+        max_connections_per_host=settings.http_pool_max_connections_per_host,
+        max_keepalive_per_host=settings.http_pool_max_keepalive_per_host,
+        keepalive_expiry_seconds=settings.http_pool_keepalive_expiry_seconds,
+    )
+
+
+# Module-level singleton
+HTTP_CLIENTS = _build_registry()
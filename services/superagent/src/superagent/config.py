@@ -23,6 +23,44 @@ class Settings(BaseSettings):
     redis_url: str
     database_url: str
     vault_key: str  # base64-encoded 32-byte key for AES-256-GCM
+    # Per-user cache of encrypted vault values (0 disables). Local writes
+    # invalidate immediately; other replicas converge within the TTL.
+    vault_cache_ttl_seconds: float = 30.0
+
+    # Shared Prisma client — one connected client per process whose query
+    # engine pools at most db_pool_size Postgres connections. Callers wait up
+    # to db_checkout_timeout_seconds for a slot; a client idle for longer than
+    # db_health_check_seconds is probed with SELECT 1 before reuse.
+    db_pool_size: int = 10
+    db_checkout_timeout_seconds: float = 10.0
+    db_health_check_seconds: float = 30.0
+
+    # Transcript write-behind — rows are written by background workers after
+    # the SSE stream closes, with retries. Set transcript_write_behind=false to
+    # persist inline before the final "done" event. Transcript reads wait up
+    # to transcript_read_wait_seconds for that session's pending write.
+    transcript_write_behind: bool = True
+    transcript_write_workers: int = 4
+    transcript_write_retries: int = 3
+    transcript_write_max_pending: int = 1000
+    transcript_read_wait_seconds: float = 5.0
+    # Transcript reads are keyset-paged (transcript_page_size rows per query).
+    # Rebuilding graph state from Postgres (no checkpoint) hydrates only the
+    # last transcript_hydrate_turns user turns; 0 loads the full history.
+    transcript_page_size: int = 200
+    transcript_hydrate_turns: int = 20
+
+    # Credit reservations (payment_guard) — each user's Postgres balance is
+    # cached in Redis for credit_balance_ttl_seconds and paid calls reserve
+    # against it atomically; reserves lapse after credit_reserve_ttl_seconds
+    # if never settled. Disable to check Postgres on every paid call.
+    credit_ledger_enabled: bool = True
+    credit_balance_ttl_seconds: float = 60.0
+    credit_reserve_ttl_seconds: float = 300.0
+    # Agent execution metrics — invocation outcomes are counted in memory and
+    # flushed every agent_metrics_flush_seconds as additive hourly buckets
+    # (agent_metrics_hourly) plus one batched update of the touched agents.
+    agent_metrics_flush_seconds: float = 10.0
 
     # Dependent services
     pnd_service_url: str
@@ -70,6 +108,12 @@ class Settings(BaseSettings):
     # boot and every completed step is appended to the hash-chained audit_ledger
     # table. Default off keeps stock OSS behaviour (NoOpObserver).
     audit_ledger_enabled: bool = False
+    # Appends are written in batches of up to audit_ledger_batch_size rows
+    # (waiting audit_ledger_linger_ms for more); chain tips are rolled into a
+    # Merkle checkpoint every audit_ledger_checkpoint_seconds (0 disables).
+    audit_ledger_batch_size: int = 100
+    audit_ledger_linger_ms: int = 5
+    audit_ledger_checkpoint_seconds: float = 300.0
 
     # KY-A supervisor cyber guardrails (WS10, FR-10.1) — when enabled, the run
     # is scope-limited to the allowlisted agent DIDs below plus an explicit set
@@ -89,6 +133,10 @@ class Settings(BaseSettings):
     dag_route_high: float = 0.75  # Channel A score >= high → DAG
     dag_route_low: float = 0.35  # Channel A score <= low → ReAct; between → Channel B
     dag_route_model: str | None = None  # Channel B arbiter; None → small_model
+    # Plan nodes are dispatched as soon as their dependencies finish; in-flight
+    # nodes are capped per plan and per agent (protects rate-limited agents).
+    dag_max_parallel_nodes: int = 4
+    dag_max_parallel_per_agent: int = 2
 
     # CDV verification (Slice 1) — per-step Channel-A scoring observer +
     # AdaptiveStopper loop backstop. Default off keeps stock OSS behaviour.
@@ -104,6 +152,88 @@ class Settings(BaseSettings):
     # string (retryable, classified) instead of a silent stall.
     agent_call_timeout_seconds: int = 60
 
+    # Concurrent tool dispatch — when enabled, the external agent calls of one
+    # AI message fan out through ExecutionMiddleware (at most
+    # max_parallel_tool_calls in flight); system tools stay serialized.
+    # Default off keeps stock OSS behaviour (sequential dispatch).
+    parallel_tool_calls_enabled: bool = False
+    max_parallel_tool_calls: int = 4
+
+    # MCP session pool — keep initialized MCP sessions (and STDIO server
+    # processes) open across tool calls, keyed by agent + transport + resolved
+    # credentials. Idle sessions are evicted after mcp_pool_idle_ttl_seconds;
+    # opening one (transport + initialize) is bounded by
+    # mcp_pool_connect_timeout_seconds.
+    mcp_session_pool_enabled: bool = True
+    mcp_pool_max_sessions_per_agent: int = 4
+    mcp_pool_idle_ttl_seconds: float = 300.0
+    mcp_pool_health_check_seconds: float = 30.0
+    mcp_pool_connect_timeout_seconds: float = 30.0
+    # Warm STDIO servers — at most mcp_stdio_max_processes resident server
+    # processes across all agents and users (LRU idle eviction beyond that).
+    # Crashed children are restarted, up to mcp_stdio_max_restarts per five
+    # minutes per (agent, user env); the supervisor polls every
+    # mcp_stdio_supervise_seconds.
+    mcp_stdio_max_processes: int = 16
+    mcp_stdio_max_restarts: int = 3
+    mcp_stdio_supervise_seconds: float = 5.0
+
+    # Shared HTTP client pool — one keep-alive connection pool per agent
+    # origin (HTTP/2 when negotiated), shared by every handler. Per-agent
+    # timeouts come from the manifest transport (timeout_seconds / timeouts);
+    # the http_*_timeout_seconds values are the defaults.
+    http_pool_http2: bool = True
+    http_pool_max_connections_per_host: int = 20
+    http_pool_max_keepalive_per_host: int = 10
+    http_pool_keepalive_expiry_seconds: float = 30.0
+    http_connect_timeout_seconds: float = 5.0
+    http_read_timeout_seconds: float = 30.0
+
+    # A2A result delivery — message/stream (SSE) for agents whose card
+    # advertises capabilities.streaming; push-notification webhooks to
+    # POST {a2a_push_base_url}/a2a/push/{id} for agents advertising
+    # pushNotifications (a2a_push_base_url must be reachable from the agents;
+    # empty disables push). tasks/get polling remains the fallback, and a
+    # safety poll every a2a_push_fallback_poll_seconds covers lost webhooks —
+    # keep it at the polling cap so a lost webhook costs no more latency
+    # than plain polling.
+    a2a_streaming_enabled: bool = True
+    a2a_push_enabled: bool = True
+    a2a_push_base_url: str = ""
+    a2a_push_fallback_poll_seconds: float = 2.0
+    a2a_task_timeout_seconds: float = 480.0
+
+    # Manifest cache — LRU of at most manifest_cache_max_entries manifests,
+    # fresh for manifest_cache_ttl_seconds, then served stale (while one
+    # background refresh runs) for up to manifest_cache_stale_seconds more.
+    # Registry failures are cached separately and briefly.
+    manifest_cache_max_entries: int = 1024
+    manifest_cache_ttl_seconds: float = 300.0
+    manifest_cache_stale_seconds: float = 3600.0
+    manifest_cache_negative_ttl_seconds: float = 10.0
+    # Warm the cache for the whole PnD candidate set with one bulk Registry
+    # call as soon as the orchestrator receives candidates.
+    manifest_prefetch_enabled: bool = True
+
+    # PnD gate Tier-2 query vectors — in-process LRU of at most
+    # gate_embedding_cache_max_entries, backed by Redis (redis_url) for
+    # gate_embedding_cache_ttl_seconds so every replica reuses them.
+    gate_embedding_cache_max_entries: int = 4096
+    gate_embedding_cache_ttl_seconds: int = 7 * 86400
+
+    # Kafka (optional) — when enabled, registry.agent.registered events
+    # invalidate cached manifests as soon as an agent is (re-)registered,
+    # and every StepResult is fanned out to execution.step_complete.
+    kafka_enabled: bool = False
+    kafka_bootstrap_servers: str = ""
+    # step_complete producer — batches for up to step_events_linger_ms;
+    # at most step_events_outbox_size events wait for the broker before new
+    # ones are dropped (counted in GET /health/kafka).
+    step_events_linger_ms: int = 20
+    step_events_batch_bytes: int = 65536
+    step_events_compression: str = "gzip"
+    step_events_outbox_size: int = 10000
+
     # Fleet filter: comma-separated agent DIDs excluded from discovery
     # (e.g. sandbox deployments hiding credential-requiring demo agents).
     agent_exclude_ids: str = ""
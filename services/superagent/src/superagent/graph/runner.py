@@ -14,6 +14,7 @@ from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage
 from langgraph.errors import GraphInterrupt
 from langgraph.types import Command
 
+from ..config import settings
 from ..pnd.candidate_compat import (
     cand_agent_id,
     cand_agent_name,
@@ -172,22 +173,8 @@ def _parse_custom_agent_invocation(chunk: Any) -> dict[str, Any] | None:
     return None
 
 
-def _merge_messages_for_transcript(
-    from_checkpoint: list[Any],
-    from_values_stream: list[Any] | None,
-) -> list[Any]:
-    """
-    Prefer the values-stream list when it is at least as long as the checkpoint.
-
-    After ``astream``, ``aget_state`` can briefly see a stale checkpoint (e.g. only
-    the new ``HumanMessage``). Values-mode chunks carry the full merged state; when
-    lengths tie, the stream snapshot is usually fresher than the checkpoint read.
-    """
-    a = from_checkpoint if isinstance(from_checkpoint, list) else []
-    b = from_values_stream if isinstance(from_values_stream, list) else []
-    if b and len(b) >= len(a):
-        return list(b)
-    return list(a)
+# State keys the transcript write needs, captured from the last values chunk.
+_TRANSCRIPT_STATE_KEYS = ("messages", "user_id", "_transcript_offset")
 
 
 async def _pending_interrupt_event(
@@ -245,9 +232,9 @@ async def _yield_multistream_events(
 
             if mode == "values":
                 if values_messages_sink is not None and isinstance(chunk, dict):
-                    vm = chunk.get("messages")
-                    if vm is not None:
-                        values_messages_sink["messages"] = vm
+                    for key in _TRANSCRIPT_STATE_KEYS:
+                        if chunk.get(key) is not None:
+                            values_messages_sink[key] = chunk[key]
                 try:
                     for event in _extract_events(
                         chunk,
@@ -361,15 +348,49 @@ class SessionRunner:
         self,
         session_id: str,
         session_credentials: dict[str, dict[str, str]] | None,
-        *,
-        stream_messages: list[Any] | None = None,
+        stream_values: dict[str, Any],
     ) -> None:
-        from ..persistence.transcript_store import (
-            get_session_meta,
-            persist_new_messages,
-            upsert_conversation_session,
-        )
+        """Persist new transcript rows off the stream's tail latency.
+
+        Only the in-memory state of the last values chunk is snapshotted here,
+        so the stream can close at once; the ``ConversationSession`` read
+        (and upsert) happens in the write job, whose count-guarded append
+        handles racing writers. With ``transcript_write_behind`` the job is
+        queued on ``TRANSCRIPT_WRITES`` (retried in the background); otherwise
+        — or when the queue is full — it runs inline. Never raises.
+        """
+        from ..persistence.transcript_store import TRANSCRIPT_WRITES
+
+        snapshot = dict(stream_values)
+        if isinstance(snapshot.get("messages"), list):
+            snapshot["messages"] = list(snapshot["messages"])
+
+        async def job() -> None:
+            values = snapshot
+            if not isinstance(values.get("messages"), list):
+                # The stream failed before its first values chunk.
+                values = await self._checkpoint_values(session_id, session_credentials)
+            await self._write_transcript(
+                session_id,
+                list(values.get("messages") or []),
+                offset=int(values.get("_transcript_offset") or 0),
+                user_id=values.get("user_id"),
+            )
+
+        if settings.transcript_write_behind and TRANSCRIPT_WRITES.submit(
+            session_id, job
+        ):
+            return
+        try:
+            await job()
+        except Exception:
+            logger.exception("transcript persist failed session=%s", session_id)
 
+    async def _checkpoint_values(
+        self,
+        session_id: str,
+        session_credentials: dict[str, dict[str, str]] | None,
+    ) -> dict[str, Any]:
         cfg = _merge_graph_config(
             {
                 "configurable": {
@@ -378,55 +399,61 @@ class SessionRunner:
                 }
             }
         )
-        try:
-            snap = await self._graph.aget_state(cfg)
-            vals = snap.values if snap else None
-            msgs_snap = (vals.get("messages") if isinstance(vals, dict) else None) or []
-            msgs = _merge_messages_for_transcript(msgs_snap, stream_messages)
-            if stream_messages is not None and isinstance(stream_messages, list):
-                if len(msgs_snap) != len(msgs) or (
-                    len(msgs_snap) < len(stream_messages)
-                ):
-                    logger.info(
-                        (
-                            "transcript: merged messages for persist session=%s "
-                            "aget_state=%d values_stream=%d chosen=%d"
-                        ),
-                        session_id,
-                        len(msgs_snap),
-                        len(stream_messages),
-                        len(msgs),
-                    )
-            else:
-                logger.info(
-                    "transcript: persist source session=%s aget_state=%d values_stream=None chosen=%d",
-                    session_id,
-                    len(msgs_snap),
-                    len(msgs),
-                )
+        snap = await self._graph.aget_state(cfg)
+        vals = snap.values if snap else None
+        return vals if isinstance(vals, dict) else {}
+
+    async def _write_transcript(
+        self,
+        session_id: str,
+        msgs: list[Any],
+        *,
+        offset: int = 0,
+        user_id: str | None = None,
+    ) -> None:
+        """Append the messages of *msgs* the session row has not counted yet.
+
+        ``msgs[0]`` is the session's message number *offset* (see
+        ``persist_new_messages``).
+
+        ``persist_new_messages`` only writes while the stored count still
+        equals the one read here; when an inline write and a background job
+        race, the loser re-reads the count and appends whatever its snapshot
+        still adds.
+        """
+        from ..persistence.transcript_store import (
+            TranscriptCountConflict,
+            get_session_meta,
+            persist_new_messages,
+            upsert_conversation_session,
+        )
+
+        meta = await get_session_meta(session_id)
+        if meta is None and user_id:
+            await upsert_conversation_session(session_id, str(user_id), None)
             meta = await get_session_meta(session_id)
-            if meta is None:
-                uid = vals.get("user_id") if isinstance(vals, dict) else None
-                if uid:
-                    try:
-                        await upsert_conversation_session(session_id, str(uid), None)
-                    except Exception:
-                        logger.exception(
-                            "transcript: ConversationSession upsert fallback failed session=%s",
-                            session_id,
-                        )
-                        return
-                    meta = await get_session_meta(session_id)
-                if meta is None:
-                    logger.warning(
-                        "transcript persist skipped: no ConversationSession row session=%s",
-                        session_id,
-                    )
-                    return
-            prev, _ = meta
-            _ = await persist_new_messages(session_id, list(msgs), prev)
-        except Exception:
-            logger.exception("transcript persist failed session=%s", session_id)
+        if meta is None:
+            logger.warning(
+                "transcript persist skipped: no ConversationSession row session=%s",
+                session_id,
+            )
+            return
+        prev = meta[0]
+        logger.info(
+            "transcript: persist session=%s persisted=%d snapshot=%d",
+            session_id,
+            prev,
+            len(msgs),
+        )
+        while prev < offset + len(msgs):
+            try:
+                await persist_new_messages(session_id, msgs, prev, offset=offset)
+                return
+            except TranscriptCountConflict:
+                meta = await get_session_meta(session_id)
+                if meta is None or meta[0] <= prev:
+                    raise
+                prev = meta[0]
 
     async def run_turn(
         self,
@@ -487,17 +514,25 @@ class SessionRunner:
                 state_update["email_campaign_context"] = prev_ec
         else:
             from ..persistence.transcript_store import (
-                load_transcript_rows,
+                get_session_meta,
+                load_transcript_tail,
                 rows_to_langchain,
             )
 
-            rows = await load_transcript_rows(session_id)
+            rows = await load_transcript_tail(
+                session_id, settings.transcript_hydrate_turns
+            )
             if rows:
                 hist = rows_to_langchain(rows)
                 state_update = default_state(session_id, user_id)
                 state_update["messages"] = hist + [
                     _human_message(user_message, initial_artifacts)
                 ]
+                # The tail stands in for every message counted so far, so the
+                # next write starts right after it.
+                meta = await get_session_meta(session_id)
+                if meta is not None:
+                    state_update["_transcript_offset"] = meta[0] - len(hist)
             else:
                 state_update = default_state(session_id, user_id)
                 state_update["messages"] = [
@@ -531,12 +566,10 @@ class SessionRunner:
             try:
                 from ..vault.client import VaultClient
 
-                vault = VaultClient()
-                byok: dict[str, str] = {}
-                for var in ("api_key", "base_url", "model"):
-                    value = await vault.get_agent_env(user_id, "__llm__", var)
-                    if value:
-                        byok[var] = value
+                stored = await VaultClient().get_agent_envs(
+                    user_id, "__llm__", ["api_key", "base_url", "model"]
+                )
+                byok = {var: value for var, value in stored.items() if value}
                 if byok.get("api_key"):
                     state_update["_session_credentials"]["__llm__"] = byok
                     logger.info(
@@ -572,11 +605,9 @@ class SessionRunner:
             # Persist even on error/cancel: a failed run is exactly what the
             # run audit (Verified Runs) is for. Never let a persist failure
             # break stream teardown.
-            stream_msgs = values_messages_sink.get("messages")
-            stream_list = stream_msgs if isinstance(stream_msgs, list) else None
             try:
                 await self._persist_transcript(
-                    session_id, session_credentials, stream_messages=stream_list
+                    session_id, session_credentials, values_messages_sink
                 )
             except Exception:
                 logger.exception(
@@ -652,11 +683,9 @@ class SessionRunner:
             # Persist even on error/cancel: a failed run is exactly what the
             # run audit (Verified Runs) is for. Never let a persist failure
             # break stream teardown.
-            stream_msgs = values_messages_sink.get("messages")
-            stream_list = stream_msgs if isinstance(stream_msgs, list) else None
             try:
                 await self._persist_transcript(
-                    session_id, session_credentials, stream_messages=stream_list
+                    session_id, session_credentials, values_messages_sink
                 )
             except Exception:
                 logger.exception(
@@ -141,6 +141,9 @@ class AgentState(dict):  # type: ignore[type-arg]
     # Active DAG plan (Slice 1) — plain JSON-safe dict built by
     # nodes/dag_plan.new_active_plan. None on the stock ReAct path.
     active_plan: dict[str, Any] | None
+    # Session message number of messages[0]: non-zero once the state was rebuilt
+    # from a transcript tail, so transcript writes slice against the full count.
+    _transcript_offset: int
 
 
 def default_state(session_id: str, user_id: str) -> dict[str, Any]:
@@ -165,4 +168,5 @@ def default_state(session_id: str, user_id: str) -> dict[str, Any]:
         "_agent_oauth_grants": {},
         "_last_turn_tokens": 0,
         "active_plan": None,
+        "_transcript_offset": 0,
     }
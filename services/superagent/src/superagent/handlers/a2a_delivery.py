@@ -0,0 +1,418 @@
+"""A2A task update delivery — SSE streaming, push notifications, polling.
+
+``A2AHandler.send_task`` consumes task states from ``A2ATaskUpdates`` and no
+longer cares how they arrive:
+
+1. **message/stream** (SSE) when the agent card advertises
+   ``capabilities.streaming`` — status/artifact events arrive as the agent
+   emits them. After an interrupted state (input-required) the handler answers
+   with ``message/send`` and the stream is re-attached via ``tasks/resubscribe``.
+2. **Push notifications** when the card advertises
+   ``capabilities.pushNotifications`` and ``a2a_push_base_url`` is set — the
+   task is created with a ``pushNotificationConfig`` pointing at
+   ``POST /a2a/push/{subscription_id}`` on this service, and updates land in
+   ``A2A_PUSH_RECEIVER``. A slow ``tasks/get`` safety poll covers lost
+   webhooks (or webhooks delivered to another replica).
+3. **tasks/get polling** with exponential backoff — the fallback for agents
+   that support neither, and for streams that fail.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hmac
+import json
+import logging
+import secrets
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Awaitable, Callable
+from typing import Any
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+POLL_INITIAL = 0.5  # first status check after 500 ms
+POLL_MAX = 2.0  # cap per interval
+MAX_POLLS = 240  # 240 × avg ~2 s ≈ 8-minute budget
+
+TERMINAL_STATES = frozenset({"completed", "failed", "canceled", "rejected"})
+
+_AGENT_CARD_PATHS = ("/.well-known/agent.json", "/.well-known/agent-card.json")
+_AGENT_CARD_TTL_SECONDS = 300.0
+_AGENT_CARD_CACHE_MAX = 512
+_AGENT_CARD_TIMEOUT_SECONDS = 3.0
+PUSH_TOKEN_HEADER = "X-A2A-Notification-Token"
+
+GetTask = Callable[[httpx.AsyncClient, str, str], Awaitable[dict[str, Any]]]
+
+
+class StreamUnsupported(Exception):
+    """The agent rejected message/stream (or answered without an SSE body)."""
+
+
+# ── Agent card capabilities ───────────────────────────────────────────────────
+
+# endpoint → (expires_at, caps), least recently used first.
+_CARD_CACHE: OrderedDict[str, tuple[float, dict[str, bool]]] = OrderedDict()
+
+
+async def agent_capabilities(
+    client: httpx.AsyncClient, endpoint: str
+) -> dict[str, bool]:
+    """``{"streaming": bool, "pushNotifications": bool}`` from the agent card.
+
+    Cached per endpoint for five minutes (LRU-bounded to
+    ``_AGENT_CARD_CACHE_MAX`` endpoints); an unreachable card means "neither"
+    (polling only), which is also cached so a card-less agent costs one GET.
+    """
+    now = time.monotonic()
+    cached = _CARD_CACHE.get(endpoint)
+    if cached is not None:
+        if cached[0] > now:
+            _CARD_CACHE.move_to_end(endpoint)
+            return cached[1]
+        del _CARD_CACHE[endpoint]
+    caps = {"streaming": False, "pushNotifications": False}
+    for path in _AGENT_CARD_PATHS:
+        try:
+            resp = await client.get(
+                f"{endpoint}{path}", timeout=_AGENT_CARD_TIMEOUT_SECONDS
+            )
+            if resp.status_code != 200:
+                continue
+            advertised = resp.json().get("capabilities") or {}
+            caps = {
+                "streaming": bool(advertised.get("streaming")),
+                "pushNotifications": bool(advertised.get("pushNotifications")),
+            }
+            break
+        except Exception:
+            logger.debug("A2A agent card fetch failed %s%s", endpoint, path)
+    _CARD_CACHE[endpoint] = (now + _AGENT_CARD_TTL_SECONDS, caps)
+    _CARD_CACHE.move_to_end(endpoint)
+    while len(_CARD_CACHE) > _AGENT_CARD_CACHE_MAX:
+        _CARD_CACHE.popitem(last=False)
+    return caps
+
+
+# ── SSE parsing ───────────────────────────────────────────────────────────────
+
+
+async def iter_sse_payloads(lines: AsyncIterator[str]) -> AsyncIterator[Any]:
+    """JSON ``data:`` payloads of an SSE stream (multi-line data joined)."""
+    data: list[str] = []
+    async for line in lines:
+        if not line:
+            if data:
+                yield json.loads("\n".join(data))
+                data = []
+            continue
+        if line.startswith("data:"):
+            data.append(line[5:].lstrip())
+    if data:
+        yield json.loads("\n".join(data))
+
+
+def apply_stream_result(
+    task_state: dict[str, Any], result: dict[str, Any]
+) -> dict[str, Any]:
+    """Fold one message/stream result into the accumulated task state.
+
+    Results are a ``Task`` snapshot, a ``status-update``, an
+    ``artifact-update`` (chunks appended by ``artifactId``) or — for agents
+    that answer without creating a task — a bare ``Message``.
+    """
+    kind = result.get("kind")
+    state = dict(task_state)
+    if kind == "status-update":
+        state["id"] = result.get("taskId") or state.get("id")
+        state["status"] = result.get("status") or {}
+        if result.get("metadata"):
+            state["metadata"] = {**(state.get("metadata") or {}), **result["metadata"]}
+    elif kind == "artifact-update":
+        state["id"] = result.get("taskId") or state.get("id")
+        artifact = result.get("artifact") or {}
+        artifacts = list(state.get("artifacts") or [])
+        artifact_id = artifact.get("artifactId")
+        existing = next(
+            (
+                i
+                for i, a in enumerate(artifacts)
+                if artifact_id and a.get("artifactId") == artifact_id
+            ),
+            None,
+        )
+        if existing is not None and result.get("append"):
+            merged = dict(artifacts[existing])
+            merged["parts"] = [*merged.get("parts", []), *artifact.get("parts", [])]
+            artifacts[existing] = merged
+        elif existing is not None:
+            artifacts[existing] = artifact
+        else:
+            artifacts.append(artifact)
+        state["artifacts"] = artifacts
+    elif kind == "message":
+        state["id"] = result.get("taskId") or state.get("id")
+        state["status"] = {"state": "completed", "message": result}
+    else:
+        state.update(result)
+    return state
+
+
+# ── Push notification receiver ────────────────────────────────────────────────
+
+
+class A2APushReceiver:
+    """In-process mailboxes for push notifications addressed to this replica.
+
+    Each in-flight task registers a subscription (random id + token); the
+    webhook route delivers the posted Task into that subscription's queue.
+    """
+
+    def __init__(self) -> None:
+        self._subs: dict[str, tuple[str, asyncio.Queue[dict[str, Any]]]] = {}
+
+    def register(self) -> tuple[str, str, asyncio.Queue[dict[str, Any]]]:
+        subscription_id = uuid.uuid4().hex
+        token = secrets.token_urlsafe(24)
+        queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue()
+        self._subs[subscription_id] = (token, queue)
+        return subscription_id, token, queue
+
+    def unregister(self, subscription_id: str) -> None:
+        self._subs.pop(subscription_id, None)
+
+    def deliver(self, subscription_id: str, token: str, payload: Any) -> bool:
+        """Queue *payload* for its subscriber; False for unknown id / bad token."""
+        sub = self._subs.get(subscription_id)
+        if sub is None or not hmac.compare_digest(sub[0], token or ""):
+            return False
+        if isinstance(payload, dict) and isinstance(payload.get("result"), dict):
+            payload = payload["result"]  # tolerate JSON-RPC wrapped bodies
+        if not isinstance(payload, dict):
+            return False
+        sub[1].put_nowait(payload)
+        return True
+
+
+# Module-level singleton
+A2A_PUSH_RECEIVER = A2APushReceiver()
+
+
+# ── Task update source ────────────────────────────────────────────────────────
+
+
+class A2ATaskUpdates:
+    """Sends the initial message and yields task states until the caller stops.
+
+    ``task_id`` is known after the first yielded state. The caller stops
+    iterating on a final answer; iteration itself only ends when the delivery
+    budget is exhausted (callers map that to a timeout).
+    """
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        endpoint: str,
+        params: dict[str, Any],
+        message_id: str,
+        get_task: GetTask,
+    ) -> None:
+        from ..config import settings
+
+        self.client = client
+        self.endpoint = endpoint
+        self.params = params
+        self.message_id = message_id
+        self.task_id = message_id
+        self.mode = "poll"
+        self._get_task = get_task
+        self._streaming_enabled = getattr(settings, "a2a_streaming_enabled", True)
+        self._push_enabled = getattr(settings, "a2a_push_enabled", True)
+        self._push_base_url = str(getattr(settings, "a2a_push_base_url", "") or "")
+        self._push_poll_seconds = float(
+            getattr(settings, "a2a_push_fallback_poll_seconds", POLL_MAX)
+        )
+        self._timeout_seconds = float(
+            getattr(settings, "a2a_task_timeout_seconds", 480.0)
+        )
+        self._subscription: str | None = None
+        self._push_queue: asyncio.Queue[dict[str, Any]] | None = None
+
+    async def __aiter__(self) -> AsyncIterator[dict[str, Any]]:
+        try:
+            async for state in self._states():
+                yield state
+        finally:
+            if self._subscription is not None:
+                A2A_PUSH_RECEIVER.unregister(self._subscription)
+
+    async def _states(self) -> AsyncIterator[dict[str, Any]]:
+        caps = {"streaming": False, "pushNotifications": False}
+        if self._streaming_enabled or (self._push_enabled and self._push_base_url):
+            caps = await agent_capabilities(self.client, self.endpoint)
+        deadline = time.monotonic() + self._timeout_seconds
+
+        if self._streaming_enabled and caps["streaming"]:
+            last: dict[str, Any] | None = None
+            try:
+                async for state in self._stream("message/stream", self.params):
+                    last = state
+                    yield state
+            except (StreamUnsupported, httpx.HTTPError) as exc:
+                logger.info(
+                    "A2A %s: message/stream failed (%s) — falling back",
+                    self.endpoint,
+                    exc,
+                )
+            if last is not None:
+                # The task exists — never re-send; follow it up instead.
+                self.mode = "stream"
+                async for state in self._follow_up(last, deadline):
+                    yield state
+                return
+
+        await self._send()
+        if self._push_queue is not None:
+            self.mode = "push"
+            async for state in self._await_push(deadline):
+                yield state
+            return
+        async for state in self._poll(MAX_POLLS):
+            yield state
+
+    # ── delivery modes ────────────────────────────────────────────────────────
+
+    async def _stream(
+        self, method: str, params: dict[str, Any]
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Yield merged task states from one SSE stream until it closes."""
+        request_id = str(uuid.uuid4())
+        payload = {
+            "jsonrpc": "2.0",
+            "method": method,
+            "params": params,
+            "id": request_id,
+        }
+        task_state: dict[str, Any] = {"id": self.task_id}
+        async with self.client.stream(
+            "POST",
+            f"{self.endpoint}/",
+            json=payload,
+            headers={"Accept": "text/event-stream"},
+            timeout=httpx.Timeout(30.0, read=None),
+        ) as resp:
+            content_type = resp.headers.get("content-type", "")
+            if resp.status_code >= 400 or "text/event-stream" not in content_type:
+                raise StreamUnsupported(f"HTTP {resp.status_code} {content_type}")
+            async for event in iter_sse_payloads(resp.aiter_lines()):
+                if not isinstance(event, dict):
+                    continue
+                if event.get("error"):
+                    raise StreamUnsupported(str(event["error"].get("message", "")))
+                result = event.get("result")
+                if not isinstance(result, dict):
+                    continue
+                task_state = apply_stream_result(task_state, result)
+                self.task_id = task_state.get("id") or self.task_id
+                yield task_state
+                if result.get("final") or _state_of(task_state) in TERMINAL_STATES:
+                    return
+
+    async def _follow_up(
+        self, last: dict[str, Any], deadline: float
+    ) -> AsyncIterator[dict[str, Any]]:
+        """After a stream closes: re-attach while interrupted, else poll.
+
+        The caller may answer an input-required state (or an escaped
+        interrupt on a failed task) before asking for the next state.
+        """
+        while _state_of(last) not in TERMINAL_STATES and time.monotonic() < deadline:
+            resumed: dict[str, Any] | None = None
+            try:
+                async for state in self._stream(
+                    "tasks/resubscribe", {"id": self.task_id}
+                ):
+                    resumed = state
+                    yield state
+            except (StreamUnsupported, httpx.HTTPError) as exc:
+                logger.info(
+                    "A2A %s: tasks/resubscribe failed (%s) — polling",
+                    self.endpoint,
+                    exc,
+                )
+                break
+            if resumed is None:
+                break
+            last = resumed
+        self.mode = "poll"
+        async for state in self._poll(MAX_POLLS):
+            yield state
+
+    async def _send(self) -> None:
+        params = self.params
+        if (
+            self._push_enabled
+            and self._push_base_url
+            and (await agent_capabilities(self.client, self.endpoint))[
+                "pushNotifications"
+            ]
+        ):
+            subscription_id, token, queue = A2A_PUSH_RECEIVER.register()
+            self._subscription = subscription_id
+            self._push_queue = queue
+            params = {
+                **params,
+                "configuration": {
+                    **(params.get("configuration") or {}),
+                    "pushNotificationConfig": {
+                        "url": (
+                            f"{self._push_base_url.rstrip('/')}"
+                            f"/a2a/push/{subscription_id}"
+                        ),
+                        "token": token,
+                    },
+                },
+            }
+        payload = {
+            "jsonrpc": "2.0",
+            "method": "message/send",
+            "params": params,
+            "id": self.message_id,
+        }
+        resp = await self.client.post(f"{self.endpoint}/", json=payload)
+        resp.raise_for_status()
+        data = resp.json()
+        self.task_id = (
+            data.get("result", {}).get("id") or data.get("id") or self.task_id
+        )
+
+    async def _await_push(self, deadline: float) -> AsyncIterator[dict[str, Any]]:
+        assert self._push_queue is not None
+        while time.monotonic() < deadline:
+            try:
+                state = await asyncio.wait_for(
+                    self._push_queue.get(), timeout=self._push_poll_seconds
+                )
+            except TimeoutError:
+                state = await self._get_task(self.client, self.endpoint, self.task_id)
+            yield state
+
+    async def _poll(self, max_polls: int) -> AsyncIterator[dict[str, Any]]:
+        interval = POLL_INITIAL
+        for _ in range(max_polls):
+            await asyncio.sleep(interval)
+            interval = min(interval * 2, POLL_MAX)
+            yield await self._get_task(self.client, self.endpoint, self.task_id)
+
+
+def _state_of(task_state: dict[str, Any]) -> str:
+    return (task_state.get("status") or {}).get("state", "unknown")
+
+
+def clear_agent_card_cache() -> None:
+    """Drop cached agent capabilities (tests, manifest updates)."""
+    _CARD_CACHE.clear()
@@ -1,11 +1,14 @@
-"""A2AHandler — stateful A2A task lifecycle with polling and HITL clarification.
+"""A2AHandler — stateful A2A task lifecycle with streaming/push and HITL clarification.
+
+Task updates arrive via ``message/stream`` (SSE), push-notification webhooks,
+or ``tasks/get`` polling as the fallback — see ``a2a_delivery.py``.
 
 Interrupt mechanics
 -------------------
 A downstream A2A agent can signal a pause in two distinct ways:
 
 1. **A2A protocol** — the task transitions to ``input-required`` (or ``auth-required``)
-   during polling.  The handler inspects the task metadata to route this to
+   while updates are followed.  The handler inspects the task metadata to route this to
    either HITL_APPROVAL (destructive action) or AGENT_CLARIFICATION (free text
    question), then calls ``interrupt()`` to suspend the graph.
 
@@ -24,7 +27,7 @@ to echo back in ``Command(resume=...)``.
 
 from __future__ import annotations
 
-import asyncio
+import contextlib
 import json
 import logging
 import re
@@ -45,15 +48,13 @@ from internal_commons.interrupts import (
 from langchain_core.runnables import RunnableConfig
 from langgraph.types import interrupt
 
+from ..clients.http_pool import HTTP_CLIENTS
+from .a2a_delivery import A2ATaskUpdates
 from .a2a_hooks import get_a2a_hook
 from .base import AgentHandler
 
 logger = logging.getLogger(__name__)
 
-_POLL_INITIAL = 0.5  # first status check after 500 ms
-_POLL_MAX = 2.0  # cap per interval
-_MAX_POLLS = 240  # 240 × avg ~2 s ≈ 8-minute budget
-
 # Maps raw A2A / LangGraph interrupt_type strings → canonical InterruptType.
 # Unknown values fall back to AGENT_CLARIFICATION.
 _A2A_INTERRUPT_TYPE_MAP: dict[str, InterruptType] = {
@@ -259,7 +260,7 @@ async def _fetch_auth_url_from_agent(
 
     connect_url = f"{transport_endpoint.rstrip('/')}/oauth/{path}/connect"
     try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
+        async with HTTP_CLIENTS.session(connect_url, timeout=5.0) as client:
             resp = await client.get(connect_url, params={"tenant_id": session_id})
             resp.raise_for_status()
             return resp.json().get("auth_url", "")
@@ -343,7 +344,9 @@ async def _build_oauth_interrupt(agent_id: str, session_id: str) -> InterruptEve
 
 def _a2a_progress_message(status: str, task_state: dict[str, Any]) -> str:
     if status == "working":
-        return "Agent is processing…"
+        # Streamed/pushed status updates may carry progress text.
+        msg = task_state.get("status", {}).get("message")
+        return (msg and _extract_text_from_message(msg)) or "Agent is processing…"
     if status == "submitted":
         return "Task submitted…"
     if status == "completed":
@@ -362,7 +365,8 @@ class A2AHandler(AgentHandler):
     """
     Handles A2A protocol agent calls.
 
-    Flow: POST message/send → poll tasks/get → handle input-required → result.
+    Flow: message/stream (or message/send + push / tasks/get polling)
+    → handle input-required → result.
     """
 
     async def send_task(
@@ -374,7 +378,7 @@ class A2AHandler(AgentHandler):
         config: RunnableConfig | None = None,
         call_id: str = "",
     ) -> Any:
-        """Send a task to an A2A agent and poll until completion or HITL."""
+        """Send a task to an A2A agent and follow it until completion or HITL."""
         endpoint = transport.get("endpoint", "").rstrip("/")
         message_id = str(uuid.uuid4())
         session_id = str(state.get("session_id", ""))
@@ -387,9 +391,7 @@ class A2AHandler(AgentHandler):
             task[:400],
         )
 
-        async with httpx.AsyncClient(
-            headers=self._auth_headers, timeout=httpx.Timeout(30.0)
-        ) as client:
+        async with self.http_session(endpoint, transport) as client:
             # Pass session_id in params.metadata so the downstream A2A agent can
             # look up the OAuth token it stored after the callback (keyed by session_id).
             # Optional data parts supplied by the registered A2A capability
@@ -403,169 +405,168 @@ class A2AHandler(AgentHandler):
             }
             if session_id:
                 params["metadata"] = {"session_id": session_id}
-            payload = {
-                "jsonrpc": "2.0",
-                "method": "message/send",
-                "params": params,
-                "id": message_id,
-            }
-            resp = await client.post(f"{endpoint}/", json=payload)
-            resp.raise_for_status()
-            data = resp.json()
-
-            task_id: str = (
-                data.get("result", {}).get("id") or data.get("id") or message_id
+            updates = A2ATaskUpdates(
+                client, endpoint, params, message_id, get_task=self._get_task
             )
+            last_progress: tuple[str, str] | None = None
+
+            async with contextlib.aclosing(aiter(updates)) as task_states:
+                async for task_state in task_states:
+                    task_id = updates.task_id
+                    status = task_state.get("status", {}).get("state", "unknown")
+
+                    # Forward every distinct (state, message) — streamed and
+                    # pushed updates carry intermediate progress text.
+                    progress = _a2a_progress_message(status, task_state)
+                    if (status, progress) != last_progress:
+                        last_progress = (status, progress)
+                        await self.emit_event(
+                            config,
+                            {
+                                "type": "invocation_progress",
+                                "call_id": call_id,
+                                "status": status,
+                                "message": progress,
+                            },
+                        )
 
-            last_poll_status: str | None = None
-            _interval = _POLL_INITIAL
-
-            for _ in range(_MAX_POLLS):
-                await asyncio.sleep(_interval)
-                _interval = min(_interval * 2, _POLL_MAX)
-                task_state = await self._get_task(client, endpoint, task_id)
-                status = task_state.get("status", {}).get("state", "unknown")
-
-                if status != last_poll_status:
-                    last_poll_status = status
-                    await self.emit_event(
-                        config,
-                        {
-                            "type": "invocation_progress",
-                            "call_id": call_id,
-                            "status": status,
-                            "message": _a2a_progress_message(status, task_state),
-                        },
-                    )
-
-                if status == "completed":
-                    result_text = self._extract_result(task_state)
-                    logger.info(
-                        "a2a_handler: ← completed agent=%s task=%s result_preview=%s",
-                        agent_id,
-                        task_id,
-                        result_text[:600],
-                    )
-                    return result_text
-
-                if status == "failed":
-                    raw_error = task_state.get("status", {}).get(
-                        "message", "Task failed"
-                    )
-                    error_text = _extract_text_from_message(raw_error)
-
-                    escaped = _parse_escaped_interrupt(error_text)
-                    if escaped:
+                    if status == "completed":
+                        result_text = self._extract_result(task_state)
                         logger.info(
-                            "a2a_handler: escaped LangGraph interrupt detected "
-                            "agent=%s task=%s type=%s",
+                            "a2a_handler: ← completed agent=%s task=%s result_preview=%s",
                             agent_id,
                             task_id,
-                            escaped.get("interrupt_type"),
+                            result_text[:600],
+                        )
+                        return result_text
+
+                    if status == "failed":
+                        raw_error = task_state.get("status", {}).get(
+                            "message", "Task failed"
                         )
-                        task_state = _escape_to_input_required(escaped, task_id)
-                        status = "input-required"
-                    else:
+                        error_text = _extract_text_from_message(raw_error)
+
+                        escaped = _parse_escaped_interrupt(error_text)
+                        if escaped:
+                            logger.info(
+                                "a2a_handler: escaped LangGraph interrupt detected "
+                                "agent=%s task=%s type=%s",
+                                agent_id,
+                                task_id,
+                                escaped.get("interrupt_type"),
+                            )
+                            task_state = _escape_to_input_required(escaped, task_id)
+                            status = "input-required"
+                        else:
+                            logger.warning(
+                                "a2a_handler: task failed agent=%s task=%s error=%r",
+                                agent_id,
+                                task_id,
+                                error_text[:200],
+                            )
+                            return f"Error: {error_text}"
+
+                    if status in ("canceled", "rejected"):
                         logger.warning(
-                            "a2a_handler: task failed agent=%s task=%s error=%r",
+                            "a2a_handler: task %s agent=%s task=%s",
+                            status,
                             agent_id,
                             task_id,
-                            error_text[:200],
                         )
-                        return f"Error: {error_text}"
-
-                if status == "auth-required":
-                    # The A2A agent explicitly signals it cannot proceed without OAuth.
-                    # Build an AGENT_OAUTH_CALLBACK interrupt from the agent's manifest
-                    # so the SuperAgent node-level handler triggers the standard OAuth
-                    # flow (user clicks → callback → token stored → task retried with
-                    # session_id in metadata → bearer found → task succeeds).
-                    logger.info(
-                        "a2a_handler: auth-required from A2A agent agent=%s task=%s",
-                        agent_id,
-                        task_id,
-                    )
-                    auth_event = await _build_oauth_interrupt(agent_id, session_id)
-                    from ..middleware.preflight import AuthInterruptRequired
-
-                    raise AuthInterruptRequired(auth_event)
-
-                if status == "input-required":
-                    interrupt_type, question, extra_meta = _classify_input_required(
-                        task_state
-                    )
-
-                    # The effective task_id for resume may differ from the polled
-                    # task_id when the interrupt escaped from a failed task.
-                    resume_task_id = task_state.get("_escaped_task_id") or task_id
-
-                    # Domain hook may auto-resume (e.g. lead-gen CRM_SETUP when
-                    # user intent already names a CRM) — else escalate to user.
-                    auto_answer = get_a2a_hook().auto_answer_interrupt(
-                        interrupt_type, task, state
-                    )
-                    if auto_answer is not None:
+                        return f"Error: Task {status}"
+
+                    if status == "auth-required":
+                        # The A2A agent explicitly signals it cannot proceed without OAuth.
+                        # Build an AGENT_OAUTH_CALLBACK interrupt from the agent's manifest
+                        # so the SuperAgent node-level handler triggers the standard OAuth
+                        # flow (user clicks → callback → token stored → task retried with
+                        # session_id in metadata → bearer found → task succeeds).
                         logger.info(
-                            "a2a_handler: hook auto-resume agent=%s task=%s type=%s",
+                            "a2a_handler: auth-required from A2A agent agent=%s task=%s",
+                            agent_id,
+                            task_id,
+                        )
+                        auth_event = await _build_oauth_interrupt(agent_id, session_id)
+                        from ..middleware.preflight import AuthInterruptRequired
+
+                        raise AuthInterruptRequired(auth_event)
+
+                    if status == "input-required":
+                        interrupt_type, question, extra_meta = _classify_input_required(
+                            task_state
+                        )
+
+                        # The effective task_id for resume may differ from the polled
+                        # task_id when the interrupt escaped from a failed task.
+                        resume_task_id = task_state.get("_escaped_task_id") or task_id
+
+                        # Domain hook may auto-resume (e.g. lead-gen CRM_SETUP when
+                        # user intent already names a CRM) — else escalate to user.
+                        auto_answer = get_a2a_hook().auto_answer_interrupt(
+                            interrupt_type, task, state
+                        )
+                        if auto_answer is not None:
+                            logger.info(
+                                "a2a_handler: hook auto-resume agent=%s task=%s type=%s",
+                                agent_id,
+                                resume_task_id,
+                                interrupt_type,
+                            )
+                            await self._send_clarification(
+                                client,
+                                endpoint,
+                                resume_task_id,
+                                auto_answer,
+                                session_id=session_id,
+                            )
+                            continue
+
+                        event = self._build_interrupt_event(
+                            interrupt_type=interrupt_type,
+                            question=question,
+                            agent_id=agent_id,
+                            session_id=session_id,
+                            task_id=resume_task_id,
+                            endpoint=endpoint,
+                            extra_meta=extra_meta,
+                        )
+
+                        logger.info(
+                            "a2a_handler: suspending graph agent=%s task=%s type=%s",
                             agent_id,
                             resume_task_id,
                             interrupt_type,
                         )
+                        user_answer = interrupt(event.model_dump())
+                        answer_text = _resume_value_to_text(user_answer)
+
+                        if (
+                            interrupt_type == InterruptType.HITL_APPROVAL
+                            and answer_text == "deny"
+                        ):
+                            logger.info(
+                                "a2a_handler: user denied action agent=%s task=%s",
+                                agent_id,
+                                resume_task_id,
+                            )
+                            return "Error: Action denied by user."
+
+                        logger.info(
+                            "a2a_handler: resuming A2A task agent=%s task=%s answer=%r",
+                            agent_id,
+                            resume_task_id,
+                            answer_text,
+                        )
                         await self._send_clarification(
                             client,
                             endpoint,
                             resume_task_id,
-                            auto_answer,
+                            answer_text,
                             session_id=session_id,
                         )
-                        continue
-
-                    event = self._build_interrupt_event(
-                        interrupt_type=interrupt_type,
-                        question=question,
-                        agent_id=agent_id,
-                        session_id=session_id,
-                        task_id=resume_task_id,
-                        endpoint=endpoint,
-                        extra_meta=extra_meta,
-                    )
-
-                    logger.info(
-                        "a2a_handler: suspending graph agent=%s task=%s type=%s",
-                        agent_id,
-                        resume_task_id,
-                        interrupt_type,
-                    )
-                    user_answer = interrupt(event.model_dump())
-                    answer_text = _resume_value_to_text(user_answer)
-
-                    if (
-                        interrupt_type == InterruptType.HITL_APPROVAL
-                        and answer_text == "deny"
-                    ):
-                        logger.info(
-                            "a2a_handler: user denied action agent=%s task=%s",
-                            agent_id,
-                            resume_task_id,
-                        )
-                        return "Error: Action denied by user."
-
-                    logger.info(
-                        "a2a_handler: resuming A2A task agent=%s task=%s answer=%r",
-                        agent_id,
-                        resume_task_id,
-                        answer_text,
-                    )
-                    await self._send_clarification(
-                        client,
-                        endpoint,
-                        resume_task_id,
-                        answer_text,
-                        session_id=session_id,
-                    )
-                    # Fall through — continue polling for completion.
-
-                # "working" | "submitted" → keep polling
+                        # Fall through — keep following updates until completion.
+
+                    # "working" | "submitted" → keep following updates
 
             return "Error: Task timed out"
 
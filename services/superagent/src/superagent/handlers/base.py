@@ -4,12 +4,16 @@ from __future__ import annotations
 
 import logging
 from abc import ABC
+from contextlib import AbstractAsyncContextManager
 from dataclasses import dataclass, field
 from typing import Any
 
+import httpx
 from langchain_core.callbacks.manager import adispatch_custom_event
 from langchain_core.runnables import RunnableConfig
 
+from ..clients.http_pool import HTTP_CLIENTS, timeout_profile
+
 logger = logging.getLogger(__name__)
 
 
@@ -37,6 +41,21 @@ class AgentHandler(ABC):  # noqa: B024
     def __init__(self, auth_headers: dict[str, str]) -> None:
         self._auth_headers = auth_headers
 
+    def http_session(
+        self,
+        url: str,
+        transport: dict[str, Any] | None = None,
+        *,
+        default_read: float | None = None,
+    ) -> AbstractAsyncContextManager[httpx.AsyncClient]:
+        """Pooled client for *url* with this handler's auth headers and the
+        agent's manifest timeout profile (see clients/http_pool.py)."""
+        return HTTP_CLIENTS.session(
+            url,
+            headers=self._auth_headers,
+            timeout=timeout_profile(transport, default_read=default_read),
+        )
+
     async def emit_event(
         self, config: RunnableConfig | None, event_data: dict[str, Any]
     ) -> None:
@@ -1,13 +1,17 @@
-"""MCPHandler — stateless MCP tool calls over SSE or STDIO transport."""
+"""MCPHandler — MCP tool calls over SSE or STDIO transport."""
 
 from __future__ import annotations
 
 import logging
 import os
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from pathlib import Path
 from typing import Any
 
 from .base import AgentHandler
+from .mcp_session_pool import MCP_SESSION_POOL, SessionOpener, session_key
+from .stdio_process_manager import STDIO_PROCESS_MANAGER
 
 try:
     from mcp import ClientSession
@@ -58,7 +62,10 @@ class MCPHandler(AgentHandler):
     """
     Handles MCP protocol agent calls.
 
-    Session lifecycle per call: initialize → call_tool → result.
+    Session lifecycle: initialize once → call_tool (reused) → idle eviction.
+    Sessions come from MCP_SESSION_POOL when ``mcp_session_pool_enabled``
+    (STDIO servers via STDIO_PROCESS_MANAGER, which caps and supervises the
+    resident processes); otherwise every call opens its own session.
     Transport: SSE (HTTP endpoint) or STDIO (command + args).
     """
 
@@ -72,9 +79,33 @@ class MCPHandler(AgentHandler):
         """Execute an MCP tool call and return the raw result."""
         transport_type = transport.get("type", "sse").upper()
         if transport_type == "STDIO":
-            return await self._call_stdio(capability_id, args, transport)
+            return await self._call_stdio(capability_id, args, transport, agent_id)
         return await self._call_sse(agent_id, capability_id, args, transport)
 
+    async def _call_session(
+        self,
+        agent_id: str,
+        capability_id: str,
+        args: dict[str, Any],
+        transport: dict[str, Any],
+        opener: SessionOpener,
+    ) -> Any:
+        """Run one tool call on a pooled (or one-shot) initialized session."""
+        from ..config import settings
+
+        if settings.mcp_session_pool_enabled:
+            result = await MCP_SESSION_POOL.call_tool(
+                session_key(agent_id, transport, self._auth_headers),
+                agent_id,
+                opener,
+                capability_id,
+                args,
+            )
+        else:
+            async with opener() as session:
+                result = await session.call_tool(capability_id, args)
+        return self._extract_content(result)
+
     async def _call_sse(
         self,
         agent_id: str,
@@ -96,13 +127,16 @@ class MCPHandler(AgentHandler):
             endpoint,
         )
 
-        async with (
-            sse_client(endpoint, headers=headers) as (read, write),
-            ClientSession(read, write) as session,
-        ):
-            await session.initialize()
-            result = await session.call_tool(capability_id, args)
-            return self._extract_content(result)
+        @asynccontextmanager
+        async def _open() -> AsyncIterator[Any]:
+            async with (
+                sse_client(endpoint, headers=headers) as (read, write),
+                ClientSession(read, write) as session,
+            ):
+                await session.initialize()
+                yield session
+
+        return await self._call_session(agent_id, capability_id, args, transport, _open)
 
     async def _call_sse_raw(
         self,
@@ -112,14 +146,11 @@ class MCPHandler(AgentHandler):
         transport: dict[str, Any],
     ) -> Any:
         """Fallback raw HTTP MCP call when mcp SDK not available."""
-        import httpx
-
         endpoint = transport.get("endpoint", "")
-        async with httpx.AsyncClient(headers=self._auth_headers) as client:
+        async with self.http_session(endpoint, transport, default_read=60.0) as client:
             resp = await client.post(
                 f"{endpoint}/tools/call",
                 json={"name": capability_id, "arguments": args},
-                timeout=60.0,
             )
             resp.raise_for_status()
             return resp.json()
@@ -129,6 +160,7 @@ class MCPHandler(AgentHandler):
         capability_id: str,
         args: dict[str, Any],
         transport: dict[str, Any],
+        agent_id: str = "",
     ) -> Any:
         """MCP over STDIO transport."""
         if stdio_client is None:
@@ -153,18 +185,40 @@ class MCPHandler(AgentHandler):
             sorted(resolved_env.keys()) if resolved_env else [],
         )
 
-        params = StdioServerParameters(
-            command=command, args=cmd_args, env=subprocess_env
-        )
-
-        async with (
-            stdio_client(params) as (read, write),
-            ClientSession(read, write) as session,
-        ):
-            await session.initialize()
-            result = await session.call_tool(capability_id, args)
+        @asynccontextmanager
+        async def _open_with_env(env: dict[str, str]) -> AsyncIterator[Any]:
+            params = StdioServerParameters(command=command, args=cmd_args, env=env)
+            async with (
+                stdio_client(params) as (read, write),
+                ClientSession(read, write) as session,
+            ):
+                await session.initialize()
+                yield session
+
+        from ..config import settings
+
+        agent_id = agent_id or command
+        if settings.mcp_session_pool_enabled:
+            # Warm, supervised server per (agent, user env) — see
+            # StdioProcessManager for the process cap and crash restarts.
+            result = await STDIO_PROCESS_MANAGER.call_tool(
+                session_key(agent_id, transport, self._auth_headers),
+                agent_id,
+                subprocess_env,
+                _open_with_env,
+                capability_id,
+                args,
+            )
             return self._extract_content(result)
 
+        return await self._call_session(
+            agent_id,
+            capability_id,
+            args,
+            transport,
+            lambda: _open_with_env(subprocess_env),
+        )
+
     @staticmethod
     def _extract_content(result: Any) -> Any:
         """Extract content from MCP CallToolResult."""
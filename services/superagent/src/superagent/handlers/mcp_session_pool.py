@@ -0,0 +1,371 @@
+"""MCPSessionPool — long-lived, initialized MCP client sessions.
+
+MCPHandler used to open a transport, run ``session.initialize()`` and tear it
+all down for every tool call (and spawn a fresh subprocess for STDIO agents).
+The pool keeps sessions open, keyed by (agent_id, transport, resolved
+credentials), so cheap tools only pay the JSON-RPC round trip.
+
+``sse_client`` / ``stdio_client`` are anyio context managers that must be
+entered and exited by the same task, so every pooled session is owned by a
+background task that holds the context open until the pool closes it. Other
+tasks share the session concurrently — MCP multiplexes requests by id.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import hashlib
+import json
+import logging
+import time
+from collections.abc import Callable
+from contextlib import AbstractAsyncContextManager
+from dataclasses import dataclass, field
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+SessionOpener = Callable[[], AbstractAsyncContextManager[Any]]
+
+_CONNECTION_CLOSED = -32000  # mcp_types.CONNECTION_CLOSED
+_PING_TIMEOUT_SECONDS = 5.0
+_CLOSE_TIMEOUT_SECONDS = 5.0
+
+try:
+    import anyio
+
+    _BROKEN_ERRORS: tuple[type[BaseException], ...] = (
+        anyio.ClosedResourceError,
+        anyio.BrokenResourceError,
+        anyio.EndOfStream,
+        BrokenPipeError,
+        ConnectionError,
+        EOFError,
+    )
+except ImportError:
+    _BROKEN_ERRORS = (BrokenPipeError, ConnectionError, EOFError)
+
+
+def session_key(
+    agent_id: str, transport: dict[str, Any], headers: dict[str, str]
+) -> str:
+    """Pool key: agent + transport shape + a digest of the resolved credentials.
+
+    Secrets (auth headers, vault-resolved env) are hashed — never held in the
+    key itself — but still split the pool so users never share a session.
+    """
+    material = {
+        "type": str(transport.get("type", "sse")).upper(),
+        "endpoint": transport.get("endpoint", ""),
+        "command": transport.get("command", ""),
+        "args": [str(a) for a in transport.get("args", []) or []],
+        "env": transport.get("resolved_env") or {},
+        "headers": headers,
+    }
+    digest = hashlib.sha256(
+        json.dumps(material, sort_keys=True, default=str).encode()
+    ).hexdigest()[:32]
+    return f"{agent_id}|{material['type']}|{digest}"
+
+
+def is_broken_session_error(exc: BaseException) -> bool:
+    """True when *exc* means the transport died (re-initialize and retry)."""
+    if isinstance(exc, _BROKEN_ERRORS):
+        return True
+    error = getattr(exc, "error", None)
+    code = getattr(error, "code", getattr(exc, "code", None))
+    return code == _CONNECTION_CLOSED
+
+
+@dataclass
+class _PooledSession:
+    key: str
+    agent_id: str
+    session: Any
+    owner: asyncio.Task[None]
+    stop: asyncio.Event
+    created_at: float = field(default_factory=time.monotonic)
+    last_used: float = field(default_factory=time.monotonic)
+    last_checked: float = field(default_factory=time.monotonic)
+    in_use: int = 0
+
+    @property
+    def alive(self) -> bool:
+        return not self.owner.done()
+
+
+class MCPSessionPool:
+    """Process-wide pool of initialized MCP ``ClientSession`` objects.
+
+    - single-flight open per key (concurrent first calls share one handshake)
+    - health check (``send_ping``) on checkout of a session idle for longer
+      than ``health_check_seconds``
+    - idle eviction by a background reaper after ``idle_ttl_seconds``
+    - at most ``max_sessions_per_agent`` sessions per agent; when every one is
+      busy the call runs on a one-shot session instead of waiting
+    - a broken transport is discarded and the call retried once on a freshly
+      initialized session
+    - a handshake that does not finish within ``connect_timeout_seconds``
+      raises ``TimeoutError`` and its transport is torn down
+    """
+
+    def __init__(
+        self,
+        *,
+        max_sessions_per_agent: int = 4,
+        idle_ttl_seconds: float = 300.0,
+        health_check_seconds: float = 30.0,
+        connect_timeout_seconds: float = 30.0,
+    ) -> None:
+        self.max_sessions_per_agent = max_sessions_per_agent
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.health_check_seconds = health_check_seconds
+        self.connect_timeout_seconds = connect_timeout_seconds
+        self._sessions: dict[str, _PooledSession] = {}
+        self._open_locks: dict[str, asyncio.Lock] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._reaper: asyncio.Task[None] | None = None
+
+    # ── Public API ────────────────────────────────────────────────────────────
+
+    async def call_tool(
+        self,
+        key: str,
+        agent_id: str,
+        opener: SessionOpener,
+        capability_id: str,
+        args: dict[str, Any],
+    ) -> Any:
+        """Run ``session.call_tool`` on a pooled session for *key*."""
+        self._bind_loop()
+        for attempt in (1, 2):
+            pooled = await self._checkout(key, agent_id, opener)
+            if pooled is None:
+                logger.debug(
+                    "MCP pool: agent=%s at capacity — one-shot session", agent_id
+                )
+                async with opener() as session:
+                    return await session.call_tool(capability_id, args)
+            pooled.in_use += 1
+            try:
+                return await pooled.session.call_tool(capability_id, args)
+            except Exception as exc:
+                if attempt == 2 or not is_broken_session_error(exc):
+                    raise
+                logger.info(
+                    "MCP pool: session for agent=%s broke (%s) — re-initializing",
+                    agent_id,
+                    type(exc).__name__,
+                )
+                await self._discard(pooled)
+            finally:
+                pooled.in_use -= 1
+                pooled.last_used = time.monotonic()
+        raise AssertionError("unreachable")  # pragma: no cover
+
+    async def warm(self, key: str, agent_id: str, opener: SessionOpener) -> bool:
+        """Open (or health-check) the session for *key* without calling a tool."""
+        self._bind_loop()
+        return await self._checkout(key, agent_id, opener) is not None
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._sessions
+
+    def idle_keys(self) -> list[str]:
+        """Keys of sessions not serving a call, least recently used first."""
+        idle = [p for p in self._sessions.values() if not p.in_use]
+        return [p.key for p in sorted(idle, key=lambda p: p.last_used)]
+
+    async def evict(self, key: str, *, force: bool = False) -> bool:
+        """Close the session for *key*; busy sessions only when *force* is set."""
+        pooled = self._sessions.get(key)
+        if pooled is None or (pooled.in_use and not force):
+            return False
+        await self._discard(pooled)
+        return True
+
+    def stats(self) -> dict[str, Any]:
+        """Snapshot for health/metrics endpoints."""
+        per_agent: dict[str, int] = {}
+        for p in self._sessions.values():
+            per_agent[p.agent_id] = per_agent.get(p.agent_id, 0) + 1
+        return {
+            "sessions": len(self._sessions),
+            "in_use": sum(1 for p in self._sessions.values() if p.in_use),
+            "per_agent": per_agent,
+        }
+
+    async def close(self) -> None:
+        """Close every pooled session (lifespan shutdown)."""
+        if self._reaper is not None:
+            self._reaper.cancel()
+            with contextlib.suppress(asyncio.CancelledError, RuntimeError):
+                await self._reaper
+            self._reaper = None
+        sessions = list(self._sessions.values())
+        self._sessions.clear()
+        await asyncio.gather(
+            *(self._stop_owner(p) for p in sessions), return_exceptions=True
+        )
+        self._open_locks.clear()
+
+    # ── Internals ─────────────────────────────────────────────────────────────
+
+    def _bind_loop(self) -> None:
+        """Sessions belong to the loop that opened them; drop them on a new loop."""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        if self._loop is not None:
+            logger.debug(
+                "MCP pool: event loop changed — dropping %d session(s)",
+                len(self._sessions),
+            )
+        self._loop = loop
+        self._sessions.clear()
+        self._open_locks.clear()
+        self._reaper = None
+
+    async def _checkout(
+        self, key: str, agent_id: str, opener: SessionOpener
+    ) -> _PooledSession | None:
+        lock = self._open_locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            pooled = self._sessions.get(key)
+            if pooled is not None and not await self._healthy(pooled):
+                await self._discard(pooled)
+                pooled = None
+            if pooled is not None:
+                return pooled
+            if not self._make_room(agent_id):
+                return None
+            pooled = await self._open(key, agent_id, opener)
+            self._sessions[key] = pooled
+            self._ensure_reaper()
+            return pooled
+
+    async def _healthy(self, pooled: _PooledSession) -> bool:
+        if not pooled.alive:
+            return False
+        now = time.monotonic()
+        if now - pooled.last_checked < self.health_check_seconds:
+            return True
+        try:
+            await asyncio.wait_for(
+                pooled.session.send_ping(), timeout=_PING_TIMEOUT_SECONDS
+            )
+        except Exception as exc:
+            logger.info(
+                "MCP pool: health check failed for agent=%s (%s)",
+                pooled.agent_id,
+                type(exc).__name__,
+            )
+            return False
+        pooled.last_checked = now
+        return True
+
+    def _make_room(self, agent_id: str) -> bool:
+        """Enforce max_sessions_per_agent; evict the LRU idle session if needed."""
+        mine = [p for p in self._sessions.values() if p.agent_id == agent_id]
+        if len(mine) < self.max_sessions_per_agent:
+            return True
+        idle = [p for p in mine if not p.in_use]
+        if not idle:
+            return False
+        victim = min(idle, key=lambda p: p.last_used)
+        self._sessions.pop(victim.key, None)
+        asyncio.get_running_loop().create_task(self._stop_owner(victim))
+        return True
+
+    async def _open(
+        self, key: str, agent_id: str, opener: SessionOpener
+    ) -> _PooledSession:
+        ready: asyncio.Future[Any] = asyncio.get_running_loop().create_future()
+        stop = asyncio.Event()
+
+        async def _own() -> None:
+            try:
+                async with opener() as session:
+                    ready.set_result(session)
+                    await stop.wait()
+            except asyncio.CancelledError:
+                if not ready.done():
+                    ready.cancel()
+                raise
+            except Exception as exc:
+                if not ready.done():
+                    ready.set_exception(exc)
+                else:
+                    logger.info(
+                        "MCP pool: session for agent=%s closed: %s", agent_id, exc
+                    )
+
+        owner = asyncio.create_task(_own(), name=f"mcp-session:{agent_id}")
+        try:
+            session = await asyncio.wait_for(
+                ready, timeout=self.connect_timeout_seconds
+            )
+        except BaseException:
+            # Timed out or the caller was cancelled: nothing will ever stop
+            # this owner, so close its transport now.
+            owner.cancel()
+            with contextlib.suppress(asyncio.CancelledError, Exception):
+                await owner
+            raise
+        logger.debug("MCP pool: opened session agent=%s key=%s", agent_id, key)
+        return _PooledSession(
+            key=key, agent_id=agent_id, session=session, owner=owner, stop=stop
+        )
+
+    async def _discard(self, pooled: _PooledSession) -> None:
+        if self._sessions.get(pooled.key) is pooled:
+            del self._sessions[pooled.key]
+        await self._stop_owner(pooled)
+
+    @staticmethod
+    async def _stop_owner(pooled: _PooledSession) -> None:
+        pooled.stop.set()
+        try:
+            await asyncio.wait_for(
+                asyncio.shield(pooled.owner), timeout=_CLOSE_TIMEOUT_SECONDS
+            )
+        except (TimeoutError, asyncio.CancelledError):
+            pooled.owner.cancel()
+        except Exception:
+            logger.debug("MCP pool: owner task ended with error", exc_info=True)
+
+    def _ensure_reaper(self) -> None:
+        if self._reaper is None or self._reaper.done():
+            self._reaper = asyncio.create_task(
+                self._reap_idle(), name="mcp-session-reaper"
+            )
+
+    async def _reap_idle(self) -> None:
+        interval = max(1.0, self.idle_ttl_seconds / 2)
+        while True:
+            await asyncio.sleep(interval)
+            now = time.monotonic()
+            for pooled in list(self._sessions.values()):
+                if pooled.in_use:
+                    continue
+                if not pooled.alive or now - pooled.last_used > self.idle_ttl_seconds:
+                    logger.debug(
+                        "MCP pool: evicting idle session agent=%s", pooled.agent_id
+                    )
+                    await self._discard(pooled)
+
+
+def _build_pool() -> MCPSessionPool:
+    from ..config import settings
+
+    return MCPSessionPool(
+        max_sessions_per_agent=settings.mcp_pool_max_sessions_per_agent,
+        idle_ttl_seconds=settings.mcp_pool_idle_ttl_seconds,
+        health_check_seconds=settings.mcp_pool_health_check_seconds,
+        connect_timeout_seconds=settings.mcp_pool_connect_timeout_seconds,
+    )
+
+
+# Module-level singleton
+MCP_SESSION_POOL = _build_pool()
@@ -0,0 +1,453 @@
+"""StdioProcessManager — warm, supervised STDIO MCP server processes.
+
+STDIO agents run as local child processes (``npx …``, ``python server.py``).
+MCP_SESSION_POOL already keeps their sessions open; this manager owns the
+process side of that:
+
+- one warm server per (agent_id, user env fingerprint) — the pool key already
+  splits on the vault-resolved env, so users never share a process that holds
+  another user's credentials
+- a global cap on resident server processes across all agents and users, with
+  LRU eviction of idle servers (calls beyond the cap with every server busy
+  run on a one-shot process)
+- a supervisor that notices crashed children and restarts them (bounded per
+  key, with backoff) instead of waiting for the next call to hit a dead pipe
+- RSS / CPU accounting per child (including the child's own descendants,
+  e.g. the ``node`` process an ``npx`` wrapper spawns)
+
+The MCP SDK's ``stdio_client`` does not expose the subprocess, so each
+spawn gets a unique ``ORCHA_MCP_PROCESS_TAG`` env var and the manager finds
+its PID by matching that tag in ``/proc/<pid>/environ``. Without ``/proc``
+(macOS dev boxes) supervision falls back to the pool's ping health check
+and usage figures are reported as ``None``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import hashlib
+import logging
+import os
+import time
+import uuid
+from collections.abc import AsyncIterator, Callable
+from contextlib import AbstractAsyncContextManager, asynccontextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from .mcp_session_pool import MCP_SESSION_POOL, MCPSessionPool, SessionOpener
+
+logger = logging.getLogger(__name__)
+
+PROCESS_TAG_ENV = "ORCHA_MCP_PROCESS_TAG"
+
+EnvSessionOpener = Callable[[dict[str, str]], AbstractAsyncContextManager[Any]]
+
+_PROC = Path("/proc")
+_RESTART_WINDOW_SECONDS = 300.0
+_RESTART_BACKOFF_BASE = 0.5
+_RESTART_BACKOFF_MAX = 30.0
+
+try:
+    _CLK_TCK = os.sysconf("SC_CLK_TCK")
+    _PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+except (AttributeError, ValueError, OSError):  # pragma: no cover — non-POSIX
+    _CLK_TCK = 100
+    _PAGE_SIZE = 4096
+
+
+def env_fingerprint(env: dict[str, str] | None) -> str:
+    """Short, non-reversible digest of a user's resolved env (for stats/logs)."""
+    if not env:
+        return "default"
+    material = "\n".join(f"{k}={v}" for k, v in sorted(env.items()))
+    return hashlib.sha256(material.encode()).hexdigest()[:12]
+
+
+# ── /proc helpers ─────────────────────────────────────────────────────────────
+
+
+def _read_stat(pid: int) -> tuple[str, int, int] | None:
+    """(state, ppid, utime+stime ticks) from /proc/<pid>/stat."""
+    try:
+        raw = (_PROC / str(pid) / "stat").read_text()
+    except OSError:
+        return None
+    # comm may contain spaces/parens — fields resume after the last ')'.
+    fields = raw[raw.rfind(")") + 2 :].split()
+    try:
+        return fields[0], int(fields[1]), int(fields[11]) + int(fields[12])
+    except (IndexError, ValueError):
+        return None
+
+
+def _process_table() -> dict[int, tuple[str, int, int]]:
+    table: dict[int, tuple[str, int, int]] = {}
+    try:
+        entries = list(_PROC.iterdir())
+    except OSError:
+        return table
+    for entry in entries:
+        if not entry.name.isdigit():
+            continue
+        stat = _read_stat(int(entry.name))
+        if stat is not None:
+            table[int(entry.name)] = stat
+    return table
+
+
+def _has_tag(pid: int, tag: str) -> bool:
+    try:
+        environ = (_PROC / str(pid) / "environ").read_bytes()
+    except OSError:
+        return False
+    return f"{PROCESS_TAG_ENV}={tag}".encode() in environ.split(b"\0")
+
+
+def find_tagged_child(tag: str) -> int | None:
+    """PID of this process's direct child spawned with *tag* in its env."""
+    me = os.getpid()
+    for pid, (_, ppid, _) in _process_table().items():
+        if ppid == me and _has_tag(pid, tag):
+            return pid
+    return None
+
+
+def process_alive(pid: int) -> bool:
+    """False once *pid* has exited (zombies awaiting reaping count as dead)."""
+    stat = _read_stat(pid)
+    if stat is None:
+        return not _PROC.is_dir() and _signal_alive(pid)
+    return stat[0] not in ("Z", "X")
+
+
+def _signal_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def process_tree_usage(
+    pid: int, table: dict[int, tuple[str, int, int]] | None = None
+) -> tuple[int, float] | None:
+    """(rss_bytes, cpu_seconds) summed over *pid* and its descendants."""
+    table = _process_table() if table is None else table
+    if pid not in table:
+        return None
+    children: dict[int, list[int]] = {}
+    for child, (_, ppid, _) in table.items():
+        children.setdefault(ppid, []).append(child)
+    rss = 0
+    ticks = 0
+    stack = [pid]
+    while stack:
+        current = stack.pop()
+        ticks += table[current][2]
+        try:
+            statm = (_PROC / str(current) / "statm").read_text().split()
+            rss += int(statm[1]) * _PAGE_SIZE
+        except (OSError, IndexError, ValueError):
+            pass
+        stack.extend(children.get(current, []))
+    return rss, ticks / _CLK_TCK
+
+
+# ── Manager ───────────────────────────────────────────────────────────────────
+
+
+@dataclass
+class _ChildProcess:
+    key: str
+    agent_id: str
+    tag: str
+    fingerprint: str
+    opener: SessionOpener
+    pid: int | None = None
+    started_at: float = field(default_factory=time.monotonic)
+    cpu_sample: tuple[float, float] | None = None  # (monotonic, cpu_seconds)
+
+
+class StdioProcessManager:
+    """Supervises the STDIO server processes behind MCP_SESSION_POOL sessions."""
+
+    def __init__(
+        self,
+        pool: MCPSessionPool,
+        *,
+        max_processes: int = 16,
+        max_restarts: int = 3,
+        supervise_interval_seconds: float = 5.0,
+    ) -> None:
+        self.pool = pool
+        self.max_processes = max_processes
+        self.max_restarts = max_restarts
+        self.supervise_interval_seconds = supervise_interval_seconds
+        self._children: dict[str, _ChildProcess] = {}
+        self._crashes: dict[str, list[float]] = {}
+        self._restarting: set[str] = set()
+        # Keys holding a process slot while their server is being opened
+        # (refcounted — concurrent callers for one key share the slot).
+        self._reserved: dict[str, int] = {}
+        self._room_lock: asyncio.Lock | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._supervisor: asyncio.Task[None] | None = None
+
+    # ── Public API ────────────────────────────────────────────────────────────
+
+    async def call_tool(
+        self,
+        key: str,
+        agent_id: str,
+        env: dict[str, str],
+        open_session: EnvSessionOpener,
+        capability_id: str,
+        args: dict[str, Any],
+    ) -> Any:
+        """Run a tool on the warm server for *key*, spawning it if needed.
+
+        *open_session* opens an initialized ClientSession for a subprocess
+        started with the given env; the manager adds the process tag.
+        """
+        self._bind_loop()
+        opener = self._tracked_opener(key, agent_id, env, open_session)
+        if key in self.pool:
+            self._ensure_supervisor()
+            return await self.pool.call_tool(key, agent_id, opener, capability_id, args)
+        if not await self._make_room(key):
+            logger.info(
+                "STDIO manager: %d servers resident and busy — one-shot for agent=%s",
+                len(self._children),
+                agent_id,
+            )
+            async with open_session(env) as session:
+                return await session.call_tool(capability_id, args)
+        self._ensure_supervisor()
+        try:
+            return await self.pool.call_tool(key, agent_id, opener, capability_id, args)
+        finally:
+            self._release(key)
+
+    def stats(self) -> list[dict[str, Any]]:
+        """Per-child snapshot (RSS/CPU) for the MCP health endpoint."""
+        table = _process_table() if _PROC.is_dir() else {}
+        now = time.monotonic()
+        out: list[dict[str, Any]] = []
+        for child in self._children.values():
+            rss: int | None = None
+            cpu_seconds: float | None = None
+            cpu_percent: float | None = None
+            usage = process_tree_usage(child.pid, table) if child.pid else None
+            if usage is not None:
+                rss, cpu_seconds = usage
+                if child.cpu_sample is not None and now > child.cpu_sample[0]:
+                    cpu_percent = round(
+                        100.0
+                        * (cpu_seconds - child.cpu_sample[1])
+                        / (now - child.cpu_sample[0]),
+                        1,
+                    )
+                child.cpu_sample = (now, cpu_seconds)
+            out.append(
+                {
+                    "agent_id": child.agent_id,
+                    "env_fingerprint": child.fingerprint,
+                    "pid": child.pid,
+                    "uptime_seconds": round(now - child.started_at, 1),
+                    "restarts": len(self._recent_crashes(child.key, now)),
+                    "rss_bytes": rss,
+                    "cpu_seconds": cpu_seconds,
+                    "cpu_percent": cpu_percent,
+                }
+            )
+        return out
+
+    async def close(self) -> None:
+        """Stop supervising (the pool itself closes the sessions/processes)."""
+        if self._supervisor is not None:
+            self._supervisor.cancel()
+            with contextlib.suppress(asyncio.CancelledError, RuntimeError):
+                await self._supervisor
+            self._supervisor = None
+        self._crashes.clear()
+
+    # ── Internals ─────────────────────────────────────────────────────────────
+
+    def _bind_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        self._loop = loop
+        self._children.clear()
+        self._restarting.clear()
+        self._reserved.clear()
+        self._room_lock = asyncio.Lock()
+        self._supervisor = None
+
+    def _tracked_opener(
+        self,
+        key: str,
+        agent_id: str,
+        env: dict[str, str],
+        open_session: EnvSessionOpener,
+    ) -> SessionOpener:
+        fingerprint = env_fingerprint(env)
+
+        @asynccontextmanager
+        async def _open() -> AsyncIterator[Any]:
+            tag = uuid.uuid4().hex
+            child = _ChildProcess(
+                key=key,
+                agent_id=agent_id,
+                tag=tag,
+                fingerprint=fingerprint,
+                opener=_open,
+            )
+            async with open_session({**env, PROCESS_TAG_ENV: tag}) as session:
+                child.pid = find_tagged_child(tag) if _PROC.is_dir() else None
+                self._children[key] = child
+                logger.debug(
+                    "STDIO manager: agent=%s pid=%s env=%s started",
+                    agent_id,
+                    child.pid,
+                    fingerprint,
+                )
+                try:
+                    yield session
+                finally:
+                    if self._children.get(key) is child:
+                        del self._children[key]
+
+        return _open
+
+    async def _make_room(self, key: str) -> bool:
+        """Reserve a process slot for *key*, evicting the LRU idle server if full.
+
+        The slot is held from here until ``_release`` — i.e. through the
+        server open — so concurrent cold starts can never overshoot
+        max_processes between the check and the spawn.
+        """
+        assert self._room_lock is not None
+        async with self._room_lock:
+            if key in self._reserved or key in self._children:
+                self._reserved[key] = self._reserved.get(key, 0) + 1
+                return True
+            resident = len(self._children.keys() | self._reserved.keys())
+            if resident >= self.max_processes:
+                for idle in self.pool.idle_keys():
+                    if idle in self._children and await self.pool.evict(idle):
+                        logger.debug("STDIO manager: evicted LRU server key=%s", idle)
+                        break
+                else:
+                    return False
+            self._reserved[key] = 1
+            return True
+
+    def _release(self, key: str) -> None:
+        remaining = self._reserved.get(key, 0) - 1
+        if remaining > 0:
+            self._reserved[key] = remaining
+        else:
+            self._reserved.pop(key, None)
+
+    def _recent_crashes(self, key: str, now: float) -> list[float]:
+        crashes = [
+            t for t in self._crashes.get(key, []) if now - t < _RESTART_WINDOW_SECONDS
+        ]
+        if crashes:
+            self._crashes[key] = crashes
+        else:
+            self._crashes.pop(key, None)
+        return crashes
+
+    def _ensure_supervisor(self) -> None:
+        if self._supervisor is None or self._supervisor.done():
+            self._supervisor = asyncio.create_task(
+                self._supervise(), name="mcp-stdio-supervisor"
+            )
+
+    async def _supervise(self) -> None:
+        while True:
+            await asyncio.sleep(self.supervise_interval_seconds)
+            await self.check_children()
+
+    async def check_children(self) -> None:
+        """One supervisor pass: restart every child whose process has exited.
+
+        Restarts run concurrently, so one child's backoff never delays the
+        others.
+        """
+        dead = [
+            child
+            for child in list(self._children.values())
+            if child.pid is not None
+            and not process_alive(child.pid)
+            and child.key not in self._restarting
+        ]
+        await asyncio.gather(*(self._supervised_restart(child) for child in dead))
+
+    async def _supervised_restart(self, child: _ChildProcess) -> None:
+        self._restarting.add(child.key)
+        try:
+            await self._restart(child)
+        except Exception:
+            logger.exception(
+                "STDIO manager: restart of agent=%s failed", child.agent_id
+            )
+        finally:
+            self._restarting.discard(child.key)
+
+    async def _restart(self, child: _ChildProcess) -> None:
+        now = time.monotonic()
+        crashes = self._recent_crashes(child.key, now)
+        logger.warning(
+            "STDIO manager: server for agent=%s (pid=%s) exited — %d recent crash(es)",
+            child.agent_id,
+            child.pid,
+            len(crashes),
+        )
+        await self.pool.evict(child.key, force=True)
+        if self._children.get(child.key) is child:
+            del self._children[child.key]
+        if len(crashes) >= self.max_restarts:
+            logger.error(
+                "STDIO manager: agent=%s crashed %d times in %.0fs — not restarting",
+                child.agent_id,
+                len(crashes),
+                _RESTART_WINDOW_SECONDS,
+            )
+            return
+        self._crashes[child.key] = [*crashes, now]
+        await asyncio.sleep(
+            min(_RESTART_BACKOFF_BASE * 2 ** len(crashes), _RESTART_BACKOFF_MAX)
+        )
+        if not await self._make_room(child.key):
+            return
+        try:
+            await self.pool.warm(child.key, child.agent_id, child.opener)
+        except Exception as exc:
+            logger.warning(
+                "STDIO manager: restart of agent=%s failed: %s", child.agent_id, exc
+            )
+        finally:
+            self._release(child.key)
+
+
+def _build_manager() -> StdioProcessManager:
+    from ..config import settings
+
+    return StdioProcessManager(
+        MCP_SESSION_POOL,
+        max_processes=settings.mcp_stdio_max_processes,
+        max_restarts=settings.mcp_stdio_max_restarts,
+        supervise_interval_seconds=settings.mcp_stdio_supervise_seconds,
+    )
+
+
+# Module-level singleton
+STDIO_PROCESS_MANAGER = _build_manager()
@@ -23,12 +23,14 @@ _pnd_client: Any = None
 _scheduler: Any = None
 # AsyncRedisSaver.from_conn_string() is an async context manager — keep it open for app lifetime
 _redis_checkpointer_cm: Any = None
+_manifest_consumer: Any = None
+_ledger: Any = None
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):  # type: ignore[type-arg]
     """Application lifespan — startup and graceful shutdown."""
-    global _pnd_client, _scheduler, _redis_checkpointer_cm
+    global _pnd_client, _scheduler, _redis_checkpointer_cm, _manifest_consumer, _ledger
 
     setup_logging("superagent", settings.log_level)
 
@@ -45,6 +47,15 @@ async def lifespan(app: FastAPI):  # type: ignore[type-arg]
 
     logger.info("Starting SuperAgent service")
 
+    # 0. Shared database client — connect eagerly so the first request doesn't
+    # pay for it; a down database only degrades the persistence paths.
+    from .persistence.db import DB
+
+    try:
+        await DB.connect()
+    except Exception:
+        logger.exception("Database connect failed — will retry on first use")
+
     # 1. Seed platform system MCP tools into Registry, then build boot-time baseline cache
     from .clients.registry_client import RegistryClient
     from .startup.platform_mcp_baseline import load_baseline_from_manifests
@@ -131,6 +142,11 @@ async def lifespan(app: FastAPI):  # type: ignore[type-arg]
     app.state.runner = SessionRunner(graph)
     logger.info("LangGraph graph compiled and runner initialised")
 
+    # Settlement records agent outcomes in memory; flushed in batches.
+    from .pricing.agent_metrics import AGENT_METRICS
+
+    AGENT_METRICS.start(settings.agent_metrics_flush_seconds)
+
     # 4. Workflow scheduler
     from .workflow.scheduler import WorkflowScheduler
 
@@ -144,7 +160,9 @@ async def lifespan(app: FastAPI):  # type: ignore[type-arg]
         from .middleware.audit_ledger import LedgerObserver
         from .middleware.observers import set_observer
 
-        set_observer(LedgerObserver())
+        _ledger = LedgerObserver()
+        _ledger.start_checkpoints(settings.audit_ledger_checkpoint_seconds)
+        set_observer(_ledger)
         logger.info("Audit ledger observer installed (AUDIT_LEDGER_ENABLED=true)")
 
     if settings.cdv_verification_enabled:
@@ -152,6 +170,29 @@ async def lifespan(app: FastAPI):  # type: ignore[type-arg]
 
         install_cdv_observer()
 
+    # 6. Manifest cache push invalidation (optional — TTL expiry still applies)
+    if settings.kafka_enabled and settings.kafka_bootstrap_servers:
+        try:
+            from .middleware.manifest_events import ManifestInvalidationConsumer
+
+            _manifest_consumer = ManifestInvalidationConsumer(
+                settings.kafka_bootstrap_servers
+            )
+            await _manifest_consumer.start()
+            logger.info("Manifest invalidation consumer started")
+        except Exception:
+            logger.exception("Manifest invalidation consumer failed to start")
+            _manifest_consumer = None
+
+    # 7. Step event producer (validator fan-out) — one batching producer
+    if settings.kafka_enabled and settings.kafka_bootstrap_servers:
+        from .middleware.step_events import STEP_EVENTS
+
+        try:
+            await STEP_EVENTS.start()
+        except Exception:
+            logger.exception("Step event producer failed to start")
+
     logger.info("SuperAgent ready on port %d", settings.port)
 
     yield  # ── app is running ──
@@ -168,9 +209,37 @@ async def lifespan(app: FastAPI):  # type: ignore[type-arg]
         await _scheduler.stop()
     if _pnd_client:
         await _pnd_client.stop()
+    if _manifest_consumer:
+        await _manifest_consumer.stop()
+    from .middleware.step_events import STEP_EVENTS
+
+    await STEP_EVENTS.close()
+    if _ledger:
+        await _ledger.aclose()
     from .middleware.manifest_cache import MANIFEST_CACHE
 
     await MANIFEST_CACHE.close()
+    from .pnd.gate import close_gate_embedding_cache
+
+    await close_gate_embedding_cache()
+    from .handlers.mcp_session_pool import MCP_SESSION_POOL
+    from .handlers.stdio_process_manager import STDIO_PROCESS_MANAGER
+
+    await STDIO_PROCESS_MANAGER.close()
+    await MCP_SESSION_POOL.close()
+    from .clients.http_pool import HTTP_CLIENTS
+
+    await HTTP_CLIENTS.aclose()
+    from .pricing.credit_ledger import CREDITS
+
+    await CREDITS.aclose()
+    from .pricing.agent_metrics import AGENT_METRICS
+
+    await AGENT_METRICS.aclose()
+    from .persistence.transcript_store import TRANSCRIPT_WRITES
+
+    await TRANSCRIPT_WRITES.aclose()
+    await DB.aclose()
     logger.info("SuperAgent shutdown complete")
 
 
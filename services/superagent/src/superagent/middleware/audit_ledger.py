@@ -5,6 +5,19 @@ completed execution step to the ``audit_ledger`` table. Each row carries a
 ``content_hash`` over the canonical row content plus the previous row's hash
 (``prev_hash``), forming a tamper-evident chain.
 
+Layout: every session has its own chain (``chain_id`` = session id, or
+``_system`` for session-less rows) numbered by ``chain_seq``. Rows written
+before chains were split form the legacy chain ``chain_id = ""``. Concurrent
+sessions therefore never contend for one global tip. Appends are queued
+in-process and written in batches, one transaction per batch, under a
+per-chain Postgres advisory lock so replicas cannot fork a chain. A periodic
+checkpoint rolls the tips of chains that advanced since the previous
+checkpoint — plus that checkpoint's root — into a Merkle root stored in
+``audit_ledger_checkpoints``, so the set of chains is tamper-evident too.
+Batches hold a shared checkpoint lock and stamp ``created_at`` from the
+database clock only once they have it, so every row lands at or after the
+window of any checkpoint that could have missed it.
+
 Design contract (dev-srs FR-7 / NFR 6.3):
 
 - DB append is the source of truth — no Kafka dependency.
@@ -18,12 +31,17 @@ Design contract (dev-srs FR-7 / NFR 6.3):
 
 from __future__ import annotations
 
+import asyncio
+import contextlib
 import hashlib
 import json
 import logging
+from dataclasses import dataclass, field
 from datetime import UTC, datetime
 from typing import Any
 
+from ..config import settings
+from ..persistence.db import use_db
 from .observers import StepResult
 
 logger = logging.getLogger(__name__)
@@ -31,6 +49,18 @@ logger = logging.getLogger(__name__)
 ENTRY_TYPE_STEP = "step_complete"
 ENTRY_TYPE_HITL_DECISION = "hitl_decision"
 
+LEGACY_CHAIN_ID = ""
+SYSTEM_CHAIN_ID = "_system"
+
+# Advisory-lock key serialising checkpoint creation across replicas. Batches
+# take it shared, a checkpoint exclusively, so a checkpoint never runs while a
+# stamped batch is still uncommitted.
+_CHECKPOINT_LOCK = "audit_ledger:checkpoint"
+# Database clock truncated to the millisecond precision of ``timestamp(3)``.
+_DB_NOW_MS_SQL = (
+    "SELECT floor(extract(epoch FROM clock_timestamp()) * 1000)::bigint AS ms"
+)
+
 # Fields covered by the content hash for step rows (FR-7.2).
 _HASH_FIELDS = (
     "entry_type",
@@ -68,10 +98,17 @@ def compute_content_hash(row: dict[str, Any]) -> str:
     return "sha256:" + hashlib.sha256(canonical.encode("utf-8")).hexdigest()
 
 
-def verify_chain(entries: list[dict[str, Any]]) -> bool:
-    """Verify a sequence of ledger rows (in append order) forms a valid chain."""
+def chain_id_for(session_id: str) -> str:
+    """Chain a row belongs to: one chain per session."""
+    return session_id or SYSTEM_CHAIN_ID
+
+
+def _verify_one_chain(entries: list[dict[str, Any]]) -> bool:
     prev_hash = ""
-    for entry in entries:
+    for index, entry in enumerate(entries, start=1):
+        seq = entry.get("chain_seq")
+        if seq is not None and seq != index:
+            return False
         if entry.get("prev_hash", "") != prev_hash:
             return False
         if compute_content_hash(entry) != entry.get("content_hash"):
@@ -80,6 +117,75 @@ def verify_chain(entries: list[dict[str, Any]]) -> bool:
     return True
 
 
+def verify_chain(entries: list[dict[str, Any]]) -> bool:
+    """Verify ledger rows form valid, complete hash chains.
+
+    Rows are grouped by ``chain_id`` (rows without one form a single legacy
+    chain) and each chain is checked in ``chain_seq`` order when present,
+    otherwise in the order given. Every chain must start at ``chain_seq`` 1
+    with an empty ``prev_hash`` and have no gaps.
+    """
+    chains: dict[str, list[dict[str, Any]]] = {}
+    for entry in entries:
+        chains.setdefault(entry.get("chain_id", LEGACY_CHAIN_ID), []).append(entry)
+    for rows in chains.values():
+        if all(r.get("chain_seq") is not None for r in rows):
+            rows = sorted(rows, key=lambda r: r["chain_seq"])
+        if not _verify_one_chain(rows):
+            return False
+    return True
+
+
+def _merkle_leaf(data: str) -> bytes:
+    return hashlib.sha256(b"\x00" + data.encode("utf-8")).digest()
+
+
+def merkle_root(leaves: list[bytes]) -> str:
+    """``sha256:<hex>`` Merkle root; odd levels duplicate their last node."""
+    if not leaves:
+        return "sha256:" + hashlib.sha256(b"").hexdigest()
+    level = list(leaves)
+    while len(level) > 1:
+        if len(level) % 2:
+            level.append(level[-1])
+        level = [
+            hashlib.sha256(b"\x01" + level[i] + level[i + 1]).digest()
+            for i in range(0, len(level), 2)
+        ]
+    return "sha256:" + level[0].hex()
+
+
+def compute_checkpoint_root(prev_root: str, tips: dict[str, list[Any]]) -> str:
+    """Merkle root over the previous checkpoint root and chain tips.
+
+    *tips* maps ``chain_id`` → ``[chain_seq, content_hash]``; leaves are taken
+    in ``chain_id`` order so the root is reproducible offline.
+    """
+    leaves = [_merkle_leaf(f"prev:{prev_root}")]
+    for chain_id in sorted(tips):
+        seq, content_hash = tips[chain_id]
+        leaves.append(_merkle_leaf(f"tip:{chain_id}:{seq}:{content_hash}"))
+    return merkle_root(leaves)
+
+
+def verify_checkpoints(
+    checkpoints: list[dict[str, Any]], *, prev_root: str = ""
+) -> bool:
+    """Verify checkpoints (oldest first) link up and their roots recompute.
+
+    *prev_root* is the root of the checkpoint before the first one given, so
+    a long history can be verified page by page.
+    """
+    for checkpoint in checkpoints:
+        if checkpoint.get("prev_root", "") != prev_root:
+            return False
+        root = compute_checkpoint_root(prev_root, checkpoint.get("tips") or {})
+        if root != checkpoint.get("merkle_root"):
+            return False
+        prev_root = root
+    return True
+
+
 def _parse_completed_at(raw: str) -> datetime:
     try:
         parsed = datetime.fromisoformat(raw)
@@ -90,32 +196,59 @@ def _parse_completed_at(raw: str) -> datetime:
         return datetime.now(UTC)
 
 
+async def _db_now(tx: Any) -> datetime:
+    """Current database time, millisecond precision, from inside *tx*."""
+    rows = await tx.query_raw(_DB_NOW_MS_SQL)
+    return datetime.fromtimestamp(int(rows[0]["ms"]) / 1000, UTC)
+
+
+@dataclass
+class _PendingAppend:
+    row: dict[str, Any]
+    completed_at: datetime
+    done: asyncio.Future[dict[str, Any] | None] = field(repr=False)
+
+
 class LedgerObserver:
     """ExecutionObserver that appends each StepResult to the audit ledger.
 
     A single instance is installed process-wide at SuperAgent boot when
-    ``AUDIT_LEDGER_ENABLED=true``. Owns its Prisma connection lazily so a
-    missing database degrades to log-only behaviour (fail closed).
+    ``AUDIT_LEDGER_ENABLED=true``. Uses the shared pooled client so a missing
+    database degrades to log-only behaviour (fail closed).
+
+    ``append`` queues the row and waits for the batch that persists it, so a
+    non-None return still means the row is durable.
     """
 
-    def __init__(self, db: Any = None) -> None:
+    def __init__(
+        self,
+        db: Any = None,
+        *,
+        batch_size: int | None = None,
+        linger_ms: int | None = None,
+    ) -> None:
         self._db = db
-        self._owns_db = db is None
-
-    async def _ensure_db(self) -> Any:
-        if self._db is None:
-            from src.generated_client import Prisma
-
-            self._db = Prisma()
-        if self._owns_db and not self._db.is_connected():
-            await self._db.connect()
-        return self._db
-
-    async def _current_tip_hash(self, db: Any) -> str:
-        tip = await db.auditledgerentry.find_first(
-            order=[{"created_at": "desc"}, {"id": "desc"}]
-        )
-        return tip.content_hash if tip else ""
+        self.batch_size = max(1, batch_size or settings.audit_ledger_batch_size)
+        self.linger_seconds = (
+            settings.audit_ledger_linger_ms if linger_ms is None else linger_ms
+        ) / 1000
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._queue: asyncio.Queue[_PendingAppend] | None = None
+        self._writer: asyncio.Task[None] | None = None
+        self._checkpointer: asyncio.Task[None] | None = None
+        self.batches = 0
+        self.rows_written = 0
+        self.failed = 0
+
+    def _ensure_writer(self) -> asyncio.Queue[_PendingAppend]:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._queue is None:
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._writer = loop.create_task(
+                self._write_loop(), name="audit-ledger-writer"
+            )
+        return self._queue
 
     async def append(
         self,
@@ -137,8 +270,6 @@ class LedgerObserver:
         Never raises — ledger failures must not break the caller.
         """
         try:
-            db = await self._ensure_db()
-            prev_hash = await self._current_tip_hash(db)
             ts = completed_at or datetime.now(UTC)
             # Postgres TIMESTAMP(3) stores milliseconds — truncate so the hash
             # matches the row when read back from the DB for verification.
@@ -155,31 +286,16 @@ class LedgerObserver:
                 "session_id": session_id,
                 "completed_at": ts.isoformat(),
                 "payload": payload,
-                "prev_hash": prev_hash,
+                "chain_id": chain_id_for(session_id),
             }
-            row["content_hash"] = compute_content_hash(row)
-
-            from src.generated_client.fields import Json as PrismaJson
-
-            data: dict[str, Any] = {
-                "entry_type": entry_type,
-                "call_id": call_id,
-                "agent_id": agent_id,
-                "capability_id": capability_id,
-                "protocol": protocol,
-                "success": success,
-                "latency_ms": latency_ms,
-                "session_id": session_id,
-                "completed_at": ts,
-                "content_hash": row["content_hash"],
-                "prev_hash": prev_hash,
-            }
-            if verdict is not None:
-                data["verdict"] = PrismaJson(verdict)
-            if payload is not None:
-                data["payload"] = PrismaJson(payload)
-            await db.auditledgerentry.create(data=data)
-            return row
+            queue = self._ensure_writer()
+            pending = _PendingAppend(
+                row=row,
+                completed_at=ts,
+                done=asyncio.get_running_loop().create_future(),
+            )
+            queue.put_nowait(pending)
+            return await asyncio.shield(pending.done)
         except Exception:
             logger.exception(
                 "Audit ledger append failed (entry_type=%s call_id=%s); continuing",
@@ -188,6 +304,191 @@ class LedgerObserver:
             )
             return None
 
+    async def _write_loop(self) -> None:
+        assert self._queue is not None
+        queue = self._queue
+        while True:
+            batch = [await queue.get()]
+            if self.linger_seconds > 0 and queue.qsize() < self.batch_size - 1:
+                await asyncio.sleep(self.linger_seconds)
+            while len(batch) < self.batch_size and not queue.empty():
+                batch.append(queue.get_nowait())
+            try:
+                rows = await self._write_batch(batch)
+            except Exception:
+                self.failed += len(batch)
+                logger.exception(
+                    "Audit ledger batch append failed (%d row(s)); continuing",
+                    len(batch),
+                )
+                rows = [None] * len(batch)
+            else:
+                self.batches += 1
+                self.rows_written += len(rows)
+            for pending, row in zip(batch, rows, strict=True):
+                if not pending.done.done():
+                    pending.done.set_result(row)
+                queue.task_done()
+
+    async def _write_batch(self, batch: list[_PendingAppend]) -> list[dict[str, Any]]:
+        """Chain and insert *batch* in one transaction."""
+        from src.generated_client.fields import Json as PrismaJson
+
+        chains = sorted({p.row["chain_id"] for p in batch})
+        async with use_db(self._db) as db, db.tx() as tx:
+            # Sorted lock order → no deadlocks between replicas' batches.
+            for chain_id in chains:
+                await tx.execute_raw(
+                    "SELECT pg_advisory_xact_lock(hashtext($1))", chain_id
+                )
+            tips: dict[str, tuple[int, str]] = {}
+            for chain_id in chains:
+                tip = await tx.auditledgerentry.find_first(
+                    where={"chain_id": chain_id}, order={"chain_seq": "desc"}
+                )
+                tips[chain_id] = (tip.chain_seq, tip.content_hash) if tip else (0, "")
+            # Stamp only once no checkpoint can be mid-flight: the default
+            # (transaction start) could predate a window already checkpointed.
+            await tx.execute_raw(
+                "SELECT pg_advisory_xact_lock_shared(hashtext($1))", _CHECKPOINT_LOCK
+            )
+            created_at = await _db_now(tx)
+
+            rows: list[dict[str, Any]] = []
+            data: list[dict[str, Any]] = []
+            for pending in batch:
+                chain_id = pending.row["chain_id"]
+                seq, prev_hash = tips[chain_id]
+                row = {**pending.row, "chain_seq": seq + 1, "prev_hash": prev_hash}
+                row["content_hash"] = compute_content_hash(row)
+                tips[chain_id] = (seq + 1, row["content_hash"])
+                rows.append(row)
+
+                record: dict[str, Any] = {
+                    key: row[key]
+                    for key in (
+                        "entry_type",
+                        "call_id",
+                        "agent_id",
+                        "capability_id",
+                        "protocol",
+                        "success",
+                        "latency_ms",
+                        "session_id",
+                        "chain_id",
+                        "chain_seq",
+                        "content_hash",
+                        "prev_hash",
+                    )
+                }
+                record["completed_at"] = pending.completed_at
+                record["created_at"] = created_at
+                if row["verdict"] is not None:
+                    record["verdict"] = PrismaJson(row["verdict"])
+                if row["payload"] is not None:
+                    record["payload"] = PrismaJson(row["payload"])
+                data.append(record)
+            await tx.auditledgerentry.create_many(data=data)
+        return rows
+
+    async def checkpoint(self) -> dict[str, Any] | None:
+        """Roll chain tips that advanced since the last checkpoint into a Merkle root.
+
+        The window is ``[window_start, window_end)`` on ``created_at``.
+
+        Returns the stored checkpoint, or None when nothing changed.
+        """
+        from src.generated_client.fields import Json as PrismaJson
+
+        async with use_db(self._db) as db, db.tx() as tx:
+            await tx.execute_raw(
+                "SELECT pg_advisory_xact_lock(hashtext($1))", _CHECKPOINT_LOCK
+            )
+            last = await tx.auditledgercheckpoint.find_first(
+                order={"window_end": "desc"}
+            )
+            window_start = last.window_end if last else datetime.fromtimestamp(0, UTC)
+            # Every batch stamped before this instant has committed (it held
+            # the lock shared); later ones stamp at or after it.
+            window_end = await _db_now(tx)
+            if window_end <= window_start:
+                return None
+            tip_rows = await tx.query_raw(
+                """
+                SELECT DISTINCT ON (chain_id) chain_id, chain_seq, content_hash
+                FROM audit_ledger
+                WHERE created_at >= $1::timestamp(3) AND created_at < $2::timestamp(3)
+                ORDER BY chain_id, chain_seq DESC
+                """,
+                window_start.replace(tzinfo=None).isoformat(),
+                window_end.replace(tzinfo=None).isoformat(),
+            )
+            if not tip_rows:
+                return None
+            tips = {
+                r["chain_id"]: [int(r["chain_seq"]), r["content_hash"]]
+                for r in tip_rows
+            }
+            prev_root = last.merkle_root if last else ""
+            checkpoint = {
+                "merkle_root": compute_checkpoint_root(prev_root, tips),
+                "prev_root": prev_root,
+                "tips": tips,
+                "chain_count": len(tips),
+                "window_start": window_start,
+                "window_end": window_end,
+            }
+            await tx.auditledgercheckpoint.create(
+                data={**checkpoint, "tips": PrismaJson(tips)}
+            )
+        logger.info(
+            "Audit ledger checkpoint %s over %d chain(s)",
+            checkpoint["merkle_root"],
+            checkpoint["chain_count"],
+        )
+        return checkpoint
+
+    def start_checkpoints(self, interval_seconds: float) -> None:
+        """Run ``checkpoint()`` every *interval_seconds* until ``aclose()``."""
+        if interval_seconds <= 0 or self._checkpointer is not None:
+            return
+
+        async def loop() -> None:
+            while True:
+                await asyncio.sleep(interval_seconds)
+                try:
+                    await self.checkpoint()
+                except Exception:
+                    logger.exception("Audit ledger checkpoint failed; will retry")
+
+        self._checkpointer = asyncio.create_task(loop(), name="audit-ledger-checkpoint")
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "batches": self.batches,
+            "rows_written": self.rows_written,
+            "failed": self.failed,
+        }
+
+    async def aclose(self, timeout: float = 10.0) -> None:
+        """Write out queued appends, then stop the writer (lifespan shutdown)."""
+        if self._checkpointer is not None:
+            self._checkpointer.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._checkpointer
+            self._checkpointer = None
+        if self._queue is not None:
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(self._queue.join(), timeout=timeout)
+        if self._writer is not None:
+            self._writer.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._writer
+        self._writer = None
+        self._queue = None
+        self._loop = None
+
     async def on_step_complete(self, record: StepResult) -> None:
         """Observer contract — one ledger row per completed execution step."""
         await self.append(
@@ -212,41 +513,37 @@ class LedgerObserver:
 async def get_session_trail(session_id: str, db: Any = None) -> list[dict[str, Any]]:
     """Assemble the per-case rationale trail for a session (FR-7.4).
 
-    Returns ledger rows in append order as plain dicts. Used by the case-file
-    composer (WS8) and the attestation signer (WS9).
+    Returns ledger rows in append order as plain dicts: the session's chain,
+    preceded by any of its rows on the legacy global chain. Used by the
+    case-file composer (WS8) and the attestation signer (WS9).
     """
-    owns_db = db is None
-    if owns_db:
-        from src.generated_client import Prisma
-
-        db = Prisma()
-        await db.connect()
-    try:
+    async with use_db(db) as db:
         rows = await db.auditledgerentry.find_many(
             where={"session_id": session_id},
-            order=[{"created_at": "asc"}, {"id": "asc"}],
+            order=[{"chain_id": "asc"}, {"chain_seq": "asc"}],
         )
-        return [
-            {
-                "entry_type": r.entry_type,
-                "call_id": r.call_id,
-                "agent_id": r.agent_id,
-                "capability_id": r.capability_id,
-                "protocol": r.protocol,
-                "success": r.success,
-                "verdict": r.verdict,
-                "latency_ms": r.latency_ms,
-                "session_id": r.session_id,
-                "completed_at": r.completed_at.isoformat() if r.completed_at else None,
-                "payload": r.payload,
-                "content_hash": r.content_hash,
-                "prev_hash": r.prev_hash,
-            }
-            for r in rows
-        ]
-    finally:
-        if owns_db:
-            await db.disconnect()
+        return [ledger_row_dict(r) for r in rows]
+
+
+def ledger_row_dict(r: Any) -> dict[str, Any]:
+    """Prisma ``AuditLedgerEntry`` → the plain dict that is hashed and exported."""
+    return {
+        "entry_type": r.entry_type,
+        "call_id": r.call_id,
+        "agent_id": r.agent_id,
+        "capability_id": r.capability_id,
+        "protocol": r.protocol,
+        "success": r.success,
+        "verdict": r.verdict,
+        "latency_ms": r.latency_ms,
+        "session_id": r.session_id,
+        "completed_at": r.completed_at.isoformat() if r.completed_at else None,
+        "payload": r.payload,
+        "chain_id": r.chain_id,
+        "chain_seq": r.chain_seq,
+        "content_hash": r.content_hash,
+        "prev_hash": r.prev_hash,
+    }
 
 
 async def has_approved_hitl_decision(session_id: str, db: Any = None) -> bool:
@@ -256,26 +553,18 @@ async def has_approved_hitl_decision(session_id: str, db: Any = None) -> bool:
     enforcement may only be sealed after a named human has approved the
     proposal (FR-6.3 / FR-9).
     """
-    owns_db = db is None
-    if owns_db:
-        from src.generated_client import Prisma
-
-        db = Prisma()
-        await db.connect()
     try:
-        row = await db.auditledgerentry.find_first(
-            where={
-                "session_id": session_id,
-                "entry_type": ENTRY_TYPE_HITL_DECISION,
-                "success": True,
-            }
-        )
-        return row is not None
+        async with use_db(db) as db:
+            row = await db.auditledgerentry.find_first(
+                where={
+                    "session_id": session_id,
+                    "entry_type": ENTRY_TYPE_HITL_DECISION,
+                    "success": True,
+                }
+            )
+            return row is not None
     except Exception:
         logger.exception(
             "has_approved_hitl_decision: lookup failed for session %s", session_id
         )
         return False
-    finally:
-        if owns_db:
-            await db.disconnect()
@@ -0,0 +1,401 @@
+"""Streaming, resumable offline verification of the audit ledger.
+
+``verify_chain`` needs every row in memory. This module verifies a whole
+ledger — straight from Postgres or from a JSON Lines export — holding only
+one page at a time:
+
+- Rows arrive in keyset order ``(chain_id, chain_seq)`` (``iter_db_pages`` /
+  ``iter_export_pages``; ``export_ledger`` writes files in that order).
+- Each page is split into per-chain segments. A segment carries the stored
+  ``content_hash`` and ``chain_seq`` of the row before it, so segments are
+  independent and are hashed on a process pool.
+- The first broken link of every chain is reported (seq + reason).
+- Checkpoints (``audit_ledger_checkpoints``) are streamed oldest first, their
+  linkage checked with ``verify_checkpoints``, and every tip they recorded
+  ``(chain_id, chain_seq, content_hash)`` is compared with the verified row,
+  so a chain rewritten and re-hashed after it was checkpointed is caught.
+- After each page is fully verified, progress — the keyset cursor, the last
+  row's hash and the breaks found so far — is written to a state file, so an
+  interrupted run resumes where it stopped.
+
+Run via ``cli/verify_ledger.py``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from collections import deque
+from collections.abc import AsyncIterator, Iterable
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+from .audit_ledger import (
+    LEGACY_CHAIN_ID,
+    compute_content_hash,
+    ledger_row_dict,
+    verify_checkpoints,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PAGE_SIZE = 5000
+
+# (chain_id, chain_seq) of the last row already verified.
+Cursor = tuple[str, int]
+
+# (chain_id, chain_seq) → content_hash recorded by a checkpoint as a chain tip.
+Tips = dict[Cursor, str]
+
+
+@dataclass
+class ChainSegment:
+    """Consecutive rows of one chain plus the stored row that precedes them."""
+
+    chain_id: str
+    rows: list[dict[str, Any]]
+    prev_seq: int
+    prev_hash: str
+
+
+@dataclass
+class SegmentResult:
+    chain_id: str
+    rows: int
+    # (chain_seq, reason) of the first bad row, if any.
+    first_break: tuple[int, str] | None = None
+
+
+def verify_segment(segment: ChainSegment) -> SegmentResult:
+    """Check linkage, numbering and content hashes of one segment (picklable)."""
+    expected_seq, prev_hash = segment.prev_seq + 1, segment.prev_hash
+    for row in segment.rows:
+        seq = row.get("chain_seq")
+        if seq is not None and seq != expected_seq:
+            reason = f"chain_seq gap: expected {expected_seq}, got {seq}"
+            return SegmentResult(segment.chain_id, len(segment.rows), (seq, reason))
+        at = expected_seq if seq is None else seq
+        if row.get("prev_hash", "") != prev_hash:
+            return SegmentResult(
+                segment.chain_id, len(segment.rows), (at, "prev_hash mismatch")
+            )
+        if compute_content_hash(row) != row.get("content_hash"):
+            return SegmentResult(
+                segment.chain_id, len(segment.rows), (at, "content_hash mismatch")
+            )
+        expected_seq, prev_hash = expected_seq + 1, row["content_hash"]
+    return SegmentResult(segment.chain_id, len(segment.rows))
+
+
+@dataclass
+class VerifyState:
+    """Resumable progress; serialised to the ``--state`` file after every page."""
+
+    cursor: Cursor | None = None
+    # chain_id, chain_seq, content_hash of the last verified row.
+    tail: tuple[str, int, str] | None = None
+    rows: int = 0
+    chains: int = 0
+    broken: dict[str, dict[str, Any]] = field(default_factory=dict)
+    checkpoints: int = 0
+    checkpoints_linked: bool = True
+    # "chain_id:chain_seq" → checkpointed tip the ledger no longer matches.
+    tip_mismatches: dict[str, dict[str, Any]] = field(default_factory=dict)
+    complete: bool = False
+
+    @classmethod
+    def load(cls, path: Path) -> VerifyState:
+        raw = json.loads(path.read_text())
+        return cls(
+            cursor=tuple(raw["cursor"]) if raw.get("cursor") else None,
+            tail=tuple(raw["tail"]) if raw.get("tail") else None,
+            rows=raw.get("rows", 0),
+            chains=raw.get("chains", 0),
+            broken=raw.get("broken", {}),
+            checkpoints=raw.get("checkpoints", 0),
+            checkpoints_linked=raw.get("checkpoints_linked", True),
+            tip_mismatches=raw.get("tip_mismatches", {}),
+            complete=raw.get("complete", False),
+        )
+
+    def save(self, path: Path) -> None:
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        tmp.write_text(json.dumps(asdict(self), sort_keys=True))
+        tmp.replace(path)
+
+    def record_break(self, chain_id: str, seq: int, reason: str) -> None:
+        seen = self.broken.get(chain_id)
+        if seen is None or seq < seen["chain_seq"]:
+            self.broken[chain_id] = {"chain_seq": seq, "reason": reason}
+
+    def record_tip_mismatch(self, key: Cursor, reason: str) -> None:
+        chain_id, seq = key
+        self.tip_mismatches[f"{chain_id}:{seq}"] = {
+            "chain_id": chain_id,
+            "chain_seq": seq,
+            "reason": reason,
+        }
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "ok": self.complete
+            and not self.broken
+            and self.checkpoints_linked
+            and not self.tip_mismatches,
+            "complete": self.complete,
+            "rows": self.rows,
+            "chains": self.chains,
+            "broken_chains": len(self.broken),
+            "broken": self.broken,
+            "checkpoints": self.checkpoints,
+            "checkpoints_linked": self.checkpoints_linked,
+            "tip_mismatches": self.tip_mismatches,
+        }
+
+
+def _row_key(row: dict[str, Any]) -> Cursor:
+    return (row.get("chain_id", LEGACY_CHAIN_ID), row.get("chain_seq") or 0)
+
+
+def split_page(
+    rows: list[dict[str, Any]], tail: tuple[str, int, str] | None
+) -> tuple[list[ChainSegment], tuple[str, int, str] | None, int]:
+    """Split a keyset-ordered page into chain segments.
+
+    Returns the segments, the new tail and how many chains start in the page.
+    """
+    segments: list[ChainSegment] = []
+    started = 0
+    for row in rows:
+        chain_id, seq = _row_key(row)
+        if segments and segments[-1].chain_id == chain_id:
+            segments[-1].rows.append(row)
+        else:
+            if tail is not None and tail[0] == chain_id:
+                prev_seq, prev_hash = tail[1], tail[2]
+            else:
+                prev_seq, prev_hash = 0, ""
+                started += 1
+            segments.append(ChainSegment(chain_id, [row], prev_seq, prev_hash))
+        if row.get("chain_seq") is None:
+            # Pre-sharding export: number rows by position within the chain.
+            seq = tail[1] + 1 if tail is not None and tail[0] == chain_id else 1
+        tail = (chain_id, seq, row.get("content_hash", ""))
+    return segments, tail, started
+
+
+async def load_checkpoints(
+    pages: AsyncIterator[list[dict[str, Any]]], state: VerifyState
+) -> Tips:
+    """Verify a stream of checkpoints (oldest first) and collect their tips.
+
+    Linkage is recorded on *state*. Every tip any checkpoint recorded is
+    kept, since each must still hold.
+    """
+    tips: Tips = {}
+    prev_root, count, linked = "", 0, True
+    async for page in pages:
+        if not page:
+            continue
+        if linked and not verify_checkpoints(page, prev_root=prev_root):
+            linked = False
+        for checkpoint in page:
+            for chain_id, (seq, content_hash) in (checkpoint.get("tips") or {}).items():
+                tips[(chain_id, int(seq))] = content_hash
+        prev_root = page[-1].get("merkle_root", "")
+        count += len(page)
+    state.checkpoints, state.checkpoints_linked = count, linked
+    return tips
+
+
+def check_tips(page: list[dict[str, Any]], tips: Tips, state: VerifyState) -> None:
+    """Compare each row a checkpoint named as a tip with the recorded hash."""
+    for row in page:
+        key = _row_key(row)
+        expected = tips.pop(key, None)
+        if expected is not None and row.get("content_hash") != expected:
+            state.record_tip_mismatch(key, "content_hash differs from checkpoint")
+
+
+async def verify_pages(
+    pages: AsyncIterator[list[dict[str, Any]]],
+    *,
+    state: VerifyState | None = None,
+    state_path: Path | None = None,
+    executor: Executor | None = None,
+    max_in_flight: int = 8,
+    tips: Tips | None = None,
+) -> VerifyState:
+    """Verify a keyset-ordered page stream, committing progress page by page.
+
+    Without *executor* segments are hashed inline (tests, tiny ledgers).
+    *tips* (from ``load_checkpoints``) are checked against the rows as they
+    stream past; a tip whose row never appears is reported as missing.
+    """
+    state = state or VerifyState()
+    resumed_after = state.cursor
+    tips = dict(tips or {})
+    loop = asyncio.get_running_loop()
+    in_flight: deque[tuple[Cursor, Any, int, list[asyncio.Future[SegmentResult]]]] = (
+        deque()
+    )
+
+    async def commit_oldest() -> None:
+        cursor, tail, started, futures = in_flight.popleft()
+        for result in await asyncio.gather(*futures):
+            state.rows += result.rows
+            if result.first_break is not None:
+                state.record_break(result.chain_id, *result.first_break)
+        state.cursor, state.tail = cursor, tail
+        state.chains += started
+        if state_path is not None:
+            state.save(state_path)
+
+    tail = state.tail
+    async for page in pages:
+        if not page:
+            continue
+        check_tips(page, tips, state)
+        segments, tail, started = split_page(page, tail)
+        if executor is None:
+            futures = [_done(verify_segment(s)) for s in segments]
+        else:
+            futures = [
+                loop.run_in_executor(executor, verify_segment, s) for s in segments
+            ]
+        in_flight.append((_row_key(page[-1]), tail, started, futures))
+        if len(in_flight) >= max_in_flight:
+            await commit_oldest()
+    while in_flight:
+        await commit_oldest()
+    for key in sorted(tips):
+        # Rows up to the resume cursor were checked by the interrupted run.
+        if resumed_after is None or key > resumed_after:
+            state.record_tip_mismatch(key, "checkpointed row missing")
+    state.complete = True
+    if state_path is not None:
+        state.save(state_path)
+    return state
+
+
+def _done(result: SegmentResult) -> asyncio.Future[SegmentResult]:
+    future: asyncio.Future[SegmentResult] = asyncio.get_running_loop().create_future()
+    future.set_result(result)
+    return future
+
+
+async def iter_db_pages(
+    db: Any, *, after: Cursor | None = None, page_size: int = DEFAULT_PAGE_SIZE
+) -> AsyncIterator[list[dict[str, Any]]]:
+    """Keyset-paginate ``audit_ledger`` in ``(chain_id, chain_seq)`` order."""
+    while True:
+        where: dict[str, Any] = {}
+        if after is not None:
+            chain_id, seq = after
+            where = {
+                "OR": [
+                    {"chain_id": {"gt": chain_id}},
+                    {"chain_id": chain_id, "chain_seq": {"gt": seq}},
+                ]
+            }
+        rows = await db.auditledgerentry.find_many(
+            where=where,
+            order=[{"chain_id": "asc"}, {"chain_seq": "asc"}],
+            take=page_size,
+        )
+        if not rows:
+            return
+        page = [ledger_row_dict(r) for r in rows]
+        yield page
+        if len(rows) < page_size:
+            return
+        after = _row_key(page[-1])
+
+
+async def iter_db_checkpoints(
+    db: Any, *, page_size: int = DEFAULT_PAGE_SIZE
+) -> AsyncIterator[list[dict[str, Any]]]:
+    """Keyset-paginate ``audit_ledger_checkpoints`` oldest first."""
+    after = None
+    while True:
+        rows = await db.auditledgercheckpoint.find_many(
+            where={"window_end": {"gt": after}} if after is not None else {},
+            order={"window_end": "asc"},
+            take=page_size,
+        )
+        if not rows:
+            return
+        yield [checkpoint_row_dict(r) for r in rows]
+        if len(rows) < page_size:
+            return
+        after = rows[-1].window_end
+
+
+def checkpoint_row_dict(r: Any) -> dict[str, Any]:
+    """Prisma ``AuditLedgerCheckpoint`` → the plain dict that is verified and exported."""
+    return {
+        "merkle_root": r.merkle_root,
+        "prev_root": r.prev_root,
+        "tips": r.tips,
+        "chain_count": r.chain_count,
+        "window_start": r.window_start.isoformat(),
+        "window_end": r.window_end.isoformat(),
+    }
+
+
+async def iter_export_pages(
+    path: Path, *, after: Cursor | None = None, page_size: int = DEFAULT_PAGE_SIZE
+) -> AsyncIterator[list[dict[str, Any]]]:
+    """Read a JSON Lines export in pages, skipping rows up to *after*."""
+    page: list[dict[str, Any]] = []
+    with path.open(encoding="utf-8") as fh:
+        for line in fh:
+            if not line.strip():
+                continue
+            row = json.loads(line)
+            if after is not None and _row_key(row) <= after:
+                continue
+            page.append(row)
+            if len(page) >= page_size:
+                yield page
+                page = []
+                await asyncio.sleep(0)
+    if page:
+        yield page
+
+
+async def export_ledger(
+    db: Any, path: Path, *, page_size: int = DEFAULT_PAGE_SIZE
+) -> int:
+    """Write the ledger to *path* as JSON Lines in verification order."""
+    written = 0
+    with path.open("w", encoding="utf-8") as fh:
+        async for page in iter_db_pages(db, page_size=page_size):
+            fh.writelines(_export_lines(page))
+            written += len(page)
+    return written
+
+
+async def export_checkpoints(
+    db: Any, path: Path, *, page_size: int = DEFAULT_PAGE_SIZE
+) -> int:
+    """Write the checkpoints to *path* as JSON Lines, oldest first."""
+    written = 0
+    with path.open("w", encoding="utf-8") as fh:
+        async for page in iter_db_checkpoints(db, page_size=page_size):
+            fh.writelines(_export_lines(page))
+            written += len(page)
+    return written
+
+
+def _export_lines(rows: Iterable[dict[str, Any]]) -> Iterable[str]:
+    for row in rows:
+        yield json.dumps(row, sort_keys=True, separators=(",", ":")) + "\n"
+
+
+def make_executor(workers: int) -> Executor | None:
+    """Process pool for hashing; ``workers <= 1`` verifies inline."""
+    return ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
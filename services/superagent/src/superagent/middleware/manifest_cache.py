@@ -1,9 +1,31 @@
-"""ManifestCache — 5-minute TTL cache of agent manifests from Registry."""
+"""ManifestCache — bounded, single-flight, stale-while-revalidate manifest cache.
+
+PreFlight reads an agent's manifest several times per call (``run`` and
+``_assert_healthy``), so this sits on the hot path:
+
+- **single-flight** — concurrent misses for one agent share one Registry GET
+- **bounded LRU** — at most ``manifest_cache_max_entries`` manifests
+- **stale-while-revalidate** — after ``manifest_cache_ttl_seconds`` the cached
+  manifest is still served (up to ``manifest_cache_stale_seconds``) while a
+  single background refresh runs
+- **negative cache** — a failed fetch is remembered separately for
+  ``manifest_cache_negative_ttl_seconds`` and never overwrites a good entry
+- **push invalidation** — ``ManifestInvalidationConsumer`` drops entries when
+  the Registry emits ``registry.agent.registered``
+- **bulk prefetch** — ``prefetch`` warms a whole PnD candidate set with one
+  ``POST /api/v1/agents/manifests`` so the first tool call of a turn does not
+  wait on a Registry round trip
+"""
 
 from __future__ import annotations
 
+import asyncio
+import contextlib
 import logging
 import time
+from collections import OrderedDict
+from collections.abc import Iterable
+from dataclasses import dataclass
 from typing import Any
 
 import httpx
@@ -12,16 +34,65 @@ from ..config import settings
 
 logger = logging.getLogger(__name__)
 
-_TTL_SECONDS = 300  # 5 minutes
+
+class ManifestFetchError(Exception):
+    """Registry did not return a usable manifest."""
+
+
+class _PrefetchMiss(Exception):
+    """The bulk call did not cover this agent — fetch it individually."""
+
+
+# Registry caps a bulk manifest request at this many ids.
+_BULK_LIMIT = 100
+
+
+@dataclass
+class _Entry:
+    manifest: dict[str, Any]
+    fetched_at: float
+
+
+def _empty_manifest(agent_id: str) -> dict[str, Any]:
+    return {"agent_id": agent_id, "capabilities": [], "security": {}}
 
 
 class ManifestCache:
-    """In-process LRU-style cache for agent manifests."""
+    """In-process LRU cache for agent manifests."""
 
-    def __init__(self) -> None:
-        self._cache: dict[str, tuple[dict[str, Any], float]] = {}
+    def __init__(
+        self,
+        *,
+        max_entries: int | None = None,
+        ttl_seconds: float | None = None,
+        stale_seconds: float | None = None,
+        negative_ttl_seconds: float | None = None,
+    ) -> None:
+        def _setting(value: Any, name: str, default: Any) -> Any:
+            return value if value is not None else getattr(settings, name, default)
+
+        self.max_entries = int(
+            _setting(max_entries, "manifest_cache_max_entries", 1024)
+        )
+        self.ttl_seconds = float(
+            _setting(ttl_seconds, "manifest_cache_ttl_seconds", 300.0)
+        )
+        self.stale_seconds = float(
+            _setting(stale_seconds, "manifest_cache_stale_seconds", 3600.0)
+        )
+        self.negative_ttl_seconds = float(
+            _setting(negative_ttl_seconds, "manifest_cache_negative_ttl_seconds", 10.0)
+        )
+        self._cache: OrderedDict[str, _Entry] = OrderedDict()
+        self._negative: dict[str, float] = {}  # agent_id → expires_at
         self._pinned: dict[str, dict[str, Any]] = {}  # boot-time seeds, no TTL
+        self._inflight: dict[str, asyncio.Future[dict[str, Any]]] = {}
+        self._refreshing: set[asyncio.Task[Any]] = set()
         self._client: httpx.AsyncClient | None = None
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.fetch_errors = 0
 
     def seed(self, agent_id: str, manifest: dict[str, Any]) -> None:
         """Pin a manifest permanently (no TTL).
@@ -41,19 +112,194 @@ class ManifestCache:
         return self._client
 
     async def get_manifest(self, agent_id: str) -> dict[str, Any]:
-        """Return cached manifest or fetch from Registry."""
+        """Return the cached manifest, fetching (once) from Registry if needed."""
         if agent_id in self._pinned:
             return self._pinned[agent_id]
 
-        cached = self._cache.get(agent_id)
-        if cached:
-            manifest, ts = cached
-            if time.monotonic() - ts < _TTL_SECONDS:
-                return manifest
+        now = time.monotonic()
+        entry = self._cache.get(agent_id)
+        if entry is not None:
+            age = now - entry.fetched_at
+            if age < self.ttl_seconds:
+                self._cache.move_to_end(agent_id)
+                self.hits += 1
+                return entry.manifest
+            if age < self.ttl_seconds + self.stale_seconds:
+                self._cache.move_to_end(agent_id)
+                self.stale_hits += 1
+                self._refresh_in_background(agent_id)
+                return entry.manifest
+            del self._cache[agent_id]
+
+        expires = self._negative.get(agent_id)
+        if expires is not None:
+            if expires > now:
+                return _empty_manifest(agent_id)
+            del self._negative[agent_id]
+
+        self.misses += 1
+        try:
+            return await self._load(agent_id)
+        except ManifestFetchError:
+            return _empty_manifest(agent_id)
+
+    async def _load(self, agent_id: str) -> dict[str, Any]:
+        """Single-flight fetch + store; raises ManifestFetchError on failure."""
+        inflight = self._inflight.get(agent_id)
+        if inflight is not None:
+            try:
+                return await asyncio.shield(inflight)
+            except _PrefetchMiss:
+                # Another waiter may already have fetched it individually.
+                entry = self._cache.get(agent_id)
+                if entry is not None:
+                    return entry.manifest
+                return await self._load(agent_id)
+
+        future: asyncio.Future[dict[str, Any]] = (
+            asyncio.get_running_loop().create_future()
+        )
+        self._inflight[agent_id] = future
+        try:
+            manifest = await self._fetch(agent_id)
+        except Exception as exc:
+            self.fetch_errors += 1
+            self._negative[agent_id] = time.monotonic() + self.negative_ttl_seconds
+            logger.warning("Failed to fetch manifest for %s: %s", agent_id, exc)
+            error = (
+                exc
+                if isinstance(exc, ManifestFetchError)
+                else ManifestFetchError(str(exc))
+            )
+            future.set_exception(error)
+            future.exception()  # mark retrieved — waiters may be absent
+            raise error from exc
+        else:
+            self._store(agent_id, manifest)
+            future.set_result(manifest)
+            return manifest
+        finally:
+            self._inflight.pop(agent_id, None)
+
+    def _store(self, agent_id: str, manifest: dict[str, Any]) -> None:
+        self._negative.pop(agent_id, None)
+        self._cache[agent_id] = _Entry(manifest, time.monotonic())
+        self._cache.move_to_end(agent_id)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
 
-        manifest = await self._fetch(agent_id)
-        self._cache[agent_id] = (manifest, time.monotonic())
-        return manifest
+    def _refresh_in_background(self, agent_id: str) -> None:
+        if agent_id in self._inflight:
+            return
+
+        async def _refresh() -> None:
+            # On failure, keep serving the stale entry.
+            with contextlib.suppress(ManifestFetchError):
+                await self._load(agent_id)
+
+        task = asyncio.get_running_loop().create_task(
+            _refresh(), name=f"manifest-refresh:{agent_id}"
+        )
+        self._refreshing.add(task)
+        task.add_done_callback(self._refreshing.discard)
+
+    def _needs_fetch(self, agent_id: str, now: float) -> bool:
+        if not agent_id or agent_id in self._pinned or agent_id in self._inflight:
+            return False
+        entry = self._cache.get(agent_id)
+        if entry is not None and now - entry.fetched_at < self.ttl_seconds:
+            return False
+        return self._negative.get(agent_id, 0.0) <= now
+
+    async def prefetch(self, agent_ids: Iterable[str]) -> int:
+        """Warm the cache for *agent_ids* with bulk Registry calls.
+
+        Only missing or expired entries are requested. Concurrent
+        ``get_manifest`` calls for those agents wait on the bulk call instead
+        of issuing their own GET. If the bulk call fails, waiters fall back to
+        individual fetches. Returns the number of manifests stored.
+        """
+        now = time.monotonic()
+        wanted = [a for a in dict.fromkeys(agent_ids) if self._needs_fetch(a, now)]
+        stored = 0
+        for start in range(0, len(wanted), _BULK_LIMIT):
+            stored += await self._prefetch_batch(wanted[start : start + _BULK_LIMIT])
+        return stored
+
+    async def _prefetch_batch(self, agent_ids: list[str]) -> int:
+        loop = asyncio.get_running_loop()
+        futures = {agent_id: loop.create_future() for agent_id in agent_ids}
+        self._inflight.update(futures)
+        try:
+            try:
+                manifests, missing = await self._fetch_many(agent_ids)
+            except ManifestFetchError as exc:
+                logger.info(
+                    "Manifest prefetch of %d agent(s) failed (%s); "
+                    "falling back to individual fetches",
+                    len(agent_ids),
+                    exc,
+                )
+                manifests, missing = {}, set()
+            expires = time.monotonic() + self.negative_ttl_seconds
+            for agent_id, future in futures.items():
+                if agent_id in manifests:
+                    self._store(agent_id, manifests[agent_id])
+                    future.set_result(manifests[agent_id])
+                    continue
+                if agent_id in missing:
+                    self._negative[agent_id] = expires
+                    future.set_exception(ManifestFetchError("agent not found"))
+                else:
+                    future.set_exception(_PrefetchMiss())
+                future.exception()  # mark retrieved — waiters may be absent
+            return len(manifests)
+        finally:
+            for agent_id, future in futures.items():
+                if self._inflight.get(agent_id) is future:
+                    del self._inflight[agent_id]
+                if not future.done():  # cancelled mid-call
+                    future.set_exception(_PrefetchMiss())
+                    future.exception()
+
+    def prefetch_in_background(self, agent_ids: Iterable[str]) -> None:
+        """Fire-and-forget ``prefetch``; overlaps the Registry call with other work."""
+        now = time.monotonic()
+        wanted = [a for a in dict.fromkeys(agent_ids) if self._needs_fetch(a, now)]
+        if not wanted:
+            return
+
+        async def _prefetch() -> None:
+            try:
+                await self.prefetch(wanted)
+            except Exception:
+                logger.debug("Manifest prefetch failed", exc_info=True)
+
+        task = asyncio.get_running_loop().create_task(
+            _prefetch(), name="manifest-prefetch"
+        )
+        self._refreshing.add(task)
+        task.add_done_callback(self._refreshing.discard)
+
+    async def _fetch_many(
+        self, agent_ids: list[str]
+    ) -> tuple[dict[str, dict[str, Any]], set[str]]:
+        """One bulk Registry call → (agent_id → manifest, ids Registry lacks)."""
+        client = self._get_client()
+        try:
+            resp = await client.post(
+                "/api/v1/agents/manifests", json={"agent_ids": agent_ids}
+            )
+            resp.raise_for_status()
+            data = resp.json().get("data", {})
+        except Exception as exc:
+            raise ManifestFetchError(f"{type(exc).__name__}: {exc}") from exc
+        manifests: dict[str, dict[str, Any]] = {}
+        for raw in data.get("manifests", []):
+            manifest = self._normalise(raw)
+            if manifest["agent_id"]:
+                manifests[manifest["agent_id"]] = manifest
+        return manifests, {str(a) for a in data.get("missing", [])}
 
     async def _fetch(self, agent_id: str) -> dict[str, Any]:
         client = self._get_client()
@@ -61,10 +307,9 @@ class ManifestCache:
             resp = await client.get(f"/api/v1/agents/{agent_id}")
             resp.raise_for_status()
             raw = resp.json()
-            return self._normalise(raw)
         except Exception as exc:
-            logger.warning("Failed to fetch manifest for %s: %s", agent_id, exc)
-            return {"agent_id": agent_id, "capabilities": [], "security": {}}
+            raise ManifestFetchError(f"{type(exc).__name__}: {exc}") from exc
+        return self._normalise(raw)
 
     @staticmethod
     def _normalise(raw: dict[str, Any]) -> dict[str, Any]:
@@ -102,8 +347,23 @@ class ManifestCache:
 
     def invalidate(self, agent_id: str) -> None:
         self._cache.pop(agent_id, None)
+        self._negative.pop(agent_id, None)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "entries": len(self._cache),
+            "pinned": len(self._pinned),
+            "negative": len(self._negative),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "fetch_errors": self.fetch_errors,
+        }
 
     async def close(self) -> None:
+        for task in list(self._refreshing):
+            task.cancel()
+        self._refreshing.clear()
         if self._client:
             await self._client.aclose()
             self._client = None
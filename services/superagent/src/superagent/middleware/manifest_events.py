@@ -0,0 +1,44 @@
+"""Push invalidation of MANIFEST_CACHE from ``registry.agent.registered``.
+
+Every superagent replica must see every registration, so each process joins
+its own consumer group (hostname + pid) and starts from the latest offset —
+there is nothing to replay into a cache that was just built.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import socket
+from typing import Any
+
+from common.kafka.src import BaseKafkaConsumer, KafkaConsumerConfig, KafkaTopics
+
+from .manifest_cache import MANIFEST_CACHE, ManifestCache
+
+logger = logging.getLogger(__name__)
+
+
+class ManifestInvalidationConsumer(BaseKafkaConsumer):
+    """Drops the cached manifest of every (re-)registered agent."""
+
+    def __init__(
+        self, bootstrap_servers: str, cache: ManifestCache = MANIFEST_CACHE
+    ) -> None:
+        config = KafkaConsumerConfig(
+            bootstrap_servers=bootstrap_servers,
+            group_id=f"superagent-manifest-cache-{socket.gethostname()}-{os.getpid()}",
+            topics=[KafkaTopics.REGISTRY_AGENT_REGISTERED],
+            auto_offset_reset="latest",
+            enable_auto_commit=True,
+        )
+        super().__init__(config)
+        self._cache = cache
+
+    async def handle_message(self, message: dict[str, Any]) -> None:
+        agent_id = message.get("agent_id") if isinstance(message, dict) else None
+        if not agent_id:
+            logger.warning("Skipping malformed registration event: %s", message)
+            return
+        self._cache.invalidate(str(agent_id))
+        logger.debug("Manifest cache invalidated for %s", agent_id)
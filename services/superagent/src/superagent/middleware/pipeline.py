@@ -5,6 +5,7 @@ from __future__ import annotations
 import asyncio
 import json
 import logging
+from dataclasses import dataclass, field
 from datetime import UTC, datetime
 from decimal import Decimal
 from typing import Any
@@ -13,6 +14,7 @@ from langchain_core.messages import HumanMessage
 from langchain_core.runnables import RunnableConfig
 
 from ..config import settings
+from ..persistence.db import DB
 from .input_guard import InputGuard, InputGuardError
 from .observers import StepResult, emit_step_complete
 from .output_normalizer import OutputNormalizer
@@ -57,6 +59,19 @@ def _structural_verify(
     return True, "ok"
 
 
+@dataclass
+class PreparedCall:
+    """Outcome of pipeline steps 2–3 for one call, ready for dispatch."""
+
+    args: dict[str, Any]
+    base_fee: Decimal = Decimal("0")
+    auth_headers: dict[str, str] = field(default_factory=dict)
+    manifest: dict[str, Any] = field(default_factory=dict)
+    resolved_env: dict[str, str] | None = None
+    # Set when InputGuard rejected the call — returned instead of dispatching.
+    early_result: dict[str, Any] | None = None
+
+
 class ExecutionMiddleware:
     """
     7-step pipeline:
@@ -74,7 +89,7 @@ class ExecutionMiddleware:
     def __init__(self, state: dict[str, Any]) -> None:
         self._state = state
 
-    async def execute(
+    async def prepare(
         self,
         agent_id: str,
         capability_id: str,
@@ -83,8 +98,14 @@ class ExecutionMiddleware:
         args: dict[str, Any],
         call_id: str,
         config: RunnableConfig | None = None,
-    ) -> dict[str, Any]:
-        """Run the pipeline and return {"content": str, "artifact": ...}."""
+    ) -> PreparedCall:
+        """Run steps 2–3 (InputGuard, PaymentGuard, PreFlight) without dispatching.
+
+        Raises PaymentInterrupt / AuthInterruptRequired / PreFlightError exactly
+        like ``execute``. A batch of concurrent calls prepares every call first
+        so an interrupt suspends the node before any sibling has been invoked
+        (and charged) — LangGraph re-runs the whole node on resume.
+        """
         from ..vault.client import VaultClient
 
         vault = VaultClient()
@@ -104,7 +125,7 @@ class ExecutionMiddleware:
         except InputGuardError as exc:
             err_text = f"Input error: {exc}"
             self._auto_update_checklist(tool_name, call_id, err_text, success=False)
-            return {"content": err_text}
+            return PreparedCall(args=args, early_result={"content": err_text})
 
         # Step 2.5: PaymentGuard (A2A/ACP only; MCP agents are infrastructure primitives)
         # Raises PaymentInterrupt → caught at execute_agent_calls_node level.
@@ -143,9 +164,45 @@ class ExecutionMiddleware:
             state=self._state,
             session_credentials=session_credentials,
         )
+        return PreparedCall(
+            args=args,
+            base_fee=base_fee,
+            auth_headers=result["headers"],
+            manifest=result["manifest"],
+            resolved_env=result.get("resolved_env"),
+        )
 
-        auth_headers: dict[str, str] = result["headers"]
-        manifest: dict[str, Any] = result["manifest"]
+    async def execute(
+        self,
+        agent_id: str,
+        capability_id: str,
+        protocol: str,
+        tool_name: str,
+        args: dict[str, Any],
+        call_id: str,
+        config: RunnableConfig | None = None,
+        prepared: PreparedCall | None = None,
+    ) -> dict[str, Any]:
+        """Run the pipeline and return {"content": str, "artifact": ...}.
+
+        Pass *prepared* (from ``prepare``) to skip steps 2–3 and dispatch.
+        """
+        if prepared is None:
+            prepared = await self.prepare(
+                agent_id=agent_id,
+                capability_id=capability_id,
+                protocol=protocol,
+                tool_name=tool_name,
+                args=args,
+                call_id=call_id,
+                config=config,
+            )
+        if prepared.early_result is not None:
+            return dict(prepared.early_result)
+        args = prepared.args
+        base_fee = prepared.base_fee
+        auth_headers = prepared.auth_headers
+        manifest = prepared.manifest
 
         # Step 4: Handler Dispatch
         _call_start = datetime.now(UTC)
@@ -155,8 +212,8 @@ class ExecutionMiddleware:
         transport = manifest.get("transport", {})
         # Inject resolved env for STDIO agents — PreFlight already resolved
         # ${VAR} placeholders from the vault; pass a copy so we don't mutate the cache.
-        if result.get("resolved_env") is not None:
-            transport = {**transport, "resolved_env": result["resolved_env"]}
+        if prepared.resolved_env is not None:
+            transport = {**transport, "resolved_env": prepared.resolved_env}
         raw_output = await self._dispatch_with_timeout(
             protocol=protocol,
             agent_id=agent_id,
@@ -263,16 +320,10 @@ class ExecutionMiddleware:
     async def _resolve_base_fee(self, agent_id: str) -> Decimal:
         """Fetch the agent's base_fee from DB (or manifest cache). Returns Decimal("0") if free."""
         try:
-            from src.generated_client import Prisma
-
-            db = Prisma()
-            await db.connect()
-            try:
+            async with DB.session() as db:
                 payment = await db.payment.find_unique(where={"agent_id": agent_id})
                 if payment and payment.enabled and getattr(payment, "base_fee", None):
                     return Decimal(str(payment.base_fee))
-            finally:
-                await db.disconnect()
         except Exception:
             logger.debug("_resolve_base_fee: DB unavailable for agent=%s", agent_id)
         return Decimal("0")
@@ -347,7 +347,7 @@ class PreFlightManager:
         session_id: str,
     ) -> str:
         """Call the agent's own OAuth connect endpoint to get a valid auth URL."""
-        import httpx
+        from ..clients.http_pool import HTTP_CLIENTS
 
         # Map scopes/provider_hint to the agent's connect path.
         scopes_str = " ".join(cfg.get("scopes", [])).lower()
@@ -371,7 +371,7 @@ class PreFlightManager:
 
         connect_url = f"{transport_endpoint.rstrip('/')}/oauth/{path}/connect"
         try:
-            async with httpx.AsyncClient(timeout=5.0) as client:
+            async with HTTP_CLIENTS.session(connect_url, timeout=5.0) as client:
                 resp = await client.get(connect_url, params={"tenant_id": session_id})
                 resp.raise_for_status()
                 return resp.json().get("auth_url", "")
@@ -405,6 +405,20 @@ class PreFlightManager:
         """
         resolved: dict[str, str] = {}
         missing: list[str] = []
+        agent_session_creds = (session_credentials or {}).get(agent_id, {})
+
+        # One vault query for every placeholder the session doesn't supply.
+        vault_names = [
+            var_name
+            for template in raw_env.values()
+            for var_name in _PLACEHOLDER_RE.findall(template)
+            if var_name not in agent_session_creds
+        ]
+        vault_values = (
+            await self._vault.get_agent_envs(user_id, agent_id, vault_names)
+            if vault_names
+            else {}
+        )
 
         for env_key, template in raw_env.items():
             placeholders = _PLACEHOLDER_RE.findall(template)
@@ -416,7 +430,6 @@ class PreFlightManager:
             value = template
             for var_name in placeholders:
                 # 0. Session-scoped credentials (highest priority)
-                agent_session_creds = (session_credentials or {}).get(agent_id, {})
                 if var_name in agent_session_creds:
                     secret: str | None = agent_session_creds[var_name]
                     logger.debug(
@@ -428,7 +441,7 @@ class PreFlightManager:
                     continue
 
                 # 1. User vault
-                secret = await self._vault.get_agent_env(user_id, agent_id, var_name)
+                secret = vault_values.get(var_name)
                 if secret is not None:
                     logger.debug(
                         "Resolved ${%s} for agent=%s user=%s from vault",
@@ -1,12 +1,20 @@
-"""Fan-out StepResult events to Kafka for validator observers."""
+"""Fan-out StepResult events to Kafka for validator observers.
+
+One long-lived producer per process (``STEP_EVENTS``), started and flushed
+by the ``main.py`` lifespan. Publishing is non-blocking: records go into the
+producer's bounded outbox and are batched (linger + compression) in the
+background, keyed by session_id so each session's steps stay ordered within
+a partition. When the outbox is full, records are dropped and counted rather
+than slowing the execution path.
+"""
 
 from __future__ import annotations
 
-import asyncio
 import logging
-import os
 from dataclasses import asdict
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
+
+from ..config import settings
 
 if TYPE_CHECKING:
     from .observers import StepResult
@@ -22,31 +30,74 @@ def step_result_payload(record: StepResult) -> dict:
     return asdict(record)
 
 
-async def fan_out_step_complete(record: StepResult) -> None:
-    """Publish to execution.step_complete when Kafka is enabled (never raises)."""
-    if os.getenv("KAFKA_ENABLED", "false").lower() != "true":
-        return
-    bootstrap = os.getenv("KAFKA_BOOTSTRAP_SERVERS", "")
-    if not bootstrap:
-        return
-    try:
-        from common_kafka.producer import KafkaProducer, KafkaProducerConfig
-        from common_kafka.topics import KafkaTopics
+class StepEventPublisher:
+    """Process-wide ``execution.step_complete`` publisher."""
 
-        config = KafkaProducerConfig(bootstrap_servers=bootstrap)
-        producer = KafkaProducer(config)
-        await producer.start()
-        try:
-            await producer.publish(
-                KafkaTopics.EXECUTION_STEP_COMPLETE,
-                payload=step_result_payload(record),
+    def __init__(self) -> None:
+        self._producer: Any = None
+
+    @property
+    def started(self) -> bool:
+        return self._producer is not None
+
+    async def start(self) -> None:
+        """Connect the shared producer (no-op unless Kafka is enabled)."""
+        if self._producer is not None:
+            return
+        if not settings.kafka_enabled or not settings.kafka_bootstrap_servers:
+            return
+        from common.kafka.src import KafkaProducer, KafkaProducerConfig
+
+        producer = KafkaProducer(
+            KafkaProducerConfig(
+                bootstrap_servers=settings.kafka_bootstrap_servers,
+                linger_ms=settings.step_events_linger_ms,
+                max_batch_size=settings.step_events_batch_bytes,
+                compression_type=settings.step_events_compression or None,
+                enable_idempotence=True,
+                outbox_size=settings.step_events_outbox_size,
             )
-        finally:
+        )
+        await producer.start()
+        self._producer = producer
+        logger.info("Step event producer started")
+
+    def publish(self, record: StepResult) -> bool:
+        """Queue *record* for delivery; False if not started or dropped."""
+        if self._producer is None:
+            return False
+        from common.kafka.src import KafkaTopics
+
+        return self._producer.publish_nowait(
+            KafkaTopics.EXECUTION_STEP_COMPLETE,
+            payload=step_result_payload(record),
+            key=record.session_id or record.call_id,
+        )
+
+    def stats(self) -> dict[str, Any]:
+        if self._producer is None:
+            return {"started": False}
+        return {"started": True, **self._producer.stats()}
+
+    async def close(self) -> None:
+        """Flush queued events and stop the producer (lifespan shutdown)."""
+        producer, self._producer = self._producer, None
+        if producer is not None:
             await producer.stop()
-    except Exception:
-        logger.exception("fan_out_step_complete failed for call_id=%s", record.call_id)
+
+
+# Module-level singleton
+STEP_EVENTS = StepEventPublisher()
+
+
+async def fan_out_step_complete(record: StepResult) -> None:
+    """Publish to execution.step_complete when Kafka is enabled (never raises)."""
+    schedule_fan_out(record)
 
 
 def schedule_fan_out(record: StepResult) -> None:
-    """Fire-and-forget Kafka publish (does not block execution path)."""
-    asyncio.create_task(fan_out_step_complete(record))
+    """Queue a Kafka publish without blocking the execution path (never raises)."""
+    try:
+        STEP_EVENTS.publish(record)
+    except Exception:
+        logger.exception("fan_out_step_complete failed for call_id=%s", record.call_id)
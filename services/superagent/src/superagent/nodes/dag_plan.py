@@ -10,6 +10,7 @@ from __future__ import annotations
 import json
 import logging
 import re
+from collections import Counter
 from typing import Any
 
 from ..graph.state import ChecklistStep, TaskChecklist
@@ -105,14 +106,42 @@ def new_active_plan(workflow: WorkflowPlan, query: str) -> dict[str, Any]:
 
 def next_ready_node(plan: dict[str, Any]) -> str | None:
     """First node (in topo order) that is pending with all dependencies done."""
+    ready = ready_nodes(plan)
+    return ready[0] if ready else None
+
+
+def ready_nodes(
+    plan: dict[str, Any],
+    *,
+    max_nodes: int | None = None,
+    max_per_agent: int | None = None,
+) -> list[str]:
+    """Every pending node (in topo order) whose dependencies are all done.
+
+    This is the plan's current wavefront. ``max_nodes`` caps how many nodes
+    may be in flight for the whole plan and ``max_per_agent`` how many may
+    target the same agent; nodes already ``in_progress`` count against both.
+    """
     nodes = plan["nodes"]
+    in_flight = [n for n in nodes.values() if n["status"] == "in_progress"]
+    per_agent = Counter(n.get("agent_id") or "" for n in in_flight)
+    budget = None if max_nodes is None else max(0, max_nodes - len(in_flight))
+
+    ready: list[str] = []
     for nid in plan["order"]:
+        if budget is not None and len(ready) >= budget:
+            break
         node = nodes[nid]
         if node["status"] != "pending":
             continue
-        if all(nodes[dep]["status"] == "done" for dep in node["dependencies"]):
-            return nid
-    return None
+        if not all(nodes[dep]["status"] == "done" for dep in node["dependencies"]):
+            continue
+        agent = node.get("agent_id") or ""
+        if max_per_agent is not None and per_agent[agent] >= max_per_agent:
+            continue
+        per_agent[agent] += 1
+        ready.append(nid)
+    return ready
 
 
 def resolve_inputs(inputs: dict[str, Any], outputs: dict[str, str]) -> dict[str, Any]:
@@ -2,10 +2,14 @@
 
 from __future__ import annotations
 
+import asyncio
+import copy
 import json
 import logging
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
 from datetime import UTC, datetime
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 from internal_commons.interrupts.events import InterruptEvent
 from internal_commons.interrupts.types import InterruptType
@@ -28,7 +32,10 @@ from ..middleware.oauth_grants import (
     store_grants_for_strategy,
 )
 from ..middleware.preflight import AuthInterruptRequired, PreFlightError
-from ..persistence.transcript_store import TRANSCRIPT_TOOL_META_KEY
+from ..persistence.transcript_store import (
+    SYNTHETIC_MESSAGE_KEY,
+    TRANSCRIPT_TOOL_META_KEY,
+)
 from ..pnd.candidate_compat import (
     cand_agent_id,
     cand_agent_name,
@@ -38,6 +45,10 @@ from ..pnd.candidate_compat import (
 )
 from ..pricing.guard import PaymentInterrupt
 from ..runtime.session_cancel import is_cancelled, session_id_from_config
+from .dag_plan import mark_result, ready_nodes, tool_call_for_node
+
+if TYPE_CHECKING:
+    from ..middleware.pipeline import PreparedCall
 
 logger = logging.getLogger(__name__)
 
@@ -209,7 +220,6 @@ def _result_status(content: str) -> str:
 async def _reject_disallowed_tool_call(
     config: RunnableConfig,
     pending_events: list[dict[str, Any]],
-    tool_messages: list[ToolMessage],
     result_store: dict[str, Any],
     *,
     tool_name: str,
@@ -217,7 +227,7 @@ async def _reject_disallowed_tool_call(
     args: dict[str, Any],
     agent_id: str,
     reason: str,
-) -> None:
+) -> ToolMessage:
     """Reject a tool call blocked by the KY-A allowlist (FR-10.1) — never executes."""
     err_content = f"Error: {reason}"
     await _emit_invocation(
@@ -231,19 +241,17 @@ async def _reject_disallowed_tool_call(
         },
         pending_events,
     )
-    tool_messages.append(
-        ToolMessage(
-            content=err_content,
-            tool_call_id=call_id,
-            name=tool_name or "disallowed tool",
-            additional_kwargs={
-                TRANSCRIPT_TOOL_META_KEY: _tool_transcript_meta(
-                    agent_id=agent_id,
-                    internal_tool_name=tool_name,
-                    invocation_args=args,
-                )
-            },
-        )
+    msg = ToolMessage(
+        content=err_content,
+        tool_call_id=call_id,
+        name=tool_name or "disallowed tool",
+        additional_kwargs={
+            TRANSCRIPT_TOOL_META_KEY: _tool_transcript_meta(
+                agent_id=agent_id,
+                internal_tool_name=tool_name,
+                invocation_args=args,
+            )
+        },
     )
     result_store[call_id] = err_content
     await _emit_invocation(
@@ -258,22 +266,20 @@ async def _reject_disallowed_tool_call(
         },
         pending_events,
     )
+    return msg
 
 
-async def _execute_with_retry(
-    middleware: Any,
+async def _with_retry[T](
+    attempt: Callable[[], Awaitable[T]],
     *,
     agent_id: str,
-    capability_id: str,
-    protocol: str,
     tool_name: str,
-    args: dict[str, Any],
     call_id: str,
     config: RunnableConfig,
     pending_events: list[dict[str, Any]],
     max_retries: int,
-) -> dict[str, Any]:
-    """Run ``middleware.execute()`` with a bounded retry on transient failures.
+) -> T:
+    """Run one pipeline phase with a bounded retry on transient failures.
 
     The verifier retry-gate (v1.3): a step that raises a *transient* error
     (timeout / connection / 429 / 5xx — classified by the Phase-1 taxonomy in
@@ -283,29 +289,21 @@ async def _execute_with_retry(
 
     Interrupts (auth / payment / graph) and non-retriable errors propagate
     unchanged to the caller's existing ``except`` handlers — this wrapper only
-    intercepts retriable dispatch failures on the happy path.
+    intercepts retriable failures on the happy path.
     """
     # Local import avoids a module-level import cycle (runner ⇄ nodes).
     from ..graph.runner import _classify_stream_error
 
-    attempt = 0
+    attempt_no = 0
     while True:
-        attempt += 1
+        attempt_no += 1
         try:
-            return await middleware.execute(
-                agent_id=agent_id,
-                capability_id=capability_id,
-                protocol=protocol,
-                tool_name=tool_name,
-                args=args,
-                call_id=call_id,
-                config=config,
-            )
+            return await attempt()
         except (AuthInterruptRequired, PaymentInterrupt, GraphInterrupt):
             raise  # control-flow interrupts are never retried
         except Exception as exc:
             cls = _classify_stream_error(exc)
-            if cls.get("retriable") and attempt <= max_retries:
+            if cls.get("retriable") and attempt_no <= max_retries:
                 await _emit_invocation(
                     config,
                     {
@@ -313,7 +311,7 @@ async def _execute_with_retry(
                         "call_id": call_id,
                         "tool_name": tool_name,
                         "agent_id": agent_id,
-                        "attempt": attempt,
+                        "attempt": attempt_no,
                         "max_attempts": max_retries + 1,
                         "reason": cls.get("category", "transient"),
                     },
@@ -322,7 +320,7 @@ async def _execute_with_retry(
                 logger.info(
                     "execute_agent_calls: retry %s (attempt %d/%d) — %s",
                     tool_name,
-                    attempt,
+                    attempt_no,
                     max_retries + 1,
                     cls.get("category"),
                 )
@@ -330,16 +328,634 @@ async def _execute_with_retry(
             raise
 
 
+@dataclass
+class _ExternalCall:
+    """An external agent call queued in the current dispatch batch."""
+
+    index: int
+    tool_name: str
+    call_id: str
+    args: dict[str, Any]
+    agent_id: str
+    capability_id: str
+    protocol: str
+    display_name: str
+    # Pipeline steps 2–3 already run for this call (batch pre-flight).
+    prepared: PreparedCall | None = None
+    # Final content decided during pre-flight (denied auth / no credits);
+    # such a call is never dispatched.
+    content: str | None = None
+    # Non-interrupt failure of the batch pre-flight, if any.
+    prepare_error: Exception | None = None
+
+    def tool_call(self) -> dict[str, Any]:
+        return {
+            "name": self.tool_name,
+            "args": self.args,
+            "id": self.call_id,
+            "type": "tool_call",
+        }
+
+    def pipeline_kwargs(self, config: RunnableConfig) -> dict[str, Any]:
+        return {
+            "agent_id": self.agent_id,
+            "capability_id": self.capability_id,
+            "protocol": self.protocol,
+            "tool_name": self.tool_name,
+            "args": self.args,
+            "call_id": self.call_id,
+            "config": config,
+        }
+
+
+async def _capture[T](
+    semaphore: asyncio.Semaphore,
+    attempt: Awaitable[T],
+) -> tuple[T | None, Exception | None]:
+    """Await *attempt* under the per-turn concurrency limit.
+
+    Exceptions (interrupts included) are captured rather than raised so that a
+    batch of concurrent calls always completes; the caller re-raises or
+    handles them in the original ``tool_calls`` order.
+    """
+    async with semaphore:
+        try:
+            return await attempt, None
+        except Exception as exc:
+            return None, exc
+
+
+async def _resume_auth_interrupt(
+    state: dict[str, Any],
+    exc: AuthInterruptRequired,
+    *,
+    agent_id: str,
+    capability_id: str,
+) -> str | None:
+    """Suspend for user credentials; on resume store them and the OAuth grants.
+
+    On the first call ``interrupt()`` raises GraphInterrupt; on node
+    re-execution after resume it returns the stored resume value. Returns the
+    error content when the user denied access, else None — the caller then
+    re-runs pre-flight, which now finds the credentials.
+    """
+    logger.info(
+        "execute_agent_calls: auth interrupt required for agent=%s — suspending",
+        agent_id,
+    )
+    resume_value: dict[str, Any] = interrupt(exc.event.model_dump())
+
+    if (
+        exc.event.interrupt_type == InterruptType.AUTH_FORM_SUBMISSION
+        and (resume_value.get("status") or "").lower() == "complete"
+    ):
+        vault_key = str(resume_value.get("vault_key") or "").strip()
+        credential_value = str(resume_value.get("credential_value") or "").strip()
+        if vault_key and credential_value:
+            from ..vault.client import VaultClient
+
+            try:
+                await VaultClient().save_user_secret(
+                    str(state.get("user_id") or ""),
+                    vault_key,
+                    credential_value,
+                )
+            except Exception:
+                logger.exception(
+                    "Failed to persist AUTH_FORM_SUBMISSION credential for user=%s key=%s",
+                    state.get("user_id", ""),
+                    vault_key,
+                )
+
+    if resume_value.get("status") == "denied":
+        return f"Error: Authorization denied by user for agent {agent_id!r}"
+
+    event_meta = exc.event.metadata or {}
+    provider_name = str(event_meta.get("provider_name") or "")
+    scopes: list[str] = event_meta.get("scopes") or []
+    user_id: str = str(state.get("user_id") or "")
+
+    # Write Redis grants covering ALL capabilities that share the same
+    # auth strategy (fan-out), then fall back to in-memory for the
+    # current preflight check within this node execution.
+    try:
+        manifest = await MANIFEST_CACHE.get_manifest(agent_id)
+        await store_grants_for_strategy(
+            user_id=user_id,
+            agent_id=agent_id,
+            provider_name=provider_name,
+            scopes=scopes,
+            manifest=manifest,
+        )
+    except Exception:
+        logger.warning(
+            "oauth_grant_fanout_failed agent=%s — falling back to in-memory grant",
+            agent_id,
+            exc_info=True,
+        )
+
+    # Keep an in-memory grant in session state so the preflight re-run later
+    # in this same node execution passes immediately without waiting for a
+    # Redis round-trip.
+    oauth_grants: dict[str, bool] = state.get("_agent_oauth_grants", {})
+    capability_key = _redis_cap_key(agent_id, capability_id)
+    oauth_grants[capability_key] = True
+    if scopes:
+        oauth_grants[_redis_cfg_key(agent_id, provider_name, scopes)] = True
+    state["_agent_oauth_grants"] = oauth_grants
+
+    logger.info(
+        "oauth_grant_stored agent=%s capability=%s user=%s provider=%s",
+        agent_id,
+        capability_id or "*",
+        user_id,
+        provider_name,
+    )
+    return None
+
+
+def _payment_interrupt(
+    state: dict[str, Any],
+    exc: PaymentInterrupt,
+    *,
+    agent_id: str,
+    capability_id: str,
+    display_name: str,
+) -> str:
+    """Suspend for a top-up; on resume return the call's error content."""
+    logger.info(
+        "execute_agent_calls: payment interrupt for agent=%s reason=%s",
+        agent_id,
+        exc.reason,
+    )
+    import secrets
+
+    session_id: str = str(state.get("session_id") or "")
+    nonce = secrets.token_hex(4)
+    interrupt_id = f"INSUFFICIENT_CREDITS__{agent_id}__{capability_id}__{nonce}"
+    payment_event = InterruptEvent(
+        interrupt_type=InterruptType.INSUFFICIENT_CREDITS,
+        interrupt_id=interrupt_id,
+        agent_id=agent_id,
+        session_id=session_id,
+        message=f"Insufficient credits to invoke {display_name}",
+        metadata={
+            "reason": exc.reason,
+            "amount_owed": str(exc.amount),
+            "agent_display_name": display_name,
+        },
+    )
+    interrupt(payment_event.model_dump())
+    return f"Error: Insufficient credits — {exc.reason}"
+
+
+def _prepare_call(
+    state: dict[str, Any],
+    config: RunnableConfig,
+    pending_events: list[dict[str, Any]],
+    call: _ExternalCall,
+    max_retries: int,
+) -> Awaitable[PreparedCall]:
+    """Pipeline steps 2–3 for *call*, retried on transient failures."""
+    from ..middleware.pipeline import ExecutionMiddleware
+
+    middleware = ExecutionMiddleware(state=state)
+    return _with_retry(
+        lambda: middleware.prepare(**call.pipeline_kwargs(config)),
+        agent_id=call.agent_id,
+        tool_name=call.tool_name,
+        call_id=call.call_id,
+        config=config,
+        pending_events=pending_events,
+        max_retries=max_retries,
+    )
+
+
+async def _preflight_batch(
+    state: dict[str, Any],
+    config: RunnableConfig,
+    pending_events: list[dict[str, Any]],
+    semaphore: asyncio.Semaphore,
+    batch: list[_ExternalCall],
+    max_retries: int,
+) -> None:
+    """Run pipeline steps 2–3 for every call before any of them is dispatched.
+
+    LangGraph re-runs the whole node when an auth / payment interrupt is
+    resumed, so a sibling dispatched before the interrupt would be invoked —
+    and charged — a second time. Preparing the full batch first means every
+    interrupt fires while nothing has been dispatched yet. Payment
+    reservations are keyed by call_id, so re-preparing on resume re-uses them.
+    """
+    from ..middleware.pipeline import ExecutionMiddleware
+
+    outcomes = await asyncio.gather(
+        *(
+            _capture(
+                semaphore,
+                _prepare_call(state, config, pending_events, call, max_retries),
+            )
+            for call in batch
+        )
+    )
+    # Interrupts are raised serially in tool_calls order so resume values
+    # map deterministically onto calls across node re-executions.
+    for call, (prepared, error) in zip(batch, outcomes, strict=True):
+        if isinstance(error, AuthInterruptRequired):
+            denied = await _resume_auth_interrupt(
+                state, error, agent_id=call.agent_id, capability_id=call.capability_id
+            )
+            if denied is not None:
+                call.content = denied
+                continue
+            try:
+                prepared = await ExecutionMiddleware(state=state).prepare(
+                    **call.pipeline_kwargs(config)
+                )
+            except AuthInterruptRequired:
+                call.content = (
+                    f"Error: Auth still unresolved for agent {call.agent_id!r} "
+                    "after user interaction"
+                )
+                continue
+            except PaymentInterrupt as exc:
+                error = exc
+            except Exception as exc:
+                prepared, error = None, exc
+        if isinstance(error, PaymentInterrupt):
+            call.content = _payment_interrupt(
+                state,
+                error,
+                agent_id=call.agent_id,
+                capability_id=call.capability_id,
+                display_name=call.display_name,
+            )
+            continue
+        # Unprepared calls (non-interrupt failure) carry the error; the
+        # caller either re-runs the full pipeline or reports it directly.
+        call.prepared = prepared
+        call.prepare_error = error
+
+
+def _plan_call(
+    plan: dict[str, Any], node_id: str, pnd_candidates: list[Any]
+) -> _ExternalCall | None:
+    """Issue plan node *node_id* as an external call, or None if it can't be.
+
+    A node that can't be issued here stays ``pending``; the next
+    execute_dag_plan pass fails the plan on it through the regular path.
+    """
+    node = plan["nodes"][node_id]
+    tc = tool_call_for_node(
+        node, pnd_candidates, plan.get("outputs", {}), call_seq=len(plan["issued"])
+    )
+    if tc is None:
+        return None
+    resolved = parse_agent_call(tc["name"], pnd_candidates)
+    if resolved is None or not agent_allowed(resolved[0]):
+        return None
+    agent_id, capability_id, protocol = resolved
+    plan["issued"][tc["id"]] = node_id
+    node["status"] = "in_progress"
+    return _ExternalCall(
+        index=-1,
+        tool_name=tc["name"],
+        call_id=tc["id"],
+        args=tc["args"],
+        agent_id=agent_id,
+        capability_id=capability_id,
+        protocol=protocol,
+        display_name=_external_tool_display_name(
+            agent_id=agent_id,
+            internal_tool_name=tc["name"],
+            pnd_candidates=pnd_candidates,
+        ),
+    )
+
+
+async def _run_plan_batch(
+    state: dict[str, Any],
+    config: RunnableConfig,
+    pending_events: list[dict[str, Any]],
+    semaphore: asyncio.Semaphore,
+    batch: list[_ExternalCall],
+    dispatch: Callable[[_ExternalCall], Awaitable[dict[str, Any]]],
+    *,
+    plan: dict[str, Any],
+    slots: list[ToolMessage | None],
+    late_calls: list[dict[str, Any]],
+    result_store: dict[str, Any],
+    max_retries: int,
+) -> None:
+    """Run a pre-flighted DAG wave, dispatching dependents as results land.
+
+    Each result is recorded with ``mark_result`` the moment its call
+    finishes and ``ready_nodes`` is re-run, so a node starts as soon as its
+    own inputs resolve instead of waiting for the slowest node of its wave.
+    Newly issued calls are appended to *late_calls* / *slots*.
+
+    A newly ready node that needs an auth / payment interrupt is not
+    interrupted here — siblings are already running and would be replayed
+    on resume. It goes back to ``pending`` and the next execute_dag_plan
+    pass issues it in a fresh batch, which interrupts before dispatching.
+    """
+    from .execute_dag_plan import plan_limits
+
+    max_nodes, max_per_agent = plan_limits()
+    pnd_candidates = state.get("pnd_candidates", [])
+    sid = session_id_from_config(config)
+    running: dict[
+        asyncio.Task[tuple[dict[str, Any] | None, Exception | None]], _ExternalCall
+    ] = {}
+
+    async def _land(
+        call: _ExternalCall, result: dict[str, Any] | None, error: Exception | None
+    ) -> None:
+        msg, content = await _finalize_external_call(
+            state, config, pending_events, call, result, error
+        )
+        slots[call.index] = msg
+        result_store[call.call_id] = content
+        mark_result(plan, content, call.call_id)
+
+    def _start(call: _ExternalCall) -> None:
+        running[asyncio.create_task(_capture(semaphore, dispatch(call)))] = call
+
+    async def _schedule() -> None:
+        if plan["status"] != "running" or (sid and is_cancelled(sid)):
+            return
+        fresh = [
+            call
+            for node_id in ready_nodes(
+                plan, max_nodes=max_nodes, max_per_agent=max_per_agent
+            )
+            if (call := _plan_call(plan, node_id, pnd_candidates)) is not None
+        ]
+        outcomes = await asyncio.gather(
+            *(
+                _capture(
+                    semaphore,
+                    _prepare_call(state, config, pending_events, call, max_retries),
+                )
+                for call in fresh
+            )
+        )
+        for call, (prepared, error) in zip(fresh, outcomes, strict=True):
+            if isinstance(error, (AuthInterruptRequired, PaymentInterrupt)):
+                plan["nodes"][plan["issued"][call.call_id]]["status"] = "pending"
+                logger.info(
+                    "execute_agent_calls: plan node %s needs user input — "
+                    "deferred to its own batch",
+                    plan["issued"][call.call_id],
+                )
+                continue
+            call.index = len(slots)
+            slots.append(None)
+            late_calls.append(call.tool_call())
+            _bind_step_to_call(
+                state.get("task_checklist"), call.tool_name, call.call_id, call.agent_id
+            )
+            await _emit_invocation(
+                config,
+                {
+                    "type": "invocation_start",
+                    "call_id": call.call_id,
+                    "tool_name": call.tool_name,
+                    "agent_id": call.agent_id,
+                    "capability_id": call.capability_id,
+                    "protocol": call.protocol,
+                    "inputs": call.args,
+                },
+                pending_events,
+            )
+            logger.info(
+                "execute_agent_calls: plan node %s ready → %s",
+                plan["issued"][call.call_id],
+                call.tool_name,
+            )
+            if error is not None:
+                await _land(call, None, error)
+            else:
+                call.prepared = prepared
+                _start(call)
+
+    for call in batch:
+        if call.content is not None:
+            await _land(call, {"content": call.content}, None)
+        elif call.prepared is None:
+            await _land(call, None, call.prepare_error)
+        else:
+            _start(call)
+
+    while True:
+        await _schedule()
+        if not running:
+            return
+        done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+        for task in sorted(done, key=lambda t: running[t].index):
+            call = running.pop(task)
+            result, error = task.result()
+            await _land(call, result, error)
+
+
+async def _finalize_external_call(
+    state: dict[str, Any],
+    config: RunnableConfig,
+    pending_events: list[dict[str, Any]],
+    call: _ExternalCall,
+    result: dict[str, Any] | None,
+    error: Exception | None,
+) -> tuple[ToolMessage, str]:
+    """Turn a completed external call into its ToolMessage + result events.
+
+    Runs serially in ``tool_calls`` order, so node-level ``interrupt()`` calls
+    (auth / payment) and state writes (artifacts, OAuth grants) stay
+    deterministic even when the dispatch itself ran concurrently.
+    """
+    from ..config import settings as _sa_settings
+    from ..middleware.pipeline import ExecutionMiddleware
+
+    agent_id = call.agent_id
+    capability_id = call.capability_id
+    protocol = call.protocol
+    tool_name = call.tool_name
+    call_id = call.call_id
+    args = call.args
+    display_name = call.display_name
+
+    _call_base_fee = "0"
+    _call_total_cost = "0"
+    _verified = True
+    _verdict_reason = "ok"
+    try:
+        if error is not None:
+            raise error
+        if result is None:
+            raise RuntimeError(f"agent call {tool_name!r} returned no result")
+        content = result.get("content", "")
+        _max_out = int(getattr(_sa_settings, "tool_output_max_chars", 0) or 0)
+        if _max_out > 0 and len(content) > _max_out:
+            content = (
+                content[:_max_out]
+                + f"\n… [truncated: {len(content) - _max_out} chars omitted]"
+            )
+        _call_base_fee = result.get("base_fee", "0")
+        _call_total_cost = result.get("total_cost_usd", _call_base_fee)
+        _verified = result.get("verified", True)
+        _verdict_reason = result.get("verdict_reason", "ok")
+        logger.info(
+            "execute_agent_calls: ← %s | result_len=%d result_preview=%s",
+            tool_name,
+            len(content),
+            content[:800],
+        )
+        # Handle agent-produced artifact (e.g. doc-convert file output)
+        produced_artifact = result.get("artifact")
+        if produced_artifact is not None:
+            artifact_id = getattr(produced_artifact, "artifact_id", None)
+            if artifact_id:
+                existing_artifacts = dict(state.get("artifacts") or {})
+                existing_artifacts[artifact_id] = produced_artifact
+                state["artifacts"] = existing_artifacts
+                await _emit_invocation(
+                    config,
+                    {
+                        "type": "artifact_created",
+                        "artifact_id": artifact_id,
+                        "filename": getattr(produced_artifact, "filename", ""),
+                        "mime_type": getattr(produced_artifact, "mime_type", ""),
+                        "size_bytes": getattr(produced_artifact, "size_bytes", 0),
+                        "source": "AGENT_OUTPUT",
+                    },
+                    pending_events,
+                )
+        # Handle agent-produced UIManifest (CanvasKit dashboard)
+        ui_manifest = result.get("ui_manifest")
+        if ui_manifest is not None:
+            await _emit_invocation(
+                config,
+                {
+                    "type": "canvas_manifest",
+                    "manifest_id": f"canvas-{call_id}",
+                    "manifest": ui_manifest,
+                    "call_id": call_id,
+                },
+                pending_events,
+            )
+    except AuthInterruptRequired as exc:
+        # Node-level interrupt: suspends the graph until the user provides credentials.
+        denied = await _resume_auth_interrupt(
+            state, exc, agent_id=agent_id, capability_id=capability_id
+        )
+        if denied is not None:
+            content = denied
+        else:
+            # Node re-executing after resume — retry preflight (credentials now in vault)
+            try:
+                middleware2 = ExecutionMiddleware(state=state)
+                result2 = await middleware2.execute(**call.pipeline_kwargs(config))
+                content = result2.get("content", "")
+                _call_base_fee = result2.get("base_fee", "0")
+                _call_total_cost = result2.get("total_cost_usd", _call_base_fee)
+            except AuthInterruptRequired:
+                content = f"Error: Auth still unresolved for agent {agent_id!r} after user interaction"
+            except PreFlightError as pfe:
+                content = f"Error: {pfe}"
+            except Exception as retry_exc:
+                logger.exception("Agent call %r failed on resume retry", tool_name)
+                content = f"Error: {retry_exc}"
+    except PaymentInterrupt as exc:
+        content = _payment_interrupt(
+            state,
+            exc,
+            agent_id=agent_id,
+            capability_id=capability_id,
+            display_name=display_name,
+        )
+    except GraphInterrupt:
+        # Safety net: let any other LangGraph-internal interrupt propagate cleanly
+        raise
+    except PreFlightError as exc:
+        logger.error("PreFlight hard failure for %r: %s", tool_name, exc)
+        content = f"Error: {exc}"
+    except Exception as exc:
+        logger.exception("Agent call %r failed", tool_name)
+        content = f"Error: {exc}"
+
+    # v1.3 verdict normalization — any Error content is unverified, no matter
+    # which path produced it (returned string, raised+exhausted retry,
+    # auth-denied, preflight). Previously a raised failure left the
+    # initialized _verified=True, mislabelling failed steps as ✓ Verified.
+    # Success keeps the middleware's structural verdict from pipeline step 5.5.
+    if content.startswith(("Error:", "Input error:", "Unsupported protocol:")):
+        _verified = False
+        if not _verdict_reason or _verdict_reason == "ok":
+            _verdict_reason = content[:120]
+
+    cost_payload: dict[str, Any] = {}
+    if _call_total_cost and _call_total_cost != "0":
+        cost_payload["total_cost_usd"] = _call_total_cost
+        cost_payload["base_fee"] = _call_base_fee
+
+    await _emit_invocation(
+        config,
+        {
+            "type": "invocation_result",
+            "call_id": call_id,
+            "tool_name": tool_name,
+            "agent_id": agent_id,
+            "status": _result_status(content),
+            "content_preview": content[:300],
+            "verified": _verified,
+            "verdict_reason": _verdict_reason,
+            **cost_payload,
+        },
+        pending_events,
+    )
+
+    transcript_meta = _tool_transcript_meta(
+        agent_id=agent_id,
+        capability_id=capability_id,
+        protocol=protocol,
+        internal_tool_name=tool_name,
+        invocation_args=args,
+        base_fee=_call_base_fee,
+        verified=_verified,
+        verdict_reason=_verdict_reason,
+        total_cost_usd=_call_total_cost,
+    )
+
+    msg = ToolMessage(
+        content=content,
+        tool_call_id=call_id,
+        name=display_name,
+        additional_kwargs={TRANSCRIPT_TOOL_META_KEY: transcript_meta},
+    )
+    return msg, content
+
+
 async def execute_agent_calls_node(
     state: dict[str, Any],
     config: RunnableConfig,
 ) -> dict[str, Any]:
     """
-    Execute all tool calls from the last AI message sequentially.
+    Execute all tool calls from the last AI message.
 
     System tools are dispatched to the SystemToolRegistry.
     External agent calls go through the ExecutionMiddleware pipeline.
+
+    By default calls run sequentially. With ``parallel_tool_calls_enabled``
+    the external calls between two system tools are fanned out concurrently
+    (at most ``max_parallel_tool_calls`` in flight). System tools act as
+    barriers: in-flight calls are drained before one runs, so handlers that
+    mutate ``task_checklist`` / ``captured_workflow`` see the same state as
+    in sequential mode. A DAG plan wave (``active_plan`` running) is always
+    dispatched concurrently, and plan nodes it unlocks are dispatched as soon
+    as their dependencies finish (see ``_run_plan_batch``); their tool calls
+    follow in one extra AIMessage. ToolMessages are always emitted in
+    ``tool_calls`` order.
     """
+    from ..config import settings as _sa_settings
     from ..middleware.pipeline import ExecutionMiddleware
     from ..system_tools.registry import SYSTEM_TOOL_REGISTRY
 
@@ -355,42 +971,139 @@ async def execute_agent_calls_node(
     if not tool_calls:
         return {}
 
+    plan = state.get("active_plan")
+    if isinstance(plan, dict) and plan.get("status") == "running":
+        # A DAG wave from execute_dag_plan. Dependents are scheduled here as
+        # results land; ready_nodes keeps the plan within its in-flight caps.
+        from .execute_dag_plan import plan_limits
+
+        plan = copy.deepcopy(plan)
+        parallel = True
+        max_in_flight = plan_limits()[0]
+    else:
+        plan = None
+        parallel = bool(getattr(_sa_settings, "parallel_tool_calls_enabled", False))
+        max_in_flight = (
+            max(1, int(getattr(_sa_settings, "max_parallel_tool_calls", 4) or 1))
+            if parallel
+            else 1
+        )
+    _verify_max_retries = max(0, int(getattr(_sa_settings, "verify_max_retries", 2)))
+
     logger.info(
-        "execute_agent_calls: dispatching %d tool call(s): [%s]",
+        "execute_agent_calls: dispatching %d tool call(s) (%s): [%s]",
         len(tool_calls),
+        f"parallel, limit={max_in_flight}" if parallel else "sequential",
         ", ".join(tc.get("name", "?") for tc in tool_calls),
     )
 
     sid = session_id_from_config(config)
     pnd_candidates = state.get("pnd_candidates", [])
-    tool_messages: list[ToolMessage] = []
+    # One slot per tool call so concurrent completion never reorders messages.
+    slots: list[ToolMessage | None] = [None] * len(tool_calls)
     result_store: dict[str, Any] = {}
     system_tool_called = False
     pending_events: list[dict[str, Any]] = []
+    semaphore = asyncio.Semaphore(max_in_flight)
+    queued: list[_ExternalCall] = []
+    # Plan calls issued during this node, after the incoming AIMessage.
+    late_calls: list[dict[str, Any]] = []
 
     # Keys that system tools may mutate directly on the state dict
     _MUTABLE_STATE_KEYS = ("task_checklist", "captured_workflow")
 
+    async def _drain() -> None:
+        """Dispatch the queued external calls, then finalize them in order.
+
+        A concurrent batch is pre-flighted as a whole first (see
+        ``_preflight_batch``), so auth / payment interrupts suspend the node
+        before any call in the batch has been dispatched.
+        """
+        if not queued:
+            return
+        batch = list(queued)
+        queued.clear()
+        if len(batch) > 1 or plan is not None:
+            await _preflight_batch(
+                state,
+                config,
+                pending_events,
+                semaphore,
+                batch,
+                _verify_max_retries,
+            )
+
+        def _dispatch(call: _ExternalCall) -> Awaitable[dict[str, Any]]:
+            middleware = ExecutionMiddleware(state=state)
+            kwargs = call.pipeline_kwargs(config)
+            if call.prepared is not None:
+                kwargs["prepared"] = call.prepared
+            return _with_retry(
+                lambda: middleware.execute(**kwargs),
+                agent_id=call.agent_id,
+                tool_name=call.tool_name,
+                call_id=call.call_id,
+                config=config,
+                pending_events=pending_events,
+                max_retries=_verify_max_retries,
+            )
+
+        if plan is not None:
+            await _run_plan_batch(
+                state,
+                config,
+                pending_events,
+                semaphore,
+                batch,
+                _dispatch,
+                plan=plan,
+                slots=slots,
+                late_calls=late_calls,
+                result_store=result_store,
+                max_retries=_verify_max_retries,
+            )
+            return
+
+        dispatched = [call for call in batch if call.content is None]
+        outcomes = dict(
+            zip(
+                (call.call_id for call in dispatched),
+                await asyncio.gather(
+                    *(_capture(semaphore, _dispatch(call)) for call in dispatched)
+                ),
+                strict=True,
+            )
+        )
+        for call in batch:
+            if call.content is not None:
+                result, error = {"content": call.content}, None
+            else:
+                result, error = outcomes[call.call_id]
+            msg, content = await _finalize_external_call(
+                state, config, pending_events, call, result, error
+            )
+            slots[call.index] = msg
+            result_store[call.call_id] = content
+
     for idx, tc in enumerate(tool_calls):
         if sid and is_cancelled(sid):
             cancel_msg = "Execution stopped by user."
-            for rem in tool_calls[idx:]:
+            for rem_idx in range(idx, len(tool_calls)):
+                rem = tool_calls[rem_idx]
                 rid = str(rem.get("id", ""))
                 rname = str(rem.get("name", "") or "cancelled")
                 rargs = rem.get("args") if isinstance(rem.get("args"), dict) else {}
-                tool_messages.append(
-                    ToolMessage(
-                        content=cancel_msg,
-                        tool_call_id=rid,
-                        name=rname,
-                        additional_kwargs={
-                            TRANSCRIPT_TOOL_META_KEY: _tool_transcript_meta(
-                                agent_id="_system",
-                                internal_tool_name=rname,
-                                invocation_args=rargs,
-                            )
-                        },
-                    )
+                slots[rem_idx] = ToolMessage(
+                    content=cancel_msg,
+                    tool_call_id=rid,
+                    name=rname,
+                    additional_kwargs={
+                        TRANSCRIPT_TOOL_META_KEY: _tool_transcript_meta(
+                            agent_id="_system",
+                            internal_tool_name=rname,
+                            invocation_args=rargs,
+                        )
+                    },
                 )
                 await _emit_invocation(
                     config,
@@ -411,7 +1124,6 @@ async def execute_agent_calls_node(
             )
             break
 
-        _call_base_fee: str = "0"  # reset for each tool call
         tool_name: str = tc.get("name", "")
         call_id: str = tc.get("id", "")
         args: dict[str, Any] = (
@@ -426,10 +1138,9 @@ async def execute_agent_calls_node(
                     "execute_agent_calls: KY-A allowlist rejected system tool %r",
                     tool_name,
                 )
-                await _reject_disallowed_tool_call(
+                slots[idx] = await _reject_disallowed_tool_call(
                     config,
                     pending_events,
-                    tool_messages,
                     result_store,
                     tool_name=tool_name,
                     call_id=call_id,
@@ -441,6 +1152,9 @@ async def execute_agent_calls_node(
                     ),
                 )
                 continue
+            # Barrier: system tools read/mutate shared state, so every earlier
+            # external call must have landed before the handler runs.
+            await _drain()
             system_tool_called = True
             await _emit_invocation(
                 config,
@@ -496,19 +1210,17 @@ async def execute_agent_calls_node(
             except Exception as exc:
                 logger.exception("System tool %r failed", tool_name)
                 content = f"Error: {exc}"
-            tool_messages.append(
-                ToolMessage(
-                    content=content,
-                    tool_call_id=call_id,
-                    name=tool_name,
-                    additional_kwargs={
-                        TRANSCRIPT_TOOL_META_KEY: _tool_transcript_meta(
-                            agent_id="_system",
-                            internal_tool_name=tool_name,
-                            invocation_args=args,
-                        )
-                    },
-                )
+            slots[idx] = ToolMessage(
+                content=content,
+                tool_call_id=call_id,
+                name=tool_name,
+                additional_kwargs={
+                    TRANSCRIPT_TOOL_META_KEY: _tool_transcript_meta(
+                        agent_id="_system",
+                        internal_tool_name=tool_name,
+                        invocation_args=args,
+                    )
+                },
             )
             result_store[call_id] = content
             await _emit_invocation(
@@ -543,19 +1255,17 @@ async def execute_agent_calls_node(
                 },
                 pending_events,
             )
-            tool_messages.append(
-                ToolMessage(
-                    content=err_content,
-                    tool_call_id=call_id,
-                    name=tool_name or "unknown tool",
-                    additional_kwargs={
-                        TRANSCRIPT_TOOL_META_KEY: _tool_transcript_meta(
-                            agent_id="_unresolved",
-                            internal_tool_name=tool_name,
-                            invocation_args=args,
-                        )
-                    },
-                )
+            slots[idx] = ToolMessage(
+                content=err_content,
+                tool_call_id=call_id,
+                name=tool_name or "unknown tool",
+                additional_kwargs={
+                    TRANSCRIPT_TOOL_META_KEY: _tool_transcript_meta(
+                        agent_id="_unresolved",
+                        internal_tool_name=tool_name,
+                        invocation_args=args,
+                    )
+                },
             )
             result_store[call_id] = err_content
             await _emit_invocation(
@@ -581,10 +1291,9 @@ async def execute_agent_calls_node(
                 agent_id,
                 tool_name,
             )
-            await _reject_disallowed_tool_call(
+            slots[idx] = await _reject_disallowed_tool_call(
                 config,
                 pending_events,
-                tool_messages,
                 result_store,
                 tool_name=tool_name,
                 call_id=call_id,
@@ -620,10 +1329,6 @@ async def execute_agent_calls_node(
             pending_events,
         )
 
-        _call_base_fee = "0"
-        _call_total_cost = "0"
-        _verified = True
-        _verdict_reason = "ok"
         logger.info(
             "execute_agent_calls: → %s | agent=%s capability=%s protocol=%s args=%s",
             tool_name,
@@ -632,262 +1337,34 @@ async def execute_agent_calls_node(
             protocol,
             json.dumps(args, default=str)[:600],
         )
-        try:
-            from ..config import settings as _sa_settings
-
-            _verify_max_retries = max(
-                0, int(getattr(_sa_settings, "verify_max_retries", 2))
-            )
-            middleware = ExecutionMiddleware(state=state)
-            result = await _execute_with_retry(
-                middleware,
-                agent_id=agent_id,
-                capability_id=capability_id,
-                protocol=protocol,
+        queued.append(
+            _ExternalCall(
+                index=idx,
                 tool_name=tool_name,
-                args=args,
                 call_id=call_id,
-                config=config,
-                pending_events=pending_events,
-                max_retries=_verify_max_retries,
-            )
-            content = result.get("content", "")
-            _max_out = int(getattr(_sa_settings, "tool_output_max_chars", 0) or 0)
-            if _max_out > 0 and len(content) > _max_out:
-                content = (
-                    content[:_max_out]
-                    + f"\n… [truncated: {len(content) - _max_out} chars omitted]"
-                )
-            _call_base_fee = result.get("base_fee", "0")
-            _call_total_cost = result.get("total_cost_usd", _call_base_fee)
-            _verified = result.get("verified", True)
-            _verdict_reason = result.get("verdict_reason", "ok")
-            logger.info(
-                "execute_agent_calls: ← %s | result_len=%d result_preview=%s",
-                tool_name,
-                len(content),
-                content[:800],
-            )
-            # Handle agent-produced artifact (e.g. doc-convert file output)
-            produced_artifact = result.get("artifact")
-            if produced_artifact is not None:
-                artifact_id = getattr(produced_artifact, "artifact_id", None)
-                if artifact_id:
-                    existing_artifacts = dict(state.get("artifacts") or {})
-                    existing_artifacts[artifact_id] = produced_artifact
-                    state["artifacts"] = existing_artifacts
-                    await _emit_invocation(
-                        config,
-                        {
-                            "type": "artifact_created",
-                            "artifact_id": artifact_id,
-                            "filename": getattr(produced_artifact, "filename", ""),
-                            "mime_type": getattr(produced_artifact, "mime_type", ""),
-                            "size_bytes": getattr(produced_artifact, "size_bytes", 0),
-                            "source": "AGENT_OUTPUT",
-                        },
-                        pending_events,
-                    )
-            # Handle agent-produced UIManifest (CanvasKit dashboard)
-            ui_manifest = result.get("ui_manifest")
-            if ui_manifest is not None:
-                await _emit_invocation(
-                    config,
-                    {
-                        "type": "canvas_manifest",
-                        "manifest_id": f"canvas-{call_id}",
-                        "manifest": ui_manifest,
-                        "call_id": call_id,
-                    },
-                    pending_events,
-                )
-        except AuthInterruptRequired as exc:
-            # Node-level interrupt: suspends the graph until the user provides credentials.
-            # On the first call interrupt() raises GraphInterrupt; on node re-execution
-            # after resume it returns the stored resume value.
-            logger.info(
-                "execute_agent_calls: auth interrupt required for agent=%s — suspending",
-                agent_id,
-            )
-            resume_value: dict[str, Any] = interrupt(exc.event.model_dump())
-
-            if (
-                exc.event.interrupt_type == InterruptType.AUTH_FORM_SUBMISSION
-                and (resume_value.get("status") or "").lower() == "complete"
-            ):
-                vault_key = str(resume_value.get("vault_key") or "").strip()
-                credential_value = str(
-                    resume_value.get("credential_value") or ""
-                ).strip()
-                if vault_key and credential_value:
-                    from ..vault.client import VaultClient
-
-                    try:
-                        await VaultClient().save_user_secret(
-                            str(state.get("user_id") or ""),
-                            vault_key,
-                            credential_value,
-                        )
-                    except Exception:
-                        logger.exception(
-                            "Failed to persist AUTH_FORM_SUBMISSION credential for user=%s key=%s",
-                            state.get("user_id", ""),
-                            vault_key,
-                        )
-
-            # Node re-executing after resume — retry preflight (credentials now in vault)
-            if resume_value.get("status") == "denied":
-                content = f"Error: Authorization denied by user for agent {agent_id!r}"
-            else:
-                event_meta = exc.event.metadata or {}
-                provider_name = str(event_meta.get("provider_name") or "")
-                scopes: list[str] = event_meta.get("scopes") or []
-                user_id: str = str(state.get("user_id") or "")
-
-                # Write Redis grants covering ALL capabilities that share the same
-                # auth strategy (fan-out), then fall back to in-memory for the
-                # current preflight check within this node execution.
-                try:
-                    manifest = await MANIFEST_CACHE.get_manifest(agent_id)
-                    await store_grants_for_strategy(
-                        user_id=user_id,
-                        agent_id=agent_id,
-                        provider_name=provider_name,
-                        scopes=scopes,
-                        manifest=manifest,
-                    )
-                except Exception:
-                    logger.warning(
-                        "oauth_grant_fanout_failed agent=%s — falling back to in-memory grant",
-                        agent_id,
-                        exc_info=True,
-                    )
-
-                # Keep an in-memory grant in session state so the preflight check
-                # later in this same node execution (middleware2) passes immediately
-                # without waiting for a Redis round-trip.
-                oauth_grants: dict[str, bool] = state.get("_agent_oauth_grants", {})
-                capability_key = _redis_cap_key(agent_id, capability_id)
-                oauth_grants[capability_key] = True
-                if scopes:
-                    oauth_grants[_redis_cfg_key(agent_id, provider_name, scopes)] = True
-                state["_agent_oauth_grants"] = oauth_grants
-
-                logger.info(
-                    "oauth_grant_stored agent=%s capability=%s user=%s provider=%s",
-                    agent_id,
-                    capability_id or "*",
-                    user_id,
-                    provider_name,
-                )
-                try:
-                    middleware2 = ExecutionMiddleware(state=state)
-                    result2 = await middleware2.execute(
-                        agent_id=agent_id,
-                        capability_id=capability_id,
-                        protocol=protocol,
-                        tool_name=tool_name,
-                        args=args,
-                        call_id=call_id,
-                        config=config,
-                    )
-                    content = result2.get("content", "")
-                    _call_base_fee = result2.get("base_fee", "0")
-                    _call_total_cost = result2.get("total_cost_usd", _call_base_fee)
-                except AuthInterruptRequired:
-                    content = f"Error: Auth still unresolved for agent {agent_id!r} after user interaction"
-                except PreFlightError as pfe:
-                    content = f"Error: {pfe}"
-                except Exception as retry_exc:
-                    logger.exception("Agent call %r failed on resume retry", tool_name)
-                    content = f"Error: {retry_exc}"
-        except PaymentInterrupt as exc:
-            logger.info(
-                "execute_agent_calls: payment interrupt for agent=%s reason=%s",
-                agent_id,
-                exc.reason,
-            )
-            import secrets
-
-            session_id: str = str(state.get("session_id") or "")
-            nonce = secrets.token_hex(4)
-            interrupt_id = f"INSUFFICIENT_CREDITS__{agent_id}__{capability_id}__{nonce}"
-            payment_event = InterruptEvent(
-                interrupt_type=InterruptType.INSUFFICIENT_CREDITS,
-                interrupt_id=interrupt_id,
+                args=args,
                 agent_id=agent_id,
-                session_id=session_id,
-                message=f"Insufficient credits to invoke {display_name}",
-                metadata={
-                    "reason": exc.reason,
-                    "amount_owed": str(exc.amount),
-                    "agent_display_name": display_name,
-                },
+                capability_id=capability_id,
+                protocol=protocol,
+                display_name=display_name,
             )
-            interrupt(payment_event.model_dump())
-            content = f"Error: Insufficient credits — {exc.reason}"
-        except GraphInterrupt:
-            # Safety net: let any other LangGraph-internal interrupt propagate cleanly
-            raise
-        except PreFlightError as exc:
-            logger.error("PreFlight hard failure for %r: %s", tool_name, exc)
-            content = f"Error: {exc}"
-        except Exception as exc:
-            logger.exception("Agent call %r failed", tool_name)
-            content = f"Error: {exc}"
-
-        # v1.3 verdict normalization — any Error content is unverified, no matter
-        # which path produced it (returned string, raised+exhausted retry,
-        # auth-denied, preflight). Previously a raised failure left the
-        # initialized _verified=True, mislabelling failed steps as ✓ Verified.
-        # Success keeps the middleware's structural verdict from pipeline step 5.5.
-        if content.startswith(("Error:", "Input error:", "Unsupported protocol:")):
-            _verified = False
-            if not _verdict_reason or _verdict_reason == "ok":
-                _verdict_reason = content[:120]
-
-        cost_payload: dict[str, Any] = {}
-        if _call_total_cost and _call_total_cost != "0":
-            cost_payload["total_cost_usd"] = _call_total_cost
-            cost_payload["base_fee"] = _call_base_fee
-
-        await _emit_invocation(
-            config,
-            {
-                "type": "invocation_result",
-                "call_id": call_id,
-                "tool_name": tool_name,
-                "agent_id": agent_id,
-                "status": _result_status(content),
-                "content_preview": content[:300],
-                "verified": _verified,
-                "verdict_reason": _verdict_reason,
-                **cost_payload,
-            },
-            pending_events,
         )
-
-        transcript_meta = _tool_transcript_meta(
-            agent_id=agent_id,
-            capability_id=capability_id,
-            protocol=protocol,
-            internal_tool_name=tool_name,
-            invocation_args=args,
-            base_fee=_call_base_fee,
-            verified=_verified,
-            verdict_reason=_verdict_reason,
-            total_cost_usd=_call_total_cost,
-        )
-
+        if not parallel:
+            await _drain()
+
+    await _drain()
+    tool_messages: list[AIMessage | ToolMessage] = [
+        m for m in slots[: len(tool_calls)] if m is not None
+    ]
+    if late_calls:
         tool_messages.append(
-            ToolMessage(
-                content=content,
-                tool_call_id=call_id,
-                name=display_name,
-                additional_kwargs={TRANSCRIPT_TOOL_META_KEY: transcript_meta},
+            AIMessage(
+                content="",
+                tool_calls=late_calls,
+                additional_kwargs={SYNTHETIC_MESSAGE_KEY: True},
             )
         )
-        result_store[call_id] = content
+        tool_messages.extend(m for m in slots[len(tool_calls) :] if m is not None)
 
     updates: dict[str, Any] = {
         "messages": tool_messages,
@@ -896,6 +1373,8 @@ async def execute_agent_calls_node(
         # Always flush artifacts — agent calls may have added new artifact refs
         "artifacts": dict(state.get("artifacts") or {}),
     }
+    if plan is not None:
+        updates["active_plan"] = plan
     if system_tool_called:
         # Flush any state mutations (direct dict writes or in-place object mutations)
         # made by system tool handlers back into LangGraph state.
@@ -1,10 +1,16 @@
 """execute_dag_plan node (Slice 1).
 
-Drives an active DAG plan: marks the previous call's result, picks the next
-ready node, and issues it as a synthetic tool call — dispatched by the
-existing execute_agent_calls node, so every plan step gets the full
-ExecutionMiddleware pipeline (verification, settlement, checklist, SSE).
-v1 is sequential: one plan node in flight at a time.
+Drives an active DAG plan: picks every node whose dependencies are
+satisfied and issues them together as one batch of synthetic tool calls —
+dispatched concurrently by the existing execute_agent_calls node, so every
+plan step gets the full ExecutionMiddleware pipeline (verification,
+settlement, checklist, SSE). execute_agent_calls records each result as it
+lands and dispatches the nodes it unlocks straight away, so one slow node
+never holds back an unrelated branch. In-flight nodes are capped per plan
+(``dag_max_parallel_nodes``) and per agent (``dag_max_parallel_per_agent``).
+
+This node starts the plan, re-issues nodes that were deferred for user
+input (auth / payment) and decides when the plan is finished.
 """
 
 from __future__ import annotations
@@ -13,19 +19,29 @@ import copy
 import logging
 from typing import Any
 
-from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.messages import AIMessage
 from langchain_core.runnables import RunnableConfig
 
 from .dag_plan import (
     checklist_for_plan,
-    mark_result,
-    next_ready_node,
+    ready_nodes,
     tool_call_for_node,
 )
 
 logger = logging.getLogger(__name__)
 
 
+def plan_limits() -> tuple[int, int]:
+    """(max in-flight nodes per plan, max in-flight nodes per agent)."""
+    from ..config import settings as _sa_settings
+
+    max_nodes = max(1, int(getattr(_sa_settings, "dag_max_parallel_nodes", 4) or 1))
+    max_per_agent = max(
+        1, int(getattr(_sa_settings, "dag_max_parallel_per_agent", 2) or 1)
+    )
+    return max_nodes, max_per_agent
+
+
 async def execute_dag_plan_node(
     state: dict[str, Any], config: RunnableConfig
 ) -> dict[str, Any]:
@@ -35,50 +51,54 @@ async def execute_dag_plan_node(
 
     plan = copy.deepcopy(plan)
 
-    # 1. Record the result of the previously issued call, if any.
-    messages = state.get("messages", [])
-    if plan["issued"] and messages and isinstance(messages[-1], ToolMessage):
-        tm = messages[-1]
-        content = tm.content if isinstance(tm.content, str) else str(tm.content)
-        plan = mark_result(plan, content, str(tm.tool_call_id))
-        if plan["status"] != "running":
-            logger.info("execute_dag_plan: plan %s", plan["status"])
+    # 1. Pick the next wavefront; nothing ready and nothing in flight → done.
+    max_nodes, max_per_agent = plan_limits()
+    wave = ready_nodes(plan, max_nodes=max_nodes, max_per_agent=max_per_agent)
+    if not wave:
+        stalled = [
+            nid for nid, n in plan["nodes"].items() if n["status"] == "in_progress"
+        ]
+        if stalled:
+            # A dispatched node never reported back — its dependents can
+            # never unlock, so fail rather than loop through the orchestrator.
+            plan["status"] = "failed"
+            logger.warning(
+                "execute_dag_plan: no result for node(s) %s — plan aborted", stalled
+            )
             return {"active_plan": plan}
-
-    # 2. Pick the next ready node; none → plan complete.
-    node_id = next_ready_node(plan)
-    if node_id is None:
         plan["status"] = "completed"
         logger.info("execute_dag_plan: plan %s completed", plan["plan_id"])
         return {"active_plan": plan}
 
-    # 3. Build the synthetic tool call for this node.
-    tc = tool_call_for_node(
-        plan["nodes"][node_id],
-        state.get("pnd_candidates", []),
-        plan.get("outputs", {}),
-        call_seq=len(plan["issued"]),
-    )
-    if tc is None:
-        plan["nodes"][node_id]["status"] = "failed"
-        plan["status"] = "failed"
-        logger.warning(
-            "execute_dag_plan: node %s not dispatchable — plan aborted", node_id
+    # 2. Build one synthetic tool call per wave node.
+    tool_calls: list[dict[str, Any]] = []
+    for node_id in wave:
+        tc = tool_call_for_node(
+            plan["nodes"][node_id],
+            state.get("pnd_candidates", []),
+            plan.get("outputs", {}),
+            call_seq=len(plan["issued"]),
         )
-        return {"active_plan": plan}
+        if tc is None:
+            plan["nodes"][node_id]["status"] = "failed"
+            plan["status"] = "failed"
+            logger.warning(
+                "execute_dag_plan: node %s not dispatchable — plan aborted", node_id
+            )
+            return {"active_plan": plan}
+        plan["issued"][tc["id"]] = node_id
+        plan["nodes"][node_id]["status"] = "in_progress"
+        tool_calls.append(tc)
 
-    plan["issued"][tc["id"]] = node_id
-    plan["nodes"][node_id]["status"] = "in_progress"
     logger.info(
-        "execute_dag_plan: dispatching node %s as %s (call %s)",
-        node_id,
-        tc["name"],
-        tc["id"],
+        "execute_dag_plan: dispatching wave of %d node(s): %s",
+        len(tool_calls),
+        ", ".join(f"{plan['issued'][tc['id']]}→{tc['name']}" for tc in tool_calls),
     )
 
     updates: dict[str, Any] = {
         "active_plan": plan,
-        "messages": [AIMessage(content="", tool_calls=[tc])],
+        "messages": [AIMessage(content="", tool_calls=tool_calls)],
     }
     if not plan.get("checklist_built"):
         plan["checklist_built"] = True
@@ -659,6 +659,14 @@ async def orchestrator_llm_node(
     pnd_tools = _candidates_to_tools(pnd_candidates)
     baseline_tools = [] if kya_mode_enabled() else get_baseline_openai_tools()
 
+    # Warm the manifest cache for every candidate while the LLM streams, so
+    # PreFlight on the first tool call of the turn finds them already cached.
+    if pnd_candidates and settings.manifest_prefetch_enabled:
+        from ..middleware.manifest_cache import MANIFEST_CACHE
+        from ..pnd.candidate_compat import cand_agent_id
+
+        MANIFEST_CACHE.prefetch_in_background(cand_agent_id(c) for c in pnd_candidates)
+
     all_tools = system_tools + _dedupe_tools_by_name(baseline_tools + pnd_tools)
     lc_messages = _build_lc_messages(state)
 
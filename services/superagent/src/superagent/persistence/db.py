@@ -0,0 +1,226 @@
+"""Shared, lifespan-managed Prisma client.
+
+Persistence helpers used to run ``Prisma(); await db.connect(); ...;
+await db.disconnect()`` per operation — a fresh query-engine connection (TCP +
+Postgres auth) for every vault lookup, transcript append or credit check.
+``DB`` keeps one connected client for the whole process; its query engine
+owns a bounded connection pool (``db_pool_size``) that every caller shares.
+
+Callers check a client out per operation::
+
+    async with DB.session() as db:
+        user = await db.user.find_unique(where={"id": user_id})
+
+Checkouts are bounded to the pool size, so under load callers queue here
+(measured in ``stats()``) instead of inside the engine. A connection idle for
+longer than ``db_health_check_seconds`` is probed with ``SELECT 1`` before it
+is handed out, and a failed probe reconnects the client.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Any
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+logger = logging.getLogger(__name__)
+
+
+class DatabaseUnavailableError(RuntimeError):
+    """No pooled connection could be checked out in time."""
+
+
+def pooled_url(url: str, *, pool_size: int, pool_timeout: float) -> str:
+    """Add Prisma's ``connection_limit`` / ``pool_timeout`` unless already set."""
+    parts = urlsplit(url)
+    query = dict(parse_qsl(parts.query, keep_blank_values=True))
+    query.setdefault("connection_limit", str(pool_size))
+    query.setdefault("pool_timeout", str(int(pool_timeout)))
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+class DatabasePool:
+    """One connected Prisma client per process with bounded checkouts."""
+
+    def __init__(
+        self,
+        *,
+        pool_size: int = 10,
+        checkout_timeout_seconds: float = 10.0,
+        health_check_seconds: float = 30.0,
+    ) -> None:
+        self.pool_size = max(1, pool_size)
+        self.checkout_timeout_seconds = checkout_timeout_seconds
+        self.health_check_seconds = health_check_seconds
+        self._client: Any = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._slots: asyncio.Semaphore | None = None
+        self._connect_lock: asyncio.Lock | None = None
+        self._last_ok = 0.0
+        self.in_use = 0
+        self.waiting = 0
+        self.checkouts_total = 0
+        self.checkout_timeouts = 0
+        self.errors_total = 0
+        self.reconnects = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def _bind_loop(self) -> None:
+        # The engine's HTTP client belongs to the loop that connected it.
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._client = None
+            self._slots = asyncio.Semaphore(self.pool_size)
+            self._connect_lock = asyncio.Lock()
+
+    def _new_client(self) -> Any:
+        from src.generated_client import Prisma
+
+        from ..config import settings
+
+        return Prisma(
+            datasource={
+                "url": pooled_url(
+                    settings.database_url,
+                    pool_size=self.pool_size,
+                    pool_timeout=self.checkout_timeout_seconds,
+                )
+            }
+        )
+
+    async def connect(self) -> Any:
+        """Connect the shared client if needed (idempotent)."""
+        self._bind_loop()
+        assert self._connect_lock is not None
+        async with self._connect_lock:
+            if self._client is None or not self._client.is_connected():
+                client = self._new_client()
+                await client.connect()
+                self._client = client
+                self._last_ok = time.monotonic()
+                logger.info("Database pool connected (pool_size=%d)", self.pool_size)
+            return self._client
+
+    async def _reconnect(self) -> Any:
+        assert self._connect_lock is not None
+        async with self._connect_lock:
+            stale, self._client = self._client, None
+            self.reconnects += 1
+        if stale is not None:
+            try:
+                await stale.disconnect()
+            except Exception:
+                logger.debug("Database pool: stale client disconnect failed")
+        return await self.connect()
+
+    async def health_check(self) -> bool:
+        """Probe the shared client with ``SELECT 1``; reconnect once on failure."""
+        client = await self.connect()
+        try:
+            await client.query_raw("SELECT 1")
+        except Exception:
+            logger.warning("Database health check failed — reconnecting")
+            try:
+                client = await self._reconnect()
+                await client.query_raw("SELECT 1")
+            except Exception:
+                logger.exception("Database reconnect failed")
+                return False
+        self._last_ok = time.monotonic()
+        return True
+
+    @asynccontextmanager
+    async def session(self) -> AsyncIterator[Any]:
+        """Check the shared client out for one operation."""
+        self._bind_loop()
+        assert self._slots is not None
+        started = time.monotonic()
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(
+                self._slots.acquire(), timeout=self.checkout_timeout_seconds
+            )
+        except TimeoutError as exc:
+            self.checkout_timeouts += 1
+            raise DatabaseUnavailableError(
+                f"no database connection within {self.checkout_timeout_seconds}s"
+            ) from exc
+        finally:
+            self.waiting -= 1
+        waited = time.monotonic() - started
+        self.wait_seconds_total += waited
+        self.wait_seconds_max = max(self.wait_seconds_max, waited)
+        self.checkouts_total += 1
+        self.in_use += 1
+        try:
+            client = await self.connect()
+            if time.monotonic() - self._last_ok > self.health_check_seconds:
+                await self.health_check()
+                client = self._client
+            try:
+                yield client
+            except Exception:
+                self.errors_total += 1
+                raise
+            else:
+                self._last_ok = time.monotonic()
+        finally:
+            self.in_use -= 1
+            self._slots.release()
+
+    def stats(self) -> dict[str, Any]:
+        """Pool utilisation, for ``GET /health/db``."""
+        return {
+            "connected": bool(self._client is not None and self._client.is_connected()),
+            "pool_size": self.pool_size,
+            "in_use": self.in_use,
+            "waiting": self.waiting,
+            "checkouts_total": self.checkouts_total,
+            "checkout_timeouts": self.checkout_timeouts,
+            "errors_total": self.errors_total,
+            "reconnects": self.reconnects,
+            "wait_seconds_avg": round(
+                self.wait_seconds_total / (self.checkouts_total or 1), 4
+            ),
+            "wait_seconds_max": round(self.wait_seconds_max, 4),
+        }
+
+    async def aclose(self) -> None:
+        """Disconnect the shared client (lifespan shutdown)."""
+        client, self._client = self._client, None
+        if client is not None and client.is_connected():
+            try:
+                await client.disconnect()
+            except Exception:
+                logger.debug("Database pool: disconnect failed", exc_info=True)
+
+
+@asynccontextmanager
+async def use_db(db: Any = None) -> AsyncIterator[Any]:
+    """Yield *db* if the caller supplied one (tests, an open transaction),
+    otherwise a pooled checkout from ``DB``."""
+    if db is not None:
+        yield db
+        return
+    async with DB.session() as pooled:
+        yield pooled
+
+
+def _build_pool() -> DatabasePool:
+    from ..config import settings
+
+    return DatabasePool(
+        pool_size=settings.db_pool_size,
+        checkout_timeout_seconds=settings.db_checkout_timeout_seconds,
+        health_check_seconds=settings.db_health_check_seconds,
+    )
+
+
+# Module-level singleton
+DB = _build_pool()
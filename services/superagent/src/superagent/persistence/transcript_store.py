@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import logging
+from collections.abc import AsyncIterator
 from datetime import UTC, datetime
 from typing import Any
 
@@ -15,16 +16,31 @@ from langchain_core.messages import (
     messages_from_dict,
 )
 
+from ..config import settings
 from ..tool_call_parsing import normalize_openai_api_tool_calls
+from .db import DB
+from .write_behind import WriteBehindQueue
 
 logger = logging.getLogger(__name__)
 
 # ToolMessage.additional_kwargs — persisted to SessionTranscriptEntry.tool_inputs (JSON)
 TRANSCRIPT_TOOL_META_KEY = "transcript_meta"
+# additional_kwargs flag on AIMessages the graph fabricates (late DAG plan
+# calls); they are not assistant turns and get no transcript row of their own.
+SYNTHETIC_MESSAGE_KEY = "synthetic"
 
 DEFAULT_TITLE = "New chat"
 _MAX_PAGE_SIZE = 50
 
+# Transcript writes run after the SSE stream closes (see ``GraphRunner``);
+# readers wait for a session's pending write before loading its rows.
+TRANSCRIPT_WRITES = WriteBehindQueue(
+    "transcript",
+    workers=settings.transcript_write_workers,
+    max_retries=settings.transcript_write_retries,
+    max_pending=settings.transcript_write_max_pending,
+)
+
 
 def _content_to_str(content: Any) -> str:
     if isinstance(content, str):
@@ -251,7 +267,12 @@ def messages_to_entry_dicts(
     messages: list[BaseMessage],
     start_sequence: int,
 ) -> list[dict[str, Any]]:
-    """Map LangChain messages to Prisma SessionTranscriptEntry create payloads (no id)."""
+    """Map LangChain messages to Prisma SessionTranscriptEntry create payloads (no id).
+
+    A synthetic AIMessage's tool calls are folded into the preceding assistant
+    row so hydrated tool results still follow the call that issued them; only
+    when that row is not in *messages* is it persisted as its own row.
+    """
     from src.generated_client import enums
 
     rows: list[dict[str, Any]] = []
@@ -279,6 +300,21 @@ def messages_to_entry_dicts(
             )
             seq += 1
         elif isinstance(m, AIMessage):
+            ak = getattr(m, "additional_kwargs", None) or {}
+            if ak.get(SYNTHETIC_MESSAGE_KEY):
+                issuer = next(
+                    (
+                        r
+                        for r in reversed(rows)
+                        if r["role"] == enums.TranscriptRole.ASSISTANT
+                    ),
+                    None,
+                )
+                if issuer is not None:
+                    issuer["tool_calls"] = (issuer["tool_calls"] or []) + (
+                        _tool_calls_to_json(m) or []
+                    )
+                    continue
             rows.append(
                 {
                     "sequence_num": seq,
@@ -405,50 +441,70 @@ async def upsert_conversation_session(
     user_id: str,
     title: str | None,
 ) -> None:
-    from src.generated_client import Prisma
-
     t = (title or "").strip() or DEFAULT_TITLE
-    db = Prisma()
-    await db.connect()
     try:
-        await db.conversationsession.upsert(
-            where={"id": session_id},
-            data={
-                "create": {
-                    "id": session_id,
-                    "user_id": user_id,
-                    "title": t,
+        async with DB.session() as db:
+            await db.conversationsession.upsert(
+                where={"id": session_id},
+                data={
+                    "create": {
+                        "id": session_id,
+                        "user_id": user_id,
+                        "title": t,
+                    },
+                    "update": {"title": t},
                 },
-                "update": {"title": t},
-            },
-        )
+            )
     except Exception:
         logger.exception("upsert_conversation_session failed for %s", session_id)
         raise
-    finally:
-        await db.disconnect()
+
+
+class TranscriptCountConflict(RuntimeError):
+    """``persisted_message_count`` no longer matches the count a write was based on."""
 
 
 async def persist_new_messages(
     session_id: str,
     messages: list[Any],
     previous_persisted_count: int,
+    *,
+    offset: int = 0,
 ) -> int:
     """
-    Append transcript rows for messages[previous_persisted_count:].
+    Append transcript rows for the messages after *previous_persisted_count*.
     Returns new persisted_message_count (total LangChain messages processed, not skipped).
+
+    ``messages[0]`` is the session's message number *offset*: non-zero when
+    the graph state was rebuilt from a transcript tail rather than the full
+    history, so the new messages are ``messages[previous_persisted_count - offset:]``.
+
+    Rows are inserted with one ``create_many`` in the same transaction that
+    advances ``ConversationSession.next_sequence_num`` and
+    ``persisted_message_count``, so a failed attempt writes nothing and can be
+    retried. The count only advances while it still equals
+    *previous_persisted_count*; if another writer got there first nothing is
+    inserted and :class:`TranscriptCountConflict` is raised. Database errors
+    are logged and re-raised.
     """
-    if previous_persisted_count >= len(messages):
+    start = previous_persisted_count - offset
+    if start < 0:
+        raise ValueError(
+            f"ConversationSession {session_id} count {previous_persisted_count} "
+            f"is behind the hydrated offset {offset}"
+        )
+    if start >= len(messages):
         return previous_persisted_count
 
-    tail_raw = messages[previous_persisted_count:]
+    tail_raw = messages[start:]
     if not tail_raw:
         return previous_persisted_count
 
     logger.info(
-        "transcript: persist_new_messages session=%s prev_count=%d total_msgs=%d tail=%d",
+        "transcript: persist_new_messages session=%s prev_count=%d offset=%d total_msgs=%d tail=%d",
         session_id,
         previous_persisted_count,
+        offset,
         len(messages),
         len(tail_raw),
     )
@@ -461,84 +517,141 @@ async def persist_new_messages(
         )
 
     tail = coerce_checkpoint_messages_for_persist(tail_raw)
+    payloads = messages_to_entry_dicts(tail, 0)
+    if not payloads:
+        logger.error(
+            "transcript: zero rows after coercion (unexpected) session=%s tail_raw=%d",
+            session_id,
+            len(tail_raw),
+        )
+        return previous_persisted_count
 
-    from src.generated_client import Prisma
-
-    # Next sequence = max existing + 1 or 1
-    db = Prisma()
-    await db.connect()
+    # Advance by raw checkpoint indices consumed (matches messages[start:] slice).
+    new_count = previous_persisted_count + len(tail_raw)
     try:
-        last = await db.sessiontranscriptentry.find_first(
-            where={"session_id": session_id},
-            order={"sequence_num": "desc"},
-        )
-        start_seq = (last.sequence_num + 1) if last else 1
-        payloads = messages_to_entry_dicts(tail, start_seq)
-        if not payloads:
-            if tail_raw:
-                logger.error(
-                    "transcript: zero rows after coercion (unexpected) session=%s tail_raw=%d",
-                    session_id,
-                    len(tail_raw),
+        async with DB.session() as db, db.tx() as tx:
+            # Reserve a block of sequence numbers from the session's counter and
+            # insert every row in one statement, atomically with the count. The
+            # count guard makes this a compare-and-set against racing writers.
+            updated = await tx.conversationsession.update_many(
+                where={
+                    "id": session_id,
+                    "persisted_message_count": previous_persisted_count,
+                },
+                data={
+                    "next_sequence_num": {"increment": len(payloads)},
+                    "persisted_message_count": new_count,
+                    "updated_at": datetime.now(UTC),
+                },
+            )
+            if not updated:
+                raise TranscriptCountConflict(
+                    f"ConversationSession {session_id} count moved from "
+                    f"{previous_persisted_count}"
                 )
-            return previous_persisted_count
-
+            session = await tx.conversationsession.find_unique(where={"id": session_id})
+            if session is None:
+                raise LookupError(f"ConversationSession {session_id} not found")
+            start_seq = session.next_sequence_num - len(payloads)
+            logger.info(
+                "transcript: inserting %d row(s) for session=%s sequence_start=%d",
+                len(payloads),
+                session_id,
+                start_seq,
+            )
+            await tx.sessiontranscriptentry.create_many(
+                data=[
+                    prisma_transcript_entry_create_data(
+                        session_id, {**p, "sequence_num": start_seq + i}
+                    )
+                    for i, p in enumerate(payloads)
+                ],
+            )
+            return new_count
+    except TranscriptCountConflict:
         logger.info(
-            "transcript: inserting %d row(s) for session=%s sequence_start=%d",
-            len(payloads),
+            "transcript: count moved under session=%s prev_count=%d, skipped",
             session_id,
-            start_seq,
+            previous_persisted_count,
         )
+        raise
+    except Exception:
+        logger.exception("persist_new_messages failed for session %s", session_id)
+        raise
 
-        for p in payloads:
-            await db.sessiontranscriptentry.create(
-                data=prisma_transcript_entry_create_data(session_id, p),
-            )
 
-        # Advance by raw checkpoint indices consumed (matches messages[prev:] slice).
-        new_count = previous_persisted_count + len(tail_raw)
-        await db.conversationsession.update(
-            where={"id": session_id},
-            data={
-                "persisted_message_count": new_count,
-                "updated_at": datetime.now(UTC),
-            },
+async def load_transcript_page(
+    session_id: str,
+    *,
+    after: int = 0,
+    limit: int | None = None,
+) -> list[Any]:
+    """Rows with ``sequence_num > after`` in order, at most *limit* (keyset page)."""
+    await TRANSCRIPT_WRITES.wait_for(
+        session_id, timeout=settings.transcript_read_wait_seconds
+    )
+    async with DB.session() as db:
+        return await db.sessiontranscriptentry.find_many(
+            where={"session_id": session_id, "sequence_num": {"gt": after}},
+            order={"sequence_num": "asc"},
+            take=limit or settings.transcript_page_size,
         )
-        return new_count
-    except Exception:
-        logger.exception("persist_new_messages failed for session %s", session_id)
-        return previous_persisted_count
-    finally:
-        await db.disconnect()
+
+
+async def iter_transcript_rows(
+    session_id: str,
+    *,
+    after: int = 0,
+    page_size: int | None = None,
+) -> AsyncIterator[Any]:
+    """Yield every row after *after*, one bounded page (and DB checkout) at a time."""
+    size = page_size or settings.transcript_page_size
+    while True:
+        page = await load_transcript_page(session_id, after=after, limit=size)
+        for row in page:
+            yield row
+        if len(page) < size:
+            return
+        after = page[-1].sequence_num
 
 
 async def load_transcript_rows(session_id: str) -> list[Any]:
-    from src.generated_client import Prisma
+    return [row async for row in iter_transcript_rows(session_id)]
 
-    db = Prisma()
-    await db.connect()
-    try:
-        return await db.sessiontranscriptentry.find_many(
-            where={"session_id": session_id},
-            order={"sequence_num": "asc"},
+
+async def load_transcript_tail(session_id: str, max_turns: int) -> list[Any]:
+    """
+    Rows for the last *max_turns* user turns (everything if there are fewer).
+
+    The tail always starts at a USER row, so assistant tool calls are never
+    separated from their tool results.
+    """
+    from src.generated_client import enums
+
+    if max_turns <= 0:
+        return await load_transcript_rows(session_id)
+    await TRANSCRIPT_WRITES.wait_for(
+        session_id, timeout=settings.transcript_read_wait_seconds
+    )
+    async with DB.session() as db:
+        turn_starts = await db.sessiontranscriptentry.find_many(
+            where={"session_id": session_id, "role": enums.TranscriptRole.USER},
+            order={"sequence_num": "desc"},
+            take=max_turns,
         )
-    finally:
-        await db.disconnect()
+    if len(turn_starts) < max_turns:
+        return await load_transcript_rows(session_id)
+    first = turn_starts[-1].sequence_num
+    return [row async for row in iter_transcript_rows(session_id, after=first - 1)]
 
 
 async def get_session_meta(session_id: str) -> tuple[int, str | None] | None:
     """Return (persisted_message_count, user_id) or None."""
-    from src.generated_client import Prisma
-
-    db = Prisma()
-    await db.connect()
-    try:
+    async with DB.session() as db:
         row = await db.conversationsession.find_unique(where={"id": session_id})
         if row is None:
             return None
         return (row.persisted_message_count, row.user_id)
-    finally:
-        await db.disconnect()
 
 
 async def verify_session_owner(session_id: str, user_id: str) -> bool:
@@ -553,15 +666,11 @@ async def list_sessions_paginated(
     page: int,
     page_size: int,
 ) -> tuple[list[Any], int]:
-    from src.generated_client import Prisma
-
     ps = min(max(1, page_size), _MAX_PAGE_SIZE)
     p = max(1, page)
     skip = (p - 1) * ps
 
-    db = Prisma()
-    await db.connect()
-    try:
+    async with DB.session() as db:
         total = await db.conversationsession.count(where={"user_id": user_id})
         rows = await db.conversationsession.find_many(
             where={"user_id": user_id},
@@ -570,8 +679,6 @@ async def list_sessions_paginated(
             take=ps,
         )
         return rows, total
-    finally:
-        await db.disconnect()
 
 
 def _role_name(row: Any) -> str:
@@ -0,0 +1,183 @@
+"""Keyed write-behind queue for persistence work that must not block a response.
+
+Callers ``submit(key, job)`` an async, idempotent job and return immediately;
+a small worker pool runs it with retries and exponential backoff. Jobs for the
+same key never run concurrently, and a job submitted while an earlier one for
+that key is still queued *replaces* it — each job is expected to persist
+everything outstanding for its key (e.g. all transcript rows not yet written),
+so only the latest one matters.
+
+Readers that need their own writes call ``wait_for(key)`` first. The queue is
+bounded: when ``max_pending`` keys are waiting, ``submit`` returns False and the
+caller should do the write inline.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+Job = Callable[[], Awaitable[Any]]
+
+
+class WriteBehindQueue:
+    """Background, per-key-serialised job runner with retries."""
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        workers: int = 2,
+        max_retries: int = 3,
+        retry_backoff_seconds: float = 0.5,
+        max_pending: int = 1000,
+    ) -> None:
+        self.name = name
+        self.workers = max(1, workers)
+        self.max_retries = max(0, max_retries)
+        self.retry_backoff_seconds = retry_backoff_seconds
+        self.max_pending = max(1, max_pending)
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._queue: asyncio.Queue[str] | None = None
+        self._tasks: list[asyncio.Task[None]] = []
+        self._pending: dict[str, Job] = {}
+        self._running: set[str] = set()
+        self._idle: dict[str, asyncio.Event] = {}
+        self.submitted = 0
+        self.coalesced = 0
+        self.completed = 0
+        self.retries = 0
+        self.failed = 0
+        self.rejected = 0
+
+    def _ensure_workers(self) -> asyncio.Queue[str]:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._queue is None:
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._pending.clear()
+            self._running.clear()
+            self._idle.clear()
+            self._tasks = [
+                loop.create_task(self._worker(), name=f"write-behind-{self.name}-{i}")
+                for i in range(self.workers)
+            ]
+        return self._queue
+
+    def submit(self, key: str, job: Job) -> bool:
+        """Queue *job* for *key*; False when the queue is full (write inline)."""
+        queue = self._ensure_workers()
+        if key in self._pending:
+            self._pending[key] = job
+            self.coalesced += 1
+            return True
+        if len(self._pending) >= self.max_pending:
+            self.rejected += 1
+            return False
+        self._pending[key] = job
+        self._idle.setdefault(key, asyncio.Event()).clear()
+        self.submitted += 1
+        if key not in self._running:
+            queue.put_nowait(key)
+        return True
+
+    async def _worker(self) -> None:
+        assert self._queue is not None
+        queue = self._queue
+        while True:
+            key = await queue.get()
+            try:
+                job = self._pending.pop(key, None)
+                if job is None:
+                    continue
+                self._running.add(key)
+                try:
+                    await self._run(key, job)
+                finally:
+                    self._running.discard(key)
+                if key in self._pending:
+                    # Re-submitted while running: go again, still one at a time.
+                    queue.put_nowait(key)
+                else:
+                    event = self._idle.pop(key, None)
+                    if event is not None:
+                        event.set()
+            finally:
+                queue.task_done()
+
+    async def _run(self, key: str, job: Job) -> None:
+        for attempt in range(self.max_retries + 1):
+            try:
+                await job()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                if attempt < self.max_retries:
+                    self.retries += 1
+                    await asyncio.sleep(self.retry_backoff_seconds * 2**attempt)
+                    continue
+                self.failed += 1
+                logger.exception(
+                    "%s write-behind failed after %d attempt(s) key=%s",
+                    self.name,
+                    attempt + 1,
+                    key,
+                )
+                return
+            self.completed += 1
+            return
+
+    async def wait_for(self, key: str, timeout: float | None = None) -> bool:
+        """Wait until no write for *key* is queued or running; False on timeout."""
+        event = self._idle.get(key)
+        if event is None:
+            return True
+        try:
+            await asyncio.wait_for(event.wait(), timeout=timeout)
+        except TimeoutError:
+            return False
+        return True
+
+    async def flush(self, timeout: float | None = None) -> bool:
+        """Wait for every queued write; False on timeout."""
+        if self._queue is None:
+            return True
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=timeout)
+        except TimeoutError:
+            return False
+        return True
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "pending": len(self._pending),
+            "running": len(self._running),
+            "submitted": self.submitted,
+            "coalesced": self.coalesced,
+            "completed": self.completed,
+            "retries": self.retries,
+            "failed": self.failed,
+            "rejected": self.rejected,
+        }
+
+    async def aclose(self, timeout: float | None = 10.0) -> None:
+        """Drain outstanding writes, then stop the workers (lifespan shutdown)."""
+        if self._queue is not None and not await self.flush(timeout):
+            logger.warning(
+                "%s write-behind: %d write(s) still pending at shutdown",
+                self.name,
+                len(self._pending) + len(self._running),
+            )
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        self._queue = None
+        self._loop = None
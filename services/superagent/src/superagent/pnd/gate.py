@@ -9,6 +9,8 @@ Tier 3  — Haiku YES/NO classifier
 
 Call warm_up_gate_encoder() at service startup so Tier 2 never cold-starts
 during a live request (the 80 MB model load is ~2-5 s on first use).
+Tier-2 query vectors go through the shared ``EmbeddingCache`` (Redis at
+``redis_url``), so a message already encoded by any replica skips the model.
 """
 
 from __future__ import annotations
@@ -20,6 +22,8 @@ from typing import TYPE_CHECKING, Any
 
 import numpy as np
 
+from common.llm.src.embedding_cache import EmbeddingCache
+
 if TYPE_CHECKING:
     from openai import AsyncOpenAI
 
@@ -61,8 +65,11 @@ _TOOL_ANCHORS = [
     "read a github repository",
 ]
 
+_ENCODER_MODEL = "all-MiniLM-L6-v2"
+
 _encoder: Any = None  # lazy-loaded sentence-transformers model
 _anchor_vecs: Any = None  # ndarray (N, D)
+_embedding_cache: EmbeddingCache | None = None  # created on first Tier-2 call
 
 
 def _load_encoder() -> Any:
@@ -72,7 +79,7 @@ def _load_encoder() -> Any:
         from sentence_transformers import SentenceTransformer
 
         logger.info("Loading all-MiniLM-L6-v2 for PnD gate (one-time ~80 MB)…")
-        _encoder = SentenceTransformer("all-MiniLM-L6-v2")
+        _encoder = SentenceTransformer(_ENCODER_MODEL)
         _anchor_vecs = _encoder.encode(_TOOL_ANCHORS, normalize_embeddings=True)
         logger.info("all-MiniLM-L6-v2 loaded")
     return _encoder
@@ -96,6 +103,44 @@ def _encode_sync(text: str) -> Any:
     return enc.encode([text], normalize_embeddings=True)[0]
 
 
+def _get_embedding_cache() -> EmbeddingCache:
+    global _embedding_cache
+    if _embedding_cache is None:
+        from ..config import settings
+
+        _embedding_cache = EmbeddingCache(
+            redis_url=settings.redis_url,
+            max_entries=settings.gate_embedding_cache_max_entries,
+            ttl_seconds=settings.gate_embedding_cache_ttl_seconds,
+            namespace="sentence-transformers",
+        )
+    return _embedding_cache
+
+
+async def _encode_cached(text: str) -> Any:
+    """Tier-2 query vector, encoded in a worker thread only on a cache miss."""
+
+    async def _encode(t: str) -> list[float]:
+        loop = asyncio.get_event_loop()
+        vec = await loop.run_in_executor(None, _encode_sync, t)
+        return vec.tolist()
+
+    vec = await _get_embedding_cache().get_or_embed(text, _ENCODER_MODEL, _encode)
+    return np.asarray(vec, dtype=np.float32)
+
+
+def gate_embedding_cache_stats() -> dict[str, Any] | None:
+    return _embedding_cache.stats() if _embedding_cache else None
+
+
+async def close_gate_embedding_cache() -> None:
+    """Close the gate's embedding cache (call from service shutdown)."""
+    global _embedding_cache
+    if _embedding_cache is not None:
+        await _embedding_cache.aclose()
+        _embedding_cache = None
+
+
 # ── Public gate function ───────────────────────────────────────────────────────
 
 
@@ -143,10 +188,11 @@ async def pnd_gate(
         )
         return True
 
-    # Tier 2 — embedding cosine similarity (offloaded to thread to avoid blocking event loop)
+    # Tier 2 — embedding cosine similarity (cache hit, else offloaded to a thread)
     try:
-        loop = asyncio.get_event_loop()
-        query_vec = await loop.run_in_executor(None, _encode_sync, last_content)
+        query_vec = await _encode_cached(last_content)
+        if _anchor_vecs is None:
+            await asyncio.get_event_loop().run_in_executor(None, _load_encoder)
         sim = _cosine_sim(query_vec, _anchor_vecs)
         logger.debug("PnD gate Tier2: cosine_sim=%.3f", sim)
         if sim > 0.6:
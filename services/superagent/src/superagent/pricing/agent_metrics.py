@@ -0,0 +1,216 @@
+"""Write-behind aggregation of agent invocation outcomes.
+
+settle_invocation used to read-modify-write the Agent row for every call,
+which loses updates under concurrency and turns popular agents into hot
+rows. Instead, outcomes are counted in memory per (agent, hour, latency
+bucket) and flushed every ``agent_metrics_flush_seconds`` in one
+transaction:
+
+1. additive upsert into ``agent_metrics_hourly`` (safe across replicas),
+2. ``execution_count = execution_count + n`` for every touched agent,
+3. ``success_rate`` / ``p95_latency_ms`` recomputed in SQL for those agents
+   from the last seven days of buckets.
+
+The gateway's nightly metrics_refresh runs the same rollup statement
+(``common.database.src.agent_metrics``) over every agent. A failed flush
+keeps its counts and retries on the next tick; a crash loses at most one
+interval of counters (agent_invocations stays the raw record). Counts are only
+put back when the transaction did not commit; an error after the commit
+(returning the connection) leaves them written, never double-counted.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import bisect
+import contextlib
+import logging
+from collections import defaultdict
+from datetime import UTC, datetime
+from typing import Any
+
+from common.database.src.agent_metrics import agent_rollup_sql
+
+from ..persistence.db import use_db
+
+logger = logging.getLogger(__name__)
+
+# Inclusive upper bounds (ms) of the latency histogram. Slower calls land in
+# the last bucket. Must match the agent_metrics_hourly backfill migration.
+LATENCY_BOUNDS_MS = (
+    50,
+    100,
+    250,
+    500,
+    1000,
+    2500,
+    5000,
+    10000,
+    30000,
+    60000,
+    120000,
+    600000,
+)
+
+# VALUES rows per statement (five bind parameters each) — well under the
+# Postgres limit of 32767 parameters.
+_MAX_ROWS_PER_STATEMENT = 1000
+
+_UPSERT_BUCKETS_SQL = """
+INSERT INTO agent_metrics_hourly
+    (agent_id, bucket_start, latency_le_ms, invocations, successes)
+VALUES {values}
+ON CONFLICT (agent_id, bucket_start, latency_le_ms) DO UPDATE SET
+    invocations = agent_metrics_hourly.invocations + EXCLUDED.invocations,
+    successes = agent_metrics_hourly.successes + EXCLUDED.successes
+"""
+
+_INCREMENT_COUNTS_SQL = """
+UPDATE agents AS a
+SET execution_count = a.execution_count + d.n
+FROM (VALUES {values}) AS d(id, n)
+WHERE a.id = d.id
+"""
+
+# (agent_id, hour, latency_le_ms) → [invocations, successes]
+_Key = tuple[str, datetime, int]
+
+
+def latency_bucket(latency_ms: int | None) -> int:
+    """Upper bound of the histogram bucket holding *latency_ms*."""
+    i = bisect.bisect_left(LATENCY_BOUNDS_MS, max(latency_ms or 0, 0))
+    return LATENCY_BOUNDS_MS[min(i, len(LATENCY_BOUNDS_MS) - 1)]
+
+
+def _chunks(items: list[Any], size: int) -> list[list[Any]]:
+    return [items[i : i + size] for i in range(0, len(items), size)]
+
+
+def _placeholders(rows: int, width: int, casts: tuple[str, ...] = ()) -> str:
+    groups = []
+    for r in range(rows):
+        cols = []
+        for c in range(width):
+            cast = casts[c] if c < len(casts) else ""
+            cols.append(f"${r * width + c + 1}{cast}")
+        groups.append(f"({', '.join(cols)})")
+    return ", ".join(groups)
+
+
+class AgentMetricsAggregator:
+    """In-memory invocation counters with a periodic batched flush."""
+
+    def __init__(self, db: Any = None) -> None:
+        self._db = db
+        self._counts: dict[_Key, list[int]] = defaultdict(lambda: [0, 0])
+        self._flusher: asyncio.Task[None] | None = None
+        self._lock = asyncio.Lock()
+        self.recorded = 0
+        self.flushes = 0
+        self.rows_flushed = 0
+        self.failed = 0
+
+    def record(
+        self,
+        agent_id: str,
+        *,
+        success: bool,
+        latency_ms: int | None,
+        at: datetime | None = None,
+    ) -> None:
+        """Count one invocation outcome (no I/O)."""
+        at = at or datetime.now(UTC)
+        hour = at.replace(minute=0, second=0, microsecond=0)
+        counts = self._counts[(agent_id, hour, latency_bucket(latency_ms))]
+        counts[0] += 1
+        counts[1] += int(success)
+        self.recorded += 1
+
+    async def flush(self) -> int:
+        """Write pending counters; returns the number of bucket rows flushed."""
+        async with self._lock:
+            if not self._counts:
+                return 0
+            pending, self._counts = self._counts, defaultdict(lambda: [0, 0])
+            committed = False
+            try:
+                async with use_db(self._db) as db:
+                    async with db.tx() as tx:
+                        await self._write(tx, pending)
+                    committed = True
+            except Exception:
+                self.failed += 1
+                if not committed:
+                    for key, (n, ok) in pending.items():
+                        counts = self._counts[key]
+                        counts[0] += n
+                        counts[1] += ok
+                raise
+            self.flushes += 1
+            self.rows_flushed += len(pending)
+            return len(pending)
+
+    async def _write(self, tx: Any, pending: dict[_Key, list[int]]) -> None:
+        # Prisma stores DateTime as UTC in timestamp-without-time-zone columns.
+        rows = [
+            (agent_id, hour.replace(tzinfo=None).isoformat(), le, n, ok)
+            for (agent_id, hour, le), (n, ok) in pending.items()
+        ]
+        per_agent: dict[str, int] = defaultdict(int)
+        for agent_id, _, _, n, _ in rows:
+            per_agent[agent_id] += n
+        agents = sorted(per_agent)
+
+        for chunk in _chunks(rows, _MAX_ROWS_PER_STATEMENT):
+            values = _placeholders(len(chunk), 5, ("", "::timestamp"))
+            await tx.execute_raw(
+                _UPSERT_BUCKETS_SQL.format(values=values),
+                *[v for row in chunk for v in row],
+            )
+        for chunk in _chunks(agents, _MAX_ROWS_PER_STATEMENT):
+            values = _placeholders(len(chunk), 2, ("", "::int"))
+            await tx.execute_raw(
+                _INCREMENT_COUNTS_SQL.format(values=values),
+                *[v for a in chunk for v in (a, per_agent[a])],
+            )
+            await tx.execute_raw(agent_rollup_sql(len(chunk)), *chunk)
+
+    def start(self, interval_seconds: float) -> None:
+        """Flush every *interval_seconds* until ``aclose()``."""
+        if interval_seconds <= 0 or self._flusher is not None:
+            return
+
+        async def loop() -> None:
+            while True:
+                await asyncio.sleep(interval_seconds)
+                try:
+                    await self.flush()
+                except Exception:
+                    logger.exception("Agent metrics flush failed; will retry")
+
+        self._flusher = asyncio.create_task(loop(), name="agent-metrics-flush")
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "pending_buckets": len(self._counts),
+            "recorded": self.recorded,
+            "flushes": self.flushes,
+            "rows_flushed": self.rows_flushed,
+            "failed": self.failed,
+        }
+
+    async def aclose(self) -> None:
+        """Stop the flusher and write out what is left (lifespan shutdown)."""
+        if self._flusher is not None:
+            self._flusher.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._flusher
+            self._flusher = None
+        try:
+            await self.flush()
+        except Exception:
+            logger.exception("Agent metrics: final flush failed; counts dropped")
+
+
+# Process-wide aggregator; settle_invocation records into it.
+AGENT_METRICS = AgentMetricsAggregator()
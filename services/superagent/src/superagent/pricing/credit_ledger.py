@@ -0,0 +1,374 @@
+"""Redis-resident credit reservation ledger for payment_guard / settle_invocation.
+
+Postgres ``users.credits_usd`` stays the billing source of truth; Redis holds a
+short-lived copy per user plus the calls currently holding a reservation:
+
+- ``{prefix}:{user_id}``          hash — balance, arrears_flag, arrears (TTL)
+- ``{prefix}:{user_id}:reserves`` hash — reservation_id → "amount:expires_ms"
+- ``{prefix}:{user_id}:debits``   hash — reservation_id → "amount:expires_ms:applied_ms"
+
+``reserve`` is one Lua script: it drops expired reservations, subtracts the
+live ones from the balance and records the new reservation only if what is
+left covers its amount — so parallel calls can no longer all pass against the
+same credit. ``release`` (Lua) drops a reservation and, for successful calls,
+debits the charge from the cached balance in the same step and records it as
+a debit Postgres has not applied yet; ``applied`` stamps it once settlement
+has deducted it there.
+
+The balance is hydrated lazily from Postgres on a miss and expires after
+``credit_balance_ttl_seconds``, which reconciles it with Postgres (top-ups,
+settlement floors, arrears). A denial from the cache is always re-checked
+against Postgres once before it is returned, so staleness can only ever
+delay a block, never a top-up. Hydration subtracts every debit the snapshot
+may not include yet (unapplied, or applied after the snapshot was read), so
+a refresh never hands back credit that was already spent.
+
+Amounts are stored as integer units of 1e-8 USD (the pipeline's cost
+quantum), which Lua numbers represent exactly; scripts write them back with
+``%d`` since Lua's default number formatting keeps only 14 digits.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+_KEY_PREFIX = "superagent:credits"
+_UNITS_PER_USD = Decimal("100000000")
+
+# Script status codes.
+_OK = 1
+_MISS = -1
+_ARREARS = -2
+_INSUFFICIENT = -3
+
+_RESERVE_LUA = """
+local user = redis.call('HMGET', KEYS[1], 'balance', 'arrears_flag', 'arrears')
+if not user[1] then
+  return {-1, 0}
+end
+if user[2] == '1' then
+  return {-2, tonumber(user[3] or '0')}
+end
+local now = tonumber(ARGV[3])
+local held = 0
+local live = redis.call('HGETALL', KEYS[2])
+for i = 1, #live, 2 do
+  local amount, expires = string.match(live[i + 1], '^(%d+):(%d+)$')
+  if tonumber(expires) <= now then
+    redis.call('HDEL', KEYS[2], live[i])
+  elseif live[i] ~= ARGV[1] then
+    held = held + tonumber(amount)
+  end
+end
+local available = tonumber(user[1]) - held
+if available <= 0 or available < tonumber(ARGV[2]) then
+  return {-3, available}
+end
+local ttl = tonumber(ARGV[4])
+redis.call('HSET', KEYS[2], ARGV[1], string.format('%d:%d', tonumber(ARGV[2]), now + ttl))
+redis.call('PEXPIRE', KEYS[2], ttl)
+return {1, available - tonumber(ARGV[2])}
+"""
+
+_RELEASE_LUA = """
+local released = redis.call('HDEL', KEYS[2], ARGV[1])
+local charge = tonumber(ARGV[2])
+if charge > 0 then
+  local balance = redis.call('HGET', KEYS[1], 'balance')
+  if balance then
+    balance = tonumber(balance) - charge
+    if balance < 0 then
+      balance = 0
+    end
+    redis.call('HSET', KEYS[1], 'balance', string.format('%d', balance))
+  end
+  local ttl = tonumber(ARGV[4])
+  local expires = tonumber(ARGV[3]) + ttl
+  redis.call('HSET', KEYS[3], ARGV[1], string.format('%d:%d:0', charge, expires))
+  redis.call('PEXPIRE', KEYS[3], ttl)
+end
+return released
+"""
+
+_APPLIED_LUA = """
+local debit = redis.call('HGET', KEYS[3], ARGV[1])
+if not debit then
+  return 0
+end
+local amount, expires = string.match(debit, '^(%d+):(%d+):')
+redis.call('HSET', KEYS[3], ARGV[1], amount .. ':' .. expires .. ':' .. ARGV[2])
+return 1
+"""
+
+_HYDRATE_LUA = """
+local now = tonumber(ARGV[5])
+local read_at = tonumber(ARGV[6])
+local pending = 0
+local debits = redis.call('HGETALL', KEYS[3])
+for i = 1, #debits, 2 do
+  local amount, expires, applied = string.match(debits[i + 1], '^(%d+):(%d+):(%d+)$')
+  applied = tonumber(applied)
+  if tonumber(expires) <= now or (applied > 0 and applied < read_at) then
+    redis.call('HDEL', KEYS[3], debits[i])
+  else
+    pending = pending + tonumber(amount)
+  end
+end
+local balance = tonumber(ARGV[1]) - pending
+if balance < 0 then
+  balance = 0
+end
+redis.call('HSET', KEYS[1], 'balance', string.format('%d', balance),
+  'arrears_flag', ARGV[2], 'arrears', ARGV[3])
+redis.call('PEXPIRE', KEYS[1], tonumber(ARGV[4]))
+return balance
+"""
+
+
+class CreditLedgerUnavailable(Exception):
+    """Redis could not be reached; callers fall back to a Postgres-only check."""
+
+
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+def to_units(amount: Decimal) -> int:
+    return int((Decimal(str(amount)) * _UNITS_PER_USD).to_integral_value())
+
+
+def from_units(units: int) -> Decimal:
+    return Decimal(units) / _UNITS_PER_USD
+
+
+@dataclass(frozen=True)
+class CreditSnapshot:
+    """The billing fields of one ``users`` row."""
+
+    credits_usd: Decimal
+    arrears_flag: bool = False
+    arrears_usd: Decimal = Decimal("0")
+
+    @classmethod
+    def from_user(cls, user: Any) -> CreditSnapshot:
+        return cls(
+            credits_usd=Decimal(str(user.credits_usd)),
+            arrears_flag=bool(getattr(user, "arrears_flag", False)),
+            arrears_usd=Decimal(str(getattr(user, "arrears_usd", 0) or 0)),
+        )
+
+    def check(self) -> Reservation:
+        """Postgres-only decision (no outstanding reservations known)."""
+        if self.arrears_flag:
+            return Reservation(False, "arrears", self.arrears_usd)
+        if self.credits_usd <= 0:
+            return Reservation(False, "insufficient_credits", Decimal("0"))
+        return Reservation(True, available=self.credits_usd)
+
+
+@dataclass(frozen=True)
+class Reservation:
+    """Outcome of a reserve attempt; *reason* matches PaymentInterrupt.reason."""
+
+    ok: bool
+    reason: str = ""
+    amount: Decimal = Decimal("0")
+    # Credit left after this reservation (cache path) or the raw balance.
+    available: Decimal = Decimal("0")
+
+
+CreditLoader = Callable[[str], Awaitable[CreditSnapshot | None]]
+
+
+class CreditLedger:
+    """Atomic per-user credit reservations in Redis (see module docstring)."""
+
+    def __init__(
+        self,
+        redis: Any = None,
+        *,
+        balance_ttl_seconds: float | None = None,
+        reserve_ttl_seconds: float | None = None,
+        prefix: str = _KEY_PREFIX,
+    ) -> None:
+        self._redis = redis
+        self._balance_ttl = balance_ttl_seconds
+        self._reserve_ttl = reserve_ttl_seconds
+        self._prefix = prefix
+        self._reserve_script: Any = None
+        self._release_script: Any = None
+        self._applied_script: Any = None
+        self._hydrate_script: Any = None
+        self._stats = {"reserved": 0, "denied": 0, "hydrated": 0, "released": 0}
+
+    # ── Redis plumbing ───────────────────────────────────────────────────────
+
+    def _client(self) -> Any:
+        if self._redis is None:
+            import redis.asyncio as aioredis
+
+            from ..config import settings
+
+            self._redis = aioredis.from_url(settings.redis_url, decode_responses=True)
+        if self._reserve_script is None:
+            self._reserve_script = self._redis.register_script(_RESERVE_LUA)
+            self._release_script = self._redis.register_script(_RELEASE_LUA)
+            self._applied_script = self._redis.register_script(_APPLIED_LUA)
+            self._hydrate_script = self._redis.register_script(_HYDRATE_LUA)
+        return self._redis
+
+    def _ttls_ms(self) -> tuple[int, int]:
+        from ..config import settings
+
+        balance = self._balance_ttl
+        if balance is None:
+            balance = settings.credit_balance_ttl_seconds
+        reserve = self._reserve_ttl
+        if reserve is None:
+            reserve = settings.credit_reserve_ttl_seconds
+        return int(balance * 1000), int(reserve * 1000)
+
+    def _keys(self, user_id: str) -> list[str]:
+        base = f"{self._prefix}:{user_id}"
+        return [base, f"{base}:reserves", f"{base}:debits"]
+
+    # ── Public API ───────────────────────────────────────────────────────────
+
+    async def hydrate(
+        self, user_id: str, snapshot: CreditSnapshot, *, read_at_ms: int = 0
+    ) -> None:
+        """Overwrite the cached balance for *user_id* with a Postgres snapshot.
+
+        *read_at_ms* is when the snapshot read started; debits applied in
+        Postgres before then are already in it, every other live debit is
+        subtracted. The default subtracts them all.
+        """
+        balance_ttl_ms, _ = self._ttls_ms()
+        self._client()
+        try:
+            await self._hydrate_script(
+                keys=self._keys(user_id),
+                args=[
+                    max(to_units(snapshot.credits_usd), 0),
+                    "1" if snapshot.arrears_flag else "0",
+                    max(to_units(snapshot.arrears_usd), 0),
+                    balance_ttl_ms,
+                    _now_ms(),
+                    read_at_ms,
+                ],
+            )
+        except Exception as exc:
+            raise CreditLedgerUnavailable(str(exc)) from exc
+        self._stats["hydrated"] += 1
+
+    async def reserve(
+        self,
+        user_id: str,
+        reservation_id: str,
+        amount: Decimal,
+        load: CreditLoader,
+    ) -> Reservation:
+        """Atomically check available credit and hold *amount* against it.
+
+        *load* reads the user's billing fields from Postgres; it is called on
+        a cache miss and to confirm a denial. Its errors propagate.
+        Raises CreditLedgerUnavailable when Redis cannot be reached.
+        """
+        refreshed = False
+        while True:
+            status, value = await self._run_reserve(user_id, reservation_id, amount)
+            if status == _OK:
+                self._stats["reserved"] += 1
+                return Reservation(True, available=from_units(value))
+            if refreshed and status != _MISS:
+                break
+            read_at_ms = _now_ms()
+            snapshot = await load(user_id)
+            if snapshot is None:
+                return Reservation(False, "user_not_found")
+            await self.hydrate(user_id, snapshot, read_at_ms=read_at_ms)
+            refreshed = True
+        self._stats["denied"] += 1
+        if status == _ARREARS:
+            return Reservation(False, "arrears", from_units(value))
+        return Reservation(False, "insufficient_credits", available=from_units(value))
+
+    async def release(
+        self, user_id: str, reservation_id: str, *, charge: Decimal = Decimal("0")
+    ) -> bool:
+        """Drop a reservation and debit *charge* from the cached balance.
+
+        The charge is remembered as unapplied until :meth:`applied` is called,
+        so a rehydration in between cannot restore it. Returns whether the
+        reservation was still held.
+        """
+        _, reserve_ttl_ms = self._ttls_ms()
+        self._client()
+        try:
+            released = await self._release_script(
+                keys=self._keys(user_id),
+                args=[
+                    reservation_id,
+                    max(to_units(charge), 0),
+                    _now_ms(),
+                    reserve_ttl_ms,
+                ],
+            )
+        except Exception as exc:
+            raise CreditLedgerUnavailable(str(exc)) from exc
+        self._stats["released"] += 1
+        return bool(released)
+
+    async def applied(self, user_id: str, reservation_id: str) -> bool:
+        """Mark a released charge as deducted in Postgres.
+
+        Returns whether the debit was still tracked.
+        """
+        self._client()
+        try:
+            marked = await self._applied_script(
+                keys=self._keys(user_id), args=[reservation_id, _now_ms()]
+            )
+        except Exception as exc:
+            raise CreditLedgerUnavailable(str(exc)) from exc
+        return bool(marked)
+
+    def stats(self) -> dict[str, int]:
+        return dict(self._stats)
+
+    async def aclose(self) -> None:
+        if self._redis is not None:
+            await self._redis.aclose()
+        self._redis = None
+        self._reserve_script = self._release_script = None
+        self._applied_script = self._hydrate_script = None
+
+    async def _run_reserve(
+        self, user_id: str, reservation_id: str, amount: Decimal
+    ) -> tuple[int, int]:
+        _, reserve_ttl_ms = self._ttls_ms()
+        self._client()
+        try:
+            status, value = await self._reserve_script(
+                keys=self._keys(user_id),
+                args=[
+                    reservation_id,
+                    max(to_units(amount), 0),
+                    _now_ms(),
+                    reserve_ttl_ms,
+                ],
+            )
+        except Exception as exc:
+            raise CreditLedgerUnavailable(str(exc)) from exc
+        return int(status), int(value)
+
+
+# Process-wide ledger; Redis client created on first use, closed at shutdown.
+CREDITS = CreditLedger()
@@ -12,6 +12,14 @@ from __future__ import annotations
 import logging
 from decimal import Decimal
 
+from ..persistence.db import DB
+from .credit_ledger import (
+    CREDITS,
+    CreditLedgerUnavailable,
+    CreditSnapshot,
+    Reservation,
+)
+
 logger = logging.getLogger(__name__)
 
 
@@ -37,66 +45,67 @@ async def payment_guard(
     call_id: str,
 ) -> None:
     """
-    Step 2.5 — Credit check + Redis soft reserve.
+    Step 2.5 — Credit check + atomic Redis reserve.
 
     Called before any A2A/ACP agent network call.
     Raises PaymentInterrupt if execution should be blocked.
 
-    The Redis soft reserve (TTL 300s) prevents double-spending within a
-    concurrent session.  Released by settle_invocation() after the call.
+    The check and the reserve are one Redis round trip (CreditLedger): the
+    user's cached balance minus every live reservation must still be positive,
+    so parallel calls cannot all pass against the same credit. Reserves expire
+    after credit_reserve_ttl_seconds and are released by settle_invocation().
+    Postgres is read only to hydrate the cache or to confirm a denial; when
+    Redis is unavailable the guard falls back to a Postgres-only check.
 
     Args:
         user_id:    authenticated user ID
         base_fee:   expected charge (from agent manifest payment.base_fee)
-        session_id: current session ID (for reserve key namespace)
-        call_id:    LangGraph tool call ID (for reserve key uniqueness)
+        session_id: current session ID (for reservation namespace)
+        call_id:    LangGraph tool call ID (for reservation uniqueness)
     """
-    # ── Fetch user ────────────────────────────────────────────────────────────
-    try:
-        from src.generated_client import Prisma
+    from ..config import settings
+
+    result: Reservation | None = None
+    if settings.credit_ledger_enabled:
+        try:
+            result = await CREDITS.reserve(
+                user_id, reservation_id(session_id, call_id), base_fee, _load_credits
+            )
+        except CreditLedgerUnavailable:
+            logger.warning(
+                "payment_guard: Redis unavailable — reserve skipped for call_id=%s",
+                call_id,
+            )
+        except Exception:
+            logger.warning(
+                "payment_guard: DB unavailable — skipping guard for call_id=%s",
+                call_id,
+            )
+            return
 
-        db = Prisma()
-        await db.connect()
+    if result is None:
+        # Postgres-only check (ledger disabled or Redis down): no reservation.
         try:
-            user = await db.user.find_unique(where={"id": user_id})
-        finally:
-            await db.disconnect()
-    except Exception:
-        logger.warning(
-            "payment_guard: DB unavailable — skipping guard for call_id=%s", call_id
-        )
-        return
-
-    if user is None:
-        raise PaymentInterrupt("user_not_found", Decimal("0"))
-
-    # ── Arrears block ─────────────────────────────────────────────────────────
-    if getattr(user, "arrears_flag", False):
-        raise PaymentInterrupt("arrears", Decimal(str(getattr(user, "arrears_usd", 0))))
-
-    # ── Credit check ──────────────────────────────────────────────────────────
-    user_credits = Decimal(str(user.credits_usd))
-    if user_credits <= 0:
-        raise PaymentInterrupt("insufficient_credits", Decimal("0"))
-
-    # ── Soft reserve (Redis TTL = 300s, covers max agent timeout) ─────────────
-    try:
-        import redis.asyncio as aioredis
-
-        from ..config import settings
-
-        redis_client = aioredis.from_url(
-            settings.redis_url, encoding="utf-8", decode_responses=True
-        )
-        async with redis_client as r:
-            await r.setex(
-                f"reserve:{session_id}:{call_id}",
-                300,
-                str(base_fee),
+            snapshot = await _load_credits(user_id)
+        except Exception:
+            logger.warning(
+                "payment_guard: DB unavailable — skipping guard for call_id=%s",
+                call_id,
             )
-    except Exception:
-        # Non-fatal — proceed without reserve if Redis is unavailable
-        logger.warning(
-            "payment_guard: Redis unavailable — soft reserve skipped for call_id=%s",
-            call_id,
-        )
+            return
+        if snapshot is None:
+            raise PaymentInterrupt("user_not_found", Decimal("0"))
+        result = snapshot.check()
+
+    if not result.ok:
+        raise PaymentInterrupt(result.reason, result.amount)
+
+
+def reservation_id(session_id: str, call_id: str) -> str:
+    return f"{session_id}:{call_id}"
+
+
+async def _load_credits(user_id: str) -> CreditSnapshot | None:
+    async with DB.session() as db:
+        user = await db.user.find_unique(where={"id": user_id})
+    return None if user is None else CreditSnapshot.from_user(user)
@@ -4,7 +4,7 @@ Fires after checklist auto-update.  Runs as asyncio.create_task so it never
 blocks the caller's response.
 
 On success: deducts credits_usd, writes Transaction(PENDING) and AgentInvocation(SUCCESS).
-On error/timeout: releases reserve, writes AgentInvocation(ERROR/TIMEOUT).
+On error/timeout: releases the credit reservation, writes AgentInvocation(ERROR/TIMEOUT).
 
 MCP agents are free — settlement is never called for protocol == "MCP".
 """
@@ -15,6 +15,9 @@ import logging
 import os
 from decimal import Decimal
 
+from ..persistence.db import DB
+from .agent_metrics import AGENT_METRICS
+
 logger = logging.getLogger(__name__)
 
 
@@ -59,17 +62,19 @@ async def settle_invocation(
 
     Called via asyncio.create_task — exceptions are logged but never re-raised.
     """
-    # ── Release Redis reserve (always — success or failure) ───────────────────
+    # ── Release the credit reservation (always — success or failure) ─────────
+    # Successful calls debit base_fee from the cached balance in the same
+    # atomic step, so the credit never looks free between release and the
+    # Postgres deduction below.
     try:
-        import redis.asyncio as aioredis
-
-        from ..config import settings
+        from .credit_ledger import CREDITS
+        from .guard import reservation_id
 
-        redis_client = aioredis.from_url(
-            settings.redis_url, encoding="utf-8", decode_responses=True
+        await CREDITS.release(
+            user_id,
+            reservation_id(session_id, call_id),
+            charge=base_fee if execution_success else Decimal("0"),
         )
-        async with redis_client as r:
-            await r.delete(f"reserve:{session_id}:{call_id}")
     except Exception:
         logger.warning(
             "settle_invocation: Redis unavailable — reserve not released call_id=%s",
@@ -108,17 +113,26 @@ async def settle_invocation(
 
     # ── DB operations ─────────────────────────────────────────────────────────
     try:
-        from src.generated_client import Prisma
-
-        db = Prisma()
-        await db.connect()
-        try:
+        async with DB.session() as db:
             # Deduct credits atomically — floor at 0, detect shortfall
             await db.execute_raw(
                 "UPDATE users SET credits_usd = GREATEST(credits_usd - $1::numeric, 0) WHERE id = $2",
                 float(base_fee),
                 user_id,
             )
+            # The cached balance already carries this debit; once Postgres has
+            # it too, rehydrating from Postgres must stop subtracting it.
+            try:
+                from .credit_ledger import CREDITS
+                from .guard import reservation_id
+
+                await CREDITS.applied(user_id, reservation_id(session_id, call_id))
+            except Exception:
+                logger.warning(
+                    "settle_invocation: Redis unavailable — debit not marked "
+                    "applied call_id=%s",
+                    call_id,
+                )
 
             # Check for shortfall → set arrears
             user = await db.user.find_unique(where={"id": user_id})
@@ -163,11 +177,9 @@ async def settle_invocation(
                 }
             )
 
-            # Increment agent execution_count + rolling success_rate
-            await _update_agent_metrics(agent_id, success=True, db=db)
-
-        finally:
-            await db.disconnect()
+            # execution_count / success_rate / p95 — aggregated and flushed
+            # in batches (pricing/agent_metrics.py).
+            AGENT_METRICS.record(agent_id, success=True, latency_ms=latency_ms)
 
     except Exception:
         logger.exception(
@@ -190,11 +202,7 @@ async def _write_invocation_record(
     platform_tokens: int,
 ) -> None:
     try:
-        from src.generated_client import Prisma
-
-        db = Prisma()
-        await db.connect()
-        try:
+        async with DB.session() as db:
             await db.agentinvocation.create(
                 data={
                     "session_id": session_id,
@@ -207,28 +215,10 @@ async def _write_invocation_record(
                     "platform_tokens": platform_tokens,
                 }
             )
-            await _update_agent_metrics(agent_id, success=(status == "SUCCESS"), db=db)
-        finally:
-            await db.disconnect()
+            AGENT_METRICS.record(
+                agent_id, success=(status == "SUCCESS"), latency_ms=latency_ms
+            )
     except Exception:
         logger.exception(
             "settle_invocation: invocation record write failed call_id=%s", call_id
         )
-
-
-async def _update_agent_metrics(agent_id: str, success: bool, db: object) -> None:
-    """Increment execution_count and update rolling success_rate on Agent row."""
-    try:
-        agent = await db.agent.find_unique(where={"id": agent_id})  # type: ignore[attr-defined]
-        if agent is None:
-            return
-        total = agent.execution_count + 1
-        current_rate = getattr(agent, "success_rate", 0.70)
-        # Exponential moving average: weight recent calls more
-        new_rate = (current_rate * (total - 1) + (1.0 if success else 0.0)) / total
-        await db.agent.update(  # type: ignore[attr-defined]
-            where={"id": agent_id},
-            data={"execution_count": total, "success_rate": new_rate},
-        )
-    except Exception:
-        logger.debug("_update_agent_metrics: failed for agent=%s", agent_id)
@@ -5,9 +5,12 @@ from __future__ import annotations
 import base64
 import logging
 import os
+import time
 
 from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 
+from ..persistence.db import DB
+
 logger = logging.getLogger(__name__)
 
 _NONCE_BYTES = 12  # 96-bit nonce for AES-256-GCM
@@ -38,50 +41,146 @@ def _encrypt(plaintext: str) -> bytes:
     return nonce + ciphertext
 
 
-def _decrypt(data: bytes) -> str:
-    key = _get_vault_key()
+def _decrypt(data: bytes, aesgcm: AESGCM | None = None) -> str:
     nonce = data[:_NONCE_BYTES]
     ciphertext = data[_NONCE_BYTES:]
-    aesgcm = AESGCM(key)
+    aesgcm = aesgcm or AESGCM(_get_vault_key())
     return aesgcm.decrypt(nonce, ciphertext, None).decode()
 
 
+def _agent_env_key(agent_id: str, var_name: str) -> str:
+    return f"agent:{agent_id}:env:{var_name}"
+
+
+class _SecretCache:
+    """Short-TTL, per-user cache of *encrypted* secret values.
+
+    Holds the AES-GCM ciphertext exactly as stored in ``user_secrets`` (and
+    ``None`` for keys known to be absent), so plaintext never sits in memory
+    between calls — values are decrypted on each read. Writes and deletes
+    through ``VaultClient`` invalidate the affected key; other replicas see
+    the change once ``vault_cache_ttl_seconds`` expires.
+    """
+
+    def __init__(self) -> None:
+        self._users: dict[str, dict[str, tuple[bytes | None, float]]] = {}
+
+    @staticmethod
+    def _ttl() -> float:
+        from ..config import settings
+
+        return float(getattr(settings, "vault_cache_ttl_seconds", 30.0))
+
+    def get_many(self, user_id: str, keys: list[str]) -> dict[str, bytes | None]:
+        """Cached ciphertexts for *keys*; keys missing from the result are unknown."""
+        entries = self._users.get(user_id)
+        if not entries:
+            return {}
+        now = time.monotonic()
+        hits: dict[str, bytes | None] = {}
+        for key in keys:
+            cached = entries.get(key)
+            if cached is None:
+                continue
+            if cached[1] <= now:
+                del entries[key]
+                continue
+            hits[key] = cached[0]
+        return hits
+
+    def put_many(self, user_id: str, values: dict[str, bytes | None]) -> None:
+        ttl = self._ttl()
+        if ttl <= 0:
+            return
+        expires = time.monotonic() + ttl
+        entries = self._users.setdefault(user_id, {})
+        for key, value in values.items():
+            entries[key] = (value, expires)
+
+    def invalidate(self, user_id: str, key: str | None = None) -> None:
+        """Drop one key, or every cached secret of *user_id*."""
+        if key is None:
+            self._users.pop(user_id, None)
+            return
+        entries = self._users.get(user_id)
+        if entries is not None:
+            entries.pop(key, None)
+            if not entries:
+                del self._users[user_id]
+
+    def clear(self) -> None:
+        self._users.clear()
+
+
+_SECRET_CACHE = _SecretCache()
+
+
 class VaultClient:
     """Manages encrypted secrets in the user_secrets and agent_registrations tables."""
 
     async def get_user_secret(self, user_id: str, key: str) -> str | None:
         """Retrieve and decrypt a user secret."""
-        try:
-            from src.generated_client import Prisma
+        return (await self.get_user_secrets(user_id, [key])).get(key)
 
-            db = Prisma()
-            await db.connect()
+    async def get_user_secrets(self, user_id: str, keys: list[str]) -> dict[str, str]:
+        """Retrieve and decrypt several user secrets with at most one query.
+
+        Returns only the keys that are stored; values that fail to load or
+        decrypt are omitted (and logged) rather than raising.
+        """
+        wanted = list(dict.fromkeys(keys))
+        encrypted = _SECRET_CACHE.get_many(user_id, wanted)
+        misses = [k for k in wanted if k not in encrypted]
+        if misses:
             try:
-                record = await db.usersecret.find_unique(
-                    where={"user_id_key": {"user_id": user_id, "key": key}}
+                async with DB.session() as db:
+                    records = await db.usersecret.find_many(
+                        where={"user_id": user_id, "key": {"in": misses}}
+                    )
+            except Exception:
+                logger.debug(
+                    "get_user_secrets failed for %s (%d keys)",
+                    user_id,
+                    len(misses),
+                    exc_info=True,
                 )
-                if record is None:
-                    return None
-                return _decrypt(record.encrypted_value.decode())
-            finally:
-                await db.disconnect()
+                records = None
+            if records is not None:
+                fetched: dict[str, bytes | None] = dict.fromkeys(misses)
+                for record in records:
+                    fetched[record.key] = record.encrypted_value.decode()
+                _SECRET_CACHE.put_many(user_id, fetched)
+                encrypted.update(fetched)
+
+        present = {k: v for k, v in encrypted.items() if v is not None}
+        if not present:
+            return {}
+        try:
+            aesgcm = AESGCM(_get_vault_key())
         except Exception:
-            logger.debug(
-                "get_user_secret failed for %s/%s", user_id, key, exc_info=True
-            )
-            return None
+            logger.exception("get_user_secrets: vault key unavailable")
+            return {}
+        values: dict[str, str] = {}
+        for key, data in present.items():
+            try:
+                values[key] = _decrypt(data, aesgcm)
+            except Exception:
+                logger.debug(
+                    "get_user_secrets: decrypt failed for %s/%s",
+                    user_id,
+                    key,
+                    exc_info=True,
+                )
+        return values
 
     async def save_user_secret(self, user_id: str, key: str, value: str) -> None:
         """Encrypt and store a user secret."""
         encrypted = _encrypt(value)
         try:
-            from src.generated_client import Prisma
             from src.generated_client import fields as prisma_fields
 
             b64_encrypted = prisma_fields.Base64.encode(encrypted)
-            db = Prisma()
-            await db.connect()
-            try:
+            async with DB.session() as db:
                 await db.usersecret.upsert(
                     where={"user_id_key": {"user_id": user_id, "key": key}},
                     data={
@@ -93,22 +192,18 @@ class VaultClient:
                         "update": {"encrypted_value": b64_encrypted},
                     },
                 )
-            finally:
-                await db.disconnect()
         except Exception:
             logger.exception("save_user_secret failed for %s/%s", user_id, key)
             raise
+        finally:
+            _SECRET_CACHE.invalidate(user_id, key)
 
     async def get_agent_registration(
         self, agent_id: str, user_id: str
     ) -> dict[str, str] | None:
         """Retrieve decrypted OAuth client credentials for an agent."""
         try:
-            from src.generated_client import Prisma
-
-            db = Prisma()
-            await db.connect()
-            try:
+            async with DB.session() as db:
                 record = await db.agentregistration.find_unique(
                     where={
                         "agent_id_user_id": {
@@ -123,8 +218,6 @@ class VaultClient:
                     "client_id": record.client_id,
                     "client_secret": _decrypt(record.encrypted_client_secret.decode()),
                 }
-            finally:
-                await db.disconnect()
         except Exception:
             logger.debug("get_agent_registration failed", exc_info=True)
             return None
@@ -138,13 +231,10 @@ class VaultClient:
     ) -> None:
         encrypted_secret = _encrypt(client_secret)
         try:
-            from src.generated_client import Prisma
             from src.generated_client import fields as prisma_fields
 
             b64_secret = prisma_fields.Base64.encode(encrypted_secret)
-            db = Prisma()
-            await db.connect()
-            try:
+            async with DB.session() as db:
                 await db.agentregistration.upsert(
                     where={
                         "agent_id_user_id": {
@@ -165,8 +255,6 @@ class VaultClient:
                         },
                     },
                 )
-            finally:
-                await db.disconnect()
         except Exception:
             logger.exception("save_agent_registration failed")
             raise
@@ -191,37 +279,45 @@ class VaultClient:
         self, user_id: str, agent_id: str, var_name: str
     ) -> str | None:
         """Retrieve a stored env-var credential for a specific agent."""
-        return await self.get_user_secret(user_id, f"agent:{agent_id}:env:{var_name}")
+        return await self.get_user_secret(user_id, _agent_env_key(agent_id, var_name))
+
+    async def get_agent_envs(
+        self, user_id: str, agent_id: str, var_names: list[str]
+    ) -> dict[str, str]:
+        """Retrieve several env-var credentials for an agent in one query.
+
+        Returns var_name → value for the names that are configured.
+        """
+        keys = {_agent_env_key(agent_id, var): var for var in var_names}
+        secrets = await self.get_user_secrets(user_id, list(keys))
+        return {keys[key]: value for key, value in secrets.items()}
 
     async def save_agent_env(
         self, user_id: str, agent_id: str, var_name: str, value: str
     ) -> None:
         """Encrypt and store an env-var credential for a specific agent."""
-        await self.save_user_secret(user_id, f"agent:{agent_id}:env:{var_name}", value)
+        await self.save_user_secret(user_id, _agent_env_key(agent_id, var_name), value)
 
     async def delete_agent_env(
         self, user_id: str, agent_id: str, var_name: str
     ) -> None:
         """Delete a stored env-var credential for a specific agent."""
-        key = f"agent:{agent_id}:env:{var_name}"
+        key = _agent_env_key(agent_id, var_name)
         try:
-            from src.generated_client import Prisma
-
-            db = Prisma()
-            await db.connect()
-            try:
-                await db.usersecret.delete(
-                    where={"user_id_key": {"user_id": user_id, "key": key}}
-                )
-            except Exception:
-                logger.debug(
-                    "delete_agent_env: record not found for %s / %s", user_id, key
-                )
-            finally:
-                await db.disconnect()
+            async with DB.session() as db:
+                try:
+                    await db.usersecret.delete(
+                        where={"user_id_key": {"user_id": user_id, "key": key}}
+                    )
+                except Exception:
+                    logger.debug(
+                        "delete_agent_env: record not found for %s / %s", user_id, key
+                    )
         except Exception:
             logger.exception("delete_agent_env failed for %s / %s", user_id, key)
             raise
+        finally:
+            _SECRET_CACHE.invalidate(user_id, key)
 
     async def list_agent_env_status(
         self, user_id: str, agent_id: str, var_names: list[str]
@@ -232,7 +328,5 @@ class VaultClient:
         Returns a mapping of var_name → True (configured) / False (missing).
         Values are never returned — only existence is indicated.
         """
-        return {
-            var: (await self.get_agent_env(user_id, agent_id, var)) is not None
-            for var in var_names
-        }
+        configured = await self.get_agent_envs(user_id, agent_id, var_names)
+        return {var: var in configured for var in var_names}
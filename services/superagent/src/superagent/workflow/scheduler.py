@@ -12,6 +12,8 @@ import logging
 from datetime import UTC, datetime
 from typing import Any
 
+from ..persistence.db import DB
+
 logger = logging.getLogger(__name__)
 
 
@@ -50,12 +52,8 @@ class WorkflowScheduler:
 
     async def _tick(self) -> None:
         """Find due templates and trigger execution."""
-        from src.generated_client import Prisma
-
         now = datetime.now(tz=UTC)
-        db = Prisma()
-        await db.connect()
-        try:
+        async with DB.session() as db:
             due = await db.workflowtemplate.find_many(
                 where={
                     "schedule_enabled": True,
@@ -73,8 +71,6 @@ class WorkflowScheduler:
                     self._run_template(template),
                     name=f"workflow-{template.id}",
                 )
-        finally:
-            await db.disconnect()
 
     async def _run_template(self, template: Any) -> None:
         """Execute a workflow template as a new SuperAgent session."""
@@ -5,6 +5,8 @@ from __future__ import annotations
 import logging
 from typing import Any
 
+from ..persistence.db import DB
+
 logger = logging.getLogger(__name__)
 
 
@@ -23,11 +25,7 @@ class WorkflowTemplateStore:
         created_from_session: str | None = None,
     ) -> str:
         """Persist a workflow template. Returns the new record ID."""
-        from src.generated_client import Prisma
-
-        db = Prisma()
-        await db.connect()
-        try:
+        async with DB.session() as db:
             record = await db.workflowtemplate.create(
                 data={
                     "user_id": user_id,
@@ -42,16 +40,10 @@ class WorkflowTemplateStore:
             )
             logger.info("Saved workflow template %s for user %s", record.id, user_id)
             return record.id
-        finally:
-            await db.disconnect()
 
     async def list_for_user(self, user_id: str) -> list[dict[str, Any]]:
         """Return all templates for a user."""
-        from src.generated_client import Prisma
-
-        db = Prisma()
-        await db.connect()
-        try:
+        async with DB.session() as db:
             records = await db.workflowtemplate.find_many(
                 where={"user_id": user_id},
                 order={"created_at": "desc"},
@@ -67,5 +59,3 @@ class WorkflowTemplateStore:
                 }
                 for r in records
             ]
-        finally:
-            await db.disconnect()
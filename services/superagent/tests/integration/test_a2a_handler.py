@@ -38,11 +38,11 @@ async def test_happy_path_task_completes():
         return result
 
     with (
-        patch("superagent.handlers.a2a_handler.asyncio.sleep", new_callable=AsyncMock),
+        patch("superagent.handlers.a2a_delivery.asyncio.sleep", new_callable=AsyncMock),
         patch.object(handler, "_get_task", side_effect=mock_get_task),
         patch("httpx.AsyncClient") as MockClient,
     ):
-        instance = MockClient.return_value.__aenter__.return_value
+        instance = MockClient.return_value
         instance.post = AsyncMock(
             return_value=AsyncMock(
                 raise_for_status=lambda: None,
@@ -67,11 +67,11 @@ async def test_failed_task_returns_error():
         return _make_task_state("failed")
 
     with (
-        patch("superagent.handlers.a2a_handler.asyncio.sleep", new_callable=AsyncMock),
+        patch("superagent.handlers.a2a_delivery.asyncio.sleep", new_callable=AsyncMock),
         patch.object(handler, "_get_task", side_effect=mock_get_task),
         patch("httpx.AsyncClient") as MockClient,
     ):
-        instance = MockClient.return_value.__aenter__.return_value
+        instance = MockClient.return_value
         instance.post = AsyncMock(
             return_value=AsyncMock(
                 raise_for_status=lambda: None,
@@ -94,3 +94,74 @@ def test_resume_value_to_text_supports_response_payload():
         == "approve this"
     )
     assert _resume_value_to_text({"response": "free-form answer"}) == "free-form answer"
+
+
+@pytest.mark.asyncio
+async def test_streamed_progress_forwarded_as_invocation_progress():
+    import json
+
+    import httpx
+    from superagent.clients.http_pool import HTTP_CLIENTS
+    from superagent.handlers.a2a_delivery import clear_agent_card_cache
+
+    def _event(result: dict) -> str:
+        return (
+            f"data: {json.dumps({'jsonrpc': '2.0', 'id': '1', 'result': result})}\n\n"
+        )
+
+    def _status(state: str, text: str = "") -> dict:
+        status: dict = {"state": state}
+        if text:
+            status["message"] = {"parts": [{"kind": "text", "text": text}]}
+        return {"kind": "status-update", "taskId": "task-001", "status": status}
+
+    body = "".join(
+        _event(r)
+        for r in (
+            _status("working", "Fetching page 1"),
+            _status("working", "Fetching page 2"),
+            {
+                "kind": "artifact-update",
+                "taskId": "task-001",
+                "artifact": {"parts": [{"kind": "text", "text": "2 pages"}]},
+            },
+            {**_status("completed"), "final": True},
+        )
+    )
+
+    def agent(request: httpx.Request) -> httpx.Response:
+        if request.method == "GET":
+            return httpx.Response(200, json={"capabilities": {"streaming": True}})
+        return httpx.Response(
+            200, text=body, headers={"content-type": "text/event-stream"}
+        )
+
+    clear_agent_card_cache()
+    handler = A2AHandler(auth_headers={})
+    events: list[dict] = []
+
+    async def _emit(config, event_data):
+        events.append(event_data)
+
+    with (
+        patch.object(
+            HTTP_CLIENTS, "transport_for", return_value=httpx.MockTransport(agent)
+        ),
+        patch.object(handler, "emit_event", side_effect=_emit),
+    ):
+        result = await handler.send_task(
+            agent_id="did:a2a:agent:001",
+            task="Crawl",
+            transport=_TRANSPORT,
+            state={"user_id": "u1"},
+            config={},
+            call_id="call-1",
+        )
+
+    assert result == "2 pages"
+    assert [e["message"] for e in events] == [
+        "Fetching page 1",
+        "Fetching page 2",
+        "Task completed",
+    ]
+    assert {e["call_id"] for e in events} == {"call-1"}
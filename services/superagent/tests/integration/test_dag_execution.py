@@ -7,6 +7,7 @@ from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage
+from superagent.middleware.pipeline import PreparedCall
 from superagent.pnd.client import PlanUnavailableError
 from superagent.pnd.models import PlanResponse
 
@@ -105,9 +106,15 @@ class TestDagExecution:
             executed.append(kwargs)
             return _MW_RESULT
 
+        async def fake_prepare(self, **kwargs: Any) -> PreparedCall:
+            return PreparedCall(args=kwargs["args"])
+
         monkeypatch.setattr(
             "superagent.middleware.pipeline.ExecutionMiddleware.execute", fake_execute
         )
+        monkeypatch.setattr(
+            "superagent.middleware.pipeline.ExecutionMiddleware.prepare", fake_prepare
+        )
 
         router_patch, orch_patch = _dag_settings_patches()
         with (
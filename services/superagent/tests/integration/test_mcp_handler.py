@@ -58,7 +58,7 @@ async def test_sse_fallback_when_no_sdk():
         patch.dict("sys.modules", {"mcp": None, "mcp.client.sse": None}),
         patch("httpx.AsyncClient") as MockClient,
     ):
-        instance = MockClient.return_value.__aenter__.return_value
+        instance = MockClient.return_value
         instance.post = AsyncMock(
             return_value=MagicMock(
                 json=lambda: {"content": [{"type": "text", "text": "ok"}]},
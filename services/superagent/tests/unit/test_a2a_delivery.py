@@ -0,0 +1,223 @@
+"""Unit tests for A2A task update delivery (stream / push / poll)."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import Any
+
+import httpx
+import pytest
+from superagent.config import settings
+from superagent.handlers import a2a_delivery
+from superagent.handlers.a2a_delivery import (
+    A2A_PUSH_RECEIVER,
+    A2APushReceiver,
+    A2ATaskUpdates,
+    apply_stream_result,
+    clear_agent_card_cache,
+)
+
+ENDPOINT = "http://agent.test"
+
+
+def _sse(*results: dict[str, Any]) -> bytes:
+    return b"".join(
+        f"data: {json.dumps({'jsonrpc': '2.0', 'id': '1', 'result': r})}\n\n".encode()
+        for r in results
+    )
+
+
+def _status(state: str, text: str = "", final: bool = False) -> dict[str, Any]:
+    status: dict[str, Any] = {"state": state}
+    if text:
+        status["message"] = {
+            "kind": "message",
+            "parts": [{"kind": "text", "text": text}],
+        }
+    return {"kind": "status-update", "taskId": "t-1", "status": status, "final": final}
+
+
+class _Agent:
+    """httpx MockTransport app: agent card + JSON-RPC endpoint."""
+
+    def __init__(self, capabilities: dict[str, bool], stream_body: bytes = b""):
+        self.capabilities = capabilities
+        self.stream_body = stream_body
+        self.methods: list[str] = []
+        self.sent_params: list[dict[str, Any]] = []
+        self.task_states: list[dict[str, Any]] = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        if request.method == "GET":
+            return httpx.Response(200, json={"capabilities": self.capabilities})
+        body = json.loads(request.content)
+        self.methods.append(body["method"])
+        if body["method"] in ("message/stream", "tasks/resubscribe"):
+            return httpx.Response(
+                200,
+                content=self.stream_body,
+                headers={"content-type": "text/event-stream"},
+            )
+        if body["method"] == "message/send":
+            self.sent_params.append(body["params"])
+            return httpx.Response(200, json={"result": {"id": "t-1"}})
+        state = self.task_states.pop(0) if self.task_states else {}
+        return httpx.Response(200, json={"result": state})
+
+
+async def _get_task(client: httpx.AsyncClient, endpoint: str, task_id: str):
+    resp = await client.post(
+        f"{endpoint}/",
+        json={"jsonrpc": "2.0", "method": "tasks/get", "params": {"id": task_id}},
+    )
+    return resp.json()["result"]
+
+
+@pytest.fixture(autouse=True)
+def _fresh_cards(monkeypatch):
+    clear_agent_card_cache()
+    monkeypatch.setattr(a2a_delivery, "POLL_INITIAL", 0.0)
+    yield
+    clear_agent_card_cache()
+
+
+def _updates(agent: _Agent) -> tuple[httpx.AsyncClient, A2ATaskUpdates]:
+    client = httpx.AsyncClient(transport=httpx.MockTransport(agent))
+    params = {"message": {"messageId": "m-1", "role": "user", "parts": []}}
+    return client, A2ATaskUpdates(client, ENDPOINT, params, "m-1", _get_task)
+
+
+class TestApplyStreamResult:
+    def test_artifact_chunks_append_by_id(self):
+        state: dict[str, Any] = {"id": "t-1"}
+        chunk = {"artifactId": "a", "parts": [{"kind": "text", "text": "he"}]}
+        state = apply_stream_result(
+            state, {"kind": "artifact-update", "taskId": "t-1", "artifact": chunk}
+        )
+        more = {"artifactId": "a", "parts": [{"kind": "text", "text": "llo"}]}
+        state = apply_stream_result(
+            state,
+            {
+                "kind": "artifact-update",
+                "taskId": "t-1",
+                "artifact": more,
+                "append": True,
+            },
+        )
+        assert [p["text"] for p in state["artifacts"][0]["parts"]] == ["he", "llo"]
+
+    def test_bare_message_completes(self):
+        state = apply_stream_result({}, {"kind": "message", "parts": []})
+        assert state["status"]["state"] == "completed"
+
+
+class TestAgentCapabilities:
+    @pytest.mark.asyncio
+    async def test_card_cache_is_lru_bounded(self, monkeypatch):
+        monkeypatch.setattr(a2a_delivery, "_AGENT_CARD_CACHE_MAX", 2)
+        agent = _Agent({"streaming": True})
+        fetched: list[str] = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            fetched.append(request.url.host)
+            return agent(request)
+
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as c:
+            for host in ("a", "b", "a", "c", "a", "b"):
+                caps = await a2a_delivery.agent_capabilities(c, f"http://{host}")
+                assert caps["streaming"]
+
+        # "b" was least recently used when "c" arrived, so it was refetched.
+        assert fetched == ["a", "b", "c", "b"]
+        assert list(a2a_delivery._CARD_CACHE) == ["http://a", "http://b"]
+
+
+class TestPushReceiver:
+    def test_rejects_bad_token_and_unknown_subscription(self):
+        receiver = A2APushReceiver()
+        sub, token, queue = receiver.register()
+        assert not receiver.deliver(sub, "wrong", {"id": "t"})
+        assert not receiver.deliver("nope", token, {"id": "t"})
+        assert receiver.deliver(sub, token, {"result": {"id": "t"}})
+        assert queue.get_nowait() == {"id": "t"}
+        receiver.unregister(sub)
+        assert not receiver.deliver(sub, token, {"id": "t"})
+
+
+class TestTaskUpdates:
+    @pytest.mark.asyncio
+    async def test_streams_progress_without_polling(self):
+        agent = _Agent(
+            {"streaming": True},
+            _sse(
+                {"kind": "task", "id": "t-1", "status": {"state": "submitted"}},
+                _status("working", "page 1/2"),
+                {
+                    "kind": "artifact-update",
+                    "taskId": "t-1",
+                    "artifact": {"parts": [{"kind": "text", "text": "done"}]},
+                },
+                _status("completed", final=True),
+            ),
+        )
+        client, updates = _updates(agent)
+        states: list[dict[str, Any]] = []
+        async with client:
+            async for state in updates:
+                states.append(state)
+                if state["status"]["state"] == "completed":
+                    break
+        assert updates.task_id == "t-1"
+        assert [s["status"]["state"] for s in states] == [
+            "submitted",
+            "working",
+            "working",
+            "completed",
+        ]
+        assert states[3]["artifacts"][0]["parts"][0]["text"] == "done"
+        assert agent.methods[0] == "message/stream"
+        assert "message/send" not in agent.methods
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_polling_without_capabilities(self):
+        agent = _Agent({})
+        agent.task_states = [
+            {"id": "t-1", "status": {"state": "working"}},
+            {"id": "t-1", "status": {"state": "completed"}},
+        ]
+        client, updates = _updates(agent)
+        seen: list[str] = []
+        async with client:
+            async for state in updates:
+                seen.append(state["status"]["state"])
+                if seen[-1] == "completed":
+                    break
+        assert seen == ["working", "completed"]
+        assert agent.methods[:2] == ["message/send", "tasks/get"]
+        assert updates.mode == "poll"
+
+    @pytest.mark.asyncio
+    async def test_push_notification_delivers_update(self, monkeypatch):
+        monkeypatch.setattr(settings, "a2a_push_base_url", "http://superagent.test")
+        agent = _Agent({"pushNotifications": True})
+        client, updates = _updates(agent)
+
+        async def _webhook() -> None:
+            while not agent.sent_params:
+                await asyncio.sleep(0)
+            cfg = agent.sent_params[0]["configuration"]["pushNotificationConfig"]
+            sub = cfg["url"].rsplit("/", 1)[-1]
+            assert cfg["url"].startswith("http://superagent.test/a2a/push/")
+            A2A_PUSH_RECEIVER.deliver(
+                sub, cfg["token"], {"id": "t-1", "status": {"state": "completed"}}
+            )
+
+        async with client:
+            hook = asyncio.create_task(_webhook())
+            async for state in updates:
+                assert state["status"]["state"] == "completed"
+                break
+            await hook
+        assert updates.mode == "push"
+        assert "tasks/get" not in agent.methods
@@ -0,0 +1,124 @@
+"""Unit tests for write-behind agent metrics aggregation."""
+
+from __future__ import annotations
+
+from contextlib import asynccontextmanager
+from datetime import UTC, datetime
+from typing import Any
+
+import pytest
+from superagent.pricing import agent_metrics
+from superagent.pricing.agent_metrics import (
+    AgentMetricsAggregator,
+    latency_bucket,
+)
+
+from common.database.src.agent_metrics import agent_rollup_sql
+
+_AT = datetime(2026, 10, 17, 9, 41, tzinfo=UTC)
+
+
+class _FakeDB:
+    def __init__(self) -> None:
+        self.statements: list[tuple[str, tuple[Any, ...]]] = []
+        self.transactions = 0
+        self.fail = False
+
+    @asynccontextmanager
+    async def tx(self):
+        self.transactions += 1
+        yield self
+
+    async def execute_raw(self, sql: str, *params: Any) -> int:
+        if self.fail:
+            raise ConnectionError("db down")
+        self.statements.append((" ".join(sql.split()), params))
+        return 1
+
+
+def test_latency_bucket_bounds():
+    assert latency_bucket(None) == 50
+    assert latency_bucket(50) == 50
+    assert latency_bucket(51) == 100
+    assert latency_bucket(4_999) == 5000
+    assert latency_bucket(10_000_000) == 600000
+
+
+@pytest.mark.asyncio
+async def test_flush_coalesces_outcomes_into_one_transaction():
+    db = _FakeDB()
+    metrics = AgentMetricsAggregator(db)
+    for latency in (40, 45, 900):
+        metrics.record("a1", success=True, latency_ms=latency, at=_AT)
+    metrics.record("a1", success=False, latency_ms=30, at=_AT)
+    metrics.record("a2", success=True, latency_ms=70, at=_AT)
+
+    assert await metrics.flush() == 3
+    assert db.transactions == 1
+
+    upsert, increment, refresh = db.statements
+    assert upsert[0].startswith("INSERT INTO agent_metrics_hourly")
+    rows = [upsert[1][i : i + 5] for i in range(0, len(upsert[1]), 5)]
+    assert sorted(rows) == [
+        ("a1", "2026-10-17T09:00:00", 50, 3, 2),
+        ("a1", "2026-10-17T09:00:00", 1000, 1, 1),
+        ("a2", "2026-10-17T09:00:00", 100, 1, 1),
+    ]
+    assert "execution_count = a.execution_count + d.n" in increment[0]
+    assert increment[1] == ("a1", 4, "a2", 1)
+    assert refresh == (" ".join(agent_rollup_sql(2).split()), ("a1", "a2"))
+
+    assert await metrics.flush() == 0
+    assert len(db.statements) == 3
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_keeps_counts_for_next_tick():
+    db = _FakeDB()
+    metrics = AgentMetricsAggregator(db)
+    metrics.record("a1", success=True, latency_ms=10, at=_AT)
+
+    db.fail = True
+    with pytest.raises(ConnectionError):
+        await metrics.flush()
+    metrics.record("a1", success=False, latency_ms=10, at=_AT)
+
+    db.fail = False
+    await metrics.flush()
+    upsert = db.statements[0]
+    assert upsert[1] == ("a1", "2026-10-17T09:00:00", 50, 2, 1)
+    assert metrics.stats()["failed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_error_after_commit_does_not_requeue_counts(monkeypatch):
+    db = _FakeDB()
+    metrics = AgentMetricsAggregator()
+
+    @asynccontextmanager
+    async def checkout(_db: Any = None):
+        yield db
+        raise ConnectionError("connection lost while returning it to the pool")
+
+    monkeypatch.setattr(agent_metrics, "use_db", checkout)
+    metrics.record("a1", success=True, latency_ms=10, at=_AT)
+
+    with pytest.raises(ConnectionError):
+        await metrics.flush()
+
+    assert db.transactions == 1
+    assert metrics.stats()["pending_buckets"] == 0
+    assert metrics.stats()["failed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_aclose_writes_remaining_counts():
+    db = _FakeDB()
+    metrics = AgentMetricsAggregator(db)
+    metrics.start(3600)
+    metrics.record("a1", success=True, latency_ms=10, at=_AT)
+
+    await metrics.aclose()
+
+    assert db.transactions == 1
+    assert metrics.stats()["pending_buckets"] == 0
@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+import asyncio
+from contextlib import asynccontextmanager
 from typing import Any
 
 import pytest
@@ -9,8 +11,10 @@ from superagent.middleware.audit_ledger import (
     ENTRY_TYPE_HITL_DECISION,
     ENTRY_TYPE_STEP,
     LedgerObserver,
+    compute_checkpoint_root,
     compute_content_hash,
     verify_chain,
+    verify_checkpoints,
 )
 from superagent.middleware.observers import StepResult
 
@@ -21,19 +25,22 @@ class _FakeTable:
     def __init__(self, fail_on_create: bool = False) -> None:
         self.rows: list[dict[str, Any]] = []
         self.fail_on_create = fail_on_create
+        self.batches: list[int] = []
 
-    async def find_first(self, order: Any = None) -> Any:
-        if not self.rows:
+    async def find_first(self, where: dict[str, Any], order: Any = None) -> Any:
+        chain = [r for r in self.rows if r["chain_id"] == where["chain_id"]]
+        if not chain:
             return None
-        row = self.rows[-1]
-        return type("Row", (), row)()
+        return type("Row", (), max(chain, key=lambda r: r["chain_seq"]))()
 
-    async def create(self, data: dict[str, Any]) -> None:
+    async def create_many(self, data: list[dict[str, Any]]) -> int:
         if self.fail_on_create:
             raise RuntimeError("db down")
         # The real client unwraps PrismaJson (fields.Json wraps values in .data)
         # and returns plain JSON types; mirror that here.
-        self.rows.append({k: getattr(v, "data", v) for k, v in data.items()})
+        self.rows.extend({k: getattr(v, "data", v) for k, v in d.items()} for d in data)
+        self.batches.append(len(data))
+        return len(data)
 
     async def find_many(self, where: dict[str, Any], order: Any = None) -> list[Any]:
         return [
@@ -46,6 +53,7 @@ class _FakeTable:
 class _FakeDB:
     def __init__(self, fail_on_create: bool = False) -> None:
         self.auditledgerentry = _FakeTable(fail_on_create)
+        self.locks: list[str] = []
 
     def is_connected(self) -> bool:
         return True
@@ -56,6 +64,17 @@ class _FakeDB:
     async def disconnect(self) -> None:
         return None
 
+    @asynccontextmanager
+    async def tx(self):
+        yield self
+
+    async def execute_raw(self, sql: str, *args: Any) -> int:
+        self.locks.extend(args)
+        return 1
+
+    async def query_raw(self, sql: str, *args: Any) -> list[dict[str, Any]]:
+        return [{"ms": 1_700_000_000_000}]
+
 
 def _step_result(call_id: str, session_id: str = "sess-1") -> StepResult:
     return StepResult(
@@ -156,6 +175,30 @@ class TestLedgerObserver:
         assert rows[1]["prev_hash"] == rows[0]["content_hash"]
         assert verify_chain(rows) is True
 
+    @pytest.mark.asyncio
+    async def test_concurrent_sessions_get_own_chains_in_one_batch(self):
+        db = _FakeDB()
+        observer = LedgerObserver(db=db, linger_ms=0)
+
+        await asyncio.gather(
+            *(
+                observer.on_step_complete(_step_result(f"call-{i}", f"sess-{i % 2}"))
+                for i in range(6)
+            )
+        )
+        await observer.aclose()
+
+        rows = db.auditledgerentry.rows
+        assert db.auditledgerentry.batches == [6]
+        # Chain locks first, then the shared checkpoint lock before stamping.
+        assert db.locks == ["sess-0", "sess-1", "audit_ledger:checkpoint"]
+        assert {r["created_at"].timestamp() for r in rows} == {1_700_000_000}
+        for session in ("sess-0", "sess-1"):
+            chain = [r for r in rows if r["chain_id"] == session]
+            assert [r["chain_seq"] for r in chain] == [1, 2, 3]
+            assert chain[0]["prev_hash"] == ""
+        assert verify_chain(rows) is True
+
     def test_compute_content_hash_is_stable(self):
         row = {
             "entry_type": ENTRY_TYPE_STEP,
@@ -173,3 +216,59 @@ class TestLedgerObserver:
         }
         assert compute_content_hash(row) == compute_content_hash(dict(row))
         assert compute_content_hash(row).startswith("sha256:")
+
+
+class TestChainLayout:
+    @staticmethod
+    def _chain(chain_id: str, n: int) -> list[dict[str, Any]]:
+        rows: list[dict[str, Any]] = []
+        prev = ""
+        for seq in range(1, n + 1):
+            row = {
+                "entry_type": ENTRY_TYPE_STEP,
+                "call_id": f"{chain_id}-{seq}",
+                "session_id": chain_id,
+                "chain_id": chain_id,
+                "chain_seq": seq,
+                "prev_hash": prev,
+            }
+            row["content_hash"] = compute_content_hash(row)
+            prev = row["content_hash"]
+            rows.append(row)
+        return rows
+
+    def test_interleaved_chains_verify_independently(self):
+        a, b = self._chain("sess-a", 3), self._chain("sess-b", 2)
+        interleaved = [a[0], b[0], a[2], b[1], a[1]]
+        assert verify_chain(interleaved) is True
+
+    def test_missing_row_breaks_the_chain(self):
+        rows = self._chain("sess-a", 3)
+        assert verify_chain([rows[0], rows[2]]) is False
+
+    def test_legacy_rows_without_chain_fields_still_verify(self):
+        rows = self._chain("", 3)
+        for row in rows:
+            del row["chain_id"], row["chain_seq"]
+        assert verify_chain(rows) is True
+
+    def test_checkpoints_chain_and_detect_tampering(self):
+        first_tips = {"sess-a": [3, "sha256:aa"], "sess-b": [1, "sha256:bb"]}
+        first_root = compute_checkpoint_root("", first_tips)
+        second_tips = {"sess-a": [5, "sha256:cc"]}
+        checkpoints = [
+            {"prev_root": "", "tips": first_tips, "merkle_root": first_root},
+            {
+                "prev_root": first_root,
+                "tips": second_tips,
+                "merkle_root": compute_checkpoint_root(first_root, second_tips),
+            },
+        ]
+        assert verify_checkpoints(checkpoints) is True
+        # Leaf order is canonical, not insertion order.
+        assert compute_checkpoint_root("", dict(reversed(first_tips.items()))) == (
+            first_root
+        )
+
+        checkpoints[0]["tips"] = {**first_tips, "sess-b": [1, "sha256:forged"]}
+        assert verify_checkpoints(checkpoints) is False
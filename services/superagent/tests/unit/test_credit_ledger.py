@@ -0,0 +1,252 @@
+"""Unit tests for atomic credit reservations (payment_guard / settle_invocation)."""
+
+from __future__ import annotations
+
+import asyncio
+from decimal import Decimal
+from typing import Any
+
+import pytest
+from superagent.pricing import credit_ledger, guard, settlement
+from superagent.pricing.credit_ledger import (
+    CreditLedger,
+    CreditSnapshot,
+)
+from superagent.pricing.guard import PaymentInterrupt, payment_guard
+
+
+class _FakeScript:
+    """Runs the Python twin of a Lua script atomically (no awaits inside)."""
+
+    def __init__(self, redis: _FakeRedis, body: str) -> None:
+        self._redis = redis
+        self._run = {
+            credit_ledger._RESERVE_LUA: redis.run_reserve,
+            credit_ledger._RELEASE_LUA: redis.run_release,
+            credit_ledger._APPLIED_LUA: redis.run_applied,
+            credit_ledger._HYDRATE_LUA: redis.run_hydrate,
+        }[body]
+
+    async def __call__(self, keys: list[str], args: list[Any]) -> Any:
+        self._redis.round_trips += 1
+        if self._redis.down:
+            raise ConnectionError("redis down")
+        return self._run(keys, [str(a) for a in args])
+
+
+class _FakeRedis:
+    def __init__(self) -> None:
+        self.hashes: dict[str, dict[str, str]] = {}
+        self.round_trips = 0
+        self.down = False
+
+    def register_script(self, body: str) -> _FakeScript:
+        return _FakeScript(self, body)
+
+    async def aclose(self) -> None:
+        return None
+
+    def run_reserve(self, keys: list[str], args: list[str]) -> list[int]:
+        user = self.hashes.get(keys[0])
+        if user is None:
+            return [-1, 0]
+        if user["arrears_flag"] == "1":
+            return [-2, int(user["arrears"])]
+        reserves = self.hashes.setdefault(keys[1], {})
+        now = int(args[2])
+        held = 0
+        for rid, packed in list(reserves.items()):
+            amount, expires = (int(x) for x in packed.split(":"))
+            if expires <= now:
+                del reserves[rid]
+            elif rid != args[0]:
+                held += amount
+        available = int(user["balance"]) - held
+        if available <= 0 or available < int(args[1]):
+            return [-3, available]
+        reserves[args[0]] = f"{args[1]}:{now + int(args[3])}"
+        return [1, available - int(args[1])]
+
+    def run_release(self, keys: list[str], args: list[str]) -> int:
+        released = self.hashes.get(keys[1], {}).pop(args[0], None) is not None
+        charge = int(args[1])
+        if charge > 0:
+            user = self.hashes.get(keys[0])
+            if user is not None:
+                user["balance"] = str(max(int(user["balance"]) - charge, 0))
+            debits = self.hashes.setdefault(keys[2], {})
+            debits[args[0]] = f"{charge}:{int(args[2]) + int(args[3])}:0"
+        return int(released)
+
+    def run_applied(self, keys: list[str], args: list[str]) -> int:
+        debits = self.hashes.get(keys[2], {})
+        if args[0] not in debits:
+            return 0
+        amount, expires, _ = debits[args[0]].split(":")
+        debits[args[0]] = f"{amount}:{expires}:{args[1]}"
+        return 1
+
+    def run_hydrate(self, keys: list[str], args: list[str]) -> int:
+        now, read_at = int(args[4]), int(args[5])
+        pending = 0
+        debits = self.hashes.setdefault(keys[2], {})
+        for rid, packed in list(debits.items()):
+            amount, expires, applied = (int(x) for x in packed.split(":"))
+            if expires <= now or 0 < applied < read_at:
+                del debits[rid]
+            else:
+                pending += amount
+        balance = max(int(args[0]) - pending, 0)
+        self.hashes.setdefault(keys[0], {}).update(
+            balance=str(balance), arrears_flag=args[1], arrears=args[2]
+        )
+        return balance
+
+
+@pytest.fixture
+def redis() -> _FakeRedis:
+    return _FakeRedis()
+
+
+@pytest.fixture
+def loads() -> list[str]:
+    return []
+
+
+@pytest.fixture
+def users(monkeypatch, redis, loads) -> dict[str, CreditSnapshot]:
+    """Postgres users table; every read is recorded in *loads*."""
+    table = {"u1": CreditSnapshot(Decimal("1.00"))}
+
+    async def load(user_id: str) -> CreditSnapshot | None:
+        loads.append(user_id)
+        return table.get(user_id)
+
+    monkeypatch.setattr(guard, "_load_credits", load)
+    monkeypatch.setattr(
+        credit_ledger,
+        "CREDITS",
+        CreditLedger(redis, balance_ttl_seconds=60, reserve_ttl_seconds=300),
+    )
+    monkeypatch.setattr(guard, "CREDITS", credit_ledger.CREDITS)
+    return table
+
+
+def _guard(call_id: str, fee: str = "0.60") -> Any:
+    return payment_guard(
+        user_id="u1", base_fee=Decimal(fee), session_id="s1", call_id=call_id
+    )
+
+
+@pytest.mark.asyncio
+async def test_parallel_calls_cannot_share_the_same_credit(users):
+    results = await asyncio.gather(
+        *(_guard(f"c{i}") for i in range(5)), return_exceptions=True
+    )
+
+    passed = [r for r in results if r is None]
+    blocked = [r for r in results if isinstance(r, PaymentInterrupt)]
+    assert len(passed) == 1  # 1.00 → 0.40 left, which no 0.60 call fits
+    assert {b.reason for b in blocked} == {"insufficient_credits"}
+
+
+@pytest.mark.asyncio
+async def test_cache_hit_is_one_round_trip_without_postgres(users, redis, loads):
+    await _guard("c1", fee="0.10")
+    assert loads == ["u1"]  # lazy hydration on the first miss
+    trips = redis.round_trips
+
+    await _guard("c2", fee="0.10")
+
+    assert loads == ["u1"]
+    assert redis.round_trips == trips + 1
+
+
+@pytest.mark.asyncio
+async def test_settle_releases_reserve_and_debits_cached_balance(
+    users, redis, monkeypatch
+):
+    async def no_db(**kwargs: Any) -> None:
+        return None
+
+    monkeypatch.setattr(settlement, "_write_invocation_record", no_db)
+    await _guard("c1", fee="0.50")
+    await _guard("c2", fee="0.50")
+    with pytest.raises(PaymentInterrupt):
+        await _guard("c3", fee="0.50")
+
+    # c1 failed: settlement releases its reserve without charging. c2
+    # succeeded: the release also debits the fee from the cached balance.
+    await settlement.settle_invocation(
+        user_id="u1",
+        agent_id="a",
+        session_id="s1",
+        call_id="c1",
+        base_fee=Decimal("0.50"),
+        latency_ms=1,
+        execution_success=False,
+    )
+    await credit_ledger.CREDITS.release("u1", "s1:c2", charge=Decimal("0.50"))
+
+    hashes = redis.hashes
+    assert hashes["superagent:credits:u1:reserves"] == {}
+    assert hashes["superagent:credits:u1"]["balance"] == str(50_000_000)
+
+
+@pytest.mark.asyncio
+async def test_rehydration_keeps_debits_postgres_has_not_applied(users, redis):
+    await _guard("c1")
+    await credit_ledger.CREDITS.release("u1", "s1:c1", charge=Decimal("0.60"))
+    await _guard("c2", fee="0.40")
+    # Postgres still says 1.00: the denial's refresh must keep the unapplied
+    # 0.60 debit, or it would free credit c2 already holds.
+    with pytest.raises(PaymentInterrupt):
+        await _guard("c3")
+    assert redis.hashes["superagent:credits:u1"]["balance"] == str(40_000_000)
+
+    # Settlement deducts it in Postgres and marks it applied; the next refresh
+    # reads the new balance and stops subtracting it.
+    users["u1"] = CreditSnapshot(Decimal("0.40"))
+    assert await credit_ledger.CREDITS.applied("u1", "s1:c1")
+    await asyncio.sleep(0.002)
+    with pytest.raises(PaymentInterrupt):
+        await _guard("c4")
+    assert redis.hashes["superagent:credits:u1"]["balance"] == str(40_000_000)
+    assert redis.hashes["superagent:credits:u1:debits"] == {}
+
+
+@pytest.mark.asyncio
+async def test_denial_is_confirmed_against_postgres(users):
+    users["u1"] = CreditSnapshot(Decimal("0"))
+    with pytest.raises(PaymentInterrupt) as exc:
+        await _guard("c1")
+    assert exc.value.reason == "insufficient_credits"
+
+    users["u1"] = CreditSnapshot(Decimal("5"))  # top-up lands in Postgres
+    await _guard("c2")
+
+
+@pytest.mark.asyncio
+async def test_arrears_and_unknown_user_block(users):
+    users["u1"] = CreditSnapshot(
+        Decimal("3"), arrears_flag=True, arrears_usd=Decimal("2")
+    )
+    with pytest.raises(PaymentInterrupt) as exc:
+        await _guard("c1")
+    assert (exc.value.reason, exc.value.amount) == ("arrears", Decimal("2"))
+
+    del users["u1"]
+    with pytest.raises(PaymentInterrupt) as exc:
+        await _guard("c2")
+    assert exc.value.reason == "user_not_found"
+
+
+@pytest.mark.asyncio
+async def test_redis_down_falls_back_to_postgres_check(users, redis):
+    redis.down = True
+    await _guard("c1")
+    await _guard("c2")  # no reservation possible — Postgres balance still positive
+
+    users["u1"] = CreditSnapshot(Decimal("0"))
+    with pytest.raises(PaymentInterrupt):
+        await _guard("c3")
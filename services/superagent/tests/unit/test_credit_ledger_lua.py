@@ -0,0 +1,87 @@
+"""Credit ledger Lua scripts run by a Redis Lua engine (fakeredis + lupa)."""
+
+from __future__ import annotations
+
+import asyncio
+from decimal import Decimal
+
+import pytest
+from superagent.pricing import credit_ledger
+from superagent.pricing.credit_ledger import (
+    CreditLedger,
+    CreditSnapshot,
+    to_units,
+)
+
+_KEY = "superagent:credits:u1"
+
+
+@pytest.fixture
+async def ledger():
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    redis = fakeredis.FakeAsyncRedis(decode_responses=True)
+    ledger = CreditLedger(redis, balance_ttl_seconds=60, reserve_ttl_seconds=300)
+    yield ledger
+    await ledger.aclose()
+
+
+def _loader(table: dict[str, CreditSnapshot]):
+    async def load(user_id: str) -> CreditSnapshot | None:
+        return table.get(user_id)
+
+    return load
+
+
+@pytest.mark.asyncio
+async def test_parallel_reservations_share_nothing(ledger):
+    load = _loader({"u1": CreditSnapshot(Decimal("1.00"))})
+    results = await asyncio.gather(
+        *(ledger.reserve("u1", f"s1:c{i}", Decimal("0.60"), load) for i in range(5))
+    )
+    assert [r.ok for r in results].count(True) == 1
+    assert {r.reason for r in results if not r.ok} == {"insufficient_credits"}
+
+
+@pytest.mark.asyncio
+async def test_reservations_together_exceeding_the_balance_are_denied(ledger):
+    load = _loader({"u1": CreditSnapshot(Decimal("1.00"))})
+    first, second = await asyncio.gather(
+        ledger.reserve("u1", "s1:c1", Decimal("0.80"), load),
+        ledger.reserve("u1", "s1:c2", Decimal("0.80"), load),
+    )
+    assert sorted([first.ok, second.ok]) == [False, True]
+    denied = second if first.ok else first
+    assert (denied.reason, denied.available) == (
+        "insufficient_credits",
+        Decimal("0.2"),
+    )
+
+
+@pytest.mark.asyncio
+async def test_large_balances_stay_exact(ledger):
+    balance_usd = Decimal("12345678.12345678")
+    load = _loader({"u1": CreditSnapshot(balance_usd)})
+    assert (await ledger.reserve("u1", "s1:c1", Decimal("0.00000001"), load)).ok
+    await ledger.release("u1", "s1:c1", charge=Decimal("0.00000001"))
+
+    balance = await ledger._client().hget(_KEY, "balance")
+    assert balance == str(to_units(balance_usd) - 1)
+
+
+@pytest.mark.asyncio
+async def test_refresh_keeps_unapplied_debits(ledger):
+    table = {"u1": CreditSnapshot(Decimal("1.00"))}
+    load = _loader(table)
+    assert (await ledger.reserve("u1", "s1:c1", Decimal("0.60"), load)).ok
+    await ledger.release("u1", "s1:c1", charge=Decimal("0.60"))
+
+    await ledger.hydrate("u1", table["u1"])
+    assert await ledger._client().hget(_KEY, "balance") == str(40_000_000)
+
+    table["u1"] = CreditSnapshot(Decimal("0.40"))
+    assert await ledger.applied("u1", "s1:c1")
+    await asyncio.sleep(0.002)
+    await ledger.hydrate("u1", table["u1"], read_at_ms=credit_ledger._now_ms())
+    assert await ledger._client().hget(_KEY, "balance") == str(40_000_000)
+    assert await ledger._client().hgetall(f"{_KEY}:debits") == {}
@@ -2,17 +2,24 @@
 
 from __future__ import annotations
 
+import asyncio
+
 import pytest
+from langchain_core.messages import AIMessage, ToolMessage
+from superagent.middleware.pipeline import PreparedCall
 from superagent.nodes.dag_plan import (
     PlanGraphError,
     checklist_for_plan,
     mark_result,
     new_active_plan,
     next_ready_node,
+    ready_nodes,
     resolve_inputs,
     tool_call_for_node,
     topo_order,
 )
+from superagent.nodes.execute_agent_calls import execute_agent_calls_node
+from superagent.nodes.execute_dag_plan import execute_dag_plan_node
 from superagent.pnd.models import PlanEdge, PlanNode, WorkflowPlan
 
 
@@ -153,6 +160,140 @@ class TestNextReadyNode:
         assert next_ready_node(plan) == "n2"
 
 
+class TestReadyNodes:
+    def test_returns_whole_wavefront(self):
+        nodes = [_node("n1"), _node("n2"), _node("n3", deps=["n1", "n2"])]
+        plan = new_active_plan(_workflow(nodes), "q")
+        assert ready_nodes(plan) == ["n1", "n2"]
+        plan["nodes"]["n1"]["status"] = "done"
+        plan["nodes"]["n2"]["status"] = "done"
+        assert ready_nodes(plan) == ["n3"]
+
+    def test_plan_cap_counts_in_flight_nodes(self):
+        nodes = [_node(f"n{i}", agent=f"did:orcha:agent:{i}") for i in range(4)]
+        plan = new_active_plan(_workflow(nodes), "q")
+        assert ready_nodes(plan, max_nodes=3) == ["n0", "n1", "n2"]
+        plan["nodes"]["n0"]["status"] = "in_progress"
+        assert ready_nodes(plan, max_nodes=3) == ["n1", "n2"]
+
+    def test_per_agent_cap(self):
+        nodes = [_node("n1"), _node("n2"), _node("n3", agent="did:orcha:agent:b")]
+        plan = new_active_plan(_workflow(nodes), "q")
+        assert ready_nodes(plan, max_per_agent=1) == ["n1", "n3"]
+
+
+class TestExecuteDagPlanNode:
+    _CANDIDATES = [
+        _MCP_CANDIDATE,
+        {**_MCP_CANDIDATE, "agent_id": "did:orcha:agent:c", "agent_name": "C"},
+    ]
+
+    def _wide_plan(self) -> dict:
+        nodes = [
+            _node("n1"),
+            _node("n2", agent="did:orcha:agent:c"),
+            _node("n3", deps=["n1", "n2"]),
+        ]
+        return new_active_plan(_workflow(nodes), "q")
+
+    @pytest.mark.asyncio
+    async def test_issues_ready_nodes_as_one_batch(self):
+        state = {
+            "active_plan": self._wide_plan(),
+            "messages": [],
+            "pnd_candidates": self._CANDIDATES,
+        }
+        out = await execute_dag_plan_node(state, {})
+        calls = out["messages"][0].tool_calls
+        assert [c["id"] for c in calls] == ["plan_call_0", "plan_call_1"]
+        assert out["active_plan"]["issued"] == {
+            "plan_call_0": "n1",
+            "plan_call_1": "n2",
+        }
+        assert out["task_checklist"] is not None
+
+    @pytest.mark.asyncio
+    async def test_dependents_start_as_soon_as_their_inputs_land(self, monkeypatch):
+        # n1 is slow; n3 only needs n2 and must not wait for n1.
+        plan = new_active_plan(
+            _workflow(
+                [
+                    _node("n1"),
+                    _node("n2", agent="did:orcha:agent:c"),
+                    _node("n3", agent="did:orcha:agent:c", deps=["n2"]),
+                ]
+            ),
+            "q",
+        )
+        log: list[tuple[str, str]] = []
+
+        async def fake_prepare(self, **kwargs):
+            return PreparedCall(args=kwargs["args"])
+
+        async def fake_execute(self, **kwargs):
+            call_id = kwargs["call_id"]
+            log.append(("start", call_id))
+            slow = kwargs["agent_id"] == "did:orcha:agent:a"
+            await asyncio.sleep(0.05 if slow else 0)
+            log.append(("end", call_id))
+            return {"content": f"out {call_id}"}
+
+        monkeypatch.setattr(
+            "superagent.middleware.pipeline.ExecutionMiddleware.prepare", fake_prepare
+        )
+        monkeypatch.setattr(
+            "superagent.middleware.pipeline.ExecutionMiddleware.execute", fake_execute
+        )
+        state = {
+            "active_plan": plan,
+            "messages": [],
+            "pnd_candidates": self._CANDIDATES,
+        }
+        first = await execute_dag_plan_node(state, {})
+        state.update(active_plan=first["active_plan"], messages=first["messages"])
+
+        out = await execute_agent_calls_node(state, {})
+
+        assert log.index(("start", "plan_call_2")) < log.index(("end", "plan_call_0"))
+        plan = out["active_plan"]
+        assert plan["issued"]["plan_call_2"] == "n3"
+        assert plan["outputs"] == {
+            "n1": "out plan_call_0",
+            "n2": "out plan_call_1",
+            "n3": "out plan_call_2",
+        }
+        messages = out["messages"]
+        assert [getattr(m, "tool_call_id", None) for m in messages] == [
+            "plan_call_0",
+            "plan_call_1",
+            None,
+            "plan_call_2",
+        ]
+        assert [c["id"] for c in messages[2].tool_calls] == ["plan_call_2"]
+
+        state.update(active_plan=plan)
+        done = await execute_dag_plan_node(state, {})
+        assert done["active_plan"]["status"] == "completed"
+
+    @pytest.mark.asyncio
+    async def test_missing_wave_result_fails_plan(self):
+        plan = self._wide_plan()
+        plan["issued"] = {"plan_call_0": "n1", "plan_call_1": "n2"}
+        plan["nodes"]["n1"]["status"] = "in_progress"
+        plan["nodes"]["n2"]["status"] = "in_progress"
+        state = {
+            "active_plan": plan,
+            "messages": [
+                AIMessage(content=""),
+                ToolMessage(content="one", tool_call_id="plan_call_0"),
+            ],
+            "pnd_candidates": self._CANDIDATES,
+        }
+        out = await execute_dag_plan_node(state, {})
+        assert out["active_plan"]["status"] == "failed"
+        assert "messages" not in out
+
+
 class TestToolCallForNode:
     def test_mcp_tool_naming_and_args(self):
         node = new_active_plan(_workflow([_node("n1")]), "q")["nodes"]["n1"]
@@ -0,0 +1,117 @@
+"""Unit tests for the shared, pooled Prisma client."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from superagent.persistence.db import (
+    DatabasePool,
+    DatabaseUnavailableError,
+    pooled_url,
+    use_db,
+)
+
+
+class _FakePrisma:
+    instances = 0
+
+    def __init__(self) -> None:
+        type(self).instances += 1
+        self.connected = False
+        self.fail_probe = False
+
+    def is_connected(self) -> bool:
+        return self.connected
+
+    async def connect(self) -> None:
+        self.connected = True
+
+    async def disconnect(self) -> None:
+        self.connected = False
+
+    async def query_raw(self, sql: str) -> list[dict]:
+        if self.fail_probe:
+            raise ConnectionError("server closed the connection")
+        return [{"?column?": 1}]
+
+
+@pytest.fixture
+def pool(monkeypatch) -> DatabasePool:
+    _FakePrisma.instances = 0
+    p = DatabasePool(pool_size=2, checkout_timeout_seconds=0.05)
+    monkeypatch.setattr(p, "_new_client", _FakePrisma)
+    return p
+
+
+def test_pooled_url_keeps_explicit_limits():
+    url = pooled_url(
+        "postgresql://u:p@db/orcha?connection_limit=3", pool_size=10, pool_timeout=5
+    )
+    assert "connection_limit=3" in url
+    assert "pool_timeout=5" in url
+
+
+@pytest.mark.asyncio
+async def test_sessions_share_one_connected_client(pool):
+    async with pool.session() as a, pool.session() as b:
+        assert a is b
+        assert pool.stats()["in_use"] == 2
+    assert _FakePrisma.instances == 1
+    assert pool.stats()["checkouts_total"] == 2
+    assert pool.stats()["in_use"] == 0
+
+
+@pytest.mark.asyncio
+async def test_checkout_times_out_when_pool_exhausted(pool):
+    async with pool.session(), pool.session():
+        with pytest.raises(DatabaseUnavailableError):
+            async with pool.session():
+                pass
+    assert pool.stats()["checkout_timeouts"] == 1
+    assert pool.stats()["waiting"] == 0
+
+
+@pytest.mark.asyncio
+async def test_waiters_get_slot_when_released(pool):
+    pool.checkout_timeout_seconds = 1.0
+    release = asyncio.Event()
+
+    async def hold() -> None:
+        async with pool.session():
+            await release.wait()
+
+    async def use() -> bool:
+        async with pool.session() as db:
+            return db.is_connected()
+
+    holders = [asyncio.create_task(hold()) for _ in range(2)]
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(use())
+    await asyncio.sleep(0)
+    assert pool.stats()["waiting"] == 1
+    release.set()
+    await asyncio.gather(*holders)
+    assert await waiter
+    assert pool.stats()["in_use"] == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_health_check_reconnects(pool):
+    pool.health_check_seconds = 0.0
+    async with pool.session() as first:
+        pass
+    first.fail_probe = True
+    async with pool.session() as second:
+        assert second is not first
+        assert second.is_connected()
+    assert pool.stats()["reconnects"] == 1
+    assert not first.is_connected()
+
+
+@pytest.mark.asyncio
+async def test_use_db_passes_through_injected_client(pool):
+    injected = object()
+    async with use_db(injected) as db:
+        assert db is injected
+    assert pool.stats()["checkouts_total"] == 0
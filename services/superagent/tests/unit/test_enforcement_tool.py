@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+from contextlib import asynccontextmanager
 from typing import Any
 
 import pytest
@@ -19,11 +20,13 @@ class _FakeTable:
     def __init__(self) -> None:
         self.rows: list[dict[str, Any]] = []
 
-    async def find_first(self, order: Any = None) -> Any:
-        return type("Row", (), self.rows[-1])() if self.rows else None
+    async def find_first(self, where: dict[str, Any], order: Any = None) -> Any:
+        chain = [r for r in self.rows if r["chain_id"] == where["chain_id"]]
+        return type("Row", (), chain[-1])() if chain else None
 
-    async def create(self, data: dict[str, Any]) -> None:
-        self.rows.append({k: getattr(v, "data", v) for k, v in data.items()})
+    async def create_many(self, data: list[dict[str, Any]]) -> int:
+        self.rows.extend({k: getattr(v, "data", v) for k, v in d.items()} for d in data)
+        return len(data)
 
 
 class _FakeDB:
@@ -33,6 +36,13 @@ class _FakeDB:
     def is_connected(self) -> bool:
         return True
 
+    @asynccontextmanager
+    async def tx(self):
+        yield self
+
+    async def execute_raw(self, sql: str, *args: Any) -> int:
+        return 1
+
 
 @pytest.fixture
 def ledger_db():
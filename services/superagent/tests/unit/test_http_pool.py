@@ -0,0 +1,75 @@
+"""Unit tests for the shared HTTP client registry."""
+
+from __future__ import annotations
+
+import asyncio
+
+import httpx
+import pytest
+from superagent.clients.http_pool import (
+    HTTPClientRegistry,
+    _MeteredTransport,
+    origin_of,
+    timeout_profile,
+)
+
+
+def test_origin_normalises_default_ports():
+    assert origin_of("https://Agent.example/a2a") == "https://agent.example:443"
+    assert origin_of("http://agent:9001/") == "http://agent:9001"
+
+
+def test_timeout_profile_from_manifest_transport():
+    t = timeout_profile({"timeout_seconds": 120, "timeouts": {"connect": 2}})
+    assert t.read == 120
+    assert t.write == 120
+    assert t.connect == 2
+
+
+def test_timeout_profile_ignores_bad_values():
+    t = timeout_profile({"timeouts": {"read": "soon", "connect": -1}}, default_read=60)
+    assert t.read == 60
+    assert t.connect > 0
+
+
+@pytest.mark.asyncio
+async def test_sessions_share_one_transport_per_origin():
+    registry = HTTPClientRegistry()
+    async with registry.session("http://a:1/x") as c1:
+        pass
+    async with registry.session("http://a:1/y", headers={"X": "1"}) as c2:
+        assert c2.headers["X"] == "1"
+    async with registry.session("http://b:1/") as c3:
+        pass
+    assert c1._transport is c2._transport
+    assert c1._transport is not c3._transport
+    assert set(registry.stats()["hosts"]) == {"http://a:1", "http://b:1"}
+    await registry.aclose()
+    assert registry.stats()["hosts"] == {}
+
+
+@pytest.mark.asyncio
+async def test_metered_transport_counts_requests():
+    registry = HTTPClientRegistry()
+
+    async def _body():
+        yield b'{"ok": true}'
+
+    # A streamed body (like a real socket) is only released when closed.
+    metered = _MeteredTransport(
+        httpx.MockTransport(lambda request: httpx.Response(200, content=_body()))
+    )
+    registry._transports["http://agent:80"] = metered
+    registry._loop = asyncio.get_running_loop()
+
+    async with registry.session("http://agent/") as client:
+        resp = await client.get("http://agent/ping")
+        assert resp.json() == {"ok": True}
+        async with client.stream("GET", "http://agent/stream") as streamed:
+            assert metered.in_flight == 1
+            await streamed.aread()
+
+    host = registry.stats()["hosts"]["http://agent:80"]
+    assert host["requests_total"] == 2
+    assert host["in_flight"] == 0
+    assert host["errors_total"] == 0
@@ -0,0 +1,195 @@
+"""Tests for the streaming, resumable offline ledger verifier."""
+
+from __future__ import annotations
+
+import json
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any
+
+import pytest
+from superagent.middleware import ledger_verify
+from superagent.middleware.audit_ledger import (
+    ENTRY_TYPE_STEP,
+    compute_checkpoint_root,
+    compute_content_hash,
+)
+from superagent.middleware.ledger_verify import (
+    VerifyState,
+    iter_export_pages,
+    load_checkpoints,
+    verify_pages,
+)
+
+
+def _chain(chain_id: str, n: int) -> list[dict[str, Any]]:
+    rows: list[dict[str, Any]] = []
+    prev = ""
+    for seq in range(1, n + 1):
+        row = {
+            "entry_type": ENTRY_TYPE_STEP,
+            "call_id": f"{chain_id}-{seq}",
+            "session_id": chain_id,
+            "completed_at": "2026-10-01T00:00:00+00:00",
+            "chain_id": chain_id,
+            "chain_seq": seq,
+            "prev_hash": prev,
+        }
+        row["content_hash"] = compute_content_hash(row)
+        prev = row["content_hash"]
+        rows.append(row)
+    return rows
+
+
+def _export(path: Path, rows: list[dict[str, Any]]) -> Path:
+    path.write_text("".join(json.dumps(r) + "\n" for r in rows))
+    return path
+
+
+@pytest.fixture
+def ledger(tmp_path) -> Path:
+    rows = _chain("sess-a", 7) + _chain("sess-b", 4) + _chain("sess-c", 5)
+    rows[9]["success"] = True  # sess-b seq 3 rewritten after the fact
+    del rows[13]  # sess-c seq 3 deleted
+    return _export(tmp_path / "ledger.jsonl", rows)
+
+
+@pytest.mark.asyncio
+async def test_reports_first_break_per_chain(ledger):
+    state = await verify_pages(iter_export_pages(ledger, page_size=3))
+
+    assert state.complete
+    assert state.rows == 15
+    assert state.chains == 3
+    assert state.broken == {
+        "sess-b": {"chain_seq": 3, "reason": "content_hash mismatch"},
+        "sess-c": {"chain_seq": 4, "reason": "chain_seq gap: expected 3, got 4"},
+    }
+    assert state.summary()["ok"] is False
+
+
+@pytest.mark.asyncio
+async def test_clean_ledger_verifies_across_page_boundaries(tmp_path):
+    path = _export(tmp_path / "ok.jsonl", _chain("a", 5) + _chain("b", 5))
+    for page_size in (1, 2, 4, 100):
+        state = await verify_pages(iter_export_pages(path, page_size=page_size))
+        assert state.summary()["ok"] is True
+        assert state.rows == 10
+
+
+@pytest.mark.asyncio
+async def test_process_pool_matches_inline(ledger):
+    inline = await verify_pages(iter_export_pages(ledger, page_size=2))
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        pooled = await verify_pages(
+            iter_export_pages(ledger, page_size=2), executor=pool, max_in_flight=3
+        )
+    assert pooled.summary() == inline.summary()
+
+
+@pytest.mark.asyncio
+async def test_interrupted_run_resumes_from_state_file(ledger, tmp_path, monkeypatch):
+    state_path = tmp_path / "state.json"
+
+    async def first_pages():
+        pages = iter_export_pages(ledger, page_size=4)
+        for _ in range(2):
+            yield await anext(pages)
+
+    partial = await verify_pages(first_pages(), state_path=state_path)
+    partial.complete = False
+    partial.save(state_path)
+    resumed = VerifyState.load(state_path)
+    assert resumed.cursor == ("sess-b", 1)
+
+    hashed: list[str] = []
+    real = ledger_verify.verify_segment
+
+    def counting(segment):
+        hashed.extend(r["call_id"] for r in segment.rows)
+        return real(segment)
+
+    monkeypatch.setattr(ledger_verify, "verify_segment", counting)
+    final = await verify_pages(
+        iter_export_pages(ledger, after=resumed.cursor, page_size=4),
+        state=resumed,
+        state_path=state_path,
+    )
+
+    assert "sess-a-7" not in hashed
+    assert final.rows == 15
+    assert set(final.broken) == {"sess-b", "sess-c"}
+    assert VerifyState.load(state_path).complete is True
+
+
+def _checkpoints(*tip_sets: dict[str, list[Any]]) -> list[dict[str, Any]]:
+    checkpoints, prev_root = [], ""
+    for tips in tip_sets:
+        root = compute_checkpoint_root(prev_root, tips)
+        checkpoints.append({"merkle_root": root, "prev_root": prev_root, "tips": tips})
+        prev_root = root
+    return checkpoints
+
+
+async def _pages(*pages: list[dict[str, Any]]):
+    for page in pages:
+        yield page
+
+
+@pytest.mark.asyncio
+async def test_chain_rewritten_after_checkpoint_is_reported(tmp_path):
+    original = _chain("sess-a", 5) + _chain("sess-b", 3)
+    checkpoints = _checkpoints(
+        {"sess-a": [3, original[2]["content_hash"]]},
+        {
+            "sess-a": [5, original[4]["content_hash"]],
+            "sess-b": [3, original[7]["content_hash"]],
+        },
+    )
+    # Rewrite sess-a wholesale: every link and hash is self-consistent again.
+    rewritten = _chain("sess-a", 5)
+    for row in rewritten:
+        row["success"] = False
+    prev = ""
+    for row in rewritten:
+        row["prev_hash"] = prev
+        row["content_hash"] = prev = compute_content_hash(row)
+    ledger = _export(tmp_path / "ledger.jsonl", rewritten + original[5:7])
+
+    state = VerifyState()
+    tips = await load_checkpoints(_pages(checkpoints[:1], checkpoints[1:]), state)
+    state = await verify_pages(
+        iter_export_pages(ledger, page_size=2), state=state, tips=tips
+    )
+
+    assert state.broken == {}
+    assert state.checkpoints == 2
+    assert state.checkpoints_linked
+    assert set(state.tip_mismatches) == {"sess-a:3", "sess-a:5", "sess-b:3"}
+    assert state.tip_mismatches["sess-b:3"]["reason"] == "checkpointed row missing"
+    summary = state.summary()
+    assert summary["ok"] is False
+    assert summary["tip_mismatches"]["sess-a:3"] == {
+        "chain_id": "sess-a",
+        "chain_seq": 3,
+        "reason": "content_hash differs from checkpoint",
+    }
+
+
+@pytest.mark.asyncio
+async def test_broken_checkpoint_linkage_fails_the_run(tmp_path):
+    rows = _chain("sess-a", 2)
+    checkpoints = _checkpoints(
+        {"sess-a": [1, rows[0]["content_hash"]]},
+        {"sess-a": [2, rows[1]["content_hash"]]},
+    )
+    checkpoints[1]["prev_root"] = "sha256:forged"
+    ledger = _export(tmp_path / "ledger.jsonl", rows)
+
+    state = VerifyState()
+    tips = await load_checkpoints(_pages(checkpoints), state)
+    state = await verify_pages(iter_export_pages(ledger), state=state, tips=tips)
+
+    assert state.tip_mismatches == {}
+    assert state.checkpoints_linked is False
+    assert state.summary()["ok"] is False
@@ -2,10 +2,11 @@
 
 from __future__ import annotations
 
+import asyncio
 from unittest.mock import AsyncMock, patch
 
 import pytest
-from superagent.middleware.manifest_cache import ManifestCache
+from superagent.middleware.manifest_cache import ManifestCache, ManifestFetchError
 
 
 @pytest.fixture
@@ -49,19 +50,164 @@ async def test_invalidate_clears_cache(cache):
 
 @pytest.mark.asyncio
 async def test_fetch_failure_returns_empty_manifest(cache):
-    with patch.object(
-        cache,
-        "_fetch",
-        new_callable=AsyncMock,
-        side_effect=Exception("Registry down"),
-    ):
-        # ManifestCache.get_manifest calls _fetch; if it raises, the cache records it
-        # In our implementation _fetch handles exceptions internally
-        pass  # _fetch is protected — test the fallback path via get_manifest with httpx mock
-
     with patch("httpx.AsyncClient") as MockClient:
-        instance = MockClient.return_value.__aenter__.return_value
-        instance.get.side_effect = Exception("connection refused")
-        result = await cache._fetch("missing-agent")
+        MockClient.return_value.get = AsyncMock(
+            side_effect=Exception("connection refused")
+        )
+        with pytest.raises(ManifestFetchError):
+            await cache._fetch("missing-agent")
+        result = await cache.get_manifest("missing-agent")
     assert result.get("agent_id") == "missing-agent"
     assert result.get("capabilities") == []
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_fetch(cache):
+    started = asyncio.Event()
+    release = asyncio.Event()
+
+    async def slow_fetch(agent_id: str) -> dict:
+        started.set()
+        await release.wait()
+        return {"agent_id": agent_id}
+
+    with patch.object(cache, "_fetch", side_effect=slow_fetch) as mock_fetch:
+        calls = [asyncio.create_task(cache.get_manifest("a")) for _ in range(5)]
+        await started.wait()
+        release.set()
+        results = await asyncio.gather(*calls)
+    assert mock_fetch.call_count == 1
+    assert all(r == {"agent_id": "a"} for r in results)
+
+
+@pytest.mark.asyncio
+async def test_lru_bound_evicts_least_recently_used():
+    cache = ManifestCache(max_entries=2)
+    with patch.object(
+        cache, "_fetch", side_effect=lambda a: {"agent_id": a}
+    ) as mock_fetch:
+        await cache.get_manifest("a")
+        await cache.get_manifest("b")
+        await cache.get_manifest("a")  # a is now most recent
+        await cache.get_manifest("c")  # evicts b
+        await cache.get_manifest("a")
+        assert mock_fetch.call_count == 3
+        await cache.get_manifest("b")
+        assert mock_fetch.call_count == 4
+    assert cache.stats()["entries"] == 2
+
+
+@pytest.mark.asyncio
+async def test_stale_entry_served_while_refreshing():
+    cache = ManifestCache(ttl_seconds=0.01, stale_seconds=60)
+    with patch.object(cache, "_fetch", side_effect=[{"v": 1}, {"v": 2}]):
+        assert await cache.get_manifest("a") == {"v": 1}
+        await asyncio.sleep(0.02)
+        assert await cache.get_manifest("a") == {"v": 1}  # stale, refresh queued
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        assert await cache.get_manifest("a") == {"v": 2}
+    assert cache.stats()["stale_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_refresh_keeps_stale_entry():
+    cache = ManifestCache(ttl_seconds=0.01, stale_seconds=60)
+    with patch.object(cache, "_fetch", return_value={"v": 1}):
+        await cache.get_manifest("a")
+    await asyncio.sleep(0.02)
+    with patch.object(cache, "_fetch", side_effect=ManifestFetchError("down")):
+        assert await cache.get_manifest("a") == {"v": 1}
+        await asyncio.sleep(0)
+        assert await cache.get_manifest("a") == {"v": 1}
+
+
+@pytest.mark.asyncio
+async def test_negative_cache_is_short_and_separate():
+    cache = ManifestCache(negative_ttl_seconds=0.05)
+    with patch.object(
+        cache, "_fetch", side_effect=ManifestFetchError("down")
+    ) as mock_fetch:
+        await cache.get_manifest("a")
+        await cache.get_manifest("a")
+        assert mock_fetch.call_count == 1
+    assert cache.stats()["entries"] == 0
+    assert cache.stats()["negative"] == 1
+    await asyncio.sleep(0.06)
+    with patch.object(cache, "_fetch", return_value={"v": 1}):
+        assert await cache.get_manifest("a") == {"v": 1}
+
+
+@pytest.mark.asyncio
+async def test_registration_event_invalidates_entry(cache):
+    pytest.importorskip("common.kafka.src")
+    from superagent.middleware.manifest_events import ManifestInvalidationConsumer
+
+    consumer = ManifestInvalidationConsumer("kafka:9092", cache=cache)
+    with patch.object(
+        cache, "_fetch", side_effect=lambda a: {"agent_id": a}
+    ) as mock_fetch:
+        await cache.get_manifest("agent-9")
+        await consumer.handle_message({"agent_id": "agent-9", "manifest": {}})
+        await cache.get_manifest("agent-9")
+    assert mock_fetch.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_prefetch_warms_cache_with_one_bulk_call():
+    cache = ManifestCache()
+    cache.seed("pinned", {"agent_id": "pinned"})
+    bulk = AsyncMock(return_value=({"a": {"agent_id": "a"}}, {"gone"}))
+    with (
+        patch.object(cache, "_fetch_many", bulk),
+        patch.object(cache, "_fetch", new_callable=AsyncMock) as single,
+    ):
+        assert await cache.prefetch(["a", "gone", "pinned", "a"]) == 1
+        assert await cache.get_manifest("a") == {"agent_id": "a"}
+        assert (await cache.get_manifest("gone"))["capabilities"] == []
+    bulk.assert_awaited_once_with(["a", "gone"])
+    single.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_get_manifest_waits_on_inflight_prefetch():
+    cache = ManifestCache()
+    release = asyncio.Event()
+
+    async def slow_bulk(agent_ids):
+        await release.wait()
+        return {"a": {"agent_id": "a"}}, set()
+
+    with (
+        patch.object(cache, "_fetch_many", side_effect=slow_bulk),
+        patch.object(cache, "_fetch", new_callable=AsyncMock) as single,
+    ):
+        cache.prefetch_in_background(["a"])
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(cache.get_manifest("a"))
+        await asyncio.sleep(0)
+        release.set()
+        assert await waiter == {"agent_id": "a"}
+    single.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_failed_prefetch_falls_back_to_single_fetch():
+    cache = ManifestCache()
+    release = asyncio.Event()
+
+    async def failing_bulk(agent_ids):
+        await release.wait()
+        raise ManifestFetchError("404 Not Found")
+
+    with (
+        patch.object(cache, "_fetch_many", side_effect=failing_bulk),
+        patch.object(cache, "_fetch", return_value={"agent_id": "a"}) as single,
+    ):
+        cache.prefetch_in_background(["a"])
+        await asyncio.sleep(0)
+        waiters = [asyncio.create_task(cache.get_manifest("a")) for _ in range(3)]
+        await asyncio.sleep(0)
+        release.set()
+        assert await asyncio.gather(*waiters) == [{"agent_id": "a"}] * 3
+    assert single.await_count == 1
@@ -0,0 +1,175 @@
+"""Unit tests for MCPSessionPool."""
+
+from __future__ import annotations
+
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Any
+from unittest.mock import AsyncMock
+
+import pytest
+from superagent.handlers.mcp_session_pool import MCPSessionPool, session_key
+
+
+class _FakeServer:
+    """Counts handshakes/teardowns; call_tool behaviour is scriptable."""
+
+    def __init__(self) -> None:
+        self.opened = 0
+        self.closed = 0
+        self.sessions: list[AsyncMock] = []
+
+    def opener(self):
+        @asynccontextmanager
+        async def _open():
+            self.opened += 1
+            session = AsyncMock()
+            session.call_tool = AsyncMock(return_value=f"result-{self.opened}")
+            self.sessions.append(session)
+            try:
+                yield session
+            finally:
+                self.closed += 1
+
+        return _open
+
+
+@pytest.fixture
+async def pool():
+    p = MCPSessionPool(
+        max_sessions_per_agent=2, idle_ttl_seconds=300, health_check_seconds=300
+    )
+    yield p
+    await p.close()
+
+
+@pytest.mark.asyncio
+async def test_session_reused_across_calls(pool):
+    server = _FakeServer()
+    for _ in range(3):
+        result = await pool.call_tool("k1", "agent-1", server.opener(), "cap", {})
+        assert result == "result-1"
+    assert server.opened == 1
+    assert server.sessions[0].call_tool.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_concurrent_first_calls_share_one_handshake(pool):
+    server = _FakeServer()
+    await asyncio.gather(
+        *(pool.call_tool("k1", "agent-1", server.opener(), "cap", {}) for _ in range(5))
+    )
+    assert server.opened == 1
+
+
+@pytest.mark.asyncio
+async def test_broken_pipe_reinitializes_and_retries(pool):
+    server = _FakeServer()
+    await pool.call_tool("k1", "agent-1", server.opener(), "cap", {})
+    server.sessions[0].call_tool.side_effect = BrokenPipeError()
+
+    result = await pool.call_tool("k1", "agent-1", server.opener(), "cap", {})
+
+    assert result == "result-2"
+    assert server.opened == 2
+    assert server.closed == 1
+
+
+@pytest.mark.asyncio
+async def test_tool_errors_are_not_retried(pool):
+    server = _FakeServer()
+    await pool.call_tool("k1", "agent-1", server.opener(), "cap", {})
+    server.sessions[0].call_tool.side_effect = ValueError("bad args")
+    with pytest.raises(ValueError):
+        await pool.call_tool("k1", "agent-1", server.opener(), "cap", {})
+    assert server.opened == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_health_check_replaces_session(pool):
+    pool.health_check_seconds = 0
+    server = _FakeServer()
+    await pool.call_tool("k1", "agent-1", server.opener(), "cap", {})
+    server.sessions[0].send_ping.side_effect = ConnectionError()
+
+    await pool.call_tool("k1", "agent-1", server.opener(), "cap", {})
+
+    assert server.opened == 2
+
+
+@pytest.mark.asyncio
+async def test_max_sessions_per_agent_evicts_lru_idle(pool):
+    server = _FakeServer()
+    for key in ("k1", "k2", "k3"):
+        await pool.call_tool(key, "agent-1", server.opener(), "cap", {})
+    await asyncio.sleep(0)
+    stats = pool.stats()
+    assert stats["per_agent"] == {"agent-1": 2}
+    assert server.opened == 3
+
+
+@pytest.mark.asyncio
+async def test_close_tears_down_sessions(pool):
+    server = _FakeServer()
+    await pool.call_tool("k1", "agent-1", server.opener(), "cap", {})
+    await pool.close()
+    assert server.closed == 1
+    assert pool.stats()["sessions"] == 0
+
+
+class _HangingServer:
+    """Accepts the transport but never finishes the handshake."""
+
+    def __init__(self) -> None:
+        self.entered = asyncio.Event()
+        self.closed = 0
+
+    def opener(self):
+        @asynccontextmanager
+        async def _open():
+            self.entered.set()
+            try:
+                await asyncio.Event().wait()
+                yield AsyncMock()
+            finally:
+                self.closed += 1
+
+        return _open
+
+
+@pytest.mark.asyncio
+async def test_handshake_timeout_tears_down_transport():
+    pool = MCPSessionPool(connect_timeout_seconds=0.05)
+    server = _HangingServer()
+
+    with pytest.raises(TimeoutError):
+        await pool.call_tool("k1", "agent-1", server.opener(), "cap", {})
+
+    assert server.closed == 1
+    assert pool.stats()["sessions"] == 0
+    await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_orphan_the_owner(pool):
+    server = _HangingServer()
+    call = asyncio.create_task(
+        pool.call_tool("k1", "agent-1", server.opener(), "cap", {})
+    )
+    await server.entered.wait()
+
+    call.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await call
+
+    assert server.closed == 1
+    assert not [t for t in asyncio.all_tasks() if t.get_name() == "mcp-session:agent-1"]
+
+
+def test_session_key_splits_on_credentials():
+    transport: dict[str, Any] = {"type": "STDIO", "command": "npx", "args": ["x"]}
+    a = session_key("agent-1", {**transport, "resolved_env": {"TOKEN": "s3cr3t"}}, {})
+    b = session_key("agent-1", {**transport, "resolved_env": {"TOKEN": "other"}}, {})
+    assert a != b
+    assert "s3cr3t" not in a
+    assert a.startswith("agent-1|STDIO|")
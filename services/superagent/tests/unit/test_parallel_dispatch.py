@@ -0,0 +1,224 @@
+"""Tests for concurrent tool-call dispatch in execute_agent_calls_node."""
+
+from __future__ import annotations
+
+import asyncio
+from decimal import Decimal
+from typing import Any
+
+import pytest
+from langchain_core.messages import AIMessage
+from langgraph.errors import GraphInterrupt
+from superagent.config import settings
+from superagent.middleware.pipeline import PreparedCall
+from superagent.nodes.execute_agent_calls import execute_agent_calls_node
+from superagent.pricing.guard import PaymentInterrupt
+from superagent.system_tools.registry import (
+    SYSTEM_TOOL_REGISTRY,
+    register_all_system_tools,
+)
+
+AGENTS = [f"did:orcha:agent:worker-{i}" for i in range(4)]
+
+
+def _candidate(agent_id: str) -> dict[str, Any]:
+    return {
+        "agent_id": agent_id,
+        "agent_name": agent_id.rsplit(":", 1)[-1],
+        "protocol_type": "MCP",
+        "capabilities": [
+            {
+                "capability_id": "run",
+                "capability_type": "TOOL",
+                "description": "cap",
+                "input_schema": {"type": "object", "properties": {}},
+            }
+        ],
+    }
+
+
+def _tool_name(agent_id: str) -> str:
+    safe_id = "".join(ch if ch.isalnum() or ch in "_-" else "_" for ch in agent_id)
+    return f"{safe_id}__run"
+
+
+def _state(tool_names: list[str]) -> dict[str, Any]:
+    return {
+        "session_id": "sess-par",
+        "user_id": "user-1",
+        "messages": [
+            AIMessage(
+                content="",
+                tool_calls=[
+                    {"name": n, "args": {}, "id": f"call_{i}", "type": "tool_call"}
+                    for i, n in enumerate(tool_names)
+                ],
+            )
+        ],
+        "pnd_candidates": [_candidate(a) for a in AGENTS],
+    }
+
+
+class _Tracker:
+    """Fake ExecutionMiddleware.execute recording concurrency + completion order."""
+
+    def __init__(self, delays: dict[str, float]) -> None:
+        self.delays = delays
+        self.in_flight = 0
+        self.peak = 0
+        self.completed: list[str] = []
+        self.prepared: list[str] = []
+        self.interrupting: set[str] = set()
+
+    async def prepare(self, _mw: Any, **kwargs: Any) -> PreparedCall:
+        agent_id = kwargs["agent_id"]
+        self.prepared.append(agent_id)
+        if agent_id in self.interrupting:
+            raise PaymentInterrupt("insufficient_credits", Decimal("0"))
+        return PreparedCall(args=kwargs["args"])
+
+    async def execute(self, _mw: Any, **kwargs: Any) -> dict[str, Any]:
+        agent_id = kwargs["agent_id"]
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(self.delays.get(agent_id, 0.01))
+        finally:
+            self.in_flight -= 1
+        self.completed.append(agent_id)
+        return {"content": f"done {agent_id}", "base_fee": "0"}
+
+
+@pytest.fixture
+def tracker(monkeypatch):
+    # Later calls finish first, so ordering bugs would surface.
+    t = _Tracker({a: 0.05 - i * 0.01 for i, a in enumerate(AGENTS)})
+
+    async def fake_execute(self, **kwargs: Any) -> dict[str, Any]:
+        return await t.execute(self, **kwargs)
+
+    async def fake_prepare(self, **kwargs: Any) -> PreparedCall:
+        return await t.prepare(self, **kwargs)
+
+    monkeypatch.setattr(
+        "superagent.middleware.pipeline.ExecutionMiddleware.execute", fake_execute
+    )
+    monkeypatch.setattr(
+        "superagent.middleware.pipeline.ExecutionMiddleware.prepare", fake_prepare
+    )
+    return t
+
+
+@pytest.fixture
+def parallel_on(monkeypatch):
+    monkeypatch.setattr(settings, "parallel_tool_calls_enabled", True)
+    monkeypatch.setattr(settings, "max_parallel_tool_calls", 4)
+    return settings
+
+
+class TestParallelDispatch:
+    @pytest.mark.asyncio
+    async def test_default_mode_is_sequential(self, tracker):
+        updates = await execute_agent_calls_node(
+            _state([_tool_name(a) for a in AGENTS[:3]]), {}
+        )
+        assert tracker.peak == 1
+        assert [m.tool_call_id for m in updates["messages"]] == [
+            "call_0",
+            "call_1",
+            "call_2",
+        ]
+
+    @pytest.mark.asyncio
+    async def test_external_calls_fan_out_and_keep_order(self, tracker, parallel_on):
+        updates = await execute_agent_calls_node(
+            _state([_tool_name(a) for a in AGENTS[:3]]), {}
+        )
+        assert tracker.peak == 3
+        # Completion order is reversed, message order is not.
+        assert tracker.completed == list(reversed(AGENTS[:3]))
+        assert [m.content for m in updates["messages"]] == [
+            f"done {a}" for a in AGENTS[:3]
+        ]
+        assert set(updates["agent_call_result_store"]) == {
+            "call_0",
+            "call_1",
+            "call_2",
+        }
+
+    @pytest.mark.asyncio
+    async def test_concurrency_limit_respected(self, tracker, parallel_on, monkeypatch):
+        monkeypatch.setattr(settings, "max_parallel_tool_calls", 2)
+        updates = await execute_agent_calls_node(
+            _state([_tool_name(a) for a in AGENTS]), {}
+        )
+        assert tracker.peak == 2
+        assert len(updates["messages"]) == 4
+
+    @pytest.mark.asyncio
+    async def test_system_tool_is_a_barrier(self, tracker, parallel_on, monkeypatch):
+        register_all_system_tools()
+        seen_completed: list[list[str]] = []
+
+        async def handler(args: dict[str, Any], state: dict[str, Any]) -> str:
+            seen_completed.append(list(tracker.completed))
+            return "now"
+
+        monkeypatch.setattr(
+            SYSTEM_TOOL_REGISTRY._tools["get_datetime"], "handler", handler
+        )
+        updates = await execute_agent_calls_node(
+            _state(
+                [
+                    _tool_name(AGENTS[0]),
+                    _tool_name(AGENTS[1]),
+                    "get_datetime",
+                    _tool_name(AGENTS[2]),
+                ]
+            ),
+            {},
+        )
+        # Both earlier external calls landed before the system tool ran.
+        assert sorted(seen_completed[0]) == sorted(AGENTS[:2])
+        assert [m.tool_call_id for m in updates["messages"]] == [
+            "call_0",
+            "call_1",
+            "call_2",
+            "call_3",
+        ]
+        assert updates["messages"][2].content == "now"
+
+    @pytest.mark.asyncio
+    async def test_interrupt_suspends_before_any_sibling_dispatch(
+        self, tracker, parallel_on, monkeypatch
+    ):
+        # A resumed interrupt re-runs the whole node, so a sibling dispatched
+        # before it would be invoked (and charged) twice.
+        tracker.interrupting = {AGENTS[2]}
+
+        def fake_interrupt(value: Any) -> Any:
+            raise GraphInterrupt(value)
+
+        monkeypatch.setattr(
+            "superagent.nodes.execute_agent_calls.interrupt", fake_interrupt
+        )
+        with pytest.raises(GraphInterrupt):
+            await execute_agent_calls_node(
+                _state([_tool_name(a) for a in AGENTS[:3]]), {}
+            )
+        assert sorted(tracker.prepared) == sorted(AGENTS[:3])
+        assert tracker.completed == []
+
+    @pytest.mark.asyncio
+    async def test_resumed_payment_denial_skips_only_that_call(
+        self, tracker, parallel_on, monkeypatch
+    ):
+        tracker.interrupting = {AGENTS[1]}
+        monkeypatch.setattr(
+            "superagent.nodes.execute_agent_calls.interrupt", lambda value: None
+        )
+        updates = await execute_agent_calls_node(
+            _state([_tool_name(a) for a in AGENTS[:3]]), {}
+        )
+        assert sorted(tracker.completed) == sorted([AGENTS[0], AGENTS[2]])
+        assert updates["messages"][1].content.startswith("Error: Insufficient credits")
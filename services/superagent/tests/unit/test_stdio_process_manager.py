@@ -0,0 +1,188 @@
+"""Unit tests for StdioProcessManager."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import sys
+from contextlib import asynccontextmanager
+from pathlib import Path
+from unittest.mock import AsyncMock
+
+import pytest
+from superagent.handlers import stdio_process_manager as spm
+from superagent.handlers.mcp_session_pool import MCPSessionPool
+from superagent.handlers.stdio_process_manager import (
+    PROCESS_TAG_ENV,
+    StdioProcessManager,
+    find_tagged_child,
+    process_alive,
+    process_tree_usage,
+)
+
+_HAS_PROC = Path("/proc").is_dir()
+
+
+class _FakeServer:
+    """Env-aware opener; records the env each 'process' was spawned with."""
+
+    def __init__(self) -> None:
+        self.envs: list[dict[str, str]] = []
+        self.closed = 0
+
+    @asynccontextmanager
+    async def open(self, env: dict[str, str]):
+        self.envs.append(env)
+        session = AsyncMock()
+        session.call_tool = AsyncMock(return_value=f"result-{len(self.envs)}")
+        try:
+            yield session
+        finally:
+            self.closed += 1
+
+
+@pytest.fixture
+async def manager(monkeypatch):
+    pids = iter(range(1000, 2000))
+    monkeypatch.setattr(spm, "find_tagged_child", lambda tag: next(pids))
+    monkeypatch.setattr(spm, "_PROC", Path("/"))  # "is_dir" → pid lookup runs
+    monkeypatch.setattr(spm, "_RESTART_BACKOFF_BASE", 0.0)
+    pool = MCPSessionPool(
+        max_sessions_per_agent=8, idle_ttl_seconds=300, health_check_seconds=300
+    )
+    m = StdioProcessManager(
+        pool, max_processes=2, max_restarts=2, supervise_interval_seconds=300
+    )
+    yield m
+    await m.close()
+    await pool.close()
+
+
+async def _call(m: StdioProcessManager, server: _FakeServer, key: str) -> str:
+    return await m.call_tool(
+        key, f"agent-{key}", {"HOME": "/h"}, server.open, "cap", {}
+    )
+
+
+@pytest.mark.asyncio
+async def test_server_stays_warm_and_is_tagged(manager):
+    server = _FakeServer()
+    assert await _call(manager, server, "k1") == "result-1"
+    assert await _call(manager, server, "k1") == "result-1"
+    assert len(server.envs) == 1
+    assert server.envs[0]["HOME"] == "/h"
+    assert server.envs[0][PROCESS_TAG_ENV]
+    assert [c["pid"] for c in manager.stats()] == [1000]
+
+
+@pytest.mark.asyncio
+async def test_global_cap_evicts_lru_idle_server(manager):
+    server = _FakeServer()
+    for key in ("k1", "k2", "k1", "k3"):
+        await _call(manager, server, key)
+    agents = sorted(c["agent_id"] for c in manager.stats())
+    assert agents == ["agent-k1", "agent-k3"]
+    assert server.closed == 1
+
+
+@pytest.mark.asyncio
+async def test_crashed_child_is_restarted(manager, monkeypatch):
+    server = _FakeServer()
+    await _call(manager, server, "k1")
+    monkeypatch.setattr(spm, "process_alive", lambda pid: pid != 1000)
+
+    await manager.check_children()
+
+    assert len(server.envs) == 2
+    assert server.envs[0][PROCESS_TAG_ENV] != server.envs[1][PROCESS_TAG_ENV]
+    [child] = manager.stats()
+    assert child["pid"] == 1001
+    assert child["restarts"] == 1
+    # The restarted server is the warm one the next call uses.
+    assert await _call(manager, server, "k1") == "result-2"
+
+
+@pytest.mark.asyncio
+async def test_restart_budget_is_bounded(manager, monkeypatch):
+    server = _FakeServer()
+    await _call(manager, server, "k1")
+    monkeypatch.setattr(spm, "process_alive", lambda pid: False)
+
+    for _ in range(4):
+        await manager.check_children()
+
+    # Initial spawn + max_restarts restarts, then the key is left cold.
+    assert len(server.envs) == 3
+    assert manager.stats() == []
+
+
+@pytest.mark.asyncio
+async def test_concurrent_cold_starts_never_exceed_cap(manager):
+    resident = 0
+    peak = 0
+
+    @asynccontextmanager
+    async def slow_open(env: dict[str, str]):
+        nonlocal resident, peak
+        tagged = PROCESS_TAG_ENV in env
+        if tagged:
+            resident += 1
+            peak = max(peak, resident)
+        await asyncio.sleep(0.01)
+        session = AsyncMock()
+        session.call_tool = AsyncMock(return_value="ok")
+        try:
+            yield session
+        finally:
+            if tagged:
+                resident -= 1
+
+    results = await asyncio.gather(
+        *(
+            manager.call_tool(f"k{i}", f"agent-k{i}", {}, slow_open, "cap", {})
+            for i in range(5)
+        )
+    )
+
+    assert results == ["ok"] * 5
+    assert peak <= manager.max_processes
+    assert len(manager.stats()) == manager.max_processes
+
+
+@pytest.mark.asyncio
+async def test_dead_children_restart_concurrently(manager, monkeypatch):
+    server = _FakeServer()
+    await _call(manager, server, "k1")
+    await _call(manager, server, "k2")
+    monkeypatch.setattr(spm, "process_alive", lambda pid: False)
+    both_started = asyncio.Barrier(2)
+
+    async def restart(child):
+        await both_started.wait()
+
+    monkeypatch.setattr(manager, "_restart", restart)
+    await asyncio.wait_for(manager.check_children(), timeout=1)
+
+
+@pytest.mark.skipif(not _HAS_PROC, reason="needs /proc")
+@pytest.mark.asyncio
+async def test_tagged_child_usage_from_proc():
+    tag = "test-tag-123"
+    proc = await asyncio.create_subprocess_exec(
+        sys.executable,
+        "-c",
+        "import time; time.sleep(30)",
+        env={**os.environ, PROCESS_TAG_ENV: tag},
+    )
+    try:
+        assert find_tagged_child(tag) == proc.pid
+        assert process_alive(proc.pid)
+        usage = process_tree_usage(proc.pid)
+        assert usage is not None
+        rss, cpu_seconds = usage
+        assert rss > 0
+        assert cpu_seconds >= 0
+    finally:
+        proc.kill()
+        await proc.wait()
+    assert not process_alive(proc.pid)
@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+import dataclasses
+
 import pytest
 from superagent.middleware.observers import StepResult
 from superagent.middleware.step_events import fan_out_step_complete, step_result_payload
@@ -33,3 +35,72 @@ async def test_fan_out_skips_when_kafka_disabled(
 ) -> None:
     monkeypatch.setenv("KAFKA_ENABLED", "false")
     await fan_out_step_complete(_record())
+
+
+class _FakeAIOKafkaProducer:
+    def __init__(self, **kwargs) -> None:
+        self.kwargs = kwargs
+        self.sent: list[tuple[str, dict, bytes | None]] = []
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+    async def flush(self) -> None:
+        pass
+
+    async def send(self, topic, value, key=None):
+        import asyncio
+
+        self.sent.append((topic, value, key))
+        future = asyncio.get_running_loop().create_future()
+        future.set_result(None)
+        return future
+
+
+@pytest.fixture
+def kafka_on(monkeypatch: pytest.MonkeyPatch):
+    kafka_producer = pytest.importorskip("common.kafka.src.producer")
+    from superagent.config import settings
+
+    monkeypatch.setattr(kafka_producer, "AIOKafkaProducer", _FakeAIOKafkaProducer)
+    monkeypatch.setattr(settings, "kafka_enabled", True)
+    monkeypatch.setattr(settings, "kafka_bootstrap_servers", "kafka:9092")
+
+
+@pytest.mark.asyncio
+async def test_shared_producer_batches_and_keys_by_session(kafka_on) -> None:
+    from superagent.middleware.step_events import StepEventPublisher
+
+    publisher = StepEventPublisher()
+    await publisher.start()
+    client = publisher._producer._producer
+    assert client.kwargs["enable_idempotence"] is True
+    assert client.kwargs["linger_ms"] > 0
+
+    record = dataclasses.replace(_record(), session_id="sess-1")
+    for _ in range(3):
+        assert publisher.publish(record)
+    await publisher._producer.flush()
+
+    assert [key for _, _, key in client.sent] == [b"sess-1"] * 3
+    assert publisher.stats()["sent"] == 3
+    await publisher.close()
+    assert not publisher.started
+
+
+@pytest.mark.asyncio
+async def test_full_outbox_drops_and_counts(kafka_on, monkeypatch) -> None:
+    from superagent.config import settings
+    from superagent.middleware.step_events import StepEventPublisher
+
+    monkeypatch.setattr(settings, "step_events_outbox_size", 2)
+    publisher = StepEventPublisher()
+    await publisher.start()
+    # No await between publishes: the drain task cannot run, so the outbox fills.
+    results = [publisher.publish(_record()) for _ in range(4)]
+    assert results == [True, True, False, False]
+    assert publisher.stats()["dropped"] == 2
+    await publisher.close()
@@ -5,6 +5,7 @@ from __future__ import annotations
 from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
 from src.generated_client import enums
 from superagent.persistence.transcript_store import (
+    SYNTHETIC_MESSAGE_KEY,
     TRANSCRIPT_TOOL_META_KEY,
     coerce_checkpoint_messages,
     coerce_checkpoint_messages_for_persist,
@@ -88,3 +89,46 @@ def test_tool_row_persists_display_name_and_transcript_meta():
     assert rows[0]["tool_name"] == "Notion MCP"
     assert rows[0]["tool_inputs"]["agent_id"] == "did:orcha:agent:notion-mcp"
     assert rows[0]["tool_inputs"]["invocation_args"] == {"title": "x"}
+
+
+def test_synthetic_late_calls_fold_into_the_issuing_assistant_row():
+    issued = {"name": "fetch", "args": {}, "id": "call-1"}
+    late = {"name": "summarise", "args": {"n": 1}, "id": "call-2"}
+    synthetic = {
+        "type": "ai",
+        "data": {
+            "content": "",
+            "tool_calls": [late],
+            "additional_kwargs": {SYNTHETIC_MESSAGE_KEY: True},
+        },
+    }
+    tail = coerce_checkpoint_messages_for_persist(
+        [
+            AIMessage(content="", tool_calls=[issued]),
+            ToolMessage(content="page", tool_call_id="call-1"),
+            synthetic,
+            ToolMessage(content="summary", tool_call_id="call-2"),
+        ]
+    )
+
+    rows = messages_to_entry_dicts(tail, 1)
+
+    assert [r["role"] for r in rows] == [
+        enums.TranscriptRole.ASSISTANT,
+        enums.TranscriptRole.TOOL,
+        enums.TranscriptRole.TOOL,
+    ]
+    assert [c["id"] for c in rows[0]["tool_calls"]] == ["call-1", "call-2"]
+    assert [r["sequence_num"] for r in rows] == [1, 2, 3]
+
+
+def test_synthetic_message_without_its_issuer_keeps_a_row():
+    late = {"name": "summarise", "args": {}, "id": "call-2"}
+    m = AIMessage(
+        content="", tool_calls=[late], additional_kwargs={SYNTHETIC_MESSAGE_KEY: True}
+    )
+
+    rows = messages_to_entry_dicts([m], 1)
+
+    assert len(rows) == 1
+    assert rows[0]["tool_calls"][0]["id"] == "call-2"
@@ -0,0 +1,91 @@
+"""Unit tests for keyset-paged transcript reads and the streaming transcript API."""
+
+from __future__ import annotations
+
+import json
+from contextlib import asynccontextmanager
+from datetime import UTC, datetime
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+from superagent.api import routes
+from superagent.persistence import transcript_store
+
+
+def _row(seq: int) -> SimpleNamespace:
+    return SimpleNamespace(
+        sequence_num=seq,
+        role="USER" if seq % 2 else "ASSISTANT",
+        content=f"m{seq}",
+        tool_calls=None,
+        tool_call_id=None,
+        tool_name=None,
+        tool_inputs=None,
+        tool_status=None,
+        created_at=datetime(2026, 10, 1, tzinfo=UTC),
+    )
+
+
+class _FakeDB:
+    def __init__(self, count: int) -> None:
+        self.rows = [_row(i) for i in range(1, count + 1)]
+        self.queries: list[dict[str, Any]] = []
+        self.sessiontranscriptentry = self
+
+    async def find_many(self, where: dict[str, Any], order: Any, take: int) -> list:
+        self.queries.append({"after": where["sequence_num"]["gt"], "take": take})
+        after = where["sequence_num"]["gt"]
+        return [r for r in self.rows if r.sequence_num > after][:take]
+
+    @asynccontextmanager
+    async def session(self):
+        yield self
+
+
+@pytest.fixture
+def db(monkeypatch) -> _FakeDB:
+    fake = _FakeDB(count=7)
+    monkeypatch.setattr(transcript_store, "DB", fake)
+
+    async def owner(session_id: str, user_id: str) -> bool:
+        return user_id == "u1"
+
+    monkeypatch.setattr(transcript_store, "verify_session_owner", owner)
+    return fake
+
+
+@pytest.mark.asyncio
+async def test_iter_reads_bounded_keyset_pages(db):
+    rows = [r async for r in transcript_store.iter_transcript_rows("s1", page_size=3)]
+    assert [r.sequence_num for r in rows] == list(range(1, 8))
+    assert db.queries == [
+        {"after": 0, "take": 3},
+        {"after": 3, "take": 3},
+        {"after": 6, "take": 3},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_transcript_page_returns_cursor(db):
+    first = await routes.get_transcript("s1", user_id="u1", after=0, limit=4)
+    assert [e.sequence_num for e in first.entries] == [1, 2, 3, 4]
+    assert first.next_after == 4
+
+    last = await routes.get_transcript("s1", user_id="u1", after=4, limit=4)
+    assert [e.sequence_num for e in last.entries] == [5, 6, 7]
+    assert last.next_after is None
+
+
+@pytest.mark.asyncio
+async def test_transcript_without_limit_streams_whole_body(db, monkeypatch):
+    from superagent.config import settings
+
+    monkeypatch.setattr(settings, "transcript_page_size", 2)
+    resp = await routes.get_transcript("s1", user_id="u1", after=2, limit=None)
+    body = "".join([chunk async for chunk in resp.body_iterator])
+
+    payload = json.loads(body)
+    assert [e["sequence_num"] for e in payload["entries"]] == [3, 4, 5, 6, 7]
+    assert payload["next_after"] is None
+    assert len(db.queries) == 3
@@ -0,0 +1,296 @@
+"""Unit tests for batched transcript inserts and the write-behind queue."""
+
+from __future__ import annotations
+
+import asyncio
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+from superagent.graph import runner as runner_module
+from superagent.graph.runner import SessionRunner
+from superagent.persistence import transcript_store
+from superagent.persistence.write_behind import WriteBehindQueue
+
+
+class _FakeTx:
+    """ConversationSession + SessionTranscriptEntry tables inside one tx."""
+
+    def __init__(
+        self, next_sequence_num: int, persisted_message_count: int = 0
+    ) -> None:
+        self.next_sequence_num = next_sequence_num
+        self.persisted_message_count = persisted_message_count
+        self.inserts: list[list[dict[str, Any]]] = []
+        self.fail_insert = False
+        self.conversationsession = self
+        self.sessiontranscriptentry = self
+
+    async def update_many(self, where: dict[str, Any], data: dict[str, Any]) -> int:
+        if where["persisted_message_count"] != self.persisted_message_count:
+            return 0
+        self.next_sequence_num += data["next_sequence_num"]["increment"]
+        self.persisted_message_count = data["persisted_message_count"]
+        return 1
+
+    async def find_unique(self, where: dict[str, Any]) -> Any:
+        return SimpleNamespace(
+            next_sequence_num=self.next_sequence_num,
+            persisted_message_count=self.persisted_message_count,
+            user_id="u1",
+        )
+
+    async def create_many(self, data: list[dict[str, Any]]) -> int:
+        if self.fail_insert:
+            raise ConnectionError("connection reset")
+        self.inserts.append(data)
+        return len(data)
+
+
+class _FakeDB:
+    def __init__(self, tx: _FakeTx) -> None:
+        self._tx = tx
+        self.committed: list[int] = []
+        self.conversationsession = tx
+
+    @asynccontextmanager
+    async def session(self):
+        yield self
+
+    @asynccontextmanager
+    async def tx(self):
+        # Commit the counter only if the block succeeds, like a real transaction.
+        before = (self._tx.next_sequence_num, self._tx.persisted_message_count)
+        try:
+            yield self._tx
+        except Exception:
+            self._tx.next_sequence_num, self._tx.persisted_message_count = before
+            raise
+        self.committed.append(self._tx.next_sequence_num)
+
+
+@pytest.fixture
+def fake_tx(monkeypatch) -> _FakeTx:
+    tx = _FakeTx(next_sequence_num=4, persisted_message_count=1)
+    monkeypatch.setattr(transcript_store, "DB", _FakeDB(tx))
+    monkeypatch.setattr(
+        transcript_store,
+        "messages_to_entry_dicts",
+        lambda msgs, start: [
+            {"sequence_num": start + i, "content": m.content}
+            for i, m in enumerate(msgs)
+        ],
+    )
+    monkeypatch.setattr(
+        transcript_store,
+        "prisma_transcript_entry_create_data",
+        lambda session_id, row: {"session_id": session_id, **row},
+    )
+    return tx
+
+
+@pytest.mark.asyncio
+async def test_persist_reserves_sequence_block_and_inserts_once(fake_tx):
+    messages = [HumanMessage("a"), AIMessage("b"), HumanMessage("c"), AIMessage("d")]
+    count = await transcript_store.persist_new_messages("s1", messages, 1)
+
+    assert count == 4
+    assert len(fake_tx.inserts) == 1
+    assert [r["sequence_num"] for r in fake_tx.inserts[0]] == [4, 5, 6]
+    assert fake_tx.next_sequence_num == 7
+
+
+@pytest.mark.asyncio
+async def test_failed_insert_rolls_back_counter_and_raises(fake_tx):
+    fake_tx.fail_insert = True
+    with pytest.raises(ConnectionError):
+        await transcript_store.persist_new_messages(
+            "s1", [HumanMessage("a"), HumanMessage("b")], 1
+        )
+    assert fake_tx.next_sequence_num == 4
+
+
+@pytest.mark.asyncio
+async def test_stale_count_inserts_nothing(fake_tx):
+    fake_tx.persisted_message_count = 3
+    with pytest.raises(transcript_store.TranscriptCountConflict):
+        await transcript_store.persist_new_messages(
+            "s1", [HumanMessage("a"), AIMessage("b"), HumanMessage("c")], 1
+        )
+    assert fake_tx.inserts == []
+    assert fake_tx.next_sequence_num == 4
+
+
+@pytest.mark.asyncio
+async def test_racing_writers_append_each_message_once(fake_tx, monkeypatch):
+    messages = [HumanMessage("a"), AIMessage("b"), HumanMessage("c"), AIMessage("d")]
+    real_meta = transcript_store.get_session_meta
+    reads = 0
+
+    async def meta_then_race(session_id: str):
+        nonlocal reads
+        reads += 1
+        meta = await real_meta(session_id)
+        if reads == 1:
+            # Another writer lands the first turn right after this read.
+            await transcript_store.persist_new_messages(session_id, messages[:3], 1)
+        return meta
+
+    monkeypatch.setattr(transcript_store, "get_session_meta", meta_then_race)
+    await SessionRunner._write_transcript(None, "s1", messages)
+
+    written = [r["content"] for batch in fake_tx.inserts for r in batch]
+    assert written == ["b", "c", "d"]
+    assert fake_tx.persisted_message_count == 4
+
+
+@pytest.mark.asyncio
+async def test_persist_snapshots_stream_values_without_touching_the_db(
+    fake_tx, monkeypatch
+):
+    reads = 0
+    real_find = fake_tx.find_unique
+
+    async def counted_find(where: dict[str, Any]) -> Any:
+        nonlocal reads
+        reads += 1
+        return await real_find(where)
+
+    monkeypatch.setattr(fake_tx, "find_unique", counted_find)
+    # No aget_state: the tail must not read the checkpoint.
+    runner = SimpleNamespace(_graph=SimpleNamespace())
+    runner._write_transcript = SessionRunner._write_transcript.__get__(runner)
+    queue = WriteBehindQueue("t", workers=1)
+    gate = asyncio.Event()
+
+    async def blocked() -> None:
+        await gate.wait()
+
+    monkeypatch.setattr(transcript_store, "TRANSCRIPT_WRITES", queue)
+    monkeypatch.setattr(runner_module.settings, "transcript_write_behind", True)
+    queue.submit("s1", blocked)
+    await asyncio.sleep(0)
+    values = {"messages": [HumanMessage("a"), AIMessage("b")], "user_id": "u1"}
+    await SessionRunner._persist_transcript(runner, "s1", None, values)
+    assert reads == 0
+    # The next turn's stream reuses the list before the queued job runs.
+    values["messages"].extend([HumanMessage("c"), AIMessage("d")])
+    gate.set()
+    assert await queue.flush(timeout=1)
+
+    written = [r["content"] for batch in fake_tx.inserts for r in batch]
+    assert written == ["b"]
+    assert fake_tx.persisted_message_count == 2
+    await queue.aclose()
+
+
+@pytest.mark.asyncio
+async def test_jobs_for_one_key_coalesce_and_never_overlap():
+    queue = WriteBehindQueue("t", workers=3)
+    gate = asyncio.Event()
+    ran: list[str] = []
+    active = 0
+
+    def job(label: str):
+        async def run() -> None:
+            nonlocal active
+            active += 1
+            assert active == 1
+            await gate.wait()
+            ran.append(label)
+            active -= 1
+
+        return run
+
+    assert queue.submit("s1", job("first"))
+    await asyncio.sleep(0)
+    assert queue.submit("s1", job("second"))
+    assert queue.submit("s1", job("third"))
+    gate.set()
+    assert await queue.wait_for("s1", timeout=1)
+    assert ran == ["first", "third"]
+    assert queue.stats()["coalesced"] == 1
+    await queue.aclose()
+
+
+@pytest.mark.asyncio
+async def test_failed_job_is_retried():
+    queue = WriteBehindQueue("t", max_retries=2, retry_backoff_seconds=0)
+    attempts = 0
+
+    async def flaky() -> None:
+        nonlocal attempts
+        attempts += 1
+        if attempts < 3:
+            raise ConnectionError("db blip")
+
+    queue.submit("s1", flaky)
+    assert await queue.flush(timeout=1)
+    assert attempts == 3
+    assert queue.stats()["retries"] == 2
+    assert queue.stats()["failed"] == 0
+    await queue.aclose()
+
+
+@pytest.mark.asyncio
+async def test_full_queue_rejects_so_caller_writes_inline():
+    queue = WriteBehindQueue("t", workers=1, max_pending=1)
+    gate = asyncio.Event()
+
+    async def blocked() -> None:
+        await gate.wait()
+
+    queue.submit("s1", blocked)
+    await asyncio.sleep(0)
+    assert queue.submit("s2", blocked)
+    assert not queue.submit("s3", blocked)
+    assert queue.stats()["rejected"] == 1
+    gate.set()
+    await queue.aclose()
+
+
+@pytest.mark.asyncio
+async def test_turn_after_tail_hydration_persists_only_the_new_messages(
+    fake_tx, monkeypatch
+):
+    # 30 messages are already persisted, but the checkpoint is gone and the
+    # state is rebuilt from the last 4 of them.
+    fake_tx.persisted_message_count = 30
+    tail = [
+        HumanMessage("q14"),
+        AIMessage("a14"),
+        HumanMessage("q15"),
+        AIMessage("a15"),
+    ]
+
+    async def load_tail(session_id: str, max_turns: int) -> list[Any]:
+        return tail
+
+    class _Graph:
+        async def aget_state(self, cfg: dict[str, Any]) -> None:
+            return None
+
+        async def astream(self, state: dict[str, Any], cfg: Any, stream_mode: Any):
+            yield (
+                "values",
+                {**state, "messages": [*state["messages"], AIMessage("a16")]},
+            )
+
+    monkeypatch.setattr(transcript_store, "load_transcript_tail", load_tail)
+    monkeypatch.setattr(transcript_store, "rows_to_langchain", list)
+    monkeypatch.setattr(runner_module.settings, "transcript_write_behind", False)
+    runner = SessionRunner(_Graph())
+
+    events = [
+        e
+        async for e in runner.run_turn(
+            "s1", "u1", "q16", session_credentials={"__llm__": {"api_key": "k"}}
+        )
+    ]
+
+    assert events[-1] == {"type": "done", "session_id": "s1"}
+    written = [r["content"] for batch in fake_tx.inserts for r in batch]
+    assert written == ["q16", "a16"]
+    assert fake_tx.persisted_message_count == 32
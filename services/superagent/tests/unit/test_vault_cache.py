@@ -0,0 +1,105 @@
+"""Unit tests for bulk vault reads and the encrypted per-user secret cache."""
+
+from __future__ import annotations
+
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+from superagent.vault import client as vault_client
+from superagent.vault.client import VaultClient, _encrypt
+
+
+class _Encrypted:
+    def __init__(self, data: bytes) -> None:
+        self._data = data
+
+    def decode(self) -> bytes:
+        return self._data
+
+
+class _FakeDB:
+    """Stands in for the pooled Prisma client's ``usersecret`` table."""
+
+    def __init__(self, secrets: dict[tuple[str, str], str]) -> None:
+        self.rows = {k: _encrypt(v) for k, v in secrets.items()}
+        self.queries: list[dict[str, Any]] = []
+        self.usersecret = self
+
+    async def find_many(self, where: dict[str, Any]) -> list[Any]:
+        self.queries.append(where)
+        return [
+            SimpleNamespace(key=key, encrypted_value=_Encrypted(data))
+            for (user_id, key), data in self.rows.items()
+            if user_id == where["user_id"] and key in where["key"]["in"]
+        ]
+
+    async def delete(self, where: dict[str, Any]) -> None:
+        ref = where["user_id_key"]
+        del self.rows[(ref["user_id"], ref["key"])]
+
+    @asynccontextmanager
+    async def session(self):
+        yield self
+
+
+@pytest.fixture
+def db(monkeypatch) -> _FakeDB:
+    fake = _FakeDB(
+        {
+            ("u1", "agent:gh:env:TOKEN"): "tok",
+            ("u1", "agent:gh:env:ORG"): "acme",
+            ("u2", "agent:gh:env:TOKEN"): "other",
+        }
+    )
+    monkeypatch.setattr(vault_client, "DB", fake)
+    vault_client._SECRET_CACHE.clear()
+    yield fake
+    vault_client._SECRET_CACHE.clear()
+
+
+@pytest.mark.asyncio
+async def test_get_agent_envs_is_one_query(db):
+    envs = await VaultClient().get_agent_envs("u1", "gh", ["TOKEN", "ORG", "MISSING"])
+    assert envs == {"TOKEN": "tok", "ORG": "acme"}
+    assert len(db.queries) == 1
+
+
+@pytest.mark.asyncio
+async def test_cache_serves_hits_and_known_misses_per_user(db):
+    vault = VaultClient()
+    await vault.get_agent_envs("u1", "gh", ["TOKEN", "MISSING"])
+    assert await vault.get_agent_env("u1", "gh", "TOKEN") == "tok"
+    assert await vault.get_agent_env("u1", "gh", "MISSING") is None
+    assert len(db.queries) == 1
+    # Another user's lookup never reads u1's entries.
+    assert await vault.get_agent_env("u2", "gh", "TOKEN") == "other"
+    assert len(db.queries) == 2
+
+
+@pytest.mark.asyncio
+async def test_cache_holds_ciphertext_only(db):
+    await VaultClient().get_agent_envs("u1", "gh", ["TOKEN"])
+    cached = vault_client._SECRET_CACHE.get_many("u1", ["agent:gh:env:TOKEN"])
+    assert b"tok" not in cached["agent:gh:env:TOKEN"]
+
+
+@pytest.mark.asyncio
+async def test_delete_invalidates_cached_value(db):
+    vault = VaultClient()
+    assert await vault.get_agent_env("u1", "gh", "TOKEN") == "tok"
+    await vault.delete_agent_env("u1", "gh", "TOKEN")
+    assert await vault.get_agent_env("u1", "gh", "TOKEN") is None
+    assert len(db.queries) == 2
+
+
+@pytest.mark.asyncio
+async def test_zero_ttl_disables_cache(db, monkeypatch):
+    from superagent.config import settings
+
+    monkeypatch.setattr(settings, "vault_cache_ttl_seconds", 0)
+    vault = VaultClient()
+    await vault.get_agent_env("u1", "gh", "TOKEN")
+    await vault.get_agent_env("u1", "gh", "TOKEN")
+    assert len(db.queries) == 2